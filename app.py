@@ -1,124 +1,145 @@
-# === Auto-install ProStocks SDK if not already installed ===
-import subprocess
-import sys
-
-try:
-    from NorenApi import NorenApi  # Attempt to import it
-except ImportError:
-    subprocess.check_call([
-        sys.executable, "-m", "pip", "install",
-        "git+https://github.com/Prostocks/starapi-python.git"
-    ])
-    from NorenApi import NorenApi  # Try again after install
-
-import os
-import logging
-import streamlit as st
-from dotenv import load_dotenv
-from prostocks_connector import login_ps
-from intraday_trading_engine import TradingEngine
-
-# ✅ Basic setup
-st.set_page_config(page_title="📈 Intraday Stock Dashboard", layout="wide")
-logging.basicConfig(level=logging.DEBUG)
-load_dotenv()
-print("📄 app.py started execution")
-
-
-
-
-# ========== LOGIN BLOCK ==========
-
-if "ps_api" not in st.session_state:
-    st.title("🔐 Login to ProStocks")
-
-    # Load from environment (Render or .env)
-    env_user_id = os.getenv("PROSTOCKS_USER_ID")
-    env_password = os.getenv("PROSTOCKS_PASSWORD")
-    env_totp = os.getenv("PROSTOCKS_FACTOR2")
-
-    env_api_key = os.getenv("PROSTOCKS_API_KEY")
-
-    # 🧠 Show login form (default values filled if in env)
-    with st.form("login_form"):
-        st.markdown("**🔑 Enter your ProStocks API credentials:**")
-        user_id = st.text_input("User ID", value=env_user_id or "")
-        password = st.text_input("Password", type="password", value=env_password or "")
-        totp_secret = st.text_input("TOTP Secret", value=env_totp or "")
-        api_key = st.text_input("API Key", value=env_api_key or "")
-        submitted = st.form_submit_button("Login")
-
-    if submitted:
-        st.warning("🚧 Login button pressed - starting login...")
-        logging.debug("🚀 login_ps() function started")
-
-        # Call login with these inputs
-        with st.spinner("🔄 Logging in..."):
-            ps_api = login_ps(user_id, password, totp_secret, api_key)
-
-        if ps_api:
-            st.session_state["ps_api"] = ps_api
-            st.success("✅ Login successful! Reloading...")
-            st.experimental_rerun()
-        else:
-            st.error("❌ Login failed. Please check your credentials.")
-            st.stop()
-    else:
-        # ⚠️ STOP page until form is submitted
-        st.warning("🔒 Please login to continue.")
-        st.stop()
-
-
-
-
-
-# ========== DASHBOARD BEGINS AFTER LOGIN ==========
-
-class Dashboard:
-    def __init__(self):
-        st.sidebar.title("⚙️ Trading Controls")
-        self.auto_buy = st.sidebar.checkbox("Auto Buy", value=False)
-        self.auto_sell = st.sidebar.checkbox("Auto Sell", value=False)
-        self.master_auto = st.sidebar.checkbox("Master Auto Mode", value=False)
-
-    def log_trade(self, symbol, side, price, qty, sl, tgt, time):
-        st.success(f"{side} {symbol} @ ₹{price} | Qty: {qty} | SL: ₹{sl} | Target: ₹{tgt} | Time: {time}")
-
-    def close_position(self, symbol, position):
-        st.warning(f"Auto-exited {symbol} ({position['side']}) @ {position['entry_price']}")
-
-    def update_visuals(self, positions, indicators):
-        st.subheader("📊 Active Positions")
-        st.write(positions)
-
-# 🎯 Main UI Title
-st.title("📈 Intraday Trading Dashboard")
-
-# 🧠 Initialize engine
-dashboard = Dashboard()
-engine = TradingEngine(dashboard, st.session_state["ps_api"])
-
-# ✅ Simulated input example (you will replace this with real logic later)
-stock_data = {
-    "symbol": "LTFOODS",
-    "price": 190,
-    "y_close": 185,
-    "open": 186,
-    "indicators": {
-        "atr_trail": "Buy",
-        "tkp_trm": "Buy",
-        "macd_hist": 0.5,
-        "above_pac": True,
-        "volatility": 2.3,
-        "min_vol_required": 2.0,
-        "pac_band_lower": 185,
-        "pac_band_upper": 194
-    },
-    "qcfg": {"Q1": 100, "Q2": 80, "Q3": 60, "Q4": 40, "Q5": 30, "Q6": 20},
-    "time": "09:30",
-    "balance": 50000
-}
-
-# 🚀 Trigger trade engine if enabled
-if dashboard.master_auto:
-    engine.process_trade(**stock_data)
\ No newline at end of file
+# app.py
+# The ProStocks SDK is a requirements.txt dependency, installed with the app, never at run time.
+# Only what the login page needs is imported up front; the engine loads after login.
+
+import os
+import streamlit as st
+from dotenv import load_dotenv
+from prostocks_connector import login_ps
+from prostocks_logging import get_logger, setup_logging
+
+# ✅ Basic setup
+st.set_page_config(page_title="📈 Intraday Stock Dashboard", layout="wide")
+load_dotenv()
+setup_logging()  # PROSTOCKS_LOG_LEVEL / _JSON / _FILE, now that .env is loaded; a no-op on reruns
+log = get_logger("app")
+
+
+
+
+# ========== LOGIN BLOCK ==========
+
+if "ps_api" not in st.session_state:
+    st.title("🔐 Login to ProStocks")
+
+    # Load from environment (Render or .env)
+    env_user_id = os.getenv("PROSTOCKS_USER_ID")
+    env_password = os.getenv("PROSTOCKS_PASSWORD")
+    env_totp = os.getenv("PROSTOCKS_FACTOR2")
+
+    env_api_key = os.getenv("PROSTOCKS_API_KEY")
+
+    # 🧠 Show login form (default values filled if in env)
+    with st.form("login_form"):
+        st.markdown("**🔑 Enter your ProStocks API credentials:**")
+        user_id = st.text_input("User ID", value=env_user_id or "")
+        password = st.text_input("Password", type="password", value=env_password or "")
+        totp_secret = st.text_input("TOTP Secret", value=env_totp or "")
+        api_key = st.text_input("API Key", value=env_api_key or "")
+        submitted = st.form_submit_button("Login")
+
+    if submitted:
+        st.warning("🚧 Login button pressed - starting login...")
+        log.debug("🚀 login_ps() function started")
+
+        # Call login with these inputs
+        with st.spinner("🔄 Logging in..."):
+            ps_api = login_ps(user_id, password, totp_secret, api_key)
+
+        if ps_api:
+            from dashboard_logic import load_settings
+            from risk_engine import RiskEngine, RiskGate
+            # One pre-trade gate for everything this session sends, engine or manual
+            st.session_state["ps_api"] = RiskGate(ps_api, RiskEngine(load_settings().get("risk_limits")))
+            st.success("✅ Login successful! Reloading...")
+            st.experimental_rerun()
+        else:
+            st.error("❌ Login failed. Please check your credentials.")
+            st.stop()
+    else:
+        # ⚠️ STOP page until form is submitted
+        st.warning("🔒 Please login to continue.")
+        st.stop()
+
+
+
+
+
+# ========== DASHBOARD BEGINS AFTER LOGIN ==========
+# The engine runs in its own asyncio loop (engine_runtime.py) and evaluates on bar
+# close and on ticks; reruns of this script only read its state and flip toggles.
+from engine_runtime import EngineRuntime  # NumPy / indicators / asyncio: not needed on the login page
+
+st.sidebar.title("⚙️ Trading Controls")
+auto_buy = st.sidebar.checkbox("Auto Buy", value=False)
+auto_sell = st.sidebar.checkbox("Auto Sell", value=False)
+master_auto = st.sidebar.checkbox("Master Auto Mode", value=False)
+symbols_text = st.sidebar.text_input("Symbols", value="LTFOODS-EQ")
+interval = st.sidebar.selectbox("Bar interval (min)", ["1", "3", "5", "15"], index=2)
+
+# 🧠 One runtime per login; restarted only when the watch list or interval changes
+symbols = tuple(s.strip().upper() for s in symbols_text.split(",") if s.strip())
+runtime = st.session_state.get("engine_runtime")
+if runtime is not None and (tuple(runtime.symbols) != symbols or runtime.interval != interval):
+    runtime.stop()
+    runtime = None
+if runtime is None and symbols:
+    # ps_api is the session's RiskGate: the runtime checks through it and keeps its RiskEngine fed
+    runtime = EngineRuntime(st.session_state["ps_api"], symbols, interval=interval).start()
+    st.session_state["engine_runtime"] = runtime
+if runtime is not None:
+    runtime.update_settings(master_auto=master_auto, auto_buy=auto_buy, auto_sell=auto_sell)
+
+# 🎯 Main UI Title
+st.title("📈 Intraday Trading Dashboard")
+
+if runtime is None:
+    st.info("Add at least one symbol to start the engine.")
+    st.stop()
+
+snap = runtime.state.snapshot()
+c1, c2, c3, c4 = st.columns(4)
+c1.metric("Engine", snap["status"])
+c2.metric("Last bar", snap["last_bar"] or "—")
+c3.metric("Bars processed", snap["bars_processed"])
+c4.metric("Ticks processed", snap["ticks_processed"])
+if st.button("🔄 Refresh"):
+    st.rerun()
+
+st.subheader("📊 Positions")
+# From the runtime's PositionBook: fills folded incrementally, MTM against the latest prices, no broker call
+book = runtime.positions.totals()
+p1, p2, p3, p4 = st.columns(4)
+p1.metric("Day P&L", f"₹{book['pnl']:,.2f}")
+p2.metric("Realized", f"₹{book['realized']:,.2f}")
+p3.metric("MTM", f"₹{book['unrealized']:,.2f}")
+p4.metric("Open positions", book["open"])
+rows = runtime.positions.rows()
+if rows:
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+else:
+    st.info("No fills yet")
+if snap["positions"]:
+    with st.expander("🎯 Engine stops / targets"):
+        st.write(snap["positions"])
+
+st.subheader("📐 Indicators (last bar)")
+st.write(snap["indicators"])
+
+st.subheader("✅ Trades")
+for t in reversed(snap["trades"]):
+    st.success(f"{t['side']} {t['symbol']} @ ₹{t['price']} | Qty: {t['qty']} | SL: ₹{t['sl']} | "
+               f"Target: ₹{t['tgt']} | Time: {t['time']}")
+
+st.subheader("🚪 Exits")
+for x in reversed(snap["exits"]):
+    st.warning(f"Auto-exited {x['symbol']} ({x['side']}) @ {x.get('exit_price', x['entry_price'])} "
+               f"[{x.get('reason')}]")
+
+if runtime.risk is not None:
+    r = runtime.risk.snapshot()
+    st.caption(f"🛡 Risk: gross ₹{r['gross']:,.0f} · net ₹{r['net']:,.0f} · open orders {r['open_orders']} · "
+               f"blocked {sum(r['rejects'].values())}")
+
+for when, msg in snap["errors"]:
+    st.error(f"{when} {msg}")
@@ -0,0 +1,456 @@
+# backtester.py
+# Offline backtests of the live strategy (strategy_rules / RulesEngine) over
+# candles stored on disk in CandleStore's layout (or any (6, n) .npy / .csv).
+# No network: nothing here touches the broker.
+#
+# Two paths share the indicator pass (IndicatorEngine over a chunk of symbols,
+# one time block at a time, so its working set stays at BLOCK bars).  The
+# aligned o/h/l/c rows are full-length - about 32 bytes per symbol per bar - so
+# over years of 1m bars it is --chunk that bounds a worker's memory:
+#
+#   fast   entry_side_vec on every bar, positions held until atr_trail flips,
+#          the day changes or auto_exit_time; P&L close to close.  No stops,
+#          targets or fill modelling - for sweeping parameters.
+#   event  RulesEngine.process_trade bar by bar against SimBroker: entries and
+#          discretionary exits fill at the next bar's open, stops and targets at
+#          their level (or the open when the bar gapped through).  Flat stretches
+#          with no entry signal are skipped, since the engine would do nothing.
+#
+# Symbol chunks x indicator-parameter sets run in a process pool; parameter sets
+# that only differ in rule settings (min_vol_required, qcfg, windows, costs)
+# reuse one indicator pass.
+#
+#   python backtester.py --symbols 2885,1594 --interval 1 --start 2023-01-01 \
+#       --sweep min_vol_required=1,1.5,2 --sweep atr_mult=2,3 --workers 4
+
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+import strategy_rules
+from candle_store import CANDLE_CACHE, COLUMNS, IST_OFFSET, Candles
+from indicator_engine import DEFAULT_PARAMS, IndicatorEngine, indicators_of, signal_fields
+from trading_engine import RulesEngine
+
+# Outputs the rules read, kept per bar for one time block
+NEEDED = ("macd_hist", "pac_band_upper", "pac_band_lower", "atr_stop", "volatility", "tsi", "tsi_signal", "rsi")
+BLOCK = 8192
+CHUNK = 64
+
+# Rule settings (everything else in a parameter set goes to IndicatorEngine)
+DEFAULT_RULES = {
+    "min_vol_required": DEFAULT_PARAMS["min_vol_required"],
+    "qcfg": strategy_rules.DEFAULT_QCFG,
+    "balance": 50000,
+    "trading_start": "09:15",
+    "cutoff_time": "14:50",
+    "auto_exit_time": "15:12",
+    "cost_bps": 0.0,
+}
+WINDOWS = ("trading_start", "cutoff_time", "auto_exit_time")
+
+
+# === Data ===
+def load_candles(token, interval="1", exchange="NSE", start=None, end=None, cache_dir=CANDLE_CACHE):
+    """Day files <cache>/<EXCH>/<token>/<interval>m/*.npy between start and end (YYYY-MM-DD, inclusive)."""
+    path = os.path.join(cache_dir, exchange, str(token), f"{interval}m")
+    parts = []
+    for name in sorted(os.listdir(path)) if os.path.isdir(path) else ():
+        day = name[:-4]
+        if not name.endswith(".npy") or day.endswith(".tmp"):
+            continue
+        if (start and day < str(start)) or (end and day > str(end)):
+            continue
+        parts.append(np.load(os.path.join(path, name), mmap_mode="r"))
+    return Candles(*(np.concatenate(parts, axis=1) if parts else np.empty((6, 0))))
+
+
+def load_file(path):
+    """One series from a (6, n) .npy or a .csv with t,o,h,l,c,v columns (t in epoch seconds)."""
+    if path.endswith(".npy"):
+        return Candles(*np.load(path, mmap_mode="r"))
+    import pandas as pd
+    df = pd.read_csv(path)
+    return Candles(*(df[k].to_numpy(dtype=np.float64) for k in COLUMNS))
+
+
+def _load(source, opts):
+    if isinstance(source, str) and source.endswith((".npy", ".csv")):
+        return load_file(source)
+    return load_candles(source, opts["interval"], opts["exchange"], opts.get("start"), opts.get("end"),
+                        opts["cache_dir"])
+
+
+def align(series):
+    """Candles list -> (t, o, h, l, c) with one row per series on the union of timestamps, NaN where absent.
+
+    Full-length (len(series), len(t)) float64 arrays: size the chunk of symbols to fit.
+    """
+    t = np.unique(np.concatenate([np.asarray(s.t) for s in series])) if series else np.empty(0)
+    cols = {k: np.full((len(series), len(t)), np.nan) for k in "ohlc"}
+    for i, s in enumerate(series):
+        pos = np.searchsorted(t, s.t)
+        for k in "ohlc":
+            cols[k][i, pos] = getattr(s, k)
+    return t, cols["o"], cols["h"], cols["l"], cols["c"]
+
+
+# === Parameters ===
+def split_params(params):
+    """A parameter set -> (IndicatorEngine params, rule settings)."""
+    params = dict(params or {})
+    rules = dict(DEFAULT_RULES, **{k: v for k, v in params.items() if k in DEFAULT_RULES})
+    ind = {k: v for k, v in params.items() if k not in DEFAULT_RULES}
+    return ind, rules
+
+
+def _minute(value):
+    if isinstance(value, str):
+        value = datetime.strptime(value, "%H:%M").time()
+    return value.hour * 60 + value.minute
+
+
+def _settings(rules):
+    return {"master_auto": True, "auto_buy": True, "auto_sell": True,
+            **{k: datetime.strptime(rules[k], "%H:%M").time() if isinstance(rules[k], str) else rules[k]
+               for k in WINDOWS}}
+
+
+def _ffill(x):
+    ok = ~np.isnan(x)
+    idx = np.where(ok, np.arange(len(x)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    return np.where(ok[idx], x[idx], np.nan)
+
+
+def _summary(pnl, bars_in_position, bars):
+    pnl = np.asarray(pnl, dtype=np.float64)
+    equity = np.cumsum(pnl)
+    drawdown = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:] - equity if len(pnl) else np.zeros(1)
+    return {"trades": len(pnl), "wins": int((pnl > 0).sum()), "pnl": round(float(pnl.sum()), 2),
+            "max_dd": round(float(drawdown.max()), 2), "exposure": round(bars_in_position / max(bars, 1), 4)}
+
+
+# === Fast path: vectorized over bars ===
+def fast_trades(t, c, side, atr_buy, rules):
+    """
+    One row: entries where `side` fires inside the entry window; a trade runs until
+    atr_trail flips, the session day changes or auto_exit_time, closing at that
+    bar's close (the previous close when the day changed).
+
+    :return: (entry_idx, exit_idx, side, qty, entry_px, exit_px, pnl) arrays.
+    """
+    n = len(t)
+    empty = (np.empty(0, np.int64),) * 2 + (np.empty(0),) * 5
+    if n == 0:
+        return empty
+    local = t.astype(np.int64) + IST_OFFSET
+    day, mod = local // 86400, (local % 86400) // 60
+    cf = _ffill(c)
+    qty = strategy_rules.quantity_vec(np.nan_to_num(cf), rules["qcfg"], rules["balance"])
+    enter = (side != strategy_rules.FLAT) & ~np.isnan(c) & (qty > 0) \
+        & (mod >= _minute(rules["trading_start"])) & (mod < _minute(rules["cutoff_time"]))
+
+    # A trade lives inside one run of constant atr_trail on one day
+    boundary = np.ones(n, dtype=bool)
+    boundary[1:] = (atr_buy[1:] != atr_buy[:-1]) | (day[1:] != day[:-1])
+    group_start = np.maximum.accumulate(np.where(boundary, np.arange(n), 0))
+    # Only the first entry of a run counts: the engine ignores signals while holding
+    prev_entry = np.concatenate(([-1], np.maximum.accumulate(np.where(enter, np.arange(n), -1))[:-1]))
+    enter &= prev_entry < group_start
+    last_entry = np.maximum.accumulate(np.where(enter, np.arange(n), -1))
+    held = (last_entry >= group_start) & (mod < _minute(rules["auto_exit_time"]))
+    trade = np.where(held, last_entry, -1)
+
+    change = np.ones(n, dtype=bool)
+    change[1:] = trade[1:] != trade[:-1]
+    starts = np.flatnonzero(change & (trade >= 0))
+    ends = np.flatnonzero(change[1:] & (trade[:-1] >= 0)) + 1
+    if trade[-1] >= 0:
+        ends = np.append(ends, n - 1)
+    if not len(starts):
+        return empty
+    exits = np.where(day[ends] == day[starts], ends, ends - 1)
+    sgn, q = side[starts].astype(np.float64), qty[starts].astype(np.float64)
+    entry_px, exit_px = cf[starts], cf[exits]
+    cost = rules["cost_bps"] / 1e4 * q * (entry_px + exit_px)
+    return starts, exits, sgn, q, entry_px, exit_px, sgn * q * (exit_px - entry_px) - cost
+
+
+# === Event path: RulesEngine against a simulated broker ===
+class SimBroker:
+    """
+    ps_api stand-in for RulesEngine.
+
+    MKT entries and trail / auto_exit exits fill at the next bar's open (the
+    decision bar's close if the next bar is another day); stop and target exits
+    fill at their level, or at the open when the bar gapped through it.
+    """
+
+    def __init__(self, engine=None):
+        self.engine = engine
+        self.fills = []  # (t, symbol, signed qty, price)
+        self.pending = []  # (symbol, signed qty, decided at t, close then)
+        self.t = self.open = self.close = None
+        self.seq = 0
+
+    def bar(self, t, o, c):
+        self.t, self.open, self.close = t, o, c
+
+    def fill_pending(self, t, o):
+        for symbol, signed, t0, c0 in self.pending:
+            same_day = (int(t) + IST_OFFSET) // 86400 == (int(t0) + IST_OFFSET) // 86400
+            self.fills.append((t if same_day else t0, symbol, signed, o if same_day else c0))
+        self.pending = []
+
+    def place_order(self, buy_or_sell, product_type, exchange, tradingsymbol, quantity, discloseqty,
+                    price_type, price=0.0, trigger_price=None, retention="DAY", remarks=None, **_):
+        signed = quantity if buy_or_sell == "B" else -quantity
+        position = self.engine.positions.get(tradingsymbol) if self.engine else None
+        if remarks in ("engine_stop", "engine_target") and position is not None:
+            level = position["sl" if remarks == "engine_stop" else "tgt"]
+            # Closing a long sells: a stop below the open or a target above it fills at the open
+            gapped = (self.open <= level) if (signed < 0) == (remarks == "engine_stop") else (self.open >= level)
+            self.fills.append((self.t, tradingsymbol, signed, self.open if gapped else level))
+        else:
+            self.pending.append((tradingsymbol, signed, self.t, self.close))
+        self.seq += 1
+        return {"stat": "Ok", "norenordno": str(self.seq)}
+
+    def trade_pnl(self, cost_bps=0.0):
+        """
+        P&L per round trip, after costs.  Fills are folded per symbol into a running
+        signed position; a trip ends when it comes back to flat (or flips, whose
+        remainder opens the next trip at that fill's price), so scale-ins, partial
+        exits and reversals pair up correctly.
+        """
+        rate = cost_bps / 1e4
+        pnl, book = [], {}  # symbol -> (held, avg entry, trip P&L so far)
+        for _, symbol, q, px in self.fills:
+            if not q:
+                continue
+            held, avg, acc = book.get(symbol, (0, 0.0, 0.0))
+            if held == 0 or (held > 0) == (q > 0):
+                avg = (avg * abs(held) + px * abs(q)) / abs(held + q)
+                acc -= rate * abs(q) * px
+            else:
+                closed = min(abs(q), abs(held))
+                acc += closed * (px - avg) * (1 if held > 0 else -1) - rate * closed * px
+                if held + q == 0 or (held + q > 0) != (held > 0):
+                    pnl.append(acc)
+                    avg, acc = px, -rate * abs(held + q) * px
+            book[symbol] = (held + q, avg, acc)
+        return pnl
+
+
+class _EventRun:
+    """RulesEngine + SimBroker for one symbol, resumable across time blocks."""
+
+    def __init__(self, symbol, rules):
+        self.symbol = symbol
+        self.rules = rules
+        self.engine = RulesEngine(None, None, settings=_settings(rules))
+        self.engine.dashboard = self
+        self.broker = SimBroker(self.engine)
+        self.engine.ps_api = self.broker
+        self.j = 0
+        self.bars_in_position = 0
+        self.last_bar = None
+
+    # RulesEngine dashboard callbacks; the fills are the record
+    def log_trade(self, *args):
+        pass
+
+    def close_position(self, *args):
+        pass
+
+    def step(self, lo, hi, t, o, h, l, c, out, i, side_row, window):
+        sym, engine, broker, rules = self.symbol, self.engine, self.broker, self.rules
+        cand = np.flatnonzero((side_row[lo:hi] != strategy_rules.FLAT) & window[lo:hi]) + lo
+        j = max(self.j, lo)
+        while j < hi:
+            if sym not in engine.positions and not broker.pending:
+                k = np.searchsorted(cand, j)
+                if k == len(cand):
+                    break
+                j = int(cand[k])
+            if c[j] != c[j]:
+                j += 1
+                continue
+            if broker.pending:
+                broker.fill_pending(t[j], o[j])
+            if sym in engine.positions:
+                self.bars_in_position += 1
+            k = j - lo
+            ind = indicators_of(c[j], out["atr_stop"][i, k], out["tsi"][i, k], out["tsi_signal"][i, k],
+                                out["rsi"][i, k], out["macd_hist"][i, k], out["pac_band_upper"][i, k],
+                                out["pac_band_lower"][i, k], out["volatility"][i, k], rules["min_vol_required"])
+            minute = (int(t[j]) + IST_OFFSET) % 86400 // 60
+            broker.bar(t[j], o[j], c[j])
+            engine.process_trade(sym, float(c[j]), ind, qcfg=rules["qcfg"], time=f"{minute // 60:02d}:{minute % 60:02d}",
+                                 balance=rules["balance"], high=float(h[j]), low=float(l[j]))
+            self.last_bar = (t[j], c[j])
+            j += 1
+        self.j = j
+
+    def finish(self):
+        """Close whatever is still open at the last close seen."""
+        if self.last_bar is None:
+            return
+        t, c = self.last_bar
+        self.broker.bar(t, c, c)
+        if self.broker.pending:
+            self.broker.fill_pending(t, c)
+        position = self.engine.positions.pop(self.symbol, None)
+        if position is not None:
+            signed = position["qty"] if position["side"] == "Buy" else -position["qty"]
+            self.broker.fills.append((t, self.symbol, -signed, c))
+
+
+# === One task: a chunk of symbols, one indicator-parameter set, many rule sets ===
+def _run_chunk(names, sources, ind_params, rule_sets, mode, opts):
+    series = [_load(s, opts) for s in sources]
+    t, o, h, l, c = align(series)
+    del series  # the loaded columns; only the aligned copy is needed from here
+    rows, n = c.shape
+    engine = IndicatorEngine(range(rows), ind_params)
+    local = t.astype(np.int64) + IST_OFFSET
+    mod = (local % 86400) // 60
+    windows = [(mod >= _minute(r["trading_start"])) & (mod < _minute(r["cutoff_time"])) for r in rule_sets]
+    sides = [np.zeros((rows, n), dtype=np.int8) for _ in rule_sets]
+    atr_buy = np.zeros((rows, n), dtype=bool)
+    runs = [[_EventRun(name, r) for name in names] for r in rule_sets] if mode == "event" else None
+
+    block = opts.get("block", BLOCK)
+    for lo in range(0, n, block):
+        hi = min(n, lo + block)
+        cb = c[:, lo:hi]
+        out = engine.run(h[:, lo:hi], l[:, lo:hi], cb, keep=NEEDED)
+        sig = signal_fields(cb, out["atr_stop"], out["tsi"], out["tsi_signal"], out["rsi"], out["macd_hist"],
+                            out["pac_band_upper"], out["pac_band_lower"], out["volatility"])
+        atr_buy[:, lo:hi] = cb > out["atr_stop"]
+        for k, rules in enumerate(rule_sets):
+            sides[k][:, lo:hi] = strategy_rules.entry_side_vec(sig, cb, rules["min_vol_required"])
+            if runs is not None:
+                for i, run in enumerate(runs[k]):
+                    run.step(lo, hi, t, o[i], h[i], l[i], c[i], out, i, sides[k][i], windows[k])
+
+    results = []
+    for k, rules in enumerate(rule_sets):
+        for i, name in enumerate(names):
+            bars = int((~np.isnan(c[i])).sum())
+            if mode == "event":
+                run = runs[k][i]
+                run.finish()
+                pnl = run.broker.trade_pnl(rules["cost_bps"])
+                res = _summary(pnl, run.bars_in_position, bars)
+                res["fills"] = run.broker.fills
+            else:
+                trades = fast_trades(t, c[i], sides[k][i], atr_buy[i], rules)
+                res = _summary(trades[6], int((trades[1] - trades[0]).sum()), bars)
+                res["trade_list"] = list(zip(t[trades[0]], t[trades[1]], *trades[2:]))
+            res.update(symbol=name, bars=bars)
+            results.append((k, res))
+    return results
+
+
+def run_backtest(symbols, param_sets=None, mode="fast", workers=None, interval="1", exchange="NSE", start=None,
+                 end=None, cache_dir=CANDLE_CACHE, chunk=CHUNK, block=BLOCK):
+    """
+    Backtest every symbol under every parameter set.
+
+    :param symbols: {name: token or path to a .npy / .csv}, or a list of tokens.
+    :param param_sets: list of dicts mixing IndicatorEngine params and DEFAULT_RULES keys.
+    :return: one result dict per (param set, symbol): param_id, params, symbol, bars,
+             trades, wins, pnl, max_dd (closed-trade), exposure, plus the trades.
+    """
+    if not isinstance(symbols, dict):
+        symbols = {str(s): s for s in symbols}
+    param_sets = list(param_sets or [{}])
+    opts = {"interval": str(interval), "exchange": exchange, "start": start, "end": end, "cache_dir": cache_dir,
+            "block": block}
+    workers = workers or os.cpu_count() or 1
+
+    # Parameter sets sharing indicator params share the indicator pass
+    groups = {}
+    for pid, params in enumerate(param_sets):
+        ind, rules = split_params(params)
+        groups.setdefault(tuple(sorted(ind.items())), []).append((pid, rules))
+    names = list(symbols)
+    chunk = max(1, min(chunk, -(-len(names) // workers)))
+    tasks = [(names[i:i + chunk], [symbols[s] for s in names[i:i + chunk]], dict(ind), [r for _, r in members],
+              mode, opts, [pid for pid, _ in members])
+             for ind, members in groups.items() for i in range(0, len(names), chunk)]
+
+    results = []
+
+    def collect(pids, chunk_results):
+        for k, res in chunk_results:
+            res.update(param_id=pids[k], params=param_sets[pids[k]])
+            results.append(res)
+
+    if workers == 1 or len(tasks) == 1:
+        for *args, pids in tasks:
+            collect(pids, _run_chunk(*args))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            futures = [(pids, pool.submit(_run_chunk, *args)) for *args, pids in tasks]
+            for pids, future in futures:
+                collect(pids, future.result())
+    return sorted(results, key=lambda r: (r["param_id"], r["symbol"]))
+
+
+def summary(results):
+    """Per-parameter-set totals as a DataFrame."""
+    import pandas as pd
+    df = pd.DataFrame([{k: v for k, v in r.items() if k not in ("fills", "trade_list", "params")}
+                       for r in results])
+    agg = df.groupby("param_id").agg(symbols=("symbol", "count"), trades=("trades", "sum"), wins=("wins", "sum"),
+                                     pnl=("pnl", "sum"), worst_dd=("max_dd", "max"))
+    agg["win_rate"] = (agg["wins"] / agg["trades"].where(agg["trades"] > 0)).round(3)
+    params = {r["param_id"]: r["params"] for r in results}
+    agg["params"] = [params[pid] for pid in agg.index]
+    return agg
+
+
+def _sweep_value(v):
+    try:
+        return float(v)
+    except ValueError:
+        return v
+
+
+def _parse_sweep(items):
+    axes = []
+    for item in items or ():
+        key, _, values = item.partition("=")
+        axes.append([(key, _sweep_value(v)) for v in values.split(",")])
+    return [dict(combo) for combo in itertools.product(*axes)] or [{}]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", required=True, help="comma-separated tokens (CandleStore cache) or .npy/.csv files")
+    parser.add_argument("--cache", default=CANDLE_CACHE)
+    parser.add_argument("--exchange", default="NSE")
+    parser.add_argument("--interval", default="1")
+    parser.add_argument("--start", help="YYYY-MM-DD")
+    parser.add_argument("--end", help="YYYY-MM-DD")
+    parser.add_argument("--mode", choices=("fast", "event"), default="fast")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--sweep", action="append", help="param=v1,v2,... (repeat for a grid)")
+    args = parser.parse_args()
+
+    symbols = {os.path.basename(s): s for s in args.symbols.split(",")}
+    results = run_backtest(symbols, _parse_sweep(args.sweep), mode=args.mode, workers=args.workers,
+                           interval=args.interval, exchange=args.exchange, start=args.start, end=args.end,
+                           cache_dir=args.cache)
+    print(summary(results).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# bench_accounts.py
+# Per-account overhead of AccountPool vs one standalone ProStocksAPI per account:
+# memory (tracemalloc) and threads per account, login-all time, and broadcasting
+# one order intent across every account vs a serial loop.
+#
+#   python bench_accounts.py --accounts 50 --latency 0.01
+
+import argparse
+import threading
+import time
+import tracemalloc
+
+import noren_standin
+from prostocks_accounts import AccountPool
+from prostocks_connector import ProStocksAPI
+from prostocks_logging import setup_logging
+
+INTENT = {
+    "buy_or_sell": "B", "product_type": "C", "exchange": "NSE", "tradingsymbol": "SYM0001-EQ",
+    "quantity": 1, "discloseqty": 0, "price_type": "LMT", "price": 101.0, "remarks": "broadcast",
+}
+
+
+def creds(i):
+    uid = f"ACC{i:04d}"
+    return uid, "pwd", "ABCDE1234F", uid, "key", "MAC123456"
+
+
+def standalone(base_url, n):
+    tracemalloc.start()
+    threads = threading.active_count()
+    before = tracemalloc.get_traced_memory()[0]
+    apis = [ProStocksAPI(*creds(i), base_url, order_rate=1_000_000) for i in range(n)]
+    start = time.perf_counter()
+    for api in apis:
+        api.login()
+    login_s = time.perf_counter() - start
+    start = time.perf_counter()
+    results = [api.place_order(**INTENT) for api in apis]
+    send_s = time.perf_counter() - start
+    mem = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    extra_threads = threading.active_count() - threads
+    for api in apis:
+        api.close()
+        api.transport.close()
+    return mem, extra_threads, login_s, send_s, results
+
+
+def pooled(base_url, n):
+    tracemalloc.start()
+    threads = threading.active_count()
+    before = tracemalloc.get_traced_memory()[0]
+    pool = AccountPool(base_url, pool_size=32, order_rate=1_000_000)
+    for i in range(n):
+        pool.add(*creds(i))
+    start = time.perf_counter()
+    pool.login_all()
+    login_s = time.perf_counter() - start
+    start = time.perf_counter()
+    results = list(pool.broadcast(INTENT).values())
+    send_s = time.perf_counter() - start
+    mem = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    extra_threads = threading.active_count() - threads
+    pool.close()
+    return mem, extra_threads, login_s, send_s, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.01, help="stand-in latency per request (s)")
+    args = parser.parse_args()
+    setup_logging(level="ERROR", force=True)
+
+    proc, base_url = noren_standin.serve_process(latency=args.latency)
+    print(f"📊 {args.accounts} accounts, {args.latency * 1000:.0f} ms stand-in latency")
+    try:
+        for label, fn in (("standalone", standalone), ("AccountPool", pooled)):
+            mem, threads, login_s, send_s, results = fn(base_url, args.accounts)
+            ok = sum(r.get("stat") == "Ok" for r in results)
+            print(f"   {label:<12} {mem / args.accounts / 1024:7.1f} KiB/account   "
+                  f"{threads / args.accounts:4.2f} threads/account   login all {login_s * 1000:7.1f} ms   "
+                  f"one order on every account {send_s * 1000:7.1f} ms ({ok}/{len(results)} ok)")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# bench_async_orders.py
+# Sync ProStocksAPI vs AsyncProStocksAPI firing a burst of orders at a local stand-in.
+#
+#   python bench_async_orders.py --orders 50 --latency 0.02
+
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+
+import noren_standin
+from prostocks_async import AsyncProStocksAPI
+from prostocks_connector import ProStocksAPI
+from prostocks_logging import setup_logging
+
+CREDS = ("BENCH01", "pwd", "ABCDE1234F", "BENCH01", "key", "MAC123456")
+
+
+def order_specs(n):
+    return [{
+        "buy_or_sell": "B" if i % 2 == 0 else "S",
+        "product_type": "I",
+        "exchange": "NSE",
+        "tradingsymbol": "SBIN-EQ",
+        "quantity": 1,
+        "discloseqty": 0,
+        "price_type": "LMT",
+        "price": 780.0 + i * 0.05,
+        "remarks": f"bench_{i}",
+    } for i in range(n)]
+
+
+def run_sync(base_url, orders):
+    api = ProStocksAPI(*CREDS, base_url, order_rate=1_000_000)
+    with contextlib.redirect_stdout(io.StringIO()):
+        api.login()
+        start = time.perf_counter()
+        results = [api.place_order(**o) for o in orders]
+    return time.perf_counter() - start, results
+
+
+async def run_async(base_url, orders):
+    async with AsyncProStocksAPI(*CREDS, base_url, order_rate=None, max_in_flight=len(orders)) as api:
+        await api.login()
+        start = time.perf_counter()
+        results = await api.place_orders(orders)
+        return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02, help="stand-in latency per request (s)")
+    args = parser.parse_args()
+    setup_logging(level="ERROR", force=True)  # keep per-order log records out of the timings
+
+    server, _, base_url = noren_standin.serve(latency=args.latency)
+    orders = order_specs(args.orders)
+    try:
+        sync_s, sync_res = run_sync(base_url, orders)
+        async_s, async_res = asyncio.run(run_async(base_url, orders))
+    finally:
+        server.shutdown()
+
+    ok = lambda res: sum(1 for r in res if r.get("stat") == "Ok")
+    print(f"📊 {args.orders} orders, {args.latency * 1000:.0f} ms simulated broker latency")
+    print(f"   sync : {sync_s * 1000:8.1f} ms  ({args.orders / sync_s:8.1f} orders/s, {ok(sync_res)} ok)")
+    print(f"   async: {async_s * 1000:8.1f} ms  ({args.orders / async_s:8.1f} orders/s, {ok(async_res)} ok)")
+    print(f"   speed-up: {sync_s / async_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# bench_backtester.py
+# Backtester throughput on synthetic 1-minute history written in CandleStore's
+# on-disk layout: fast vs event path, 1..N worker processes, a small parameter
+# sweep, and the extrapolated wall time for N symbols x Y years.
+#
+#   python bench_backtester.py --symbols 64 --days 60 --max-workers 4
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from backtester import run_backtest, summary
+from candle_store import IST
+
+SESSION_BARS = 375  # 09:15 - 15:30
+TRADING_DAYS = 250
+
+
+def write_history(cache_dir, symbols, days, seed=11):
+    """Random-walk 1m sessions with slow intraday swings, one .npy per token per day."""
+    rng = np.random.default_rng(seed)
+    tokens = {}
+    for s in range(symbols):
+        token = str(10000 + s)
+        tokens[f"SYM{s:04d}-EQ"] = token
+        path = os.path.join(cache_dir, "NSE", token, "1m")
+        os.makedirs(path, exist_ok=True)
+        price, day = rng.uniform(50, 3000), date(2023, 1, 2)
+        for _ in range(days):
+            while day.weekday() >= 5:
+                day += timedelta(days=1)
+            t0 = datetime(day.year, day.month, day.day, 9, 15, tzinfo=IST).timestamp()
+            steps = rng.normal(0, 0.0015, SESSION_BARS) + 0.0006 * np.sin(np.arange(SESSION_BARS) / 40 + s)
+            c = price * np.exp(np.cumsum(steps))
+            o = np.concatenate(([price], c[:-1]))
+            wick = np.abs(rng.normal(0, 0.001, SESSION_BARS)) * c
+            bars = np.vstack([t0 + 60 * np.arange(SESSION_BARS), o, np.maximum(o, c) + wick,
+                              np.minimum(o, c) - wick, c, np.ones(SESSION_BARS)])
+            np.save(os.path.join(path, f"{day.isoformat()}.npy"), bars)
+            price, day = c[-1], day + timedelta(days=1)
+    return tokens
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=64)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--target-symbols", type=int, default=300, help="extrapolate to this many symbols")
+    parser.add_argument("--target-years", type=float, default=3)
+    args = parser.parse_args()
+
+    cache = tempfile.mkdtemp(prefix="bt-bench-")
+    try:
+        tokens = write_history(cache, args.symbols, args.days)
+        bars = args.symbols * args.days * SESSION_BARS
+        target = args.target_symbols * args.target_years * TRADING_DAYS * SESSION_BARS
+        print(f"📊 {args.symbols} symbols x {args.days} days of 1m bars = {bars / 1e6:.2f}M bars, "
+              f"{os.cpu_count()} CPU(s)")
+        sweep = [{"min_vol_required": v} for v in (0.05, 0.1, 0.2)]
+        workers = sorted({1, args.max_workers} | {w for w in (2, 4, 8) if w < args.max_workers})
+        for mode in ("fast", "event"):
+            for n in workers:
+                start = time.perf_counter()
+                results = run_backtest(tokens, sweep, mode=mode, workers=n, cache_dir=cache)
+                took = time.perf_counter() - start
+                rate = bars / took
+                print(f"   {mode:5s} {n:2d} worker(s): {took:6.2f} s  {rate / 1e6:5.2f}M bars/s x {len(sweep)} "
+                      f"param sets   -> {args.target_symbols} symbols x {args.target_years:g} years "
+                      f"≈ {target / rate / 60:5.1f} min")
+            agg = summary(results)
+            print("      " + "   ".join(f"min_vol {p['min_vol_required']}: {t} trades, ₹{pnl:,.0f}"
+                                        for p, t, pnl in zip(agg["params"], agg["trades"], agg["pnl"])))
+    finally:
+        shutil.rmtree(cache, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
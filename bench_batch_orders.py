@@ -0,0 +1,70 @@
+# bench_batch_orders.py
+# 50-order basket against a stand-in that enforces a per-second order cap:
+# serial place_order loop vs place_orders(), with and without the client limiter.
+#
+#   python bench_batch_orders.py --orders 50 --cap 10 --latency 0.15
+
+import argparse
+import contextlib
+import io
+import time
+
+import noren_standin
+from prostocks_connector import ProStocksAPI
+from prostocks_logging import setup_logging
+
+CREDS = ("BENCH01", "pwd", "ABCDE1234F", "BENCH01", "key", "MAC123456")
+
+
+def basket(n):
+    return [{
+        "buy_or_sell": "B",
+        "product_type": "I",
+        "exchange": "NSE",
+        "tradingsymbol": "SBIN-EQ",
+        "quantity": 1,
+        "discloseqty": 0,
+        "price_type": "LMT",
+        "price": 780.0,
+        "remarks": f"basket_{i}",
+    } for i in range(n)]
+
+
+def run(label, base_url, standin, order_rate, send):
+    api = ProStocksAPI(*CREDS, base_url, order_rate=order_rate)
+    with contextlib.redirect_stdout(io.StringIO()):
+        api.login()
+        time.sleep(1.1)  # start every run with an empty broker window
+        rejected_before = standin.throttled
+        start = time.perf_counter()
+        results = send(api)
+        elapsed = time.perf_counter() - start
+    ok = sum(1 for r in results if r.get("stat") == "Ok")
+    print(f"   {label:<34} {elapsed:6.2f} s   {ok:3d}/{len(results)} ok   "
+          f"broker rejections: {standin.throttled - rejected_before}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=50)
+    parser.add_argument("--cap", type=int, default=10, help="broker orders/second")
+    parser.add_argument("--latency", type=float, default=0.15, help="broker latency per request (s)")
+    args = parser.parse_args()
+    setup_logging(level="ERROR", force=True)  # keep per-order log records out of the timings
+
+    server, standin, base_url = noren_standin.serve(latency=args.latency, order_rate_cap=args.cap)
+    orders = basket(args.orders)
+    print(f"📊 {args.orders} orders, broker cap {args.cap}/s, {args.latency * 1000:.0f} ms latency")
+    try:
+        run("serial place_order loop", base_url, standin, args.cap,
+            lambda api: [api.place_order(**o) for o in orders])
+        run("place_orders, limiter off", base_url, standin, 10_000,
+            lambda api: api.place_orders(orders, max_throttle_retries=0))
+        run("place_orders, limiter on", base_url, standin, args.cap,
+            lambda api: api.place_orders(orders))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
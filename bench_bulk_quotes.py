@@ -0,0 +1,62 @@
+# bench_bulk_quotes.py
+# Full-universe LTP refresh against the local stand-in: serial get_ltp loop vs get_ltps.
+#
+#   python bench_bulk_quotes.py --symbols 200 --latency 0.005
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import noren_standin
+from prostocks_logging import setup_logging
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.005, help="stand-in latency per request (s)")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    setup_logging(level="ERROR", force=True)  # keep per-order log records out of the timings
+
+    proc, base_url = noren_standin.serve_process(latency=args.latency, symbols=args.symbols)
+    universe = noren_standin.universe(args.symbols)
+    os.environ.update({
+        "PROSTOCKS_BASE_URL": base_url,
+        "PROSTOCKS_USER_ID": "BENCH01",
+        "PROSTOCKS_PASSWORD": "pwd",
+        "PROSTOCKS_FACTOR2": "ABCDE1234F",
+        "PROSTOCKS_API_KEY": "key",
+        "PROSTOCKS_SCRIP_CACHE": tempfile.mkdtemp(prefix="scrips_"),
+    })
+
+    import scrip_master
+    scrip_master.build_index([(tsym, int(tok), 1) for tsym, tok in universe.items()],
+                             scrip_master.index_dir("NSE"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        import prostocks_data
+    symbols = list(universe)
+
+    try:
+        start = time.perf_counter()
+        serial = [prostocks_data.get_ltp(sym) for sym in symbols]
+        serial_s = time.perf_counter() - start
+
+        prostocks_data.quote_cache.invalidate()
+        start = time.perf_counter()
+        df = prostocks_data.get_ltps(symbols, max_workers=args.workers)
+        bulk_s = time.perf_counter() - start
+    finally:
+        proc.terminate()
+
+    print(f"📊 {len(symbols)} symbols, {args.latency * 1000:.0f} ms stand-in latency")
+    print(f"   serial get_ltp : {serial_s * 1000:8.1f} ms  ({sum(v is not None for v in serial)} ok)")
+    print(f"   get_ltps ({args.workers:>2}w): {bulk_s * 1000:8.1f} ms  ({df['error'].isna().sum()} ok)")
+    print(df.head().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
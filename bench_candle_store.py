@@ -0,0 +1,71 @@
+# bench_candle_store.py
+# CandleStore vs re-downloading the whole window on every call, plus a simulated
+# restart that reloads finished sessions from the on-disk cache.
+#
+#   python bench_candle_store.py --days 5 --interval 1 --calls 20
+
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+
+import noren_standin
+from candle_store import CandleStore, parse_tpseries
+from prostocks_connector import ProStocksAPI
+from prostocks_logging import setup_logging
+
+CREDS = ("BENCH01", "pwd", "ABCDE1234F", "BENCH01", "key", "MAC123456")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--interval", default="1")
+    parser.add_argument("--calls", type=int, default=20)
+    args = parser.parse_args()
+    setup_logging(level="ERROR", force=True)  # keep per-order log records out of the timings
+
+    proc, base_url = noren_standin.serve_process(symbols=10)
+    api = ProStocksAPI(*CREDS, base_url)
+    cache_dir = tempfile.mkdtemp(prefix="candles_")
+    token = "10001"
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            api.login()
+
+            start = time.perf_counter()
+            for _ in range(args.calls):
+                bars = parse_tpseries(api.get_time_price_series("NSE", token, interval=args.interval,
+                                                                days=args.days))
+            raw_s = (time.perf_counter() - start) / args.calls
+
+            store = CandleStore(api, cache_dir=cache_dir)
+            start = time.perf_counter()
+            candles = store.get(token, interval=args.interval, days=args.days)
+            cold_s = time.perf_counter() - start
+            cold_bars = store.bars_downloaded
+
+            start = time.perf_counter()
+            for _ in range(args.calls):
+                candles = store.get(token, interval=args.interval, days=args.days)
+            warm_s = (time.perf_counter() - start) / args.calls
+            warm_bars = (store.bars_downloaded - cold_bars) / args.calls
+
+            restarted = CandleStore(api, cache_dir=cache_dir)
+            start = time.perf_counter()
+            again = restarted.get(token, interval=args.interval, days=args.days)
+            restart_s = time.perf_counter() - start
+    finally:
+        proc.terminate()
+
+    print(f"📊 {len(candles.t)} x {args.interval}m bars over {args.days} days")
+    print(f"   full re-download per call : {raw_s * 1000:8.1f} ms   {bars.shape[1]} bars/call")
+    print(f"   CandleStore cold          : {cold_s * 1000:8.1f} ms   {cold_bars} bars")
+    print(f"   CandleStore incremental   : {warm_s * 1000:8.1f} ms   {warm_bars:.1f} bars/call")
+    print(f"   restart (disk cache)      : {restart_s * 1000:8.1f} ms   {restarted.bars_downloaded} bars downloaded, "
+          f"{len(again.t)} bars served")
+
+
+if __name__ == "__main__":
+    main()
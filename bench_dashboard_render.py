@@ -0,0 +1,104 @@
+# bench_dashboard_render.py
+# Order-book section build time in a headless Streamlit run (AppTest) at
+# 10 / 1,000 / 10,000 orders: the old per-order st.json + form + cancel
+# button layout against order_grid's single paginated grid.
+#
+#   python bench_dashboard_render.py --sizes 10,1000,10000 --legacy-max 1000
+
+import argparse
+import time
+
+from streamlit.testing.v1 import AppTest
+
+
+def legacy_app(n):
+    import streamlit as st
+
+    from bench_dashboard_render import fake_book
+
+    snap, store = fake_book(n)
+    # The pre-grid layout: every order gets its own JSON dump, header, modify form and cancel button
+    for ordno, order in snap.orders.items():
+        st.json(order)
+        st.markdown(f"### 🔎 Order Status: **{order['status']}**")
+        if store.is_open(ordno):
+            with st.expander(f"🛠 Modify Order {ordno}"):
+                with st.form(f"modify_form_{ordno}"):
+                    st.number_input("New Quantity", value=int(order["qty"]), step=1, key=f"qty_{ordno}")
+                    st.selectbox("Price Type", ["LMT", "MKT"], key=f"ptype_{ordno}")
+                    st.number_input("New Price", value=float(order["prc"]), step=0.05, key=f"prc_{ordno}")
+                    st.form_submit_button("🔁 Submit Modification")
+            st.button(f"❌ Cancel Order {ordno}")
+
+
+def grid_app(n):
+    from bench_dashboard_render import fake_book
+    from order_grid import order_grid
+
+    snap, store = fake_book(n)
+    order_grid(snap, store, api=None)
+
+
+_books = {}
+
+
+def fake_book(n, seed=3):
+    """Snapshot + OrderStore with n orders, built once per size and reused across runs."""
+    if n not in _books:
+        import random
+
+        from order_store import OrderStore
+        from orderbook_service import OrderBookSnapshot
+
+        rnd = random.Random(seed)
+        symbols = [f"SYM{i:03d}-EQ" for i in range(50)]
+        orders = {}
+        for i in range(n):
+            ordno = str(26000000000000 + i)
+            orders[ordno] = {
+                "stat": "Ok", "norenordno": ordno, "exch": "NSE", "tsym": rnd.choice(symbols),
+                "trantype": rnd.choice("BS"), "qty": str(rnd.randrange(1, 500)), "prc": f"{rnd.uniform(10, 3000):.2f}",
+                "prctyp": "LMT", "prd": "I", "status": rnd.choice(["OPEN", "OPEN", "COMPLETE", "CANCELED", "REJECTED"]),
+                "fillshares": "0", "norentm": "10:15:00 18-10-2026", "remarks": "bench",
+            }
+        store = OrderStore()
+        store.apply_order_book(list(orders.values()))
+        added = frozenset(list(orders)[-5:])
+        _books[n] = (OrderBookSnapshot(1, time.time(), orders, added, frozenset(), frozenset(), None), store)
+    return _books[n]
+
+
+def timed_run(app, n, repeat):
+    at = AppTest.from_function(app, args=(n,), default_timeout=600)
+    at.run()  # first run pays imports and builds the fake book
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        at.run()
+        best = min(best, time.perf_counter() - start)
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return best, len(at.main.children)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10,1000,10000")
+    parser.add_argument("--legacy-max", type=int, default=1000, help="skip the old layout above this many orders")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("📊 Order-book section build time per rerun (best of runs, headless AppTest)")
+    for n in (int(s) for s in args.sizes.split(",")):
+        grid, grid_nodes = timed_run(grid_app, n, args.repeat)
+        line = f"   {n:6d} orders: grid {grid * 1000:8.1f} ms ({grid_nodes} top-level elements)"
+        if n <= args.legacy_max:
+            legacy, legacy_nodes = timed_run(legacy_app, n, 1)
+            line += f"   per-order {legacy * 1000:9.1f} ms ({legacy_nodes} elements)   {legacy / grid:6.1f}x"
+        else:
+            line += "   per-order skipped (--legacy-max)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
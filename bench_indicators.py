@@ -0,0 +1,71 @@
+# bench_indicators.py
+# IndicatorEngine on a synthetic universe: incremental per-bar update vs
+# recomputing the full window, plus a pandas cross-check of MACD and ATR.
+#
+#   python bench_indicators.py --symbols 500 --bars 375
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from indicator_engine import IndicatorEngine
+
+
+def synthetic_ohlc(n_symbols, n_bars, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, (n_symbols, n_bars)), axis=1))
+    spread = np.abs(rng.normal(0, 0.001, (n_symbols, n_bars))) * close
+    return close + spread, close - spread, close
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=375, help="one NSE session of 1-minute bars")
+    args = parser.parse_args()
+
+    high, low, close = synthetic_ohlc(args.symbols, 2 * args.bars)
+    symbols = [f"SYM{i:04d}-EQ" for i in range(args.symbols)]
+    hist, live = slice(0, args.bars), slice(args.bars, 2 * args.bars)
+
+    engine = IndicatorEngine(symbols)
+    start = time.perf_counter()
+    out = engine.run(high[:, hist], low[:, hist], close[:, hist])
+    warmup_s = time.perf_counter() - start
+
+    samples = []
+    for j in range(args.bars, 2 * args.bars):
+        start = time.perf_counter()
+        engine.update(high[:, j], low[:, j], close[:, j])
+        signals = engine.signals()
+        samples.append(time.perf_counter() - start)
+    samples = np.array(samples) * 1e3
+
+    # What a non-incremental engine pays on every bar: recompute the whole window
+    start = time.perf_counter()
+    IndicatorEngine(symbols).run(high[:, live], low[:, live], close[:, live], keep=())
+    full_ms = (time.perf_counter() - start) * 1e3
+
+    # Cross-check against pandas on symbol 0 over the warm-up window
+    c = pd.Series(close[0, hist])
+    macd = c.ewm(span=12, adjust=False).mean() - c.ewm(span=26, adjust=False).mean()
+    hist_ref = macd - macd.ewm(span=9, adjust=False).mean()
+    pc = c.shift(1).fillna(c.iloc[0])
+    tr = pd.concat([pd.Series(high[0, hist]) - pd.Series(low[0, hist]),
+                    (pd.Series(high[0, hist]) - pc).abs(), (pd.Series(low[0, hist]) - pc).abs()], axis=1).max(axis=1)
+    atr_ref = tr.ewm(alpha=1 / 14, adjust=False).mean()
+
+    print(f"📊 {args.symbols} symbols")
+    print(f"   warm-up {args.bars} bars        : {warmup_s * 1000:8.1f} ms")
+    print(f"   update + signals per bar : p50 {np.median(samples):.3f} ms   max {samples.max():.3f} ms")
+    print(f"   full recompute per bar   : {full_ms:8.1f} ms")
+    print(f"   max |macd_hist - pandas| : {np.abs(out['macd_hist'][0] - hist_ref.values).max():.2e}")
+    print(f"   max |atr - pandas|       : {np.abs(out['atr'][0] - atr_ref.values).max():.2e}")
+    print(f"   {symbols[0]}: {engine.indicators(symbols[0])}")
+    print(f"   Buy/Sell atr_trail: {np.sum(signals['atr_trail'] == 'Buy')}/{np.sum(signals['atr_trail'] == 'Sell')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# bench_logging.py
+# place_order latency against the stand-in with the old synchronous logging
+# (every payload and response written on the caller's thread, as the print()
+# calls did) vs the queue-backed pipeline at INFO and DEBUG.
+#
+#   python bench_logging.py --orders 500
+#   python bench_logging.py --sink stdout     # write to the terminal, as print() did
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import noren_standin
+from prostocks_connector import ProStocksAPI
+from prostocks_logging import ROOT, RedactingFilter, TextFormatter, flush_logging, setup_logging
+
+CREDS = ("BENCH01", "pwd", "ABCDE1234F", "BENCH01", "key", "MAC123456")
+
+ORDER = {
+    "buy_or_sell": "B", "product_type": "I", "exchange": "NSE", "tradingsymbol": "SYM0001-EQ",
+    "quantity": 1, "discloseqty": 0, "price_type": "LMT", "price": 101.0, "remarks": "bench_logging",
+}
+
+
+def synchronous(stream):
+    """The "before" shape: DEBUG records formatted and written inline by the caller."""
+    flush_logging()
+    logger = logging.getLogger(ROOT)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(TextFormatter())
+    handler.addFilter(RedactingFilter())
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+
+
+def measure(api, n):
+    lat = np.empty(n)
+    for i in range(n):
+        t0 = time.perf_counter()
+        api.place_order(**ORDER)
+        lat[i] = time.perf_counter() - t0
+    return lat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--sink", choices=("file", "stdout"), default="file")
+    args = parser.parse_args()
+
+    if args.sink == "stdout":
+        stream, path = sys.stdout, None
+    else:
+        fd, path = tempfile.mkstemp(suffix=".log")
+        os.close(fd)
+        stream = open(path, "a", encoding="utf-8")
+
+    modes = {
+        "synchronous DEBUG (before)": lambda: synchronous(stream),
+        "queued INFO": lambda: setup_logging("INFO", stream=stream, force=True),
+        "queued DEBUG": lambda: setup_logging("DEBUG", stream=stream, force=True),
+        "queued DEBUG, JSON lines": lambda: setup_logging("DEBUG", json_lines=True, stream=stream, force=True),
+    }
+    results = {name: [] for name in modes}
+
+    proc, base_url = noren_standin.serve_process()
+    try:
+        setup_logging("ERROR", force=True)
+        api = ProStocksAPI(*CREDS, base_url, order_rate=1_000_000)
+        api.login()
+        measure(api, 50)  # warm the connection
+        # Interleave rounds so drift on the box hits every mode equally
+        for _ in range(args.rounds):
+            for name, install in modes.items():
+                install()
+                results[name].append(measure(api, args.orders))
+        flush_logging()
+    finally:
+        proc.terminate()
+        proc.wait()
+        if path:
+            stream.close()
+            os.remove(path)
+
+    print(f"\n📊 place_order x {args.orders * args.rounds} per mode, log sink: {args.sink}", file=sys.stderr)
+    for name, runs in results.items():
+        lat = np.concatenate(runs) * 1000
+        print(f"   {name:<28} p50 {np.percentile(lat, 50):6.3f} ms   p99 {np.percentile(lat, 99):6.3f} ms   "
+              f"mean {lat.mean():6.3f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# bench_market_feed.py
+# MarketFeed against the fake NorenWS server: tick ingest rate, in-memory LTP read
+# cost, and reconnect + resubscribe after the server drops every connection.
+#
+#   python bench_market_feed.py --symbols 200 --ticks 50000
+
+import argparse
+import time
+from types import SimpleNamespace
+
+import noren_standin
+from market_feed import MarketFeed
+
+
+def wait_for(cond, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            raise TimeoutError("condition not met")
+        time.sleep(0.01)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--ticks", type=int, default=50000)
+    args = parser.parse_args()
+
+    server = noren_standin.FakeNorenWS()
+    api = SimpleNamespace(userid="BENCH01", actid="BENCH01", session_token="standin-BENCH01")
+    feed = MarketFeed(api, ws_url=server.url, capacity=512, reconnect_delay=0.1).start()
+    tokens = [str(10001 + i) for i in range(args.symbols)]
+    try:
+        feed.wait_connected(5)
+        feed.subscribe(tokens)
+        wait_for(lambda: server.subscribers("NSE", tokens[-1]) == 1)
+
+        base = feed.ticks
+        start = time.perf_counter()
+        for i in range(args.ticks):
+            server.push_tick("NSE", tokens[i % len(tokens)], lp=f"{100 + i % 50:.2f}", v=str(i))
+        wait_for(lambda: feed.ticks - base >= args.ticks, timeout=60)
+        ingest_s = time.perf_counter() - start
+
+        reads = 100_000
+        start = time.perf_counter()
+        for i in range(reads):
+            feed.ltp(tokens[i % len(tokens)])
+        read_us = (time.perf_counter() - start) / reads * 1e6
+
+        server.drop_all()
+        start = time.perf_counter()
+        wait_for(lambda: feed.reconnects >= 1 and server.subscribers("NSE", tokens[-1]) == 1)
+        reconnect_s = time.perf_counter() - start
+        server.push_tick("NSE", tokens[0], lp="123.45")
+        wait_for(lambda: feed.ltp(tokens[0]) == 123.45)
+    finally:
+        feed.stop()
+        server.close()
+
+    ts, data = feed.history(tokens[0], n=5)
+    print(f"📊 {args.symbols} symbols, {args.ticks} ticks")
+    print(f"   ingest      : {args.ticks / ingest_s:10.0f} ticks/s")
+    print(f"   ltp() read  : {read_us:10.2f} µs")
+    print(f"   reconnect + resubscribe: {reconnect_s * 1000:.0f} ms, ticks flowing again ✅")
+    print(f"   last 5 lp for {tokens[0]}: {data[:, 0].tolist()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# bench_metrics.py
+# Cost of the per-request instrumentation: Metrics.observe() in a tight loop, then
+# place_order against the stand-in with metrics recording on vs a no-op recorder.
+#
+#   python bench_metrics.py --calls 200000 --orders 500
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+import noren_standin
+from prostocks_connector import ProStocksAPI
+from prostocks_logging import setup_logging
+from prostocks_metrics import Metrics
+
+CREDS = ("BENCH01", "pwd", "ABCDE1234F", "BENCH01", "key", "MAC123456")
+
+ORDER = {
+    "buy_or_sell": "B", "product_type": "I", "exchange": "NSE", "tradingsymbol": "SYM0001-EQ",
+    "quantity": 1, "discloseqty": 0, "price_type": "LMT", "price": 101.0,
+}
+
+
+class NoMetrics:
+    def observe(self, endpoint, seconds, outcome="ok"):
+        pass
+
+    def inc(self, name, endpoint="", n=1):
+        pass
+
+
+def micro(calls):
+    metrics = Metrics()
+    endpoints = ("PlaceOrder", "ModifyOrder", "CancelOrder", "OrderBook")
+    samples = np.random.default_rng(1).lognormal(np.log(0.02), 0.6, calls)
+    start = time.perf_counter()
+    for i, s in enumerate(samples.tolist()):
+        metrics.observe(endpoints[i & 3], s, "ok")
+    per_call = (time.perf_counter() - start) / calls
+    # The same loop body without the observe() call, so only the recorder is counted
+    start = time.perf_counter()
+    for i, s in enumerate(samples.tolist()):
+        endpoints[i & 3]
+    per_call -= (time.perf_counter() - start) / calls
+    p99 = metrics.snapshot()["PlaceOrder"]["p99_ms"]
+    exact = np.percentile(samples[::4], 99) * 1000
+    return per_call, p99, exact
+
+
+def order_latencies(api, n):
+    lat = np.empty(n)
+    for i in range(n):
+        t0 = time.perf_counter()
+        api.place_order(**ORDER)
+        lat[i] = time.perf_counter() - t0
+    return lat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=4)
+    args = parser.parse_args()
+    setup_logging(level="ERROR", force=True)  # keep per-order log records out of the timings
+
+    per_call, p99, exact = micro(args.calls)
+    print(f"📊 Metrics.observe: {per_call * 1e9:.0f} ns/call over {args.calls} calls")
+    print(f"   histogram p99 estimate {p99:.1f} ms vs exact {exact:.1f} ms")
+
+    proc, base_url = noren_standin.serve_process()
+    try:
+        api = ProStocksAPI(*CREDS, base_url, order_rate=1_000_000)
+        real = api.transport.metrics
+        on, off = [], []
+        with contextlib.redirect_stdout(io.StringIO()):
+            api.login()
+            order_latencies(api, 50)  # warm the connection
+            # Interleave rounds so drift on the box hits both sides equally
+            for _ in range(args.rounds):
+                api.transport.metrics = NoMetrics()
+                off.append(order_latencies(api, args.orders))
+                api.transport.metrics = real
+                on.append(order_latencies(api, args.orders))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    off, on = np.concatenate(off), np.concatenate(on)
+    print(f"📊 place_order x {len(on)} against the stand-in")
+    print(f"   metrics off: p50 {np.percentile(off, 50) * 1000:.3f} ms   p99 {np.percentile(off, 99) * 1000:.3f} ms")
+    print(f"   metrics on : p50 {np.percentile(on, 50) * 1000:.3f} ms   p99 {np.percentile(on, 99) * 1000:.3f} ms")
+    print(f"   recorder cost {per_call * 1e6:.2f} µs = {100 * per_call / np.percentile(on, 50):.3f}% of a p50 order")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# bench_order_store.py
+# OrderStore at a busy day's scale: bulk load, incremental status updates,
+# indexed lookups vs a linear scan of the order-book list.
+#
+#   python bench_order_store.py --orders 50000 --symbols 500
+
+import argparse
+import random
+import time
+
+from order_store import OrderStore
+
+
+def make_orders(n, n_symbols, seed=3):
+    rnd = random.Random(seed)
+    symbols = [f"SYM{i:04d}-EQ" for i in range(n_symbols)]
+    return [{
+        "stat": "Ok",
+        "norenordno": str(26000000000000 + i),
+        "tsym": rnd.choice(symbols),
+        "status": rnd.choice(["OPEN", "OPEN", "COMPLETE", "CANCELED", "REJECTED"]),
+        "qty": str(rnd.randint(1, 100)),
+        "prc": f"{rnd.uniform(100, 1000):.2f}",
+        "trantype": rnd.choice("BS"),
+        "remarks": f"strat_{i % 20}",
+    } for i in range(n)], symbols
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=50000)
+    parser.add_argument("--symbols", type=int, default=500)
+    args = parser.parse_args()
+    orders, symbols = make_orders(args.orders, args.symbols)
+    store = OrderStore()
+
+    start = time.perf_counter()
+    store.apply_order_book(orders)
+    load_ms = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    unchanged = store.apply_order_book(orders)
+    reapply_ms = (time.perf_counter() - start) * 1e3
+
+    updates = [{"norenordno": o["norenordno"], "status": "COMPLETE"} for o in orders[::5]]
+    start = time.perf_counter()
+    for u in updates:
+        store.apply_update(u)
+    update_us = (time.perf_counter() - start) / len(updates) * 1e6
+
+    lookups = 20000
+    start = time.perf_counter()
+    for i in range(lookups):
+        store.open_ids(symbols[i % len(symbols)])
+    indexed_us = (time.perf_counter() - start) / lookups * 1e6
+
+    start = time.perf_counter()
+    for i in range(200):
+        sym = symbols[i % len(symbols)]
+        [o for o in orders if o["tsym"] == sym and o["status"] in ("OPEN", "PENDING")]
+    scan_us = (time.perf_counter() - start) / 200 * 1e6
+
+    print(f"📊 {args.orders} orders over {args.symbols} symbols")
+    print(f"   initial load          : {load_ms:8.1f} ms")
+    print(f"   re-apply same book    : {reapply_ms:8.1f} ms   ({unchanged} changed)")
+    print(f"   incremental update    : {update_us:8.2f} µs/order")
+    print(f"   open orders for symbol: {indexed_us:8.2f} µs indexed vs {scan_us:8.1f} µs linear scan")
+    print(f"   by status: {store.counts_by_status()}")
+
+
+if __name__ == "__main__":
+    main()
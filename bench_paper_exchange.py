@@ -0,0 +1,92 @@
+# bench_paper_exchange.py
+# PaperExchange throughput: a strategy-like mix of LMT places, re-prices,
+# cancels and MKT orders with a tick every few operations, measured with
+# 1k / 10k / 100k orders already resting so the O(log n) books show up as flat
+# per-operation cost.
+#
+#   python bench_paper_exchange.py --ops 200000 --symbols 50
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from paper_exchange import PaperExchange
+from prostocks_logging import setup_logging
+
+
+def pct(samples, q):
+    return float(np.percentile(samples, q)) * 1e6 if samples else float("nan")
+
+
+def run(ops, symbols, resting, tick_every, seed=5):
+    rnd = random.Random(seed)
+    px = PaperExchange()
+    names = [f"SYM{i:03d}-EQ" for i in range(symbols)]
+    mid = {s: 100.0 + 10 * i for i, s in enumerate(names)}
+    for s in names:
+        px.on_tick(s, lp=mid[s], bp=mid[s] - 0.05, sp=mid[s] + 0.05, bq=500, sq=500)
+    # Depth well away from the market so it rests for the whole run
+    for i in range(resting):
+        s = names[i % symbols]
+        side = rnd.choice("BS")
+        off = round(rnd.uniform(5, 9) * 20) / 20
+        px.place_order(side, "I", "NSE", s, 10, 0, "LMT", price=round(mid[s] + (off if side == "S" else -off), 2))
+
+    live = []
+    lat = {"place": [], "modify": [], "cancel": [], "mkt": [], "tick": []}
+    clock = time.perf_counter
+    start = clock()
+    for i in range(ops):
+        s = names[rnd.randrange(symbols)]
+        if i % tick_every == 0:
+            mid[s] = max(1.0, round((mid[s] + rnd.choice((-0.05, 0.0, 0.05))) * 20) / 20)
+            t0 = clock()
+            px.on_tick(s, lp=mid[s], bp=mid[s] - 0.05, sp=mid[s] + 0.05, bq=500, sq=500)
+            lat["tick"].append(clock() - t0)
+            continue
+        r = rnd.random()
+        if r < 0.55 or not live:
+            side = rnd.choice("BS")
+            prc = round((mid[s] + (1 if side == "S" else -1) * rnd.randrange(0, 20) * 0.05) * 20) / 20
+            t0 = clock()
+            resp = px.place_order(side, "I", "NSE", s, rnd.randrange(1, 50), 0, "LMT", price=prc)
+            lat["place"].append(clock() - t0)
+            live.append((resp["norenordno"], s))
+        elif r < 0.75:
+            ordno, sym = live[rnd.randrange(len(live))]
+            t0 = clock()
+            px.modify_order(ordno, "NSE", sym, 60, "LMT", round((mid[sym] + rnd.choice((-1, 1)) * 0.5) * 20) / 20)
+            lat["modify"].append(clock() - t0)
+        elif r < 0.95:
+            ordno, sym = live.pop(rnd.randrange(len(live)))
+            t0 = clock()
+            px.cancel_order(ordno)
+            lat["cancel"].append(clock() - t0)
+        else:
+            t0 = clock()
+            px.place_order(rnd.choice("BS"), "I", "NSE", s, rnd.randrange(1, 50), 0, "MKT")
+            lat["mkt"].append(clock() - t0)
+    wall = clock() - start
+    return wall, lat, px
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=200000)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--tick-every", type=int, default=10, help="one tick per this many operations")
+    args = parser.parse_args()
+    setup_logging(level="ERROR", force=True)
+
+    print(f"📊 {args.ops} operations over {args.symbols} symbols, one tick every {args.tick_every}")
+    for resting in (1_000, 10_000, 100_000):
+        wall, lat, px = run(args.ops, args.symbols, resting, args.tick_every)
+        fills = len(px.trades)
+        print(f"   {resting:7d} resting: {args.ops / wall:9,.0f} ops/s   {fills} fills   " + "  ".join(
+            f"{k} p50 {pct(v, 50):5.1f}µs p99 {pct(v, 99):6.1f}µs" for k, v in lat.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# bench_positions.py
+# PositionBook against recomputing positions from scratch.
+#
+# 1) Polling trade_book(): the day's fills grow by --batch per poll; the book
+#    folds only the unseen ones, the baseline rebuilds every position from the
+#    full list each time.
+# 2) Marking to market on a tick: one on_price + vectorized mtm() against a
+#    Python loop over a {symbol: position} dict, at 100 / 1,000 / 5,000 symbols.
+#
+#   python bench_positions.py --fills 50000 --batch 500
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from position_book import PositionBook
+
+
+def fake_trades(n, symbols, seed=13):
+    rnd = random.Random(seed)
+    trades = []
+    for i in range(n):
+        s = f"SYM{rnd.randrange(symbols):04d}-EQ"
+        trades.append({"stat": "Ok", "norenordno": str(26000000000000 + i // 2), "flid": str(i), "tsym": s,
+                       "trantype": rnd.choice("BS"), "flqty": str(rnd.randrange(1, 100)),
+                       "flprc": f"{rnd.uniform(50, 2000):.2f}"})
+    return trades
+
+
+def recompute(trades):
+    """The no-state baseline: net qty / avg / realized per symbol from every fill."""
+    pos = {}
+    for f in trades:
+        qty = int(f["flqty"]) * (1 if f["trantype"] == "B" else -1)
+        prc = float(f["flprc"])
+        p = pos.setdefault(f["tsym"], [0, 0.0, 0.0])
+        held, avg = p[0], p[1]
+        if held == 0 or (held > 0) == (qty > 0):
+            p[1] = (avg * abs(held) + prc * abs(qty)) / abs(held + qty)
+        else:
+            p[2] += min(abs(qty), abs(held)) * (prc - avg) * (1 if held > 0 else -1)
+            if held + qty == 0:
+                p[1] = 0.0
+            elif (held + qty > 0) != (held > 0):
+                p[1] = prc
+        p[0] = held + qty
+    return pos
+
+
+def polls(total, batch, symbols):
+    trades = fake_trades(total, symbols)
+    book = PositionBook()
+    inc, full = [], []
+    for end in range(batch, total + 1, batch):
+        view = trades[:end]
+        t0 = time.perf_counter()
+        book.apply_trade_book(view)
+        inc.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        baseline = recompute(view)
+        full.append(time.perf_counter() - t0)
+    realized = sum(p[2] for p in baseline.values())
+    assert abs(realized - book.realized_total) < 1e-6 * max(1.0, abs(realized)), (realized, book.realized_total)
+    return np.array(inc), np.array(full)
+
+
+def mtm_ticks(symbols, ticks=20000, seed=17):
+    rnd = random.Random(seed)
+    names = [f"SYM{i:04d}-EQ" for i in range(symbols)]
+    book = PositionBook()
+    positions = {}
+    for s in names:
+        qty, avg = rnd.randrange(-500, 500), rnd.uniform(50, 2000)
+        book.fill(s, qty or 1, avg)
+        book.on_price(s, avg)
+        positions[s] = {"qty": qty or 1, "avg": avg, "ltp": avg}
+    vec, loop = np.empty(ticks), np.empty(ticks)
+    for i in range(ticks):
+        s = names[rnd.randrange(symbols)]
+        lp = positions[s]["ltp"] * (1 + rnd.uniform(-0.001, 0.001))
+        t0 = time.perf_counter()
+        book.on_price(s, lp)
+        book.mtm()
+        vec[i] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        positions[s]["ltp"] = lp
+        total = sum(p["qty"] * (p["ltp"] - p["avg"]) for p in positions.values())
+        loop[i] = time.perf_counter() - t0
+    assert abs(total - book.unrealized_total) < 1e-6 * max(1.0, abs(total))
+    return vec, loop
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fills", type=int, default=50000)
+    parser.add_argument("--batch", type=int, default=500, help="new fills per trade_book poll")
+    parser.add_argument("--symbols", type=int, default=200)
+    args = parser.parse_args()
+
+    inc, full = polls(args.fills, args.batch, args.symbols)
+    print(f"📊 trade_book polls, +{args.batch} fills each, up to {args.fills} fills over {args.symbols} symbols")
+    print(f"   incremental fold: last poll {inc[-1] * 1000:7.2f} ms, all polls {inc.sum() * 1000:8.1f} ms")
+    print(f"   full recompute  : last poll {full[-1] * 1000:7.2f} ms, all polls {full.sum() * 1000:8.1f} ms "
+          f"({full.sum() / inc.sum():.1f}x)")
+
+    print("📊 Mark-to-market per tick (on_price + whole-book MTM)")
+    for symbols in (100, 1000, 5000):
+        vec, loop = mtm_ticks(symbols)
+        print(f"   {symbols:5d} symbols: vectorized p50 {np.median(vec) * 1e6:7.2f}µs | dict loop p50 "
+              f"{np.median(loop) * 1e6:8.2f}µs | {np.median(loop) / np.median(vec):5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# bench_quote_cache.py
+# Broker calls with and without QuoteCache when many threads ask for the same LTPs.
+#
+#   python bench_quote_cache.py --threads 32 --symbols 20 --seconds 3
+
+import argparse
+import random
+import threading
+import time
+
+from quote_cache import QuoteCache
+
+
+class FakeBroker:
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def get_quotes(self, key):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return {"stat": "Ok", "token": key[1], "lp": "100.0"}
+
+
+def hammer(get, symbols, threads, seconds):
+    stop = time.monotonic() + seconds
+    done = [0] * threads
+
+    def worker(i):
+        rnd = random.Random(i)
+        while time.monotonic() < stop:
+            get(("NSE", rnd.choice(symbols)))
+            done[i] += 1
+            time.sleep(0.001)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return sum(done)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--ttl", type=float, default=0.5)
+    args = parser.parse_args()
+    symbols = [str(3000 + i) for i in range(args.symbols)]
+
+    direct = FakeBroker(args.latency)
+    n_direct = hammer(direct.get_quotes, symbols, args.threads, args.seconds)
+
+    cached = FakeBroker(args.latency)
+    cache = QuoteCache(cached.get_quotes, ttl=args.ttl)
+    n_cached = hammer(cache.get, symbols, args.threads, args.seconds)
+
+    print(f"📊 {args.threads} threads, {args.symbols} symbols, {args.seconds:.0f}s, TTL {args.ttl}s")
+    print(f"   no cache : {n_direct:7d} lookups -> {direct.calls:6d} broker calls")
+    print(f"   QuoteCache: {n_cached:7d} lookups -> {cached.calls:6d} broker calls   {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
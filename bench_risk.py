@@ -0,0 +1,110 @@
+# bench_risk.py
+# Latency RiskEngine adds per order.
+#
+# 1) admit + ack alone (the work RiskGate does before and after the network
+#    call) with 100 / 10k / 100k orders already working, to show the check is
+#    O(1) in book size.
+# 2) place_order against PaperExchange directly and through RiskGate, with the
+#    engine also folding every order update - the end-to-end added cost.
+#
+#   python bench_risk.py --orders 100000 --symbols 500
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from paper_exchange import PaperExchange
+from prostocks_logging import setup_logging
+from risk_engine import RiskEngine, RiskGate
+
+# Loose enough that the benchmark measures the pass path
+LIMITS = {"max_order_qty": None, "max_order_value": None, "max_symbol_qty": None, "max_symbol_value": None,
+          "max_gross": None, "max_net": None, "max_open_orders": None, "max_daily_loss": None}
+
+
+def pct(samples, q):
+    return float(np.percentile(samples, q)) / 1000
+
+
+def admit_latency(orders, symbols, working, seed=7):
+    rnd = random.Random(seed)
+    risk = RiskEngine(LIMITS)
+    names = [f"SYM{i:04d}-EQ" for i in range(symbols)]
+    for i, s in enumerate(names):
+        risk.on_price(s, 100.0 + i)
+    for i in range(working):
+        s = names[i % symbols]
+        ticket, _ = risk.admit(s, rnd.choice((1, -1)), 10, 100.0 + i % symbols)
+        risk.ack(ticket, {"stat": "Ok", "norenordno": f"W{i}"})
+
+    clock = time.perf_counter_ns
+    lat = np.empty(orders, dtype=np.int64)
+    for i in range(orders):
+        k = rnd.randrange(symbols)
+        s, side = names[k], rnd.choice((1, -1))
+        prc = 100.0 + k + rnd.randrange(-20, 20) * 0.05
+        t0 = clock()
+        ticket, reason = risk.admit(s, side, rnd.randrange(1, 100), prc)
+        if ticket is not None:
+            risk.ack(ticket, {"stat": "Ok", "norenordno": f"N{i}"})
+        lat[i] = clock() - t0
+        if reason is not None:
+            raise RuntimeError(reason)
+    return lat
+
+
+def gate_latency(orders, symbols, seed=9):
+    """Per-order place_order time: (direct, through RiskGate) on identical PaperExchange runs."""
+    out = []
+    for gated in (False, True):
+        rnd = random.Random(seed)
+        px = PaperExchange()
+        api = px
+        px.subscribe_orders(lambda msg: None)  # both runs build the order-update rows
+        if gated:
+            risk = RiskEngine(LIMITS)
+            px.subscribe_orders(risk.on_order)
+            api = RiskGate(px, risk)
+        names = [f"SYM{i:04d}-EQ" for i in range(symbols)]
+        for i, s in enumerate(names):
+            px.on_tick(s, lp=100.0, bp=99.95, sp=100.05)
+            if gated:
+                risk.on_price(s, 100.0)
+        clock = time.perf_counter_ns
+        lat = np.empty(orders, dtype=np.int64)
+        for i in range(orders):
+            s = names[rnd.randrange(symbols)]
+            side = rnd.choice("BS")
+            prc = round((100.0 + (-1 if side == "B" else 1) * rnd.randrange(1, 40) * 0.05) * 20) / 20
+            t0 = clock()
+            api.place_order(side, "I", "NSE", s, rnd.randrange(1, 100), 0, "LMT", price=prc)
+            lat[i] = clock() - t0
+        out.append(lat)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--symbols", type=int, default=500)
+    args = parser.parse_args()
+    setup_logging(level="ERROR", force=True)
+
+    print(f"📊 RiskEngine admit + ack, {args.orders} orders over {args.symbols} symbols")
+    for working in (100, 10_000, 100_000):
+        lat = admit_latency(args.orders, args.symbols, working)
+        print(f"   {working:7d} working: p50 {pct(lat, 50):5.2f}µs  p99 {pct(lat, 99):5.2f}µs  "
+              f"max {lat.max() / 1000:7.1f}µs")
+
+    direct, gated = gate_latency(args.orders, args.symbols)
+    print(f"📊 PaperExchange.place_order, {args.orders} resting LMT orders")
+    print(f"   direct     p50 {pct(direct, 50):5.2f}µs  p99 {pct(direct, 99):6.2f}µs")
+    print(f"   RiskGate   p50 {pct(gated, 50):5.2f}µs  p99 {pct(gated, 99):6.2f}µs")
+    print(f"   added      p50 {pct(gated, 50) - pct(direct, 50):5.2f}µs  "
+          f"mean {(gated.mean() - direct.mean()) / 1000:5.2f}µs per order")
+
+
+if __name__ == "__main__":
+    main()
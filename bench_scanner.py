@@ -0,0 +1,63 @@
+# bench_scanner.py
+# UniverseScanner over a synthetic NSE-sized universe: one full scan of the
+# latest bar at 1..N worker processes, with the speed-up and a check that every
+# worker count finds the same signals.
+#
+#   python bench_scanner.py --symbols 2000 --bars 375 --max-workers 8
+
+import argparse
+import os
+import pickle
+import time
+
+import numpy as np
+
+from universe_scanner import UniverseScanner
+
+
+def synthetic(symbols, bars, seed=7):
+    rng = np.random.default_rng(seed)
+    start = rng.uniform(20, 3000, size=(symbols, 1))
+    drift = rng.normal(0, 0.0004, size=(symbols, 1))
+    close = start * np.exp(np.cumsum(drift + rng.normal(0, 0.004, size=(symbols, bars)), axis=1))
+    spread = np.abs(rng.normal(0, 0.003, size=(symbols, bars))) * close
+    return close + spread, close - spread, close
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--bars", type=int, default=375, help="history per scan (375 = one day of 1m bars)")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-vol", type=float, default=0.5, help="min_vol_required (ATR %%) for the rules")
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i:04d}-EQ" for i in range(args.symbols)]
+    high, low, close = synthetic(args.symbols, args.bars)
+    pickled = len(pickle.dumps((high, low, close), protocol=pickle.HIGHEST_PROTOCOL))
+    print(f"📊 {args.symbols} symbols x {args.bars} bars ({pickled / 1e6:.1f} MB if pickled per scan), "
+          f"{os.cpu_count()} CPU(s) on this machine")
+
+    workers = sorted({1, 2, 4, 8, 16, args.max_workers} - {w for w in (2, 4, 8, 16) if w > args.max_workers})
+    baseline, reference = None, None
+    for n in workers:
+        with UniverseScanner(symbols, workers=n, params={"min_vol_required": args.min_vol},
+                             balance=1_000_000) as scanner:
+            scanner.load(high, low, close)
+            scanner.scan()  # start the pool and attach the block
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                signals = scanner.scan()
+                best = min(best, time.perf_counter() - start)
+        baseline = baseline or best
+        found = sorted((s["symbol"], s["side"]) for s in signals)
+        reference = reference if reference is not None else found
+        same = "same signals" if found == reference else "❌ signals differ"
+        print(f"   {n:2d} worker(s): {best * 1000:8.1f} ms   speed-up {baseline / best:4.2f}x   "
+              f"{len(signals)} signals ({same})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# bench_session.py
+# Threads placing orders against a stand-in whose sessions expire every few
+# seconds: reactive re-login (replay after "Session Expired", single-flight)
+# vs proactive background renewal.
+#
+#   python bench_session.py --ttl 1.5 --seconds 6 --threads 8
+
+import argparse
+import threading
+import time
+
+import numpy as np
+
+import noren_standin
+from prostocks_connector import ProStocksAPI
+from prostocks_logging import setup_logging
+
+CREDS = ("BENCH01", "pwd", "ABCDE1234F", "BENCH01", "key", "MAC123456")
+
+ORDER = {
+    "buy_or_sell": "B", "product_type": "I", "exchange": "NSE", "tradingsymbol": "SYM0001-EQ",
+    "quantity": 1, "discloseqty": 0, "price_type": "LMT", "price": 101.0,
+}
+
+
+def run(label, base_url, threads, seconds, **api_kwargs):
+    api = ProStocksAPI(*CREDS, base_url, order_rate=1_000_000, **api_kwargs)
+    api.login()
+    stop = time.monotonic() + seconds
+    lat = [[] for _ in range(threads)]
+    failed = [0] * threads
+
+    def worker(i):
+        while time.monotonic() < stop:
+            t0 = time.perf_counter()
+            resp = api.place_order(**ORDER)
+            lat[i].append(time.perf_counter() - t0)
+            failed[i] += resp.get("stat") != "Ok"
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    api.close()
+
+    ms = np.concatenate([np.array(x) for x in lat]) * 1000
+    m = api.metrics
+    print(f"   {label:<10} {len(ms):6d} orders  {sum(failed):3d} failed   "
+          f"p50 {np.percentile(ms, 50):6.2f}  p99 {np.percentile(ms, 99):6.2f}  max {ms.max():7.2f} ms   "
+          f"QuickAuth {m.count('ok', 'QuickAuth'):3d}  expired replays {m.count('relogins'):3d}  "
+          f"background {m.count('session_refreshes'):3d}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ttl", type=float, default=1.5, help="stand-in session lifetime (s)")
+    parser.add_argument("--seconds", type=float, default=6.0)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.002, help="stand-in latency per request (s)")
+    args = parser.parse_args()
+    setup_logging(level="ERROR", force=True)
+
+    proc, base_url = noren_standin.serve_process(latency=args.latency, session_ttl=args.ttl)
+    print(f"📊 {args.threads} threads x {args.seconds:.0f}s, sessions expire every {args.ttl}s, "
+          f"{args.latency * 1000:.0f} ms latency")
+    try:
+        run("reactive", base_url, args.threads, args.seconds, auto_refresh=False, session_max_age=1e9)
+        run("proactive", base_url, args.threads, args.seconds, session_max_age=args.ttl)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# bench_startup.py
+# Cold import cost of the entry modules, from `python -X importtime` in a fresh
+# interpreter per module, checked against startup_budget.json:
+#
+#   max_ms   cumulative import time allowed (best of --repeat runs)
+#   forbid   modules that must not be imported as a side effect (pandas on the
+#            login path, requests in scrip_master, ...)
+#
+# Exits 1 when a module is over budget or pulls in a forbidden module, so
+# import cost cannot creep back unnoticed.  --update rewrites max_ms from this
+# machine's numbers plus headroom.
+#
+#   python bench_startup.py            # report + check
+#   python bench_startup.py --top 15   # longer self-time listing
+#   python bench_startup.py --update   # re-baseline after an intended change
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+HEADROOM = 1.5
+MIN_SLACK_MS = 100  # small imports are noisy in absolute terms
+
+
+def importtime(module):
+    """[(name, self_us, cumulative_us)] for one cold `import module`."""
+    env = dict(os.environ, PROSTOCKS_LOG_LEVEL="ERROR")
+    for k in ("PROSTOCKS_USER_ID", "PROSTOCKS_PASSWORD"):
+        env.pop(k, None)  # an import must never need credentials
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True,
+                          text=True, env=env, cwd=os.path.dirname(BUDGET_FILE))
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cum_us)))
+    return rows
+
+
+def measure(module, repeat):
+    runs = [importtime(module) for _ in range(repeat)]
+    best = min(runs, key=lambda rows: rows[-1][2])
+    return best[-1][2] / 1000, best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5, help="slowest imports (self time) to list per module")
+    parser.add_argument("--update", action="store_true", help="rewrite max_ms in startup_budget.json")
+    args = parser.parse_args()
+
+    with open(BUDGET_FILE) as f:
+        budget = json.load(f)
+
+    failures = []
+    print(f"📊 Cold import time, best of {args.repeat} (python -X importtime)")
+    for module, spec in budget.items():
+        ms, rows = measure(module, args.repeat)
+        loaded = {name for name, _, _ in rows}
+        forbidden = sorted(m for m in spec.get("forbid", ()) if m in loaded)
+        over = not args.update and ms > spec["max_ms"]
+        mark = "❌" if over or forbidden else "✅"
+        print(f"   {mark} {module:22s} {ms:7.1f} ms  (budget {spec['max_ms']:.0f} ms, {len(rows)} modules)")
+        for name, self_us, cum_us in sorted(rows, key=lambda r: -r[1])[:args.top]:
+            print(f"        {self_us / 1000:6.1f} ms self {cum_us / 1000:7.1f} ms cum  {name.strip()}")
+        if forbidden:
+            failures.append(f"{module} imports {', '.join(forbidden)}")
+        if over:
+            failures.append(f"{module} took {ms:.0f} ms > {spec['max_ms']:.0f} ms")
+        if args.update:
+            spec["max_ms"] = round(max(ms * HEADROOM, ms + MIN_SLACK_MS))
+
+    if args.update:
+        with open(BUDGET_FILE, "w") as f:
+            json.dump(budget, f, indent=2)
+            f.write("\n")
+        print(f"💾 Budgets rewritten with {HEADROOM}x headroom: {BUDGET_FILE}")
+    if failures:
+        print("❌ " + "\n❌ ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# bench_suite.py
+# Load test of the order path against the local Noren stand-in (separate process):
+# ops/sec and p50/p99 latency for login, place/modify/cancel, order/trade book and
+# a concurrent basket, with an optional saved baseline to catch regressions.
+#
+#   python bench_suite.py --ops 300 --latency 0.005 --save baseline.json
+#   python bench_suite.py --ops 300 --latency 0.005 --compare baseline.json
+#   python bench_suite.py --error-rate 0.05 --session-ttl 2    # fault injection
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+
+import numpy as np
+
+import noren_standin
+from prostocks_connector import ProStocksAPI
+from prostocks_logging import setup_logging
+
+CREDS = ("BENCH01", "pwd", "ABCDE1234F", "BENCH01", "key", "MAC123456")
+
+
+def order_spec(i):
+    return {
+        "buy_or_sell": "B" if i % 2 == 0 else "S",
+        "product_type": "I",
+        "exchange": "NSE",
+        "tradingsymbol": "SYM0001-EQ",
+        "quantity": 1,
+        "discloseqty": 0,
+        "price_type": "LMT",
+        "price": 100.0 + (i % 50) * 0.05,
+        "remarks": f"suite_{i}",
+    }
+
+
+def timed(n, call):
+    """Run call(i) n times; returns (latencies in s, ok count, wall seconds)."""
+    lat = np.empty(n)
+    ok = 0
+    start = time.perf_counter()
+    for i in range(n):
+        t0 = time.perf_counter()
+        resp = call(i)
+        lat[i] = time.perf_counter() - t0
+        ok += isinstance(resp, (dict, list)) and _ok(resp)
+    return lat, ok, time.perf_counter() - start
+
+
+def _ok(resp):
+    # Book endpoints answer an empty book with Not_Ok "no data"
+    if isinstance(resp, list):
+        return True
+    return resp.get("stat") == "Ok" or "no data" in str(resp.get("emsg", "")).lower()
+
+
+def row(name, lat, ok, wall, n):
+    return {
+        "name": name,
+        "n": n,
+        "ok": int(ok),
+        "ops_per_s": n / wall if wall else 0.0,
+        "p50_ms": float(np.percentile(lat, 50) * 1000) if len(lat) else 0.0,
+        "p99_ms": float(np.percentile(lat, 99) * 1000) if len(lat) else 0.0,
+    }
+
+
+def run_suite(base_url, ops, basket):
+    api = ProStocksAPI(*CREDS, base_url, order_rate=1_000_000)
+    results = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        n_login = max(ops // 10, 10)
+        lat, ok, wall = timed(n_login, lambda i: {"stat": "Ok" if api.login()[0] else "Not_Ok"})
+        results.append(row("login", lat, ok, wall, n_login))
+
+        placed = []
+
+        def place(i):
+            resp = api.place_order(**order_spec(i))
+            if resp.get("stat") == "Ok":
+                placed.append(resp["norenordno"])
+            return resp
+
+        lat, ok, wall = timed(ops, place)
+        results.append(row("place_order", lat, ok, wall, ops))
+
+        n = len(placed)
+        lat, ok, wall = timed(n, lambda i: api.modify_order(placed[i], "NSE", "SYM0001-EQ", 2, "LMT", 101.0))
+        results.append(row("modify_order", lat, ok, wall, n))
+
+        lat, ok, wall = timed(n, lambda i: api.cancel_order(placed[i]))
+        results.append(row("cancel_order", lat, ok, wall, n))
+
+        n_books = max(ops // 5, 10)
+        lat, ok, wall = timed(n_books, lambda i: api.order_book())
+        results.append(row("order_book", lat, ok, wall, n_books))
+        lat, ok, wall = timed(n_books, lambda i: api.trade_book())
+        results.append(row("trade_book", lat, ok, wall, n_books))
+
+        # Basket: latency per order is the basket's wall time spread over its orders
+        rounds = max(ops // basket, 3)
+        lat, ok, wall = timed(rounds, lambda i: {"stat": "Ok" if all(
+            r.get("stat") == "Ok" for r in api.place_orders([order_spec(j) for j in range(basket)])) else "Not_Ok"})
+        results.append(row(f"place_orders x{basket}", lat, ok, wall / basket, rounds))
+    return results
+
+
+def report(results, baseline=None, tolerance=0.2):
+    """Print the table; returns the names that regressed against the baseline."""
+    base = {r["name"]: r for r in (baseline or [])}
+    regressed = []
+    print(f"   {'operation':<20} {'n':>6} {'ok':>6} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for r in results:
+        line = (f"   {r['name']:<20} {r['n']:>6} {r['ok']:>6} {r['ops_per_s']:>10.0f} "
+                f"{r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+        b = base.get(r["name"])
+        if b:
+            change = r["ops_per_s"] / b["ops_per_s"] - 1 if b["ops_per_s"] else 0.0
+            line += f"   {change:+.0%} vs baseline"
+            if change < -tolerance:
+                line += "  ❌"
+                regressed.append(r["name"])
+        print(line)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=300, help="orders placed (other ops scale from this)")
+    parser.add_argument("--basket", type=int, default=20, help="orders per place_orders call")
+    parser.add_argument("--latency", type=float, default=0.0, help="stand-in latency per request (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra uniform random latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction answered with Not_Ok")
+    parser.add_argument("--http-error-rate", type=float, default=0.0, help="fraction answered with HTTP 502")
+    parser.add_argument("--session-ttl", type=float, default=None, help="stand-in session lifetime (s)")
+    parser.add_argument("--save", help="write results to this baseline JSON")
+    parser.add_argument("--compare", help="compare against this baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed ops/s drop vs baseline")
+    args = parser.parse_args()
+    setup_logging(level="ERROR", force=True)  # keep per-order log records out of the timings
+
+    proc, base_url = noren_standin.serve_process(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        http_error_rate=args.http_error_rate, session_ttl=args.session_ttl, seed=42)
+    print(f"📊 Stand-in {base_url}: latency {args.latency * 1000:.1f} ms (+{args.jitter * 1000:.1f} jitter), "
+          f"errors {args.error_rate:.0%} Not_Ok / {args.http_error_rate:.0%} HTTP 502, "
+          f"session ttl {args.session_ttl or '∞'}")
+    try:
+        results = run_suite(base_url, args.ops, args.basket)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    regressed = report(results, baseline, args.tolerance)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"created": time.time(), "args": vars(args), "results": results}, f, indent=2)
+        print(f"💾 Baseline saved to {args.save}")
+    if regressed:
+        print(f"❌ Regression beyond {args.tolerance:.0%}: {', '.join(regressed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# bench_transport.py
+# Handshake cost on the modify/cancel path: bare requests.post (the old code path,
+# one new TCP+TLS connection per call) vs the pooled Transport.
+#
+#   python bench_transport.py --orders 100 --tls
+
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import time
+
+import requests
+
+import noren_standin
+from prostocks_connector import ProStocksAPI
+from prostocks_logging import setup_logging
+
+CREDS = ("BENCH01", "pwd", "ABCDE1234F", "BENCH01", "key", "MAC123456")
+
+
+def place_open_orders(api, n):
+    ordnos = []
+    for i in range(n):
+        resp = api.place_order("B", "I", "NSE", "SBIN-EQ", 1, 0, "LMT", price=700 + i * 0.05)
+        ordnos.append(resp["norenordno"])
+    return ordnos
+
+
+def bare_post(api, endpoint, jdata, verify):
+    # What modify_order/cancel_order did before the shared transport
+    url = f"{api.base_url}/{endpoint}"
+    payload = f"jData={json.dumps(jdata)}&jKey={api.session_token}"
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    return requests.post(url, data=payload, headers=headers, verify=verify).json()
+
+
+def time_calls(fn, ordnos):
+    samples = []
+    for ordno in ordnos:
+        start = time.perf_counter()
+        fn(ordno)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(label, samples, connections):
+    samples = sorted(samples)
+    p50 = statistics.median(samples) * 1e3
+    p99 = samples[int(len(samples) * 0.99) - 1] * 1e3
+    print(f"   {label:<27} p50 {p50:7.2f} ms   p99 {p99:7.2f} ms   new connections: {connections}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=100)
+    parser.add_argument("--tls", action="store_true", help="HTTPS stand-in with a self-signed cert")
+    args = parser.parse_args()
+    setup_logging(level="ERROR", force=True)  # keep per-order log records out of the timings
+
+    server, standin, base_url = noren_standin.serve(tls=args.tls)
+    verify = server.certfile or True
+    # Limiter off: this measures the wire, not the broker's order cap
+    api = ProStocksAPI(*CREDS, base_url, order_rate=1_000_000)
+    api.transport.verify = verify
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            api.login()
+            ordnos = place_open_orders(api, 2 * args.orders)
+        bare_ids, pooled_ids = ordnos[:args.orders], ordnos[args.orders:]
+
+        results = {}
+        for label, ids, modify, cancel in (
+            ("bare requests.post", bare_ids,
+             lambda o: bare_post(api, "ModifyOrder", {"uid": api.userid, "norenordno": o, "exch": "NSE",
+                                                       "tsym": "SBIN-EQ", "qty": "2", "prctyp": "LMT",
+                                                       "prc": "701"}, verify),
+             lambda o: bare_post(api, "CancelOrder", {"norenordno": o, "uid": api.userid}, verify)),
+            ("pooled Transport", pooled_ids,
+             lambda o: api.modify_order(o, "NSE", "SBIN-EQ", 2, "LMT", 701),
+             lambda o: api.cancel_order(o)),
+        ):
+            before = standin.connections
+            with contextlib.redirect_stdout(io.StringIO()):
+                mod = time_calls(modify, ids)
+                can = time_calls(cancel, ids)
+            results[label] = (mod, can, standin.connections - before)
+    finally:
+        server.shutdown()
+
+    print(f"📊 {args.orders} modify + {args.orders} cancel over {'HTTPS' if args.tls else 'HTTP'}")
+    for label, (mod, can, conns) in results.items():
+        report(f"{label} / modify", mod, conns)
+        report(f"{label} / cancel", can, conns)
+    bare = statistics.mean(results["bare requests.post"][0] + results["bare requests.post"][1])
+    pooled = statistics.mean(results["pooled Transport"][0] + results["pooled Transport"][1])
+    print(f"   mean saving per call: {(bare - pooled) * 1e3:.2f} ms ({bare / pooled:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# candle_store.py
+# Columnar OHLCV store keyed by (exchange, token, interval).
+#
+# Bars live in contiguous NumPy columns that grow by doubling.  Each refresh asks
+# the broker only for bars newer than the last one held.  Finished sessions are
+# written as one (6, n) float64 .npy per day that later processes mmap back in
+# rather than re-downloading.  Only days fetched whole get a file (an empty one
+# for a holiday), so a missing day always means "never fetched":
+#
+#   <cache>/<EXCH>/<token>/<interval>m/<YYYY-MM-DD>.npy    rows: t, o, h, l, c, v
+
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from prostocks_logging import get_logger
+
+log = get_logger("candles")
+
+CANDLE_CACHE = os.getenv("PROSTOCKS_CANDLE_CACHE",
+                         os.path.join(os.path.expanduser("~"), ".cache", "prostocks", "candles"))
+IST = timezone(timedelta(hours=5, minutes=30))
+IST_OFFSET = 19800
+COLUMNS = ("t", "o", "h", "l", "c", "v")
+
+Candles = namedtuple("Candles", COLUMNS)
+Candles.__doc__ = "Read-only views of one series: t (epoch s, bar start), o, h, l, c, v."
+
+
+def _to_frame(self):
+    import pandas as pd
+    df = pd.DataFrame({k: getattr(self, k) for k in COLUMNS[1:]})
+    df.index = pd.to_datetime(self.t, unit="s", utc=True).tz_convert("Asia/Kolkata")
+    return df
+
+
+Candles.to_frame = _to_frame
+
+
+def session_day(t):
+    return datetime.fromtimestamp(int(t), IST).date()
+
+
+def parse_tpseries(resp):
+    """Broker TPSeries rows (newest first) -> (6, n) array, oldest first."""
+    if not isinstance(resp, list):
+        return np.empty((6, 0))
+    bars = []
+    for row in resp:
+        if not isinstance(row, dict) or row.get("stat") != "Ok":
+            continue
+        try:
+            if row.get("ssboe"):
+                t = int(row["ssboe"])
+            else:
+                t = int(datetime.strptime(row["time"], "%d-%m-%Y %H:%M:%S").replace(tzinfo=IST).timestamp())
+            bars.append((t, float(row["into"]), float(row["inth"]), float(row["intl"]),
+                         float(row["intc"]), float(row.get("intv") or 0)))
+        except (KeyError, ValueError):
+            continue
+    if not bars:
+        return np.empty((6, 0))
+    arr = np.array(sorted(bars), dtype=np.float64).T
+    # Drop duplicate timestamps, keeping the last copy
+    keep = np.append(arr[0, 1:] != arr[0, :-1], True)
+    return arr[:, keep]
+
+
+class CandleSeries:
+    """Growable columnar buffer for one (exchange, token, interval)."""
+
+    def __init__(self, capacity=1024):
+        self.buf = np.empty((6, capacity), dtype=np.float64)
+        self.n = 0
+        self.covered_from = None  # earliest time this series is known to be complete from
+        self.lock = threading.Lock()
+
+    @property
+    def last_t(self):
+        return int(self.buf[0, self.n - 1]) if self.n else None
+
+    def _reserve(self, extra):
+        if self.n + extra > self.buf.shape[1]:
+            cap = max(self.buf.shape[1] * 2, self.n + extra)
+            grown = np.empty((6, cap), dtype=np.float64)
+            grown[:, :self.n] = self.buf[:, :self.n]
+            self.buf = grown
+
+    def merge(self, bars):
+        """Merge sorted bars in; returns how many new timestamps were added.
+
+        The common case only appends bars newer than the last one, and a bar with
+        the last timestamp replaces it (the broker's still-forming bar).  Older
+        bars (backfill) take a full sort-and-dedupe pass.
+        """
+        if bars.shape[1] == 0:
+            return 0
+        with self.lock:
+            if self.n and bars[0, 0] < self.buf[0, self.n - 1]:
+                combined = np.concatenate([self.buf[:, :self.n], bars], axis=1)
+                order = np.argsort(combined[0], kind="stable")
+                combined = combined[:, order]
+                keep = np.append(combined[0, 1:] != combined[0, :-1], True)
+                combined = combined[:, keep]
+                added = combined.shape[1] - self.n
+                self.n = 0
+                self._reserve(combined.shape[1])
+                self.buf[:, :combined.shape[1]] = combined
+                self.n = combined.shape[1]
+                return added
+            if self.n:
+                last = self.buf[0, self.n - 1]
+                same = bars[0] == last
+                if same.any():
+                    self.buf[:, self.n - 1] = bars[:, same][:, -1]
+                bars = bars[:, bars[0] > last]
+            self._reserve(bars.shape[1])
+            self.buf[:, self.n:self.n + bars.shape[1]] = bars
+            self.n += bars.shape[1]
+            return bars.shape[1]
+
+    def view(self, since=None):
+        with self.lock:
+            cols = self.buf[:, :self.n]
+            if since is not None:
+                cols = cols[:, np.searchsorted(cols[0], since, side="left"):]
+            cols = cols.view()
+            cols.flags.writeable = False
+            return Candles(*cols)
+
+
+class CandleStore:
+    def __init__(self, api, cache_dir=CANDLE_CACHE):
+        self.api = api
+        self.cache_dir = cache_dir
+        self.series = {}
+        self.persisted = set()
+        self.lock = threading.Lock()
+        self.fetches = 0
+        self.bars_downloaded = 0
+
+    def _dir(self, exchange, token, interval):
+        return os.path.join(self.cache_dir, exchange, str(token), f"{interval}m")
+
+    def _load_disk(self, exchange, token, interval, since_day):
+        """Day files back from yesterday to since_day, stopping at the first missing day.
+
+        Anything before a gap is left to the broker: the head fetch in get() covers it.
+        """
+        path = self._dir(exchange, token, interval)
+        if not os.path.isdir(path):
+            return np.empty((6, 0))
+        days = {name[:-4] for name in os.listdir(path) if name.endswith(".npy") and not name.endswith(".tmp.npy")}
+        parts = []
+        day = datetime.now(IST).date() - timedelta(days=1)
+        while day >= since_day and day.isoformat() in days:
+            parts.append(np.load(os.path.join(path, f"{day.isoformat()}.npy"), mmap_mode="r"))
+            self.persisted.add((exchange, str(token), str(interval), day.isoformat()))
+            day -= timedelta(days=1)
+        return np.concatenate(parts[::-1], axis=1) if parts else np.empty((6, 0))
+
+    def _persist(self, exchange, token, interval, series):
+        """Write every finished session (IST day before today) held from its midnight on, bars or not."""
+        if series.covered_from is None:
+            return
+        today = datetime.now(IST).date()
+        day = session_day(series.covered_from)
+        if (int(series.covered_from) + IST_OFFSET) % 86400:
+            day += timedelta(days=1)  # only the day's tail was fetched: a file would read back as the whole day
+        with series.lock:
+            cols = series.buf[:, :series.n].copy()
+        day_num = (cols[0].astype(np.int64) + IST_OFFSET) // 86400
+        path = self._dir(exchange, token, interval)
+        while day < today:
+            key = (exchange, str(token), str(interval), day.isoformat())
+            if key not in self.persisted:
+                os.makedirs(path, exist_ok=True)
+                tmp = os.path.join(path, f"{day.isoformat()}.tmp.npy")
+                np.save(tmp, np.ascontiguousarray(cols[:, day_num == (day - date(1970, 1, 1)).days]))
+                os.replace(tmp, os.path.join(path, f"{day.isoformat()}.npy"))
+                self.persisted.add(key)
+            day += timedelta(days=1)
+
+    def _fetch(self, exchange, token, interval, start, end=None):
+        """One TPSeries call -> (6, n) bars, or None when the broker call failed ("no data" is not a failure)."""
+        resp = self.api.get_time_price_series(exchange=exchange, token=token, starttime=start, endtime=end,
+                                              interval=interval)
+        self.fetches += 1
+        if not isinstance(resp, list) and not (isinstance(resp, dict) and
+                                               str(resp.get("emsg", "")).lower().startswith("no data")):
+            return None
+        bars = parse_tpseries(resp)
+        self.bars_downloaded += bars.shape[1]
+        return bars
+
+    def get(self, token, interval="5", days=1, exchange="NSE", refresh=True):
+        """
+        Candles for the last `days` days, fetching only bars newer than what is held.
+
+        :return: Candles of read-only NumPy views, oldest bar first.
+        """
+        interval = str(interval)
+        key = (exchange, str(token), interval)
+        since = time.time() - 86400 * days
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = CandleSeries()
+            backfill = series.covered_from is None or since < series.covered_from
+            if backfill:
+                series.merge(self._load_disk(exchange, token, interval, session_day(since)))
+
+        if refresh:
+            added = 0
+            head_ok = True
+            if backfill and series.n and series.buf[0, 0] > since:
+                # A wider window than ever asked for: the bars between `since` and the first one held
+                # were never fetched (a shorter window came first, or disk only has the later days)
+                head = self._fetch(exchange, token, interval, since, end=int(series.buf[0, 0]) - 1)
+                head_ok = head is not None
+                if head_ok:
+                    added += series.merge(head)
+            # Disk covers finished sessions, so after a cold load only today's tail is fetched
+            tail = self._fetch(exchange, token, interval, series.last_t if series.n else since)
+            if tail is not None:
+                added += series.merge(tail)
+            if backfill and head_ok and tail is not None:
+                series.covered_from = min(since, series.covered_from or since)
+            if added:
+                try:
+                    self._persist(exchange, token, interval, series)
+                except OSError as e:
+                    log.error("❌ Could not persist candles for %s: %s", key, e)
+        return series.view(since=since)
@@ -0,0 +1,62 @@
+# conftest.py
+# Shared pytest fixtures: the local NorenWS stand-in and the paper exchange.
+#
+#   python -m pytest -q
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import noren_standin
+from paper_exchange import PaperExchange
+from prostocks_logging import flush_logging, setup_logging
+
+CREDS = ("TEST01", "pwd", "ABCDE1234F", "TEST01", "key", "MAC123456")
+
+# Manual login scripts that hit the broker at import time - not tests
+collect_ignore = ["test_login.py", "test_prostocks_login.py"]
+
+
+def wait_for(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            raise TimeoutError("condition not met")
+        time.sleep(0.01)
+
+
+@pytest.fixture(autouse=True, scope="session")
+def quiet_logs():
+    setup_logging(level="ERROR", force=True)
+    yield
+    flush_logging()  # before pytest closes the captured stderr the sink writes to
+
+
+@pytest.fixture
+def rest_server():
+    """In-process Noren REST stand-in: yields (standin, base_url)."""
+    server, standin, base_url = noren_standin.serve()
+    yield standin, base_url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def ws_server():
+    server = noren_standin.FakeNorenWS()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def ws_api():
+    """Just the attributes MarketFeed reads at connect time."""
+    return SimpleNamespace(userid="TEST01", actid="TEST01", session_token="standin-TEST01")
+
+
+@pytest.fixture
+def paper():
+    px = PaperExchange()
+    yield px
+    px.close()
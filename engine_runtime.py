@@ -0,0 +1,471 @@
+# engine_runtime.py
+# Standalone trading-engine runtime: an asyncio loop that evaluates the engine on
+# every bar close and on ticks for symbols with open positions, independent of
+# Streamlit reruns.  The dashboard only reads `runtime.state`.
+#
+#   python engine_runtime.py --symbols SBIN-EQ,INFY-EQ --interval 5
+
+import argparse
+import asyncio
+import threading
+import time as _time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from datetime import time as dtime
+
+import numpy as np
+
+import scrip_master
+from candle_store import IST, CandleStore, session_day
+from dashboard_logic import load_settings
+from indicator_engine import IndicatorEngine
+from position_book import PositionBook
+from prostocks_logging import get_logger
+from risk_engine import RiskEngine, RiskGate
+from strategy_rules import DEFAULT_QCFG
+from trading_engine import make_engine
+from trigger_manager import TriggerManager
+
+log = get_logger("runtime")
+
+# Bars of history the indicators are seeded with; after that each closed bar is one update()
+HISTORY_BARS = 300
+# Wait after the bar boundary so the broker has closed the bar
+BAR_CLOSE_GRACE = 2.0
+
+
+class EngineState:
+    """What the engine did, for read-only views; also the `dashboard` object the engine calls back."""
+
+    def __init__(self, max_events=500):
+        self.lock = threading.Lock()
+        self.trades = deque(maxlen=max_events)
+        self.exits = deque(maxlen=max_events)
+        self.errors = deque(maxlen=50)
+        self.positions = {}
+        self.indicators = {}
+        self.prices = {}
+        self.status = "stopped"
+        self.last_bar = None
+        self.last_tick = None
+        self.bars_processed = 0
+        self.ticks_processed = 0
+        self.triggers = None  # TriggerManager arming each entry's stop / target
+
+    # === TradingEngine dashboard callbacks ===
+    def log_trade(self, symbol, side, price, qty, sl, tgt, time):
+        with self.lock:
+            self.trades.append({"symbol": symbol, "side": side, "price": price, "qty": qty, "sl": sl,
+                                "tgt": tgt, "time": time})
+        if self.triggers is not None:
+            self.triggers.add_bracket(symbol, side, qty, sl=sl, tgt=tgt, ref_price=price, key=symbol,
+                                      remarks="engine")
+        log.info("✅ %s %s @ ₹%s | Qty: %s | SL: ₹%s | Target: ₹%s", side, symbol, price, qty, sl, tgt)
+
+    def close_position(self, symbol, position):
+        with self.lock:
+            self.exits.append(dict(position, symbol=symbol))
+        if self.triggers is not None:
+            self.triggers.cancel_key(symbol)
+        log.info("🚪 Exited %s (%s) @ %s", symbol, position.get("reason"), position.get("exit_price"))
+
+    def update_visuals(self, positions, indicators):
+        with self.lock:
+            self.positions = {k: dict(v) for k, v in positions.items()}
+            self.indicators = dict(indicators)
+
+    # === Runtime bookkeeping ===
+    def set_price(self, symbol, price):
+        with self.lock:
+            self.prices[symbol] = price
+
+    def error(self, msg):
+        with self.lock:
+            self.errors.append((datetime.now(IST).strftime("%H:%M:%S"), msg))
+        log.error("❌ %s", msg)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "status": self.status,
+                "last_bar": self.last_bar,
+                "last_tick": self.last_tick,
+                "bars_processed": self.bars_processed,
+                "ticks_processed": self.ticks_processed,
+                "positions": {k: dict(v) for k, v in self.positions.items()},
+                "indicators": dict(self.indicators),
+                "prices": dict(self.prices),
+                "trades": list(self.trades),
+                "exits": list(self.exits),
+                "errors": list(self.errors),
+            }
+
+
+def next_bar_close(now, interval_min, session_start):
+    """First bar boundary after `now` (IST datetime) on the grid anchored at session_start."""
+    anchor = now.replace(hour=session_start.hour, minute=session_start.minute, second=0, microsecond=0)
+    step = timedelta(minutes=interval_min)
+    if now < anchor:
+        return anchor + step
+    n = int((now - anchor) / step) + 1
+    return anchor + n * step
+
+
+class EngineRuntime:
+    """
+    Drives `engine.process_trade` from an asyncio loop.
+
+    - bar close: refresh candles (CandleStore, incremental), advance the
+      indicators by the newly closed bar for every symbol in one vectorized
+      update() (seeded once from HISTORY_BARS), evaluate each symbol
+    - ticks (optional MarketFeed): re-evaluate symbols holding a position at the
+      tick price, so stops and targets don't wait for the bar
+    - windows from dashboard_logic.load_settings(): nothing before trading_start,
+      entries until cutoff_time (the engine checks), square-off at auto_exit_time,
+      idle after trading_end
+    - positions: a PositionBook marked on every bar and tick; fills come from
+      the RiskEngine's order updates when there is one, else from trade_book()
+      once per bar (only unseen fills are folded)
+    - optional RiskEngine: the engine's orders go through a RiskGate (`api` may
+      already be one), and the runtime feeds it bar / tick prices and order
+      updates (feed pushes, or the order book once per bar without a feed)
+    - optional TriggerManager: each entry arms its stop / target as a bracket
+      and ticks go through the manager's per-symbol heaps instead of
+      re-evaluating every open position; a fired leg exits via the engine
+    """
+
+    def __init__(self, api, symbols, interval="5", settings=None, engine=None, feed=None, candle_store=None,
+                 qcfg=None, balance=50000, exchange="NSE", max_workers=8, risk=None,
+                 triggers=None):
+        if isinstance(api, RiskGate):
+            # Already gated (the dashboard gates its shared session): reuse that engine, don't admit twice
+            if risk is not None and risk is not api.risk:
+                raise ValueError("api is already behind a RiskGate with a different RiskEngine")
+            risk = api.risk
+        elif risk is not None and api is not None:
+            api = RiskGate(api, risk)
+        self.risk = risk
+        self.positions = risk.positions if risk is not None else PositionBook()
+        self.api = api
+        self.symbols = list(symbols)
+        self.interval = str(interval)
+        self.settings = dict(settings if settings is not None else load_settings())
+        self.state = EngineState()
+        self.engine = engine or make_engine(self.state, api, settings=self.settings, exchange=exchange)
+        self.feed = feed
+        self.triggers = triggers
+        if triggers is not None:
+            self.state.triggers = triggers
+            if triggers.exit_fn is None and hasattr(self.engine, "exit_position"):
+                triggers.exit_fn = self._trigger_exit
+        self.candle_store = candle_store or CandleStore(api)
+        self.qcfg = qcfg or DEFAULT_QCFG
+        self.balance = balance
+        self.exchange = exchange
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="engine-io")
+        self.tokens = {}
+        self.by_key = {}
+        self.day_refs = {}  # symbol -> (session day, y_close, open)
+        self.ind = None  # IndicatorEngine over every resolved symbol, seeded once then advanced per bar
+        self.ind_t = {}  # symbol -> start time of the last bar fed to self.ind
+        self.loop = None
+        self.thread = None
+        self._stop = None
+        self._tick_pending = {}
+        self._tick_lock = threading.Lock()  # _tick_pending is filled on the feed thread, drained on the loop
+        self._tick_event = None
+        self.squared_off = None
+        self.session_date = None
+
+    # === Lifecycle ===
+    def start(self):
+        """Run the loop on a background thread; returns self."""
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=lambda: asyncio.run(self.run()), name="engine-runtime",
+                                           daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        if self.loop is not None and self._stop is not None:
+            self.loop.call_soon_threadsafe(self._stop.set)
+        if self.thread is not None:
+            self.thread.join(timeout=10)
+        self.executor.shutdown(wait=False)
+
+    def update_settings(self, **changes):
+        """Dashboard toggles (master_auto / auto_buy / auto_sell); the engine sees them on its next call."""
+        self.settings.update(changes)
+        if hasattr(self.engine, "settings"):
+            self.engine.settings.update(changes)
+
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._tick_event = asyncio.Event()
+        self.state.status = "starting"
+        await self.loop.run_in_executor(self.executor, self._resolve_tokens)
+        if self.feed is not None:
+            self.feed.on_tick(self._on_tick)
+            if self.risk is not None:
+                self.feed.subscribe_orders(self.risk.on_order)
+            self.feed.subscribe(list(self.tokens.values()), exchange=self.exchange)
+        tasks = [asyncio.create_task(self._bar_loop()), asyncio.create_task(self._tick_loop())]
+        self.state.status = "running"
+        await self._stop.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.state.status = "stopped"
+
+    def _resolve_tokens(self):
+        for symbol in self.symbols:
+            token = scrip_master.get_token(symbol, self.exchange)
+            if token is None and hasattr(self.api, "searchscrip"):
+                resp = self.api.searchscrip(exchange=self.exchange, searchtext=symbol)
+                values = resp.get("values") if isinstance(resp, dict) else None
+                token = values[0]["token"] if values else None
+            if token is None:
+                self.state.error(f"No token for {symbol}")
+                continue
+            self.tokens[symbol] = str(token)
+            self.by_key[f"{self.exchange}|{token}"] = symbol
+
+    # === Bar close ===
+    def _now(self):
+        return datetime.now(IST)
+
+    async def _bar_loop(self):
+        start = self.settings.get("trading_start") or dtime(9, 15)
+        while True:
+            now = self._now()
+            close_at = next_bar_close(now, int(self.interval), start)
+            await asyncio.sleep((close_at - now).total_seconds() + BAR_CLOSE_GRACE)
+            try:
+                await self.on_bar_close(close_at)
+            except Exception as e:
+                self.state.error(f"Bar processing failed: {e}")
+
+    async def on_bar_close(self, close_at):
+        now = close_at.time()
+        s = self.settings
+        if s.get("trading_start") and now < s["trading_start"]:
+            return
+        if s.get("trading_end") and now > s["trading_end"] and self.squared_off == close_at.date():
+            return
+        day = close_at.date()
+        if self.session_date is not None and self.session_date != day:
+            # Before this bar's book sync, so the new day's fills count towards the new day
+            if self.risk is not None:
+                self.risk.new_day(day)
+            else:
+                self.positions.new_day()
+        self.session_date = day
+        candles = await asyncio.gather(*(
+            self.loop.run_in_executor(self.executor, self._candles, symbol) for symbol in self.tokens))
+        if self.api is not None and (self.risk is None or self.feed is None):
+            await self.loop.run_in_executor(self.executor, self._sync_books)
+        await self.loop.run_in_executor(self.executor, self._evaluate_bar, dict(zip(self.tokens, candles)),
+                                        close_at)
+
+    def _sync_books(self):
+        try:
+            if self.risk is not None:
+                self.risk.sync(self.api.order_book())
+            else:
+                self.positions.apply_trade_book(self.api.trade_book())
+        except Exception as e:
+            self.state.error(f"Order / trade book sync failed: {e}")
+
+    def _candles(self, symbol):
+        return self.candle_store.get(self.tokens[symbol], interval=self.interval, days=5, exchange=self.exchange)
+
+    def _evaluate_bar(self, candles, close_at):
+        # Closed bars only: a bar still forming at close_at would be fed to the indicators once and never corrected
+        cutoff = close_at.timestamp() - 60 * int(self.interval)
+        closed = {}
+        for s, c in candles.items():
+            n = int(np.searchsorted(c.t, cutoff, side="right"))
+            if n:
+                closed[s] = (c, n)
+        if not closed:
+            return
+        self._advance_indicators(closed)
+
+        stamp = close_at.strftime("%H:%M")
+        indicators = {}
+        for s, (c, n) in closed.items():
+            if not self.ind.bars[self.ind.index[s]]:
+                continue
+            indicators[s] = self.ind.indicators(s)
+            price = float(c.c[n - 1])
+            self._mark(s, price)
+            self._day_refs(s, c, n)
+            self._process(s, price, indicators[s], stamp, high=float(c.h[n - 1]), low=float(c.l[n - 1]))
+
+        auto_exit = self.settings.get("auto_exit_time")
+        if auto_exit and close_at.time() >= auto_exit and self.squared_off != close_at.date():
+            if hasattr(self.engine, "exit_all"):
+                self.engine.exit_all(self.state.snapshot()["prices"], stamp)
+            self.squared_off = close_at.date()
+        with self.state.lock:
+            self.state.last_bar = stamp
+            self.state.bars_processed += 1
+        self.state.update_visuals(self._engine_positions(), indicators)
+
+    def _advance_indicators(self, closed):
+        """Seed self.ind with run() over the last HISTORY_BARS bars once, then update() with each new closed bar."""
+        min_vol = self.settings.get("min_vol_required", 2.0)
+        fresh = [s for s in closed if s not in self.ind_t]
+        # (Re)seed at start, when a symbol first has bars, or after a gap longer than the candle window
+        if self.ind is None or fresh or any(closed[s][0].t[0] > self.ind_t[s] for s in closed):
+            symbols = list(self.tokens)
+            self.ind = IndicatorEngine(symbols, {"min_vol_required": min_vol})
+            self.ind_t = {}
+            bars = min(HISTORY_BARS, max(n for _, n in closed.values()))
+            # Right-aligned (symbols x bars) window; shorter histories are NaN-padded on the left
+            hlc = np.full((3, len(symbols), bars), np.nan)
+            for s, (c, n) in closed.items():
+                i, k = self.ind.index[s], min(bars, n)
+                hlc[0, i, bars - k:], hlc[1, i, bars - k:], hlc[2, i, bars - k:] = \
+                    c.h[n - k:n], c.l[n - k:n], c.c[n - k:n]
+                self.ind_t[s] = float(c.t[n - 1])
+            self.ind.run(hlc[0], hlc[1], hlc[2], keep=())
+            return
+        self.ind.params["min_vol_required"] = min_vol
+        # Normally one new bar per symbol; after a missed bar close, every bar since is fed in time order
+        new = {}
+        for s, (c, n) in closed.items():
+            j = int(np.searchsorted(c.t, self.ind_t[s], side="right"))
+            for k in range(j, n):
+                new.setdefault(float(c.t[k]), []).append((self.ind.index[s], c, k))
+            if n > j:
+                self.ind_t[s] = float(c.t[n - 1])
+        size = len(self.ind.symbols)
+        for t in sorted(new):
+            h, l, cl = np.full(size, np.nan), np.full(size, np.nan), np.full(size, np.nan)
+            for i, c, k in new[t]:
+                h[i], l[i], cl[i] = c.h[k], c.l[k], c.c[k]
+            self.ind.update(h, l, cl)
+
+    def _day_refs(self, symbol, candles, n):
+        """Cache (y_close, day open) per symbol for its current session; recomputed once a day."""
+        today = session_day(candles.t[n - 1])
+        cached = self.day_refs.get(symbol)
+        if cached is not None and cached[0] == today:
+            return
+        midnight = datetime.combine(today, dtime(0), IST).timestamp()
+        k = int(np.searchsorted(candles.t[:n], midnight, side="left"))
+        day_open = float(candles.o[k])
+        self.day_refs[symbol] = (today, float(candles.c[k - 1]) if k else day_open, day_open)
+
+    def _engine_positions(self):
+        """Copy of the engine's positions, under its lock when it has one (exits run on other executor threads)."""
+        positions = getattr(self.engine, "positions", None)
+        if positions is None:
+            return {}
+        lock = getattr(self.engine, "lock", None)
+        if lock is None:
+            return {k: dict(v) for k, v in list(positions.items())}
+        with lock:
+            return {k: dict(v) for k, v in positions.items()}
+
+    def _mark(self, symbol, price):
+        self.state.set_price(symbol, price)
+        if self.risk is not None:
+            self.risk.on_price(symbol, price)  # marks the shared PositionBook too
+        else:
+            self.positions.on_price(symbol, price)
+
+    def _process(self, symbol, price, indicators, stamp, high=None, low=None):
+        _, y_close, day_open = self.day_refs.get(symbol, (None, price, price))
+        try:
+            self.engine.process_trade(symbol=symbol, price=price, y_close=y_close, open=day_open,
+                                      indicators=indicators, qcfg=self.qcfg, time=stamp, balance=self.balance,
+                                      high=high, low=low)
+        except Exception as e:
+            self.state.error(f"process_trade({symbol}) failed: {e}")
+
+    # === Ticks ===
+    def _on_tick(self, key, row):
+        # Feed thread: keep only the latest tick per symbol and wake the loop
+        symbol = self.by_key.get(key)
+        if symbol is None or row is None or self.loop is None:
+            return
+        with self._tick_lock:
+            self._tick_pending[symbol] = row
+        self.loop.call_soon_threadsafe(self._tick_event.set)
+
+    async def _tick_loop(self):
+        while True:
+            await self._tick_event.wait()
+            self._tick_event.clear()
+            with self._tick_lock:
+                pending, self._tick_pending = self._tick_pending, {}
+            await self.loop.run_in_executor(self.executor, self._evaluate_ticks, pending)
+
+    def _evaluate_ticks(self, pending):
+        positions = getattr(self.engine, "positions", None)
+        stamp = self._now().strftime("%H:%M")
+        for symbol, row in pending.items():
+            price = row.get("lp")
+            if price is None or price != price:
+                continue
+            self._mark(symbol, price)
+            if self.triggers is not None:
+                self.triggers.on_tick(symbol, price)
+                continue
+            # Entries wait for the bar; ticks only guard open positions
+            if positions is not None and symbol not in positions:
+                continue
+            indicators = self.state.indicators.get(symbol)
+            if indicators is None:
+                continue
+            self._process(symbol, price, indicators, stamp)
+        with self.state.lock:
+            self.state.last_tick = stamp
+            self.state.ticks_processed += len(pending)
+        if positions is not None:
+            with self.state.lock:
+                indicators = dict(self.state.indicators)
+            self.state.update_visuals(self._engine_positions(), indicators)
+
+    def _trigger_exit(self, bracket, leg, price):
+        return self.engine.exit_position(bracket.tsym, price, leg.kind, self._now().strftime("%H:%M"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", required=True, help="comma-separated trading symbols, e.g. SBIN-EQ,INFY-EQ")
+    parser.add_argument("--interval", default="5", help="bar size in minutes")
+    parser.add_argument("--balance", type=float, default=50000)
+    parser.add_argument("--feed", action="store_true", help="also react to NorenWS ticks")
+    parser.add_argument("--no-triggers", action="store_true",
+                        help="with --feed, re-evaluate positions on ticks instead of heap-indexed stop / target legs")
+    parser.add_argument("--no-risk", action="store_true", help="send orders without the pre-trade risk checks")
+    args = parser.parse_args()
+
+    from prostocks_connector import login_ps
+    api = login_ps()
+    if api is None:
+        raise SystemExit(1)
+    feed = None
+    if args.feed:
+        from market_feed import MarketFeed
+        feed = MarketFeed(api).start()
+    risk = None if args.no_risk else RiskEngine(load_settings().get("risk_limits"))
+    triggers = TriggerManager() if args.feed and not args.no_triggers else None
+    runtime = EngineRuntime(api, args.symbols.split(","), interval=args.interval, feed=feed,
+                            balance=args.balance, risk=risk, triggers=triggers)
+    try:
+        asyncio.run(runtime.run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if feed is not None:
+            feed.stop()
+
+
+if __name__ == "__main__":
+    main()
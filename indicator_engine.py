@@ -0,0 +1,194 @@
+# indicator_engine.py
+# Universe-wide, incremental indicators behind TradingEngine's `indicators` dict.
+#
+# Every indicator is a recursive filter (EMA / Wilder smoothing), so a new bar
+# updates each one in O(1) from the previous state.  State is held as 1-D arrays
+# with one slot per symbol, and each update is a handful of vector ops across
+# the whole universe.
+#
+#   macd_hist       MACD(12, 26) - signal(9)
+#   pac_band_*      Price Action Channel: EMA(34) of high / low
+#   above_pac       close above the upper PAC band
+#   atr_trail       "Buy"/"Sell" side of an ATR(14) x 3 trailing stop
+#   volatility      ATR(14) as % of close
+#   tkp_trm         "Buy" when TSI(25, 13) > its EMA(7) and RSI(14) > 50,
+#                   "Sell" when both are the other way, else "Neutral"
+
+import numpy as np
+
+DEFAULT_PARAMS = {
+    "macd_fast": 12, "macd_slow": 26, "macd_signal": 9,
+    "pac_period": 34,
+    "atr_period": 14, "atr_mult": 3.0,
+    "tsi_long": 25, "tsi_short": 13, "tsi_signal": 7,
+    "rsi_period": 14,
+    "min_vol_required": 2.0,
+}
+
+# Outputs kept per bar when a history is requested
+OUTPUTS = ("macd_hist", "pac_band_upper", "pac_band_lower", "atr", "atr_stop", "volatility", "tsi",
+           "tsi_signal", "rsi")
+
+
+def _alpha(n):
+    return 2.0 / (n + 1.0)
+
+
+class IndicatorEngine:
+    def __init__(self, symbols, params=None):
+        self.symbols = list(symbols)
+        self.index = {s: i for i, s in enumerate(self.symbols)}
+        self.params = dict(DEFAULT_PARAMS, **(params or {}))
+        p = self.params
+        self.a_fast, self.a_slow, self.a_sig = _alpha(p["macd_fast"]), _alpha(p["macd_slow"]), _alpha(p["macd_signal"])
+        self.a_pac = _alpha(p["pac_period"])
+        self.w_atr = 1.0 / p["atr_period"]
+        self.w_rsi = 1.0 / p["rsi_period"]
+        self.a_tl, self.a_ts, self.a_tsig = _alpha(p["tsi_long"]), _alpha(p["tsi_short"]), _alpha(p["tsi_signal"])
+
+        n = len(self.symbols)
+        nan = lambda: np.full(n, np.nan)
+        # Recursive state, NaN until a symbol's first bar
+        self.prev_close = nan()
+        self.ema_fast, self.ema_slow, self.macd_sig = nan(), nan(), nan()
+        self.pac_upper, self.pac_lower = nan(), nan()
+        self.atr, self.atr_stop = nan(), nan()
+        self.avg_gain, self.avg_loss = nan(), nan()
+        self.mom1, self.mom2, self.abs1, self.abs2, self.tsi_sig = nan(), nan(), nan(), nan(), nan()
+        self.bars = np.zeros(n, dtype=np.int64)
+        # Latest values
+        self.close = nan()
+        self.macd_hist = nan()
+        self.tsi = nan()
+        self.rsi = nan()
+
+    # === One bar for every symbol: O(1) per indicator, vectorized across symbols ===
+    def update(self, high, low, close):
+        """Advance all indicators by one bar. Inputs are 1-D arrays (one value per
+        symbol); NaN means "no bar for this symbol" and leaves its state untouched."""
+        h, l, c = (np.asarray(x, dtype=np.float64) for x in (high, low, close))
+        ok = ~np.isnan(c)
+        first = ok & np.isnan(self.prev_close)
+        pc = np.where(first, c, self.prev_close)
+
+        def ema(state, x, a):
+            new = np.where(np.isnan(state), x, state + a * (x - state))
+            return np.where(ok, new, state)
+
+        # MACD
+        self.ema_fast = ema(self.ema_fast, c, self.a_fast)
+        self.ema_slow = ema(self.ema_slow, c, self.a_slow)
+        macd = self.ema_fast - self.ema_slow
+        self.macd_sig = ema(self.macd_sig, macd, self.a_sig)
+        self.macd_hist = np.where(ok, macd - self.macd_sig, self.macd_hist)
+
+        # PAC bands
+        self.pac_upper = ema(self.pac_upper, h, self.a_pac)
+        self.pac_lower = ema(self.pac_lower, l, self.a_pac)
+
+        # ATR (Wilder) + trailing stop
+        tr = np.maximum(h - l, np.maximum(np.abs(h - pc), np.abs(l - pc)))
+        self.atr = ema(self.atr, tr, self.w_atr)
+        loss = self.params["atr_mult"] * self.atr
+        prev_stop = np.where(np.isnan(self.atr_stop), c - loss, self.atr_stop)
+        up = (c > prev_stop) & (pc > prev_stop)
+        down = (c < prev_stop) & (pc < prev_stop)
+        stop = np.where(up, np.maximum(prev_stop, c - loss),
+                        np.where(down, np.minimum(prev_stop, c + loss),
+                                 np.where(c > prev_stop, c - loss, c + loss)))
+        self.atr_stop = np.where(ok, stop, self.atr_stop)
+
+        # RSI (Wilder)
+        change = np.where(first, 0.0, c - pc)
+        self.avg_gain = ema(self.avg_gain, np.maximum(change, 0.0), self.w_rsi)
+        self.avg_loss = ema(self.avg_loss, np.maximum(-change, 0.0), self.w_rsi)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(self.avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss))
+        self.rsi = np.where(ok, np.where((self.avg_gain == 0) & (self.avg_loss == 0), 50.0, rsi), self.rsi)
+
+        # TSI + signal
+        self.mom1 = ema(self.mom1, change, self.a_tl)
+        self.mom2 = ema(self.mom2, self.mom1, self.a_ts)
+        self.abs1 = ema(self.abs1, np.abs(change), self.a_tl)
+        self.abs2 = ema(self.abs2, self.abs1, self.a_ts)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tsi = np.where(self.abs2 > 0, 100.0 * self.mom2 / self.abs2, 0.0)
+        self.tsi = np.where(ok, tsi, self.tsi)
+        self.tsi_sig = ema(self.tsi_sig, self.tsi, self.a_tsig)
+
+        self.close = np.where(ok, c, self.close)
+        self.prev_close = np.where(ok, c, self.prev_close)
+        self.bars += ok
+
+    # === Whole history at once: symbols x bars in, symbols x bars out ===
+    def run(self, high, low, close, keep=OUTPUTS):
+        """Feed 2-D (symbols x bars) arrays bar by bar; returns {name: symbols x bars}
+        for each output in `keep` and leaves the engine ready for update()."""
+        high, low, close = (np.asarray(x, dtype=np.float64) for x in (high, low, close))
+        n_bars = close.shape[1]
+        out = {name: np.empty((len(self.symbols), n_bars)) for name in keep}
+        for j in range(n_bars):
+            self.update(high[:, j], low[:, j], close[:, j])
+            for name in keep:
+                out[name][:, j] = self.value(name)
+        return out
+
+    def value(self, name):
+        if name == "pac_band_upper":
+            return self.pac_upper
+        if name == "pac_band_lower":
+            return self.pac_lower
+        if name == "volatility":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return 100.0 * self.atr / self.close
+        if name == "tsi_signal":
+            return self.tsi_sig
+        return getattr(self, name)
+
+    # === Views in TradingEngine's vocabulary ===
+    def signals(self):
+        """Universe-wide arrays of the fields TradingEngine reads."""
+        return signal_fields(self.close, self.atr_stop, self.tsi, self.tsi_sig, self.rsi, self.macd_hist,
+                             self.pac_upper, self.pac_lower, self.value("volatility"))
+
+    def indicators(self, symbol):
+        """The `indicators` dict for one symbol, as app.py passes to process_trade."""
+        i = self.index[symbol]
+        return indicators_of(self.close[i], self.atr_stop[i], self.tsi[i], self.tsi_sig[i], self.rsi[i],
+                             self.macd_hist[i], self.pac_upper[i], self.pac_lower[i],
+                             100.0 * self.atr[i] / self.close[i], self.params["min_vol_required"])
+
+
+# Shared with run() histories (backtester), so live and offline views are built the same way
+def signal_fields(close, atr_stop, tsi, tsi_signal, rsi, macd_hist, pac_upper, pac_lower, volatility):
+    trm_buy = (tsi > tsi_signal) & (rsi > 50)
+    trm_sell = (tsi < tsi_signal) & (rsi < 50)
+    return {
+        "atr_trail": np.where(close > atr_stop, "Buy", "Sell"),
+        "tkp_trm": np.where(trm_buy, "Buy", np.where(trm_sell, "Sell", "Neutral")),
+        "macd_hist": macd_hist,
+        "above_pac": close > pac_upper,
+        "volatility": volatility,
+        "pac_band_lower": pac_lower,
+        "pac_band_upper": pac_upper,
+    }
+
+
+def indicators_of(close, atr_stop, tsi, tsi_signal, rsi, macd_hist, pac_upper, pac_lower, volatility,
+                  min_vol_required):
+    if tsi > tsi_signal and rsi > 50:
+        trm = "Buy"
+    elif tsi < tsi_signal and rsi < 50:
+        trm = "Sell"
+    else:
+        trm = "Neutral"
+    return {
+        "atr_trail": "Buy" if close > atr_stop else "Sell",
+        "tkp_trm": trm,
+        "macd_hist": float(macd_hist),
+        "above_pac": bool(close > pac_upper),
+        "volatility": float(volatility),
+        "min_vol_required": min_vol_required,
+        "pac_band_lower": float(pac_lower),
+        "pac_band_upper": float(pac_upper),
+    }
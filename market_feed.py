@@ -0,0 +1,284 @@
+# market_feed.py
+# Streaming touchline/depth feed over NorenWS with per-symbol NumPy ring buffers.
+
+import json
+import os
+import socket
+import threading
+import time
+
+import numpy as np
+import websocket
+
+from prostocks_logging import get_logger
+
+log = get_logger("feed")
+
+WS_URL = os.getenv("PROSTOCKS_WS_URL", "wss://starapiuat.prostocks.com/NorenWSTP/")
+
+# Columns kept per tick; NaN until the feed has sent a value
+TICK_FIELDS = ("lp", "v", "bp1", "sp1", "bq1", "sq1", "o", "h", "l", "c")
+
+
+class TickRing:
+    """Ring buffers of `capacity` ticks, one per subscribed symbol.
+
+    A symbol's buffers are allocated when it is first subscribed (or first
+    ticks), so memory follows the subscription list rather than `max_symbols`;
+    writing a tick is a handful of array stores, and readers get NumPy views in
+    chronological order.
+    """
+
+    def __init__(self, capacity=256, max_symbols=2048, fields=TICK_FIELDS):
+        self.capacity = capacity
+        self.max_symbols = max_symbols
+        self.fields = fields
+        self.col = {f: i for i, f in enumerate(fields)}
+        # Indexed by slot
+        self.ts = []
+        self.data = []
+        self.last = []
+        self.count = []
+        self.slots = {}
+        self.lock = threading.Lock()
+
+    def slot(self, key):
+        with self.lock:
+            slot = self.slots.get(key)
+            if slot is None:
+                if len(self.slots) >= self.max_symbols:
+                    raise ValueError(f"TickRing full ({self.max_symbols} symbols)")
+                self.ts.append(np.zeros(self.capacity, dtype=np.float64))
+                self.data.append(np.full((self.capacity, len(self.fields)), np.nan, dtype=np.float64))
+                self.last.append(np.full(len(self.fields), np.nan, dtype=np.float64))
+                self.count.append(0)
+                slot = self.slots[key] = len(self.slots)
+            return slot
+
+    def write(self, key, ts, fields):
+        """Merge a (possibly partial) update into the latest row and append it."""
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.slot(key)
+        with self.lock:
+            last = self.last[slot]
+            for name, value in fields.items():
+                col = self.col.get(name)
+                if col is not None:
+                    try:
+                        last[col] = float(value)
+                    except (TypeError, ValueError):
+                        pass
+            pos = self.count[slot] % self.capacity
+            self.ts[slot][pos] = ts
+            self.data[slot][pos] = last
+            self.count[slot] += 1
+
+    def latest(self, key):
+        slot = self.slots.get(key)
+        if slot is None or self.count[slot] == 0:
+            return None
+        with self.lock:
+            pos = (self.count[slot] - 1) % self.capacity
+            row = dict(zip(self.fields, self.data[slot][pos].tolist()))
+            row["ts"] = float(self.ts[slot][pos])
+        return row
+
+    def history(self, key, n=None):
+        """Last `n` ticks (default: all retained) as (ts, data) arrays, oldest first."""
+        slot = self.slots.get(key)
+        if slot is None:
+            return np.empty(0), np.empty((0, len(self.fields)))
+        with self.lock:
+            count = self.count[slot]
+            n = min(n or self.capacity, count, self.capacity)
+            idx = (np.arange(count - n, count) % self.capacity)
+            return self.ts[slot][idx], self.data[slot][idx]
+
+
+class MarketFeed:
+    """NorenWS client that keeps touchline/depth ticks in a TickRing.
+
+    Runs on a background thread, reconnects with backoff and replays every
+    subscription after each reconnect.  The session token is read from
+    `api.session_token` at connect time, so a re-login is picked up.
+    """
+
+    def __init__(self, api, ws_url=WS_URL, capacity=256, max_symbols=2048,
+                 reconnect_delay=1.0, max_reconnect_delay=30.0):
+        self.api = api
+        self.ws_url = ws_url
+        self.ring = TickRing(capacity=capacity, max_symbols=max_symbols)
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.touchline = set()
+        self.depth = set()
+        self.callbacks = []
+        self.order_callbacks = []
+        self.order_updates = False
+        self.ws = None
+        self.connected = threading.Event()
+        self.running = False
+        self.thread = None
+        self.reconnects = 0
+        self.ticks = 0
+        self.lock = threading.Lock()
+
+    # === Lifecycle ===
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="market-feed", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        ws = self.ws
+        if ws is not None:
+            ws.keep_running = False
+            # Shut the socket down rather than close() it: closing the fd under the feed thread's
+            # select() leaves that thread waiting out ping_timeout, a shutdown wakes it to close up itself
+            sock = getattr(ws.sock, "sock", None)
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+
+    def wait_connected(self, timeout=None):
+        return self.connected.wait(timeout)
+
+    def _run(self):
+        delay = self.reconnect_delay
+        while self.running:
+            self.ws = websocket.WebSocketApp(
+                self.ws_url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close,
+            )
+            started = time.monotonic()
+            self.ws.run_forever(ping_interval=30, ping_timeout=10)
+            self.connected.clear()
+            if not self.running:
+                break
+            if time.monotonic() - started > 60:
+                delay = self.reconnect_delay
+            self.reconnects += 1
+            log.warning("🔁 Market feed disconnected, reconnecting in %.1fs", delay)
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    # === Subscriptions ===
+    @staticmethod
+    def _keys(tokens, exchange):
+        return {t if "|" in str(t) else f"{exchange}|{t}" for t in tokens}
+
+    def subscribe(self, tokens, exchange="NSE", depth=False):
+        keys = self._keys(tokens, exchange)
+        for key in keys:
+            self.ring.slot(key)
+        with self.lock:
+            (self.depth if depth else self.touchline).update(keys)
+        if self.connected.is_set():
+            self._send({"t": "d" if depth else "t", "k": "#".join(sorted(keys))})
+
+    def unsubscribe(self, tokens, exchange="NSE", depth=False):
+        keys = self._keys(tokens, exchange)
+        with self.lock:
+            (self.depth if depth else self.touchline).difference_update(keys)
+        if self.connected.is_set():
+            self._send({"t": "ud" if depth else "u", "k": "#".join(sorted(keys))})
+
+    def subscribe_orders(self, callback=None):
+        """Ask NorenWS for order-update pushes ("om"); callback(msg) runs on the feed thread."""
+        if callback is not None:
+            self.order_callbacks.append(callback)
+        self.order_updates = True
+        if self.connected.is_set():
+            self._send({"t": "o", "actid": getattr(self.api, "actid", None)})
+
+    def _resubscribe(self):
+        if self.order_updates:
+            self._send({"t": "o", "actid": getattr(self.api, "actid", None)})
+        with self.lock:
+            touchline, depth = sorted(self.touchline), sorted(self.depth)
+        if touchline:
+            self._send({"t": "t", "k": "#".join(touchline)})
+        if depth:
+            self._send({"t": "d", "k": "#".join(depth)})
+
+    def on_tick(self, callback):
+        """Register callback(key, latest_row) run on the feed thread for every tick."""
+        self.callbacks.append(callback)
+
+    # === Reads (no network) ===
+    def ltp(self, token, exchange="NSE", max_age=None):
+        row = self.ring.latest(next(iter(self._keys([token], exchange))))
+        if row is None or np.isnan(row["lp"]):
+            return None
+        if max_age is not None and time.time() - row["ts"] > max_age:
+            return None
+        return row["lp"]
+
+    def latest(self, token, exchange="NSE"):
+        return self.ring.latest(next(iter(self._keys([token], exchange))))
+
+    def history(self, token, exchange="NSE", n=None):
+        return self.ring.history(next(iter(self._keys([token], exchange))), n)
+
+    # === WebSocket callbacks ===
+    def _send(self, msg):
+        try:
+            self.ws.send(json.dumps(msg))
+        except (websocket.WebSocketException, OSError, AttributeError) as e:
+            log.error("❌ Market feed send failed: %s", e)
+
+    def _on_open(self, ws):
+        uid = getattr(self.api, "userid", None)
+        self._send({"t": "c", "uid": uid, "actid": getattr(self.api, "actid", uid),
+                    "susertoken": getattr(self.api, "session_token", None), "source": "API"})
+
+    def _on_message(self, ws, message):
+        try:
+            msg = json.loads(message)
+        except ValueError:
+            return
+        kind = msg.get("t")
+        if kind == "ck":
+            if msg.get("s", "").upper() == "OK":
+                self.connected.set()
+                self._resubscribe()
+                log.info("✅ Market feed connected")
+            else:
+                log.error("❌ Market feed login rejected: %s", msg)
+        elif kind in ("tk", "tf", "dk", "df"):
+            key = f"{msg.get('e')}|{msg.get('tk')}"
+            ts = float(msg.get("ft") or time.time())
+            self.ring.write(key, ts, msg)
+            self.ticks += 1
+            if self.callbacks:
+                row = self.ring.latest(key)
+                for callback in self.callbacks:
+                    try:
+                        callback(key, row)
+                    except Exception as e:
+                        log.error("❌ Tick callback failed: %s", e)
+
+        elif kind == "om":
+            for callback in self.order_callbacks:
+                try:
+                    callback(msg)
+                except Exception as e:
+                    log.error("❌ Order update callback failed: %s", e)
+
+    def _on_error(self, ws, error):
+        log.error("❌ Market feed error: %s", error)
+
+    def _on_close(self, ws, status, reason):
+        self.connected.clear()
@@ -0,0 +1,540 @@
+# noren_standin.py
+# Local stand-in for the Noren REST host, used by the benchmark scripts.
+
+import base64
+import hashlib
+import json
+import os
+import random
+import secrets
+import struct
+import socket
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+# === Parse a "jData=...&jKey=..." body (raw or urlencoded) ===
+def parse_body(body: str):
+    if body.startswith("jData={"):
+        jdata, _, jkey = body[len("jData="):].rpartition("&jKey=")
+        if not jdata:
+            jdata, jkey = body[len("jData="):], ""
+    else:
+        form = parse_qs(body)
+        jdata = form.get("jData", ["{}"])[0]
+        jkey = form.get("jKey", [""])[0]
+    return json.loads(jdata), jkey
+
+
+class InjectedHTTPError(Exception):
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+
+class NorenStandIn:
+    """In-memory order/trade book behind the Noren endpoint names.
+
+    latency/jitter      seconds added per request (fixed + uniform random)
+    error_rate          fraction of requests answered with stat Not_Ok
+    http_error_rate     fraction of requests answered with HTTP 502
+    session_ttl         seconds a QuickAuth token stays valid (None = forever)
+    order_rate_cap      orders/second before "Too many requests" rejections
+    """
+
+    ORDER_ENDPOINTS = {"placeorder", "modifyorder", "cancelorder"}
+    SESSION_EXPIRED = "Session Expired :  Invalid Session Key"
+
+    def __init__(self, latency=0.0, order_rate_cap=None, symbols=500, jitter=0.0,
+                 error_rate=0.0, http_error_rate=0.0, session_ttl=None, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.http_error_rate = http_error_rate
+        self.session_ttl = session_ttl
+        self.sessions = {}  # susertoken -> (uid, issued_at)
+        self.rng = random.Random(seed)
+        self.injected_errors = 0
+        self.expired_rejections = 0
+        # Synthetic NSE cash universe: SYM0000-EQ.. with tokens from 10001
+        self.universe = {f"SYM{i:04d}-EQ": str(10001 + i) for i in range(symbols)}
+        self.prices = {tok: 100.0 + (int(tok) % 900) for tok in self.universe.values()}
+        self.order_rate_cap = order_rate_cap
+        self.order_times = []
+        self.throttled = 0
+        self.lock = threading.Lock()
+        self.orders = {}
+        self.trades = []
+        self.next_ordno = 25000000000000
+        self.connections = 0
+        self.requests = 0
+
+    def _now(self):
+        return datetime.now().strftime("%H:%M:%S %d-%m-%Y")
+
+    def handle(self, endpoint, jdata, jkey):
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        if self.http_error_rate and self.rng.random() < self.http_error_rate:
+            self.injected_errors += 1
+            raise InjectedHTTPError(502)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.injected_errors += 1
+            return {"stat": "Not_Ok", "emsg": "Simulated broker error"}
+        if endpoint.lower() != "quickauth" and not self._session_ok(jkey):
+            self.expired_rejections += 1
+            return {"stat": "Not_Ok", "emsg": self.SESSION_EXPIRED}
+        if self.order_rate_cap and endpoint.lower() in self.ORDER_ENDPOINTS and self._over_order_cap():
+            return {"stat": "Not_Ok", "emsg": "Too many requests : order rate limit exceeded"}
+        handler = getattr(self, f"ep_{endpoint.lower()}", None)
+        if handler is None:
+            return {"stat": "Not_Ok", "emsg": f"Unknown endpoint {endpoint}"}
+        return handler(jdata, jkey)
+
+    def _session_ok(self, jkey):
+        with self.lock:
+            session = self.sessions.get(jkey)
+        if session is None:
+            return False
+        return self.session_ttl is None or time.monotonic() - session[1] < self.session_ttl
+
+    def expire_sessions(self):
+        """Invalidate every issued token, as the broker does at its session cut-off."""
+        with self.lock:
+            self.sessions.clear()
+
+    def _over_order_cap(self):
+        # Sliding one-second window, like the broker's per-second order cap
+        now = time.monotonic()
+        with self.lock:
+            self.order_times = [t for t in self.order_times if now - t < 1.0]
+            if len(self.order_times) >= self.order_rate_cap:
+                self.throttled += 1
+                return True
+            self.order_times.append(now)
+            return False
+
+    # === Endpoints ===
+    def ep_quickauth(self, jdata, jkey):
+        if not jdata.get("uid") or not jdata.get("pwd"):
+            return {"stat": "Not_Ok", "emsg": "Invalid Input : uid/pwd missing"}
+        token = secrets.token_hex(16)
+        with self.lock:
+            self.sessions[token] = (jdata["uid"], time.monotonic())
+        return {"stat": "Ok", "susertoken": token, "uid": jdata["uid"], "request_time": self._now()}
+
+    def ep_placeorder(self, jdata, jkey):
+        with self.lock:
+            self.next_ordno += 1
+            ordno = str(self.next_ordno)
+            order = dict(jdata)
+            order.update({"stat": "Ok", "norenordno": ordno, "status": "OPEN",
+                          "prc": jdata.get("prc", "0"), "norentm": self._now()})
+            self.orders[ordno] = order
+            if jdata.get("prctyp", "").upper() == "MKT":
+                order["status"] = "COMPLETE"
+                self.trades.append(dict(order, flqty=order.get("qty", "0"), flprc=order["prc"]))
+        return {"request_time": self._now(), "stat": "Ok", "norenordno": ordno}
+
+    def ep_modifyorder(self, jdata, jkey):
+        ordno = jdata.get("norenordno")
+        with self.lock:
+            order = self.orders.get(ordno)
+            if order is None or order["status"] != "OPEN":
+                return {"stat": "Not_Ok", "emsg": f"Order {ordno} not open"}
+            for k in ("qty", "prc", "prctyp", "trgprc"):
+                if k in jdata:
+                    order[k] = jdata[k]
+        return {"request_time": self._now(), "stat": "Ok", "result": ordno}
+
+    def ep_cancelorder(self, jdata, jkey):
+        ordno = jdata.get("norenordno")
+        with self.lock:
+            order = self.orders.get(ordno)
+            if order is None or order["status"] != "OPEN":
+                return {"stat": "Not_Ok", "emsg": f"Order {ordno} not open"}
+            order["status"] = "CANCELED"
+        return {"request_time": self._now(), "stat": "Ok", "result": ordno}
+
+    def ep_searchscrip(self, jdata, jkey):
+        text = jdata.get("stext", "").upper()
+        values = [{"exch": jdata.get("exch", "NSE"), "token": tok, "tsym": tsym}
+                  for tsym, tok in self.universe.items() if tsym.startswith(text)][:20]
+        return {"stat": "Ok", "values": values} if values else {"stat": "Not_Ok", "emsg": "no data"}
+
+    def ep_getquotes(self, jdata, jkey):
+        token = str(jdata.get("token"))
+        with self.lock:
+            if token not in self.prices:
+                return {"stat": "Not_Ok", "emsg": f"Invalid token {token}"}
+            lp = self.prices[token] = round(self.prices[token] * (1 + random.uniform(-0.001, 0.001)), 2)
+        return {"request_time": self._now(), "stat": "Ok", "exch": jdata.get("exch", "NSE"),
+                "token": token, "lp": f"{lp:.2f}", "lut": str(int(time.time()))}
+
+    def ep_tpseries(self, jdata, jkey):
+        token = str(jdata.get("token"))
+        if token not in self.prices:
+            return {"stat": "Not_Ok", "emsg": f"Invalid token {token}"}
+        step = 60 * int(jdata.get("intrv") or 1)
+        now = time.time()
+        st = int(float(jdata.get("st") or now - 86400))
+        et = min(int(float(jdata.get("et") or now)), int(now))
+        bars = []
+        # Bars are deterministic in (token, bar time) so repeated fetches agree
+        t = st - st % step
+        while t <= et:
+            ist = (t + 19800) % 86400
+            if 33300 <= ist < 55800 and datetime.fromtimestamp(t, timezone.utc).weekday() < 5:
+                rnd = random.Random(int(token) * 1_000_003 + t)
+                base = 100.0 + int(token) % 900
+                o = base * (1 + 0.02 * rnd.uniform(-1, 1))
+                c = o * (1 + 0.004 * rnd.uniform(-1, 1))
+                h = max(o, c) * (1 + 0.002 * rnd.random())
+                l = min(o, c) * (1 - 0.002 * rnd.random())
+                bars.append({"stat": "Ok", "time": datetime.fromtimestamp(t, IST).strftime("%d-%m-%Y %H:%M:%S"),
+                             "ssboe": str(t), "into": f"{o:.2f}", "inth": f"{h:.2f}", "intl": f"{l:.2f}",
+                             "intc": f"{c:.2f}", "intv": str(rnd.randint(100, 10000))})
+            t += step
+        return bars[::-1] or {"stat": "Not_Ok", "emsg": "no data"}
+
+    def ep_orderbook(self, jdata, jkey):
+        with self.lock:
+            orders = [dict(o) for o in self.orders.values()]
+        return orders or {"stat": "Not_Ok", "emsg": "no data"}
+
+    def ep_tradebook(self, jdata, jkey):
+        with self.lock:
+            trades = [dict(t) for t in self.trades]
+        return trades or {"stat": "Not_Ok", "emsg": "no data"}
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def make_handler(standin):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with standin.lock:
+                standin.connections += 1
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length).decode()
+            endpoint = self.path.rstrip("/").rsplit("/", 1)[-1]
+            status = 200
+            try:
+                jdata, jkey = parse_body(body)
+                resp = standin.handle(endpoint, jdata, jkey)
+            except ValueError as e:
+                resp = {"stat": "Not_Ok", "emsg": f"Invalid Input : {e}"}
+            except InjectedHTTPError as e:
+                status, resp = e.status, {"error": "Bad Gateway"}
+            with standin.lock:
+                standin.requests += 1
+            out = json.dumps(resp).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(out)))
+            self.end_headers()
+            self.wfile.write(out)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+# === Self-signed certificate for TLS runs (needs `cryptography`) ===
+def make_self_signed_cert(host="127.0.0.1"):
+    """Writes a throwaway cert/key pair and returns (certfile, keyfile)."""
+    import ipaddress
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, host)])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(minutes=5))
+        .not_valid_after(now + timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address(host))]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    tmpdir = tempfile.mkdtemp(prefix="noren_standin_")
+    certfile = os.path.join(tmpdir, "cert.pem")
+    keyfile = os.path.join(tmpdir, "key.pem")
+    with open(certfile, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(keyfile, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    return certfile, keyfile
+
+
+# === Start the stand-in on a background thread ===
+def serve(host="127.0.0.1", port=0, tls=False, **options):
+    """Returns (server, standin, base_url); call server.shutdown() when done.
+
+    `options` go to NorenStandIn (latency, error_rate, session_ttl, ...).  With
+    tls=True the server speaks HTTPS and server.certfile is the CA bundle
+    clients should verify against.
+    """
+    standin = NorenStandIn(**options)
+    server = StandInServer((host, port), make_handler(standin))
+    server.certfile = None
+    if tls:
+        certfile, keyfile = make_self_signed_cert(host)
+        ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        ctx.load_cert_chain(certfile, keyfile)
+        server.socket = ctx.wrap_socket(server.socket, server_side=True)
+        server.certfile = certfile
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    scheme = "https" if tls else "http"
+    base_url = f"{scheme}://{host}:{server.server_address[1]}/NorenWClientTP"
+    return server, standin, base_url
+
+
+# === Fake NorenWS market-data server (RFC 6455 text frames, stdlib only) ===
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class _WSConn:
+    def __init__(self, sock):
+        self.sock = sock
+        self.keys = set()
+        self.send_lock = threading.Lock()
+
+    def recv_exact(self, n):
+        buf = b""
+        while len(buf) < n:
+            chunk = self.sock.recv(n - len(buf))
+            if not chunk:
+                raise ConnectionError("closed")
+            buf += chunk
+        return buf
+
+    def recv_frame(self):
+        b1, b2 = self.recv_exact(2)
+        opcode, length = b1 & 0x0F, b2 & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", self.recv_exact(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", self.recv_exact(8))[0]
+        mask = self.recv_exact(4) if b2 & 0x80 else None
+        data = self.recv_exact(length)
+        if mask:
+            data = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+        return opcode, data
+
+    def send_frame(self, data, opcode=0x1):
+        header = bytes([0x80 | opcode])
+        if len(data) < 126:
+            header += bytes([len(data)])
+        elif len(data) < 65536:
+            header += bytes([126]) + struct.pack("!H", len(data))
+        else:
+            header += bytes([127]) + struct.pack("!Q", len(data))
+        with self.send_lock:
+            self.sock.sendall(header + data)
+
+    def send_json(self, msg):
+        self.send_frame(json.dumps(msg).encode())
+
+
+class FakeNorenWS:
+    """Speaks enough NorenWS for MarketFeed: c/ck login, t/tk + d/dk subscribe,
+    u/ud unsubscribe, and tf/df pushes via push_tick().  drop_all() cuts every
+    connection to exercise reconnect + resubscribe."""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.sock = socket.socket()
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen(64)
+        self.url = f"ws://{host}:{self.sock.getsockname()[1]}/NorenWSTP/"
+        self.conns = []
+        self.lock = threading.Lock()
+        self.logins = 0
+        self.running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                sock, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+    def _handshake(self, sock):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = sock.recv(4096)
+            if not chunk:
+                raise ConnectionError("closed during handshake")
+            request += chunk
+        headers = {}
+        for line in request.decode().split("\r\n")[1:]:
+            if ":" in line:
+                k, v = line.split(":", 1)
+                headers[k.strip().lower()] = v.strip()
+        accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + _WS_GUID).encode()).digest())
+        sock.sendall(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                     b"Connection: Upgrade\r\nSec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+
+    def _serve(self, sock):
+        conn = _WSConn(sock)
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._handshake(sock)
+            with self.lock:
+                self.conns.append(conn)
+            while self.running:
+                opcode, data = conn.recv_frame()
+                if opcode == 0x8:
+                    conn.send_frame(b"", opcode=0x8)
+                    break
+                if opcode == 0x9:
+                    conn.send_frame(data, opcode=0xA)
+                    continue
+                if opcode == 0x1:
+                    self._on_message(conn, json.loads(data))
+        except (ConnectionError, OSError, ValueError, KeyError):
+            pass
+        finally:
+            with self.lock:
+                if conn in self.conns:
+                    self.conns.remove(conn)
+            sock.close()
+
+    def _on_message(self, conn, msg):
+        kind = msg.get("t")
+        if kind == "c":
+            with self.lock:
+                self.logins += 1
+            ok = bool(msg.get("susertoken"))
+            conn.send_json({"t": "ck", "s": "OK" if ok else "NOT_OK", "uid": msg.get("uid")})
+        elif kind in ("t", "d"):
+            keys = [k for k in msg.get("k", "").split("#") if k]
+            conn.keys.update(keys)
+            for key in keys:
+                exch, token = key.split("|", 1)
+                conn.send_json({"t": kind + "k", "e": exch, "tk": token, "ft": str(int(time.time()))})
+        elif kind in ("u", "ud"):
+            conn.keys.difference_update(msg.get("k", "").split("#"))
+
+    def push_tick(self, exch, token, depth=False, **fields):
+        """Send a tf (or df) update to every connection subscribed to exch|token."""
+        key = f"{exch}|{token}"
+        msg = dict(fields, t="df" if depth else "tf", e=exch, tk=str(token))
+        msg.setdefault("ft", str(int(time.time())))
+        payload = json.dumps(msg).encode()
+        with self.lock:
+            targets = [c for c in self.conns if key in c.keys]
+        for conn in targets:
+            try:
+                conn.send_frame(payload)
+            except OSError:
+                pass
+        return len(targets)
+
+    def subscribers(self, exch, token):
+        key = f"{exch}|{token}"
+        with self.lock:
+            return sum(1 for c in self.conns if key in c.keys)
+
+    def drop_all(self):
+        with self.lock:
+            conns, self.conns = self.conns, []
+        for conn in conns:
+            try:
+                conn.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.sock.close()
+
+    def close(self):
+        self.running = False
+        self.drop_all()
+        self.sock.close()
+
+
+# === Run the stand-in in its own process (keeps it off the benchmark's GIL) ===
+def universe(symbols=500):
+    """The synthetic tsym -> token map a stand-in with `symbols` instruments serves."""
+    return NorenStandIn(symbols=symbols).universe
+
+
+def serve_process(port=0, **options):
+    """Returns (process, base_url); call process.terminate() when done.
+
+    `options` are NorenStandIn keyword arguments, passed as CLI flags.
+    """
+    if not port:
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+    cmd = [sys.executable, os.path.abspath(__file__), "--port", str(port)]
+    for key, value in options.items():
+        if value is not None:
+            cmd += [f"--{key.replace('_', '-')}", str(value)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            break
+        except OSError:
+            if proc.poll() is not None or time.monotonic() > deadline:
+                proc.kill()
+                raise RuntimeError("stand-in process failed to start")
+            time.sleep(0.05)
+    return proc, f"http://127.0.0.1:{port}/NorenWClientTP"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local Noren REST stand-in")
+    parser.add_argument("--port", type=int, default=8686)
+    parser.add_argument("--tls", action="store_true", help="serve HTTPS with a self-signed cert")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra uniform random latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction answered with Not_Ok")
+    parser.add_argument("--http-error-rate", type=float, default=0.0, help="fraction answered with HTTP 502")
+    parser.add_argument("--session-ttl", type=float, default=None, help="seconds a session token stays valid")
+    parser.add_argument("--order-rate-cap", type=int, default=None, help="orders/second before throttling")
+    parser.add_argument("--symbols", type=int, default=500, help="size of the synthetic universe")
+    parser.add_argument("--seed", type=int, default=None, help="seed for latency/error injection")
+    args = parser.parse_args()
+    options = {k: v for k, v in vars(args).items() if k not in ("port", "tls")}
+    server, _, url = serve(port=args.port, tls=args.tls, **options)
+    print(f"🧪 Stand-in listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
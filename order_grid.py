@@ -0,0 +1,115 @@
+# order_grid.py
+# Order book as one dataframe grid: status / symbol filters, pagination, and a
+# single modify / cancel panel for the selected row.
+#
+# Filtering runs on OrderStore's indexes and only the visible page is turned
+# into a DataFrame, so a page costs the same at 10 or 10,000 orders; the grid
+# itself scrolls virtually in the browser.
+
+import math
+
+import streamlit as st
+
+GRID_COLUMNS = ("norenordno", "tsym", "trantype", "qty", "prc", "prctyp", "status", "fillshares", "avgprc",
+                "norentm", "remarks", "rejreason")
+PAGE_SIZES = (50, 200, 1000)
+ALL = "All"
+
+
+def _newest_first(ordno):
+    return len(ordno), ordno
+
+
+def order_ids(orders, store=None, statuses=(), symbol=None):
+    """Order numbers passing the filters, newest first; uses the store's indexes when given."""
+    symbol = None if symbol in (None, ALL) else symbol
+    if store is not None:
+        if statuses:
+            ids = set().union(*(store.ids(symbol=symbol, status=s) for s in statuses))
+        else:
+            ids = store.ids(symbol=symbol)
+        ids &= orders.keys()
+    else:
+        wanted = {s.upper() for s in statuses}
+        ids = [k for k, o in orders.items() if (not wanted or str(o.get("status", "")).upper() in wanted)
+               and (symbol is None or o.get("tsym") == symbol)]
+    return sorted(ids, key=_newest_first, reverse=True)
+
+
+def order_frame(orders, ids, added=(), changed=()):
+    """DataFrame of just these orders, with a badge column for new / changed rows."""
+    import pandas as pd
+
+    df = pd.DataFrame.from_records([orders[i] for i in ids], columns=GRID_COLUMNS)
+    df.insert(0, "", ["🆕" if i in added else "✏️" if i in changed else "" for i in ids])
+    return df
+
+
+def order_grid(snap, store, api, on_change=None, key="orders"):
+    """Filters, one page of the grid and the selected order's panel; call inside a fragment."""
+    c1, c2, c3 = st.columns([3, 2, 1])
+    statuses = c1.multiselect("Status", sorted(store.counts_by_status()), key=f"{key}_status")
+    symbol = c2.selectbox("Symbol", [ALL] + store.symbols(), key=f"{key}_symbol")
+    size = c3.selectbox("Rows / page", PAGE_SIZES, key=f"{key}_size")
+
+    ids = order_ids(snap.orders, store, statuses, symbol)
+    pages = max(1, math.ceil(len(ids) / size))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key=page_key)
+    view = ids[(page - 1) * size:page * size]
+    st.caption(f"Showing {len(view)} of {len(ids)} matching · {len(snap.orders)} total")
+
+    event = st.dataframe(order_frame(snap.orders, view, snap.added, snap.changed), hide_index=True,
+                         use_container_width=True, on_select="rerun", selection_mode="single-row",
+                         key=f"{key}_grid")
+    rows = event.selection.rows if event is not None else []
+    selected_key = f"{key}_selected"
+    if rows and rows[0] < len(view):
+        st.session_state[selected_key] = view[rows[0]]
+
+    selected = st.session_state.get(selected_key)
+    if selected in snap.orders:
+        order_panel(snap.orders[selected], store, api, on_change, key)
+
+
+def order_panel(order, store, api, on_change=None, key="orders"):
+    """Modify / cancel for one order, shared by every row of the grid."""
+    ordno = order["norenordno"]
+    head, close = st.columns([6, 1])
+    head.markdown(f"#### 🔎 {ordno} · {order.get('tsym', '')} · **{order.get('status', '')}**")
+    if close.button("✖ Close", key=f"{key}_close"):
+        st.session_state.pop(f"{key}_selected", None)
+        st.rerun()
+    with st.expander("📋 Raw order"):
+        st.json(order)
+
+    if not store.is_open(ordno):
+        return
+    with st.form(f"{key}_modify_form"):
+        c1, c2, c3 = st.columns(3)
+        mod_qty = c1.number_input("New Quantity", value=int(order["qty"]), step=1, key=f"{key}_qty_{ordno}")
+        mod_price_type = c2.selectbox("Price Type", ["LMT", "MKT"], index=0 if order.get("prctyp") == "LMT" else 1,
+                                      key=f"{key}_ptype_{ordno}")
+        mod_price = c3.number_input("New Price", value=float(order.get("prc", 0)), step=0.05,
+                                    key=f"{key}_prc_{ordno}")
+        submit_mod = st.form_submit_button("🔁 Submit Modification")
+    if submit_mod:
+        resp = api.modify_order(norenordno=ordno, exch=order["exch"], tsym=order["tsym"], qty=mod_qty,
+                                prctyp=mod_price_type, prc=mod_price if mod_price_type == "LMT" else "0")
+        if resp.get("stat") == "Ok":
+            st.success(f"✅ Order Modified: {resp.get('result', 'Success')}")
+            if on_change:
+                on_change()
+        else:
+            st.error(f"❌ Modify Failed: {resp.get('emsg', 'Unknown error')}")
+
+    if st.button(f"❌ Cancel Order {ordno}", key=f"{key}_cancel"):
+        resp = api.cancel_order(norenordno=ordno, uid=getattr(api, "userid", None))
+        if resp.get("stat") == "Ok":
+            st.success(f"✅ Order Cancelled: {resp.get('result')}")
+            if on_change:
+                on_change()
+        else:
+            st.error(f"❌ Cancel Failed: {resp.get('emsg', 'Unknown error')}")
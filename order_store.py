@@ -0,0 +1,201 @@
+# order_store.py
+
+import threading
+from collections import defaultdict
+
+OPEN_STATUSES = frozenset({"OPEN", "PENDING", "TRIGGER_PENDING"})
+
+
+def fill_key(fill):
+    """Identity of one trade_book() fill: (norenordno, flid), or its time / qty / price without a flid."""
+    return fill["norenordno"], fill.get("flid") or (fill.get("fltm"), fill.get("flqty"), fill.get("flprc"))
+
+
+class OrderStore:
+    """In-memory order and trade state with secondary indexes.
+
+    Orders are keyed by norenordno and indexed by status, symbol, remarks tag
+    and (symbol, status), so questions like "open orders for SBIN-EQ" are a
+    dict lookup.  Updates are applied incrementally: an order whose fields
+    didn't change costs one dict comparison, and a changed one moves between
+    index buckets without touching any other order.
+    """
+
+    def __init__(self):
+        self.orders = {}
+        self.by_status = defaultdict(set)
+        self.by_symbol = defaultdict(set)
+        self.by_tag = defaultdict(set)
+        self.by_symbol_status = defaultdict(set)
+        self.trades = {}  # (norenordno, flid) -> fill
+        self.trades_by_order = defaultdict(list)
+        self.trades_by_symbol = defaultdict(list)
+        self.lock = threading.RLock()
+        self.version = 0
+
+    # === Index maintenance ===
+    @staticmethod
+    def _keys(order):
+        status = str(order.get("status", "")).upper()
+        tsym = order.get("tsym", "")
+        return status, tsym, order.get("remarks") or ""
+
+    def _unindex(self, ordno, order):
+        status, tsym, tag = self._keys(order)
+        for index, key in ((self.by_status, status), (self.by_symbol, tsym), (self.by_tag, tag),
+                           (self.by_symbol_status, (tsym, status))):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.discard(ordno)
+                if not bucket:
+                    del index[key]
+
+    def _index(self, ordno, order):
+        status, tsym, tag = self._keys(order)
+        self.by_status[status].add(ordno)
+        self.by_symbol[tsym].add(ordno)
+        if tag:
+            self.by_tag[tag].add(ordno)
+        self.by_symbol_status[(tsym, status)].add(ordno)
+
+    # === Writes ===
+    def apply(self, order):
+        """Insert or merge one order (full order-book row or partial update push).
+        Returns True if anything changed."""
+        ordno = order.get("norenordno")
+        if not ordno:
+            return False
+        with self.lock:
+            old = self.orders.get(ordno)
+            if old is None:
+                merged = dict(order)
+            else:
+                if all(old.get(k) == v for k, v in order.items()):
+                    return False
+                merged = dict(old)
+                merged.update(order)
+                self._unindex(ordno, old)
+            self.orders[ordno] = merged
+            self._index(ordno, merged)
+            self.version += 1
+            return True
+
+    def apply_order_book(self, orders, full=False):
+        """Fold an order_book() list (or {"orders": [...]} response) in; returns the number changed.
+
+        With full=True the list is the broker's whole book, so orders missing from it are dropped.
+        """
+        if isinstance(orders, dict):
+            orders = orders.get("orders") or orders.get("data") or []
+        changed = 0
+        with self.lock:
+            for order in orders:
+                changed += self.apply(order)
+            if full:
+                present = {o.get("norenordno") for o in orders}
+                for ordno in [o for o in self.orders if o not in present]:
+                    changed += self.remove(ordno)
+        return changed
+
+    def remove(self, norenordno):
+        """Drop one order and its index entries (its fills stay); returns True if it was there."""
+        with self.lock:
+            order = self.orders.pop(norenordno, None)
+            if order is None:
+                return False
+            self._unindex(norenordno, order)
+            self.version += 1
+            return True
+
+    def apply_update(self, msg):
+        """Order-update push from NorenWS ("om" message) or any partial order dict."""
+        update = {k: v for k, v in msg.items() if k not in ("t", "stat")}
+        return self.apply(update)
+
+    def apply_trade_book(self, trades):
+        """Fold trade_book() fills in, de-duplicated by (norenordno, flid); returns the new fills."""
+        if isinstance(trades, dict):
+            trades = trades.get("trades") or trades.get("data") or []
+        if not isinstance(trades, list):
+            return []
+        new = []
+        with self.lock:
+            for fill in trades:
+                if not isinstance(fill, dict) or not fill.get("norenordno"):
+                    continue
+                key = fill_key(fill)
+                if key in self.trades:
+                    continue
+                self.trades[key] = fill
+                self.trades_by_order[fill["norenordno"]].append(fill)
+                self.trades_by_symbol[fill.get("tsym", "")].append(fill)
+                new.append(fill)
+            if new:
+                self.version += 1
+        return new
+
+    def clear(self):
+        with self.lock:
+            for index in (self.orders, self.by_status, self.by_symbol, self.by_tag, self.by_symbol_status,
+                          self.trades, self.trades_by_order, self.trades_by_symbol):
+                index.clear()
+            self.version += 1
+
+    # === Reads (no network) ===
+    def get(self, norenordno):
+        return self.orders.get(norenordno)
+
+    def ids(self, symbol=None, status=None, tag=None):
+        """Set of order numbers matching every given filter (a copy, safe to keep)."""
+        with self.lock:
+            if symbol is not None and status is not None:
+                sets = [self.by_symbol_status.get((symbol, status.upper()), set())]
+            else:
+                sets = []
+                if symbol is not None:
+                    sets.append(self.by_symbol.get(symbol, set()))
+                if status is not None:
+                    sets.append(self.by_status.get(status.upper(), set()))
+            if tag is not None:
+                sets.append(self.by_tag.get(tag, set()))
+            if not sets:
+                return set(self.orders)
+            sets.sort(key=len)
+            return set(sets[0]).intersection(*sets[1:])
+
+    def find(self, symbol=None, status=None, tag=None):
+        with self.lock:
+            return [self.orders[o] for o in self.ids(symbol, status, tag)]
+
+    def open_ids(self, symbol=None):
+        with self.lock:
+            if symbol is None:
+                return set().union(*(self.by_status.get(s, set()) for s in OPEN_STATUSES))
+            return set().union(*(self.by_symbol_status.get((symbol, s), set()) for s in OPEN_STATUSES))
+
+    def open_orders(self, symbol=None):
+        with self.lock:
+            return [self.orders[o] for o in self.open_ids(symbol)]
+
+    def is_open(self, norenordno):
+        order = self.orders.get(norenordno)
+        return order is not None and str(order.get("status", "")).upper() in OPEN_STATUSES
+
+    def fills(self, norenordno=None, symbol=None):
+        with self.lock:
+            if norenordno is not None:
+                return list(self.trades_by_order.get(norenordno, ()))
+            if symbol is not None:
+                return list(self.trades_by_symbol.get(symbol, ()))
+            return list(self.trades.values())
+
+    def symbols(self):
+        with self.lock:
+            return sorted(self.by_symbol)
+
+    def counts_by_status(self):
+        with self.lock:
+            return {status: len(ids) for status, ids in self.by_status.items()}
+
+    def __len__(self):
+        return len(self.orders)
@@ -0,0 +1,114 @@
+# orderbook_service.py
+
+import threading
+import time
+from collections import namedtuple
+
+from prostocks_logging import get_logger
+
+log = get_logger("orderbook")
+
+# Fields that decide whether an order row changed between two refreshes
+ORDER_FIELDS = ("status", "qty", "prc", "trgprc", "prctyp", "fillshares", "avgprc", "rejreason", "norentm")
+
+OrderBookSnapshot = namedtuple(
+    "OrderBookSnapshot",
+    ("version", "fetched_at", "orders", "added", "removed", "changed", "error"),
+)
+OrderBookSnapshot.__doc__ = ("Immutable order book at one refresh: orders maps norenordno -> order dict; "
+                             "added/removed/changed are sets of norenordno vs the previous snapshot.")
+
+EMPTY_SNAPSHOT = OrderBookSnapshot(0, None, {}, frozenset(), frozenset(), frozenset(), None)
+
+
+def _fingerprint(order):
+    return tuple(order.get(f) for f in ORDER_FIELDS)
+
+
+def diff_orders(old, new):
+    """(added, removed, changed) norenordno sets between two {norenordno: order} maps."""
+    added = new.keys() - old.keys()
+    removed = old.keys() - new.keys()
+    changed = {k for k in new.keys() & old.keys() if _fingerprint(new[k]) != _fingerprint(old[k])}
+    return frozenset(added), frozenset(removed), frozenset(changed)
+
+
+class OrderBookService:
+    """Keeps the latest order book in memory, refreshed on a background thread.
+
+    Readers call snapshot() and never touch the network.  refresh_now() wakes
+    the thread early, e.g. right after our own place/modify/cancel.
+    """
+
+    def __init__(self, api, interval=5.0):
+        self.api = api
+        self.interval = interval
+        self._snapshot = EMPTY_SNAPSHOT
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.running = False
+        self.thread = None
+        self.refreshes = 0
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.thread = threading.Thread(target=self._run, name="orderbook-service", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+
+    def snapshot(self):
+        return self._snapshot
+
+    def refresh_now(self):
+        self._wake.set()
+
+    def on_refresh(self, callback):
+        """Register callback(snapshot, raw_orders) run after each successful refresh, before the snapshot is
+        published, so whoever sees the new snapshot also sees what the callbacks did with it."""
+        self._listeners.append(callback)
+
+    def _run(self):
+        while self.running:
+            self.refresh()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def refresh(self):
+        """Fetch the order book once and publish a new snapshot; returns it."""
+        try:
+            resp = self.api.order_book()
+        except Exception as e:
+            resp = {"stat": "Not_Ok", "emsg": str(e)}
+
+        with self._lock:
+            prev = self._snapshot
+            if isinstance(resp, dict) and resp.get("stat") == "Ok":
+                orders = resp.get("orders") or resp.get("data") or []
+            elif isinstance(resp, dict) and "no data" in str(resp.get("emsg", "")).lower():
+                orders = []
+            else:
+                emsg = resp.get("emsg") if isinstance(resp, dict) else str(resp)
+                log.warning("⚠️ Order book refresh failed: %s", emsg)
+                self._snapshot = prev._replace(error=emsg)
+                return self._snapshot
+
+            by_no = {o["norenordno"]: o for o in orders if "norenordno" in o}
+            added, removed, changed = diff_orders(prev.orders, by_no)
+            version = prev.version + 1 if (added or removed or changed or prev.fetched_at is None) else prev.version
+            snapshot = OrderBookSnapshot(version, time.time(), by_no, added, removed, changed, None)
+            for callback in self._listeners:
+                try:
+                    callback(snapshot, orders)
+                except Exception as e:
+                    log.error("❌ Order book listener failed: %s", e)
+            self._snapshot = snapshot
+            self.refreshes += 1
+        return snapshot
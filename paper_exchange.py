@@ -0,0 +1,376 @@
+# paper_exchange.py
+# Simulated exchange behind the ProStocksAPI order surface, for running
+# strategies at full speed without UAT.
+#
+# Each symbol keeps a limit order book of our own resting orders: bids in a
+# max-heap, asks in a min-heap, price-time priority.  Cancels and re-prices use
+# lazy deletion - the order's version is bumped and its stale heap entry is
+# dropped when it reaches the top - so place / modify / cancel are O(log n)
+# and a book is compacted once stale entries outnumber live ones.
+#
+# Incoming orders first cross the opposite side of the book, then the market
+# quote from the tick stream (on_tick / attach_feed / replay).  Resting LMT
+# orders fill at their limit when a later tick trades through them, up to the
+# quoted size when the tick carries one.  An order never trades against a
+# resting order of the same account: like the exchange's self-trade
+# prevention, the incoming (newest) order's remainder is cancelled instead.
+
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from prostocks_logging import get_logger
+
+log = get_logger("paper")
+
+IST = timezone(timedelta(hours=5, minutes=30))  # candle_store.IST, without pulling in NumPy
+OPEN, COMPLETE, CANCELED, REJECTED = "OPEN", "COMPLETE", "CANCELED", "REJECTED"
+PRICE_TYPES = ("MKT", "LMT")
+
+
+_stamp = [None, ""]
+
+
+def _now():
+    # Noren-style timestamp, formatted once per second rather than per order and fill
+    sec = int(time.time())
+    if sec != _stamp[0]:
+        _stamp[0], _stamp[1] = sec, datetime.fromtimestamp(sec, IST).strftime("%H:%M:%S %d-%m-%Y")
+    return _stamp[1]
+
+
+class PaperOrder:
+    __slots__ = ("ordno", "uid", "exch", "tsym", "side", "qty", "filled", "value", "prc", "prctyp", "prd", "ret",
+                 "remarks", "status", "version", "norentm", "rejreason")
+
+    def __init__(self, ordno, uid, exch, tsym, side, qty, prc, prctyp, prd, ret, remarks):
+        self.ordno, self.uid, self.exch, self.tsym, self.side = ordno, uid, exch, tsym, side
+        self.qty, self.filled, self.value = qty, 0, 0.0
+        self.prc, self.prctyp, self.prd, self.ret, self.remarks = prc, prctyp, prd, ret, remarks
+        self.status, self.version, self.norentm, self.rejreason = OPEN, 0, _now(), ""
+
+    @property
+    def remaining(self):
+        return self.qty - self.filled
+
+    def row(self):
+        """The order as order_book() returns it (Noren field names, string values)."""
+        row = {"stat": "Ok", "norenordno": self.ordno, "uid": self.uid, "exch": self.exch, "tsym": self.tsym,
+               "trantype": "B" if self.side > 0 else "S", "qty": str(self.qty), "prc": f"{self.prc:.2f}",
+               "prctyp": self.prctyp, "prd": self.prd, "ret": self.ret, "remarks": self.remarks,
+               "status": self.status, "fillshares": str(self.filled), "norentm": self.norentm}
+        if self.filled:
+            row["avgprc"] = f"{self.value / self.filled:.2f}"
+        if self.rejreason:
+            row["rejreason"] = self.rejreason
+        return row
+
+
+class Book:
+    """One symbol: resting orders by side plus the latest market quote."""
+
+    def __init__(self):
+        self.bids = []  # (-price, seq, version, order)
+        self.asks = []  # (price, seq, version, order)
+        self.stale = 0
+        self.lp = self.bp = self.sp = None
+        self.bq = self.sq = None  # quoted size left this tick; None = unlimited
+
+    def side(self, side):
+        return self.bids if side > 0 else self.asks
+
+    def push(self, order, seq):
+        heapq.heappush(self.side(order.side), (-order.prc if order.side > 0 else order.prc, seq, order.version,
+                                               order))
+
+    def top(self, side):
+        """Best live resting order on one side, dropping stale entries on the way."""
+        heap = self.side(side)
+        while heap:
+            _, _, version, order = heap[0]
+            if order.version == version and order.status == OPEN:
+                return order
+            heapq.heappop(heap)
+            if order.version != version:
+                self.stale -= 1
+        return None
+
+    def compact(self):
+        for name in ("bids", "asks"):
+            heap = [e for e in getattr(self, name) if e[3].version == e[2] and e[3].status == OPEN]
+            heapq.heapify(heap)
+            setattr(self, name, heap)
+        self.stale = 0
+
+
+class PaperExchange:
+    """
+    ProStocksAPI stand-in: place_order / modify_order / cancel_order /
+    order_book / trade_book (plus the batch forms) against local books.
+
+    Prices must be multiples of tick_size (None disables the check).  MKT orders
+    need a market price (a tick) or a resting order to cross; otherwise they
+    are REJECTED, as the exchange does with no liquidity.  Orders belong to
+    `userid` unless place_order gets another uid (several accounts on one book).
+    """
+
+    def __init__(self, userid="PAPER", tick_size=0.05):
+        self.userid = userid
+        self.tick_size = tick_size
+        self.session_token = "paper"
+        self.books = {}
+        self.orders = {}
+        self.trades = []
+        self.lock = threading.RLock()
+        self.seq = itertools.count()
+        self.next_ordno = 26000000000000
+        self.next_flid = 0
+        self.order_callbacks = []
+        self.ticks = 0
+
+    # === ProStocksAPI session surface ===
+    def login(self):
+        return True, self.session_token
+
+    def close(self):
+        pass
+
+    def subscribe_orders(self, callback):
+        """callback(msg) with an "om"-style order update on every status or fill change."""
+        self.order_callbacks.append(callback)
+
+    # === Orders ===
+    def _book(self, tsym):
+        book = self.books.get(tsym)
+        if book is None:
+            book = self.books[tsym] = Book()
+        return book
+
+    def _bad_price(self, prc):
+        if prc <= 0:
+            return True
+        if self.tick_size:
+            ticks = prc / self.tick_size
+            return abs(ticks - round(ticks)) > 1e-6
+        return False
+
+    def place_order(self, buy_or_sell, product_type, exchange, tradingsymbol, quantity, discloseqty, price_type,
+                    price=None, trigger_price=None, retention='DAY', remarks='', uid=None):
+        prctyp = str(price_type).upper()
+        if prctyp not in PRICE_TYPES:
+            return {"stat": "Not_Ok", "emsg": f"Unsupported price type {price_type}"}
+        try:
+            qty = int(quantity)
+            prc = 0.0 if prctyp == "MKT" else float(price)
+        except (TypeError, ValueError):
+            return {"stat": "Not_Ok", "emsg": "Invalid Input : qty/prc"}
+        if qty <= 0:
+            return {"stat": "Not_Ok", "emsg": "Invalid Input : qty"}
+        if prctyp == "LMT" and self._bad_price(prc):
+            return {"stat": "Not_Ok", "emsg": f"Invalid Input : prc {price} not a multiple of {self.tick_size}"}
+
+        with self.lock:
+            self.next_ordno += 1
+            order = PaperOrder(str(self.next_ordno), uid or self.userid, exchange, tradingsymbol,
+                               1 if buy_or_sell == "B" else -1, qty, prc, prctyp, product_type, retention, remarks)
+            self.orders[order.ordno] = order
+            self._enter(order, self._book(tradingsymbol))
+        return {"request_time": _now(), "stat": "Ok", "norenordno": order.ordno}
+
+    def _enter(self, order, book):
+        """Cross the book and the quote; rest a LMT remainder, reject a MKT one."""
+        own = self._match(order, book)
+        if order.remaining > 0:
+            if own is not None:
+                order.status = CANCELED
+                order.rejreason = f"Self-trade prevented: would cross own order {own.ordno}"
+            elif order.prctyp == "LMT":
+                book.push(order, next(self.seq))
+            elif order.filled:
+                order.status = CANCELED
+                order.rejreason = "Unfilled MKT quantity cancelled"
+            else:
+                order.status = REJECTED
+                order.rejreason = f"No market price for {order.tsym}"
+        self._notify(order)
+
+    def _match(self, order, book):
+        """Fill what crosses; returns the account's own resting order that stopped it, if one did."""
+        side = order.side
+        while order.remaining > 0:
+            rest = book.top(-side)
+            quote = book.sp if side > 0 else book.bp
+            quote = quote if quote is not None else book.lp
+            left = book.sq if side > 0 else book.bq
+            if left is not None and left <= 0:
+                quote = None
+            # Best of our own opposite order and the market, within the limit
+            best = None
+            if rest is not None:
+                best = rest.prc
+            if quote is not None and (best is None or (quote < best if side > 0 else quote > best)):
+                best, rest = quote, None
+            if best is None or (order.prctyp == "LMT" and (best > order.prc if side > 0 else best < order.prc)):
+                return None
+            if rest is not None and rest.uid == order.uid:
+                return rest
+            if rest is not None:
+                qty = min(order.remaining, rest.remaining)
+                self._fill(rest, qty, best)
+                self._notify(rest)
+            else:
+                qty = order.remaining if left is None else min(order.remaining, left)
+                if left is not None:
+                    if side > 0:
+                        book.sq -= qty
+                    else:
+                        book.bq -= qty
+            self._fill(order, qty, best)
+        return None
+
+    def _fill(self, order, qty, prc):
+        order.filled += qty
+        order.value += qty * prc
+        if order.remaining == 0:
+            order.status = COMPLETE
+        self.next_flid += 1
+        self.trades.append({"stat": "Ok", "norenordno": order.ordno, "exch": order.exch, "tsym": order.tsym,
+                            "trantype": "B" if order.side > 0 else "S", "prd": order.prd, "qty": str(order.qty),
+                            "flqty": str(qty), "flprc": f"{prc:.2f}", "flid": str(self.next_flid),
+                            "fltm": _now(), "remarks": order.remarks})
+
+    def _notify(self, order):
+        if not self.order_callbacks:
+            return
+        msg = dict(order.row(), t="om")
+        for callback in self.order_callbacks:
+            try:
+                callback(msg)
+            except Exception as e:
+                log.error("❌ Order update callback failed: %s", e)
+
+    def modify_order(self, norenordno, exch, tsym, qty, prctyp, prc="0"):
+        """New total quantity and/or price. A pure size cut keeps time priority; anything else requeues."""
+        prctyp = str(prctyp).upper()
+        try:
+            qty = int(qty)
+            prc = 0.0 if prctyp == "MKT" else float(prc)
+        except (TypeError, ValueError):
+            return {"stat": "Not_Ok", "emsg": "Invalid Input : qty/prc"}
+        if prctyp not in PRICE_TYPES or (prctyp == "LMT" and self._bad_price(prc)):
+            return {"stat": "Not_Ok", "emsg": f"Invalid Input : prctyp/prc {prctyp} {prc}"}
+        with self.lock:
+            order = self.orders.get(str(norenordno))
+            if order is None or order.status != OPEN:
+                return {"stat": "Not_Ok", "emsg": f"Order {norenordno} not open"}
+            if qty <= order.filled:
+                return {"stat": "Not_Ok", "emsg": f"Invalid Input : qty {qty} <= filled {order.filled}"}
+            book = self._book(order.tsym)
+            keeps_priority = prctyp == order.prctyp and prc == order.prc and qty <= order.qty
+            order.qty = qty
+            if not keeps_priority:
+                order.version += 1
+                book.stale += 1
+                order.prc, order.prctyp = prc, prctyp
+                self._enter(order, book)
+                self._maybe_compact(book)
+            else:
+                self._notify(order)
+        return {"request_time": _now(), "stat": "Ok", "result": order.ordno}
+
+    def cancel_order(self, norenordno, uid=None, ext_remarks=None):
+        with self.lock:
+            order = self.orders.get(str(norenordno))
+            if order is None or order.status != OPEN:
+                return {"stat": "Not_Ok", "emsg": f"Order {norenordno} not open"}
+            order.status = CANCELED
+            order.version += 1
+            book = self._book(order.tsym)
+            book.stale += 1
+            self._maybe_compact(book)
+            self._notify(order)
+        return {"request_time": _now(), "stat": "Ok", "result": order.ordno}
+
+    @staticmethod
+    def _maybe_compact(book):
+        if book.stale > 1024 and book.stale > len(book.bids) + len(book.asks) - book.stale:
+            book.compact()
+
+    def place_orders(self, orders, max_workers=8, max_throttle_retries=3):
+        return [self.place_order(**spec) for spec in orders]
+
+    def modify_orders(self, modifications, max_workers=8, max_throttle_retries=3):
+        return [self.modify_order(**spec) for spec in modifications]
+
+    def cancel_orders(self, norenordnos, max_workers=8, max_throttle_retries=3):
+        return [self.cancel_order(**(o if isinstance(o, dict) else {"norenordno": o})) for o in norenordnos]
+
+    def order_book(self):
+        with self.lock:
+            rows = [o.row() for o in self.orders.values()]
+        return {"stat": "Ok", "orders": rows} if rows else {"stat": "Not_Ok", "emsg": "no data"}
+
+    def trade_book(self):
+        with self.lock:
+            trades = list(self.trades)
+        return trades or {"stat": "Not_Ok", "emsg": "no data"}
+
+    def get_quotes(self, exchange, token):
+        """Last quote for a symbol (books are keyed by trading symbol)."""
+        book = self.books.get(str(token))
+        if book is None or book.lp is None:
+            return {"stat": "Not_Ok", "emsg": f"Invalid token {token}"}
+        return {"stat": "Ok", "exch": exchange, "tsym": str(token), "lp": f"{book.lp:.2f}",
+                "lut": str(int(time.time()))}
+
+    # === Market data ===
+    def on_tick(self, tsym, lp=None, bp=None, sp=None, bq=None, sq=None):
+        """New quote for tsym; resting orders it trades through fill at their limit."""
+        with self.lock:
+            self.ticks += 1
+            book = self._book(tsym)
+            book.lp, book.bp, book.sp = lp, bp, sp
+            book.bq, book.sq = bq, sq
+            ask = sp if sp is not None else lp
+            bid = bp if bp is not None else lp
+            self._sweep(book, 1, ask, "sq")
+            self._sweep(book, -1, bid, "bq")
+
+    def _sweep(self, book, side, market, size_attr):
+        if market is None:
+            return
+        while True:
+            left = getattr(book, size_attr)
+            if left is not None and left <= 0:
+                return
+            order = book.top(side)
+            if order is None or (order.prc < market if side > 0 else order.prc > market):
+                return
+            qty = order.remaining if left is None else min(order.remaining, left)
+            if left is not None:
+                setattr(book, size_attr, left - qty)
+            self._fill(order, qty, order.prc)
+            self._notify(order)
+
+    def replay(self, ticks):
+        """Feed an iterable of tick dicts (tsym, lp and optionally bp, sp, bq, sq)."""
+        for tick in ticks:
+            self.on_tick(tick["tsym"], tick.get("lp"), tick.get("bp"), tick.get("sp"), tick.get("bq"),
+                         tick.get("sq"))
+
+    def attach_feed(self, feed, tokens, exchange="NSE"):
+        """Drive the books from a MarketFeed; tokens maps trading symbol -> token."""
+        by_key = {f"{exchange}|{token}": tsym for tsym, token in tokens.items()}
+
+        def on_tick(key, row):
+            tsym = by_key.get(key)
+            if tsym is None or row is None:
+                return
+            vals = [row.get(f) for f in ("lp", "bp1", "sp1", "bq1", "sq1")]
+            self.on_tick(tsym, *(None if v is None or v != v else v for v in vals))
+
+        feed.on_tick(on_tick)
+        feed.subscribe(list(tokens.values()), exchange=exchange)
+        return on_tick
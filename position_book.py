@@ -0,0 +1,208 @@
+# position_book.py
+# Net positions and P&L per symbol, folded incrementally from fills.
+#
+# Each symbol owns a slot in preallocated NumPy arrays (net qty, average price,
+# realized P&L, day buy / sell totals, LTP).  A fill is an O(1) update of one
+# slot; trade_book() rows are de-duplicated the way OrderStore does it, so
+# re-reading the whole trade book only folds the fills not seen yet.  Marking
+# to market is one vectorized pass over all slots - qty * (ltp - avg) - done
+# lazily after prices or fills change, so a burst of ticks costs one pass.
+#
+#   book = PositionBook()
+#   book.apply_trade_book(api.trade_book())
+#   book.on_price("SBIN-EQ", 812.4)
+#   book.totals()   # {"realized": ..., "unrealized": ..., "gross": ..., "net": ..., "open": ...}
+
+import threading
+
+import numpy as np
+
+from order_store import fill_key
+
+
+class PositionBook:
+    """Slots are never reused, so indexes stay valid for arrays built against `symbols`."""
+
+    def __init__(self, capacity=256):
+        self.slots = {}
+        self.symbols = []
+        self.qty = np.zeros(capacity, dtype=np.int64)
+        self.avg = np.zeros(capacity)
+        self.realized = np.zeros(capacity)
+        self.ltp = np.full(capacity, np.nan)
+        self.buy_qty = np.zeros(capacity, dtype=np.int64)
+        self.sell_qty = np.zeros(capacity, dtype=np.int64)
+        self.buy_value = np.zeros(capacity)
+        self.sell_value = np.zeros(capacity)
+        self.unrealized = np.zeros(capacity)
+        self._diff = np.zeros(capacity)
+        self.realized_total = 0.0
+        self.unrealized_total = 0.0
+        self.seen = set()
+        self.fills = 0
+        self.dirty = False
+        self.lock = threading.RLock()
+
+    _ARRAYS = ("qty", "avg", "realized", "ltp", "buy_qty", "sell_qty", "buy_value", "sell_value", "unrealized",
+               "_diff")
+
+    def slot(self, tsym):
+        i = self.slots.get(tsym)
+        if i is None:
+            with self.lock:
+                i = self.slots.get(tsym)
+                if i is None:
+                    i = len(self.symbols)
+                    if i == len(self.qty):
+                        self._grow()
+                    self.slots[tsym] = i
+                    self.symbols.append(tsym)
+        return i
+
+    def _grow(self):
+        n = len(self.qty)
+        for name in self._ARRAYS:
+            old = getattr(self, name)
+            new = np.full(n * 2, np.nan) if name == "ltp" else np.zeros(n * 2, dtype=old.dtype)
+            new[:n] = old
+            setattr(self, name, new)
+
+    # === Fills ===
+    def fill(self, tsym, qty, price):
+        """Fold one fill (qty signed: + bought, - sold); returns the symbol's (net qty, avg price)."""
+        with self.lock:
+            i = self.slot(tsym)
+            pos, avg = int(self.qty[i]), float(self.avg[i])
+            new = pos + qty
+            if pos == 0 or (pos > 0) == (qty > 0):
+                avg = (avg * abs(pos) + price * abs(qty)) / abs(new)
+            else:
+                pnl = min(abs(qty), abs(pos)) * (price - avg) * (1 if pos > 0 else -1)
+                self.realized[i] += pnl
+                self.realized_total += pnl
+                if new == 0:
+                    avg = 0.0
+                elif (new > 0) != (pos > 0):
+                    avg = price
+            self.qty[i], self.avg[i] = new, avg
+            if qty > 0:
+                self.buy_qty[i] += qty
+                self.buy_value[i] += qty * price
+            else:
+                self.sell_qty[i] -= qty
+                self.sell_value[i] -= qty * price
+            if self.ltp[i] != self.ltp[i]:
+                self.ltp[i] = price  # no tick yet: our own fill is the best mark we have
+            self.fills += 1
+            self.dirty = True
+            return new, avg
+
+    def apply_fills(self, fills):
+        """Fold trade_book()-style rows already known to be new (e.g. OrderStore.apply_trade_book's result)."""
+        with self.lock:
+            for f in fills:
+                qty = int(f.get("flqty") or 0)
+                if qty:
+                    self.fill(f.get("tsym", ""), qty if f.get("trantype") == "B" else -qty, float(f["flprc"]))
+                    self.seen.add(fill_key(f))
+
+    def apply_trade_book(self, trades):
+        """Fold a trade_book() response; only fills not seen before are applied. Returns how many were."""
+        if isinstance(trades, dict):
+            trades = trades.get("trades") or trades.get("data") or []
+        if not isinstance(trades, list):
+            return 0
+        with self.lock:
+            new = [f for f in trades if isinstance(f, dict) and f.get("norenordno") and fill_key(f) not in self.seen]
+            self.apply_fills(new)
+            return len(new)
+
+    # === Marks ===
+    def on_price(self, tsym, lp):
+        if lp is None or lp != lp:
+            return
+        with self.lock:
+            i = self.slot(tsym)
+            self.ltp[i] = lp
+            self.dirty = True
+
+    def mark(self, ltp):
+        """Replace the whole LTP vector (aligned with `symbols`; NaN keeps the previous mark, and so does
+        every slot past the end of a shorter vector)."""
+        with self.lock:
+            n = len(self.symbols)
+            ltp = np.asarray(ltp, dtype=np.float64).reshape(-1)[:n]
+            np.copyto(self.ltp[:len(ltp)], ltp, where=~np.isnan(ltp))
+            self.dirty = True
+
+    def attach_feed(self, feed, tokens, exchange="NSE"):
+        """Marks from a MarketFeed's ticks; tokens maps trading symbol -> token."""
+        by_key = {f"{exchange}|{token}": tsym for tsym, token in tokens.items()}
+
+        def on_tick(key, row):
+            tsym = by_key.get(key)
+            if tsym is not None and row is not None:
+                self.on_price(tsym, row.get("lp"))
+
+        feed.on_tick(on_tick)
+        return on_tick
+
+    def mtm(self):
+        """Unrealized P&L per slot: one vectorized qty * (ltp - avg) when anything changed since the last call."""
+        with self.lock:
+            n = len(self.symbols)
+            if self.dirty:
+                np.subtract(self.ltp[:n], self.avg[:n], out=self._diff[:n])
+                np.multiply(self.qty[:n], self._diff[:n], out=self.unrealized[:n])
+                self.unrealized_total = float(self.unrealized[:n].sum())
+                self.dirty = False
+            return self.unrealized[:n]
+
+    # === Reads ===
+    def pnl(self):
+        """Day P&L: realized plus mark-to-market."""
+        self.mtm()
+        return self.realized_total + self.unrealized_total
+
+    def totals(self):
+        with self.lock:
+            n = len(self.symbols)
+            self.mtm()
+            value = self.qty[:n] * self.ltp[:n]
+            return {"realized": self.realized_total, "unrealized": self.unrealized_total,
+                    "pnl": self.realized_total + self.unrealized_total, "gross": float(np.abs(value).sum()),
+                    "net": float(value.sum()), "open": int(np.count_nonzero(self.qty[:n])), "fills": self.fills}
+
+    def position(self, tsym):
+        i = self.slots.get(tsym)
+        if i is None:
+            return None
+        with self.lock:
+            self.mtm()
+            return {"tsym": tsym, "qty": int(self.qty[i]), "avg": float(self.avg[i]), "ltp": float(self.ltp[i]),
+                    "realized": float(self.realized[i]), "unrealized": float(self.unrealized[i]),
+                    "buy_qty": int(self.buy_qty[i]), "sell_qty": int(self.sell_qty[i])}
+
+    def rows(self, include_flat=True):
+        """One dict per symbol traded today (or just the open ones), for the dashboard."""
+        with self.lock:
+            n = len(self.symbols)
+            unreal = self.mtm()
+            cols = [self.qty[:n].tolist(), self.avg[:n].tolist(), self.ltp[:n].tolist(),
+                    self.realized[:n].tolist(), unreal.tolist(), self.buy_qty[:n].tolist(),
+                    self.sell_qty[:n].tolist()]
+            rows = []
+            for tsym, qty, avg, ltp, realized, unrealized, bought, sold in zip(self.symbols, *cols):
+                if qty or (include_flat and (bought or sold)):
+                    rows.append({"tsym": tsym, "qty": qty, "avg": round(avg, 2), "ltp": ltp,
+                                 "realized": round(realized, 2), "unrealized": round(unrealized, 2),
+                                 "bought": bought, "sold": sold})
+            return rows
+
+    def new_day(self):
+        """Session rollover: realized P&L and day turnover restart; open quantity carries over."""
+        with self.lock:
+            for name in ("realized", "buy_qty", "sell_qty", "buy_value", "sell_value"):
+                getattr(self, name).fill(0)
+            self.realized_total = 0.0
+            self.dirty = True
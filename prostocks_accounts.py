@@ -0,0 +1,146 @@
+# prostocks_accounts.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from prostocks_connector import DEFAULT_ORDER_RATE, ProStocksAPI
+from prostocks_logging import get_logger
+from prostocks_ratelimit import TokenBucket
+from prostocks_session import SESSION_MAX_AGE
+from prostocks_transport import Transport
+
+log = get_logger("accounts")
+
+
+class AccountPool:
+    """Many authenticated accounts in one process, sharing one Transport.
+
+    Every account is a ProStocksAPI with its own session and its own order
+    limiter (the broker's per-user cap).  All of them use one keep-alive
+    connection pool, one Metrics object, one global order limiter and a
+    single background thread that renews whichever sessions are due.
+    """
+
+    def __init__(self, base_url, pool_size=32, timeouts=None, order_rate=DEFAULT_ORDER_RATE,
+                 global_order_rate=None, session_max_age=SESSION_MAX_AGE, max_workers=16):
+        self.transport = Transport(base_url, pool_size=pool_size, timeouts=timeouts)
+        self.metrics = self.transport.metrics
+        self.order_rate = order_rate
+        self.global_limiter = TokenBucket(global_order_rate, capacity=1) if global_order_rate else None
+        self.session_max_age = session_max_age
+        self.max_workers = max_workers
+        self.accounts = {}
+        self.lock = threading.Lock()
+        self._wake = threading.Event()
+        self.running = False
+        self.thread = None
+
+    # === Membership ===
+    def add(self, userid, password_plain, factor2, vc, api_key, imei, apkversion="1.0.0", order_rate=None):
+        api = ProStocksAPI(userid, password_plain, factor2, vc, api_key, imei, self.transport.base_url,
+                           apkversion, transport=self.transport,
+                           order_rate=order_rate or self.order_rate,
+                           session_max_age=self.session_max_age, auto_refresh=False,
+                           shared_limiter=self.global_limiter)
+        with self.lock:
+            self.accounts[userid] = api
+        self._wake.set()
+        return api
+
+    def remove(self, userid):
+        with self.lock:
+            return self.accounts.pop(userid, None)
+
+    def get(self, userid):
+        return self.accounts[userid]
+
+    def __len__(self):
+        return len(self.accounts)
+
+    def __iter__(self):
+        return iter(list(self.accounts.values()))
+
+    def _select(self, userids):
+        with self.lock:
+            if userids is None:
+                return list(self.accounts.items())
+            return [(u, self.accounts[u]) for u in userids]
+
+    def _map(self, fn, items):
+        if not items:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool:
+            return dict(zip((u for u, _ in items), pool.map(fn, (api for _, api in items))))
+
+    # === Sessions ===
+    def login_all(self, userids=None):
+        """Log every (or the given) account in concurrently; returns {userid: (ok, token_or_emsg)}."""
+        results = self._map(lambda api: api.login(), self._select(userids))
+        failed = [u for u, (ok, _) in results.items() if not ok]
+        if failed:
+            log.error("❌ Login failed for %d account(s): %s", len(failed), ", ".join(failed))
+        self.start()
+        return results
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.thread = threading.Thread(target=self._run, name="account-pool-refresh", daemon=True)
+            self.thread.start()
+        return self
+
+    def _run(self):
+        # One thread for the whole pool instead of one SessionManager thread per account
+        while self.running:
+            with self.lock:
+                managers = [api.session_manager for api in self.accounts.values()]
+            live = [m for m in managers if m.token is not None]
+            due = [m for m in live if m.due_in() <= 0]
+            failed = False
+            for manager in due:
+                ok, result = manager.login(stale=manager.token)
+                if ok:
+                    self.metrics.inc("session_refreshes")
+                else:
+                    failed = True
+                    log.error("❌ Background session refresh failed: %s", result)
+            if failed:
+                self._wake.wait(manager.retry_delay)
+                self._wake.clear()
+                continue
+            if due:
+                continue
+            wait = min((m.due_in() for m in live), default=60.0)
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def close(self):
+        self.running = False
+        self._wake.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+        self.transport.close()
+
+    # === Fan-out ===
+    def broadcast(self, intent, userids=None, quantities=None, max_throttle_retries=3):
+        """
+        Place one order intent on many accounts concurrently.
+
+        :param intent: place_order keyword arguments.
+        :param userids: Accounts to use (default: all).
+        :param quantities: Optional {userid: quantity} overriding intent["quantity"].
+        :return: {userid: place_order response}.
+        """
+        quantities = quantities or {}
+
+        def send(api):
+            spec = dict(intent)
+            if api.userid in quantities:
+                spec["quantity"] = quantities[api.userid]
+            return api._send_with_backoff(api.place_order, spec, max_throttle_retries)
+
+        return self._map(send, self._select(userids))
+
+    def order_books(self, userids=None):
+        """{userid: order_book()} for every (or the given) account, fetched concurrently."""
+        return self._map(lambda api: api.order_book(), self._select(userids))
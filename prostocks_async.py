@@ -0,0 +1,218 @@
+# prostocks_async.py
+
+import asyncio
+import hashlib
+import json
+import os
+
+import aiohttp
+
+from prostocks_connector import DEFAULT_ORDER_RATE
+from prostocks_logging import get_logger
+from prostocks_ratelimit import TokenBucket, is_throttled
+
+MAX_IN_FLIGHT = 20
+
+log = get_logger("async")
+
+
+class AsyncProStocksAPI:
+    """asyncio twin of ProStocksAPI: same endpoints and jData/jKey payloads,
+    but every call is a coroutine sharing one keep-alive connection pool."""
+
+    def __init__(self, userid, password_plain, factor2, vc, api_key, imei, base_url,
+                 apkversion="1.0.0", pool_size=100, timeout=10, order_rate=DEFAULT_ORDER_RATE,
+                 max_in_flight=MAX_IN_FLIGHT):
+        self.userid = userid
+        self.uid = userid
+        self.actid = userid
+        self.password_plain = password_plain
+        self.factor2 = factor2
+        self.vc = vc
+        self.api_key = api_key
+        self.imei = imei
+        self.base_url = base_url.rstrip("/")
+        self.apkversion = apkversion
+        self.session_token = None
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session = None
+        self.order_limiter = TokenBucket(order_rate, capacity=1) if order_rate else None
+        self.max_in_flight = max_in_flight
+
+    async def __aenter__(self):
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _get_session(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self.session
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+    def sha256(self, text):
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    async def _post(self, endpoint, jdata, with_key=True):
+        url = f"{self.base_url}/{endpoint}"
+        payload = f"jData={json.dumps(jdata, separators=(',', ':'))}"
+        if with_key:
+            payload += f"&jKey={self.session_token}"
+        session = await self._get_session()
+        try:
+            async with session.post(url, data=payload, headers={
+                "Content-Type": "application/x-www-form-urlencoded"
+            }) as response:
+                return await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            return {"stat": "Not_Ok", "emsg": f"{endpoint} Exception: {e!r}"}
+
+    async def login(self):
+        payload = {
+            "uid": self.userid,
+            "pwd": self.sha256(self.password_plain),
+            "factor2": self.factor2,
+            "vc": self.vc,
+            "appkey": self.sha256(f"{self.userid}|{self.api_key}"),
+            "imei": self.imei,
+            "apkversion": self.apkversion,
+            "source": "API"
+        }
+        data = await self._post("QuickAuth", payload, with_key=False)
+        if isinstance(data, dict) and data.get("stat") == "Ok":
+            self.session_token = data["susertoken"]
+            return True, self.session_token
+        return False, data.get("emsg", "Unknown login error") if isinstance(data, dict) else str(data)
+
+    async def place_order(self, buy_or_sell, product_type, exchange, tradingsymbol,
+                          quantity, discloseqty, price_type, price=None, trigger_price=None,
+                          retention='DAY', remarks=''):
+        order_data = {
+            "uid": self.userid,
+            "actid": self.userid,
+            "exch": exchange,
+            "tsym": tradingsymbol,
+            "qty": str(quantity),
+            "dscqty": str(discloseqty),
+            "prd": product_type,
+            "trantype": buy_or_sell,
+            "prctyp": price_type,
+            "ret": retention,
+            "ordersource": "API",
+            "remarks": remarks
+        }
+
+        if price_type.upper() == "MKT":
+            order_data["prc"] = "0"
+        elif price is not None:
+            order_data["prc"] = str(price)
+        else:
+            raise ValueError("Price is required for non-MKT orders.")
+
+        if trigger_price is not None:
+            order_data["trgprc"] = str(trigger_price)
+
+        return await self._post("PlaceOrder", order_data)
+
+    async def modify_order(self, norenordno, exch, tsym, qty, prctyp, prc="0"):
+        jdata = {
+            "uid": self.userid,
+            "norenordno": norenordno,
+            "exch": exch,
+            "tsym": tsym,
+            "qty": str(qty),
+            "prctyp": prctyp,
+            "prc": str(prc)
+        }
+        return await self._post("ModifyOrder", jdata)
+
+    async def cancel_order(self, norenordno, uid=None, ext_remarks=None):
+        jdata = {
+            "norenordno": norenordno,
+            "uid": uid or self.userid,
+        }
+        if ext_remarks:
+            jdata["ext_remarks"] = ext_remarks
+        return await self._post("CancelOrder", jdata)
+
+    async def order_book(self):
+        data = await self._post("OrderBook", {"uid": self.userid})
+        if isinstance(data, list) and data and data[0].get("stat") == "Ok":
+            return {"stat": "Ok", "orders": data}
+        elif isinstance(data, dict) and data.get("stat") == "Not_Ok":
+            return {"stat": "Not_Ok", "emsg": data.get("emsg", "Unknown Error")}
+        else:
+            return {"stat": "Not_Ok", "emsg": "Unexpected format from API"}
+
+    async def trade_book(self):
+        return await self._post("TradeBook", {"uid": self.userid})
+
+    # === Fire many orders at once; results come back in input order ===
+    async def _acquire_order_slot(self):
+        if self.order_limiter is None:
+            return
+        while not self.order_limiter.try_acquire():
+            await asyncio.sleep(min(0.05, 1 / self.order_limiter.rate))
+
+    async def _send_order(self, gate, spec, max_throttle_retries):
+        async with gate:
+            for attempt in range(max_throttle_retries + 1):
+                await self._acquire_order_slot()
+                resp = await self.place_order(**spec)
+                if not is_throttled(resp):
+                    break
+                if attempt < max_throttle_retries and self.order_limiter is not None:
+                    delay = self.order_limiter.throttled()
+                    log.warning("⏳ Throttled by broker, backing off %.2fs: %s", delay, resp.get("emsg"))
+            if self.order_limiter is not None and not is_throttled(resp):
+                self.order_limiter.ok()
+            return resp
+
+    async def place_orders(self, orders, max_in_flight=None, max_throttle_retries=3):
+        """
+        Place many orders concurrently, at most `max_in_flight` at a time and within `order_rate`.
+
+        :return: One response per order, in input order; an order that could not be sent
+                 (bad spec, transport error) gets a {"stat": "Not_Ok", "emsg": ...} in its place.
+        """
+        gate = asyncio.Semaphore(max_in_flight or self.max_in_flight)
+        results = await asyncio.gather(*(self._send_order(gate, spec, max_throttle_retries) for spec in orders),
+                                       return_exceptions=True)
+        for i, resp in enumerate(results):
+            if isinstance(resp, (TypeError, ValueError)):
+                results[i] = {"stat": "Not_Ok", "emsg": f"Invalid order spec: {resp}"}
+            elif isinstance(resp, Exception):
+                results[i] = {"stat": "Not_Ok", "emsg": f"PlaceOrder Exception: {resp!r}"}
+        return results
+
+
+# ✅ Async counterpart of prostocks_connector.login_ps
+async def login_ps_async(user_id=None, password=None, factor2=None, app_key=None):
+    user_id = user_id or os.getenv("PROSTOCKS_USER_ID")
+    password = password or os.getenv("PROSTOCKS_PASSWORD")
+    factor2 = factor2 or os.getenv("PROSTOCKS_FACTOR2")
+    vc = os.getenv("PROSTOCKS_VENDOR_CODE", user_id)
+    imei = os.getenv("PROSTOCKS_MAC", "MAC123456")
+    app_key = app_key or os.getenv("PROSTOCKS_API_KEY")
+    base_url = os.getenv("PROSTOCKS_BASE_URL", "https://starapiuat.prostocks.com/NorenWClientTP")
+    apkversion = os.getenv("PROSTOCKS_APKVERSION", "1.0.0")
+
+    if not all([user_id, password, factor2, app_key]):
+        log.error("❌ Missing login credentials.")
+        return None
+
+    api = AsyncProStocksAPI(user_id, password, factor2, vc, app_key, imei, base_url, apkversion)
+    success, token = await api.login()
+    if success:
+        log.info("✅ Async login successful!")
+        return api
+    log.error("❌ Async login failed: %s", token)
+    await api.close()
+    return None
@@ -1,259 +1,301 @@
-# prostocks_connector.py
-
-import hashlib
-import requests
-import json
-import os
-
-class ProStocksAPI:
-    def __init__(self, userid, password_plain, factor2, vc, api_key, imei, base_url, apkversion="1.0.0"):
-        self.userid = userid
-        self.uid = userid
-        self.actid = userid
-        self.password_plain = password_plain
-        self.factor2 = factor2
-        self.vc = vc
-        self.api_key = api_key
-        self.imei = imei
-        self.base_url = base_url.rstrip("/")
-        self.apkversion = apkversion
-        self.session_token = None
-        self.session = requests.Session()
-        self.headers = {
-            "Content-Type": "text/plain"
-        }
-
-    def sha256(self, text):
-        return hashlib.sha256(text.encode()).hexdigest()
-
-    def login(self):
-        url = f"{self.base_url}/QuickAuth"
-        pwd_hash = self.sha256(self.password_plain)
-        appkey_raw = f"{self.userid}|{self.api_key}"
-        appkey_hash = self.sha256(appkey_raw)
-
-        print("📎 App Key Raw:", appkey_raw)
-        print("🔐 Hashed App Key:", appkey_hash)
-
-        payload = {
-            "uid": self.userid,
-            "pwd": pwd_hash,
-            "factor2": self.factor2,
-            "vc": self.vc,
-            "appkey": appkey_hash,
-            "imei": self.imei,
-            "apkversion": self.apkversion,
-            "source": "API"
-        }
-
-        try:
-            jdata = json.dumps(payload, separators=(",", ":"))
-            raw_data = f"jData={jdata}"
-            response = self.session.post(
-                url,
-                data=raw_data,
-                headers=self.headers,
-                timeout=10
-            )
-            print("🔁 Response Code:", response.status_code)
-            print("📨 Response Body:", response.text)
-
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("stat") == "Ok":
-                    self.session_token = data["susertoken"]
-                    self.headers["Authorization"] = self.session_token
-                    print("✅ Login Success!")
-                    print("🔑 Session Token set:", self.session_token)
-                    return True, self.session_token
-                else:
-                    return False, data.get("emsg", "Unknown login error")
-            else:
-                return False, f"HTTP {response.status_code}: {response.text}"
-        except requests.exceptions.RequestException as e:
-            return False, f"RequestException: {e}"
-
-    def _post(self, url, data):
-        try:
-            response = self.session.post(url, headers={
-                "Content-Type": "application/x-www-form-urlencoded",
-                "Authorization": self.session_token
-            }, data=data)
-
-            json_resp = response.json()
-
-            if json_resp.get("stat") == "Not_Ok" and "Session Expired" in json_resp.get("emsg", ""):
-                print("🔁 Session expired. Attempting re-login...")
-                success, _ = self.login()
-                if success:
-                    self.headers["Authorization"] = self.session_token
-                    new_data = data.replace(f"jKey=", f"jKey={self.session_token}")
-                    response = self.session.post(url, headers={
-                        "Content-Type": "application/x-www-form-urlencoded",
-                        "Authorization": self.session_token
-                    }, data=new_data)
-                    return response.json()
-                else:
-                    return {"stat": "Not_Ok", "emsg": "Session expired and auto re-login failed."}
-
-            return json_resp
-
-        except Exception as e:
-            return {"stat": "Not_Ok", "emsg": str(e)}
-
-    def place_order(self, buy_or_sell, product_type, exchange, tradingsymbol,
-                    quantity, discloseqty, price_type, price=None, trigger_price=None,
-                    retention='DAY', remarks=''):
-
-        url = f"{self.base_url}/PlaceOrder"
-
-        order_data = {
-            "uid": self.userid,
-            "actid": self.userid,
-            "exch": exchange,
-            "tsym": tradingsymbol,
-            "qty": str(quantity),
-            "dscqty": str(discloseqty),
-            "prd": product_type,
-            "trantype": buy_or_sell,
-            "prctyp": price_type,
-            "ret": retention,
-            "ordersource": "API",
-            "remarks": remarks
-        }
-
-        if price_type.upper() == "MKT":
-            order_data["prc"] = "0"
-        elif price is not None:
-            order_data["prc"] = str(price)
-        else:
-            raise ValueError("Price is required for non-MKT orders.")
-
-        if trigger_price is not None:
-            order_data["trgprc"] = str(trigger_price)
-
-        print("📦 Order Payload:", order_data)
-
-        jdata_str = json.dumps(order_data, separators=(",", ":"))
-        payload = f"jData={jdata_str}&jKey={self.session_token}"
-        self.headers["Content-Type"] = "application/x-www-form-urlencoded"
-
-        try:
-            response = self.session.post(url, data=payload, headers=self.headers, timeout=10)
-            print("📨 Place Order Response:", response.text)
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print("❌ Place order exception:", e)
-            return {"stat": "Not_Ok", "emsg": str(e)}
-
-    def modify_order(self, norenordno, exch, tsym, qty, prctyp, prc="0"):
-        url = f"{self.base_url}/ModifyOrder"
-        jdata = {
-            "uid": self.userid,
-            "norenordno": norenordno,
-            "exch": exch,
-            "tsym": tsym,
-            "qty": str(qty),
-            "prctyp": prctyp,
-            "prc": str(prc)
-        }
-
-        payload = f"jData={json.dumps(jdata)}&jKey={self.session_token}"
-
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded"
-        }
-
-        try:
-            response = requests.post(url, data=payload, headers=headers)
-            print("📨 Modify Order Response:", response.text)
-            return response.json()
-        except Exception as e:
-            return {"stat": "Not_Ok", "emsg": f"ModifyOrder Exception: {str(e)}"}
-
-    def cancel_order(self, norenordno, uid=None, ext_remarks=None):
-        """
-        Cancel an order using Noren Order Number.
-
-        :param norenordno: Order number to cancel.
-        :param uid: User ID (optional, will default to self.userid)
-        :param ext_remarks: Optional remarks.
-        :return: JSON response from the cancel endpoint.
-        """
-        url = f"{self.base_url}/CancelOrder"
-        jdata = {
-            "norenordno": norenordno,
-            "uid": uid or self.userid,
-        }
-        if ext_remarks:
-            jdata["ext_remarks"] = ext_remarks
-
-        payload = f"jData={json.dumps(jdata)}&jKey={self.session_token}"
-
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded"
-        }
-
-        try:
-            response = requests.post(url, data=payload, headers=headers)
-            print("📨 Cancel Order Response:", response.text)
-            return response.json()
-        except Exception as e:
-            return {"stat": "Not_Ok", "emsg": f"CancelOrder Exception: {str(e)}"}
-
-    def order_book(self):
-        url = f"{self.base_url}/OrderBook"
-        jdata = {"uid": self.userid}
-        payload = f"jData={json.dumps(jdata)}&jKey={self.session_token}"
-
-        try:
-            response = self.session.post(
-                url,
-                data=payload,
-                headers={"Content-Type": "application/x-www-form-urlencoded"}
-            )
-            data = response.json()
-
-            if isinstance(data, list) and data and data[0].get("stat") == "Ok":
-                return {"stat": "Ok", "orders": data}
-            elif isinstance(data, dict) and data.get("stat") == "Not_Ok":
-                return {"stat": "Not_Ok", "emsg": data.get("emsg", "Unknown Error")}
-            else:
-                return {"stat": "Not_Ok", "emsg": "Unexpected format from API"}
-        except Exception as e:
-            return {"stat": "Not_Ok", "emsg": str(e)}
-
-    def trade_book(self):
-        url = f"{self.base_url}/TradeBook"
-        payload = f"jData={{\"uid\":\"{self.userid}\"}}&jKey={self.session_token}"
-        return self._post(url, payload)
-
-
-# ✅ Helper function to log in with environment support
-def login_ps(user_id=None, password=None, factor2=None, app_key=None):
-    user_id = user_id or os.getenv("PROSTOCKS_USER_ID")
-    password = password or os.getenv("PROSTOCKS_PASSWORD")
-    factor2 = factor2 or os.getenv("PROSTOCKS_FACTOR2")
-    vc = os.getenv("PROSTOCKS_VENDOR_CODE", user_id)
-    imei = os.getenv("PROSTOCKS_MAC", "MAC123456")
-    app_key = app_key or os.getenv("PROSTOCKS_API_KEY")
-    base_url = os.getenv("PROSTOCKS_BASE_URL", "https://starapiuat.prostocks.com/NorenWClientTP")
-    apkversion = os.getenv("PROSTOCKS_APKVERSION", "1.0.0")
-
-    if not all([user_id, password, factor2, app_key]):
-        print("❌ Missing login credentials.")
-        return None
-
-    try:
-        print("📶 Logging into ProStocks API...")
-        api = ProStocksAPI(user_id, password, factor2, vc, app_key, imei, base_url, apkversion)
-        success, token = api.login()
-        if success:
-            print("✅ Login successful!")
-            return api
-        else:
-            print("❌ Login failed:", token)
-            return None
-    except Exception as e:
-        print("❌ Login Exception:", e)
-        return None
+# prostocks_connector.py
+
+import hashlib
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from prostocks_logging import get_logger
+from prostocks_ratelimit import TokenBucket, is_throttled
+from prostocks_session import SESSION_MAX_AGE, SessionManager
+from prostocks_transport import Transport
+
+# Broker cap on order entry (place/modify/cancel) per second
+DEFAULT_ORDER_RATE = 10
+
+log = get_logger("connector")
+
+class ProStocksAPI:
+    def __init__(self, userid, password_plain, factor2, vc, api_key, imei, base_url, apkversion="1.0.0",
+                 pool_size=10, timeouts=None, transport=None, order_rate=DEFAULT_ORDER_RATE,
+                 session_max_age=SESSION_MAX_AGE, auto_refresh=True, shared_limiter=None):
+        self.userid = userid
+        self.uid = userid
+        self.actid = userid
+        self.password_plain = password_plain
+        self.factor2 = factor2
+        self.vc = vc
+        self.api_key = api_key
+        self.imei = imei
+        self.base_url = base_url.rstrip("/")
+        self.apkversion = apkversion
+        self.transport = transport or Transport(self.base_url, pool_size=pool_size, timeouts=timeouts)
+        self.session = self.transport.session
+        self.metrics = self.transport.metrics
+        self.order_limiter = TokenBucket(order_rate, capacity=1)
+        # Optional cap across several accounts (see AccountPool); taken after the account's own
+        self.shared_limiter = shared_limiter
+        # Token lifecycle: single-flight re-login, background renewal once logged in
+        self.session_manager = SessionManager(self._quick_auth, max_age=session_max_age,
+                                              refresh_ahead=min(300.0, session_max_age / 4),
+                                              metrics=self.metrics, background=auto_refresh)
+
+    @property
+    def session_token(self):
+        return self.session_manager.token
+
+    @session_token.setter
+    def session_token(self, token):
+        self.session_manager.set_token(token)
+
+    def sha256(self, text):
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def login(self):
+        """Fresh QuickAuth (shared with any login already in flight); returns (ok, token_or_emsg)."""
+        return self.session_manager.login()
+
+    def _quick_auth(self):
+        pwd_hash = self.sha256(self.password_plain)
+        appkey_raw = f"{self.userid}|{self.api_key}"
+        appkey_hash = self.sha256(appkey_raw)
+
+        log.debug("🔐 App key hashed", extra={"fields": {"uid": self.userid, "appkey": appkey_hash}})
+
+        payload = {
+            "uid": self.userid,
+            "pwd": pwd_hash,
+            "factor2": self.factor2,
+            "vc": self.vc,
+            "appkey": appkey_hash,
+            "imei": self.imei,
+            "apkversion": self.apkversion,
+            "source": "API"
+        }
+
+        data = self.transport.post("QuickAuth", payload)
+        log.debug("📨 QuickAuth response: %s", data)
+
+        if isinstance(data, dict) and data.get("stat") == "Ok":
+            log.info("✅ Login Success!", extra={"fields": {"uid": self.userid}})
+            return True, data["susertoken"]
+        elif isinstance(data, dict):
+            log.warning("❌ Login failed: %s", data.get("emsg"), extra={"fields": {"uid": self.userid}})
+            return False, data.get("emsg", "Unknown login error")
+        else:
+            return False, f"Unexpected login response: {data}"
+
+    def _post(self, endpoint, jdata):
+        # A request rejected with "Session Expired" was not acted on, so replaying it
+        # with the renewed token is safe for order entry too
+        return self.session_manager.call(lambda token: self.transport.post(endpoint, jdata, token))
+
+    def close(self):
+        self.session_manager.stop()
+
+    def place_order(self, buy_or_sell, product_type, exchange, tradingsymbol,
+                    quantity, discloseqty, price_type, price=None, trigger_price=None,
+                    retention='DAY', remarks=''):
+
+        order_data = {
+            "uid": self.userid,
+            "actid": self.userid,
+            "exch": exchange,
+            "tsym": tradingsymbol,
+            "qty": str(quantity),
+            "dscqty": str(discloseqty),
+            "prd": product_type,
+            "trantype": buy_or_sell,
+            "prctyp": price_type,
+            "ret": retention,
+            "ordersource": "API",
+            "remarks": remarks
+        }
+
+        if price_type.upper() == "MKT":
+            order_data["prc"] = "0"
+        elif price is not None:
+            order_data["prc"] = str(price)
+        else:
+            raise ValueError("Price is required for non-MKT orders.")
+
+        if trigger_price is not None:
+            order_data["trgprc"] = str(trigger_price)
+
+        log.debug("📦 Order Payload: %s", order_data)
+
+        self._acquire_order_slot()
+        response = self._post("PlaceOrder", order_data)
+        self._log_order("PlaceOrder", response, tsym=tradingsymbol, trantype=buy_or_sell, qty=quantity,
+                        remarks=remarks)
+        return response
+
+    def modify_order(self, norenordno, exch, tsym, qty, prctyp, prc="0"):
+        jdata = {
+            "uid": self.userid,
+            "norenordno": norenordno,
+            "exch": exch,
+            "tsym": tsym,
+            "qty": str(qty),
+            "prctyp": prctyp,
+            "prc": str(prc)
+        }
+
+        self._acquire_order_slot()
+        response = self._post("ModifyOrder", jdata)
+        self._log_order("ModifyOrder", response, norenordno=norenordno, tsym=tsym, qty=qty, prc=prc)
+        return response
+
+    def cancel_order(self, norenordno, uid=None, ext_remarks=None):
+        """
+        Cancel an order using Noren Order Number.
+
+        :param norenordno: Order number to cancel.
+        :param uid: User ID (optional, will default to self.userid)
+        :param ext_remarks: Optional remarks.
+        :return: JSON response from the cancel endpoint.
+        """
+        jdata = {
+            "norenordno": norenordno,
+            "uid": uid or self.userid,
+        }
+        if ext_remarks:
+            jdata["ext_remarks"] = ext_remarks
+
+        self._acquire_order_slot()
+        response = self._post("CancelOrder", jdata)
+        self._log_order("CancelOrder", response, norenordno=norenordno)
+        return response
+
+    @staticmethod
+    def _log_order(endpoint, response, **fields):
+        """One structured record per order call; Ok at INFO, anything else at WARNING."""
+        ok = isinstance(response, dict) and response.get("stat") == "Ok"
+        if not log.isEnabledFor(logging.INFO if ok else logging.WARNING):
+            return
+        fields["endpoint"] = endpoint
+        if isinstance(response, dict):
+            fields["stat"] = response.get("stat")
+            fields["norenordno"] = response.get("norenordno", fields.get("norenordno"))
+            if not ok:
+                fields["emsg"] = response.get("emsg")
+        if ok:
+            log.info("📨 %s Ok", endpoint, extra={"fields": fields})
+        else:
+            log.warning("❌ %s failed", endpoint, extra={"fields": fields})
+
+    def _acquire_order_slot(self):
+        self.order_limiter.acquire()
+        if self.shared_limiter is not None:
+            self.shared_limiter.acquire()
+
+    # === Batch order entry ===
+    def _send_with_backoff(self, fn, spec, max_throttle_retries):
+        try:
+            resp = fn(**spec)
+            for _ in range(max_throttle_retries):
+                if not is_throttled(resp):
+                    break
+                delay = self.order_limiter.throttled()
+                self.metrics.inc("throttled")
+                log.warning("⏳ Throttled by broker, backing off %.2fs: %s", delay, resp.get("emsg"))
+                resp = fn(**spec)
+            if not is_throttled(resp):
+                self.order_limiter.ok()
+            return resp
+        except (TypeError, ValueError) as e:
+            return {"stat": "Not_Ok", "emsg": f"Invalid order spec: {e}"}
+
+    def _run_batch(self, fn, specs, max_workers, max_throttle_retries):
+        specs = list(specs)
+        if not specs:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(specs))) as pool:
+            return list(pool.map(lambda spec: self._send_with_backoff(fn, spec, max_throttle_retries), specs))
+
+    def place_orders(self, orders, max_workers=8, max_throttle_retries=3):
+        """
+        Place many orders concurrently within the broker's order-rate cap.
+
+        :param orders: List of dicts of place_order keyword arguments.
+        :param max_workers: Maximum requests in flight at once.
+        :param max_throttle_retries: Resends per order after a throttling rejection.
+        :return: One response per order, in input order.
+        """
+        return self._run_batch(self.place_order, orders, max_workers, max_throttle_retries)
+
+    def modify_orders(self, modifications, max_workers=8, max_throttle_retries=3):
+        """Batch form of modify_order; takes dicts of modify_order keyword arguments."""
+        return self._run_batch(self.modify_order, modifications, max_workers, max_throttle_retries)
+
+    def cancel_orders(self, norenordnos, max_workers=8, max_throttle_retries=3):
+        """Batch form of cancel_order; takes order numbers or dicts of cancel_order keyword arguments."""
+        specs = [o if isinstance(o, dict) else {"norenordno": o} for o in norenordnos]
+        return self._run_batch(self.cancel_order, specs, max_workers, max_throttle_retries)
+
+    def order_book(self):
+        data = self._post("OrderBook", {"uid": self.userid})
+
+        if isinstance(data, list) and data and data[0].get("stat") == "Ok":
+            return {"stat": "Ok", "orders": data}
+        elif isinstance(data, dict) and data.get("stat") == "Not_Ok":
+            return {"stat": "Not_Ok", "emsg": data.get("emsg", "Unknown Error")}
+        else:
+            return {"stat": "Not_Ok", "emsg": "Unexpected format from API"}
+
+    def trade_book(self):
+        return self._post("TradeBook", {"uid": self.userid})
+
+    # === Market data ===
+    def searchscrip(self, exchange, searchtext):
+        return self._post("SearchScrip", {"uid": self.userid, "exch": exchange, "stext": searchtext})
+
+    def get_quotes(self, exchange, token):
+        return self._post("GetQuotes", {"uid": self.userid, "exch": exchange, "token": str(token)})
+
+    def get_time_price_series(self, exchange, token, starttime=None, endtime=None, interval=None, days=None):
+        """
+        Intraday OHLCV bars (newest first, as the broker returns them).
+
+        :param starttime: Epoch seconds; defaults to `days` (or 1) days ago.
+        :param endtime: Epoch seconds; defaults to now.
+        :param interval: Bar size in minutes ("1", "3", "5", "10", "15", "30", "60", ...).
+        """
+        if starttime is None:
+            starttime = time.time() - 86400 * (days or 1)
+        jdata = {"uid": self.userid, "exch": exchange, "token": str(token), "st": str(int(starttime))}
+        if endtime is not None:
+            jdata["et"] = str(int(endtime))
+        if interval is not None:
+            jdata["intrv"] = str(interval)
+        return self._post("TPSeries", jdata)
+
+
+# ✅ Helper function to log in with environment support
+def login_ps(user_id=None, password=None, factor2=None, app_key=None):
+    user_id = user_id or os.getenv("PROSTOCKS_USER_ID")
+    password = password or os.getenv("PROSTOCKS_PASSWORD")
+    factor2 = factor2 or os.getenv("PROSTOCKS_FACTOR2")
+    vc = os.getenv("PROSTOCKS_VENDOR_CODE", user_id)
+    imei = os.getenv("PROSTOCKS_MAC", "MAC123456")
+    app_key = app_key or os.getenv("PROSTOCKS_API_KEY")
+    base_url = os.getenv("PROSTOCKS_BASE_URL", "https://starapiuat.prostocks.com/NorenWClientTP")
+    apkversion = os.getenv("PROSTOCKS_APKVERSION", "1.0.0")
+
+    if not all([user_id, password, factor2, app_key]):
+        log.error("❌ Missing login credentials.")
+        return None
+
+    try:
+        log.info("📶 Logging into ProStocks API...")
+        api = ProStocksAPI(user_id, password, factor2, vc, app_key, imei, base_url, apkversion)
+        success, token = api.login()
+        if success:
+            return api
+        else:
+            log.error("❌ Login failed: %s", token)
+            return None
+    except Exception as e:
+        log.exception("❌ Login Exception: %s", e)
+        return None
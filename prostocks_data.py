@@ -1,51 +1,189 @@
-import logging
-from prostocks_connector import login_ps  # ✅ This should return a logged-in API object
-from api_helper import NorenApiPy
-
-# === Setup Logging ===
-logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
-
-# ✅ Initialize and login
-try:
-    ps_api = login_ps()
-    logging.info("✅ ProStocks API session initialized.")
-except Exception as e:
-    logging.error(f"❌ ProStocks login failed: {e}")
-    raise
-
-# === Get Token for Symbol ===
-def get_token(symbol: str) -> str:
-    try:
-        scrip = ps_api.searchscrip(exchange="NSE", searchtext=symbol)
-        token = scrip["values"][0]["token"]
-        return token
-    except Exception as e:
-        logging.error(f"❌ Error getting token for {symbol}: {e}")
-        return None
-
-# === Get LTP for a Symbol ===
-def get_ltp(symbol: str):
-    try:
-        token = get_token(symbol)
-        if not token:
-            return None
-        quote = ps_api.get_quotes(exchange="NSE", token=token)
-        ltp = float(quote["lp"])
-        logging.info(f"✅ LTP for {symbol}: ₹{ltp}")
-        return ltp
-    except Exception as e:
-        logging.error(f"❌ Error getting LTP for {symbol}: {e}")
-        return None
-
-# === Get Candlestick Data ===
-def get_candles(symbol: str, interval: str = "5", days: int = 1):
-    try:
-        token = get_token(symbol)
-        if not token:
-            return None
-        candles = ps_api.get_time_price_series(exchange="NSE", token=token, interval=interval, days=days)
-        logging.info(f"✅ Candle data fetched for {symbol}")
-        return candles
-    except Exception as e:
-        logging.error(f"❌ Error getting candles for {symbol}: {e}")
-        return None
\ No newline at end of file
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import scrip_master
+from quote_cache import QuoteCache
+from prostocks_logging import get_logger
+
+# === Setup Logging (queue-backed, see prostocks_logging) ===
+log = get_logger("data")
+
+# === Broker session: created on first use, never as a side effect of import ===
+_api = None
+_api_lock = threading.Lock()
+_candle_store = None
+
+def set_api(api):
+    """Use an existing session (the dashboard's, an AccountPool member, a PaperExchange, ...)."""
+    global _api, _candle_store
+    with _api_lock:
+        _api, _candle_store = api, None
+
+def get_api():
+    """The shared session; the first call logs in with login_ps() (credentials from the environment)."""
+    global _api
+    if _api is None:
+        with _api_lock:
+            if _api is None:
+                from prostocks_connector import login_ps
+                api = login_ps()
+                if api is None:
+                    raise RuntimeError("ProStocks login failed")
+                log.info("✅ ProStocks API session initialized.")
+                _api = api
+    return _api
+
+def get_candle_store():
+    global _candle_store
+    if _candle_store is None:
+        api = get_api()
+        with _api_lock:
+            if _candle_store is None:
+                from candle_store import CandleStore
+                _candle_store = CandleStore(api)
+    return _candle_store
+
+def __getattr__(name):
+    # prostocks_data.ps_api / .candle_store still work, resolved lazily
+    if name == "ps_api":
+        return get_api()
+    if name == "candle_store":
+        return get_candle_store()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# === Get Token for Symbol ===
+def get_token(symbol: str) -> str:
+    # Local scrip-master index first; searchscrip only for symbols it doesn't know
+    token = scrip_master.get_token(symbol, "NSE")
+    if token:
+        return token
+    try:
+        scrip = get_api().searchscrip(exchange="NSE", searchtext=symbol)
+        token = scrip["values"][0]["token"]
+        return token
+    except Exception as e:
+        log.error("❌ Error getting token for %s: %s", symbol, e)
+        return None
+
+# === Quote cache: TTL + LRU, concurrent callers for one token share one request ===
+def _fetch_quote(key):
+    exchange, token = key
+    quote = get_api().get_quotes(exchange=exchange, token=token)
+    if not isinstance(quote, dict) or quote.get("stat") != "Ok":
+        # Raised to every coalesced caller and never cached
+        raise ValueError(f"GetQuotes failed for {exchange}|{token}: {quote}")
+    return quote
+
+quote_cache = QuoteCache(
+    _fetch_quote,
+    ttl=float(os.getenv("PROSTOCKS_QUOTE_TTL", "1.0")),
+    maxsize=int(os.getenv("PROSTOCKS_QUOTE_CACHE_SIZE", "2048")),
+)
+
+def quote_cache_stats():
+    return quote_cache.stats()
+
+# === Streaming feed: when attached, LTPs for subscribed tokens come from memory ===
+market_feed = None
+FEED_MAX_AGE = float(os.getenv("PROSTOCKS_FEED_MAX_AGE", "5"))
+
+def attach_feed(feed):
+    """Serve get_ltp/get_ltps from a running market_feed.MarketFeed where it has fresh ticks."""
+    global market_feed
+    market_feed = feed
+
+def _feed_ltp(token):
+    if market_feed is None:
+        return None
+    return market_feed.ltp(token, "NSE", max_age=FEED_MAX_AGE)
+
+# === Get LTP for a Symbol ===
+def get_ltp(symbol: str):
+    try:
+        token = get_token(symbol)
+        if not token:
+            return None
+        ltp = _feed_ltp(token)
+        if ltp is not None:
+            return ltp
+        quote = quote_cache.get(("NSE", token))
+        ltp = float(quote["lp"])
+        log.info("✅ LTP for %s: ₹%s", symbol, ltp)
+        return ltp
+    except Exception as e:
+        log.error("❌ Error getting LTP for %s: %s", symbol, e)
+        return None
+
+# === Bulk token resolution: local index in one pass, searchscrip only for misses ===
+def get_tokens(symbols, max_workers: int = 8) -> dict:
+    tokens = {sym: scrip_master.get_token(sym, "NSE") for sym in symbols}
+    missing = [sym for sym, tok in tokens.items() if not tok]
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as pool:
+            tokens.update(zip(missing, pool.map(get_token, missing)))
+    return tokens
+
+# === Bulk quotes for a watchlist ===
+QUOTE_FIELDS = ("lp", "o", "h", "l", "c", "v", "bp1", "sp1", "bq1", "sq1")
+
+def get_quotes_many(symbols, fields=QUOTE_FIELDS, max_workers: int = 8) -> "pd.DataFrame":
+    """
+    Quotes for many symbols over a bounded worker pool (through the quote cache).
+
+    :return: DataFrame indexed like `symbols` with columns symbol, token, timestamp,
+             error and one float column per field; failed rows carry the reason in
+             `error` and NaN prices instead of being dropped.
+    """
+    import pandas as pd
+
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return pd.DataFrame(columns=["symbol", "token", *fields, "timestamp", "error"])
+    tokens = get_tokens(symbols, max_workers)
+
+    def fetch(sym):
+        token = tokens.get(sym)
+        if not token:
+            return {"symbol": sym, "token": None, "error": "unknown symbol"}
+        if tuple(fields) == ("lp",):
+            lp = _feed_ltp(token)
+            if lp is not None:
+                return {"symbol": sym, "token": token, "lp": lp, "timestamp": time.time(), "error": None}
+        try:
+            quote = quote_cache.get(("NSE", token))
+        except Exception as e:
+            return {"symbol": sym, "token": token, "error": str(e)}
+        row = {"symbol": sym, "token": token, "error": None,
+               "timestamp": float(quote.get("lut") or time.time())}
+        for f in fields:
+            row[f] = quote.get(f)
+        return row
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols))) as pool:
+        rows = list(pool.map(fetch, symbols))
+
+    df = pd.DataFrame(rows, columns=["symbol", "token", *fields, "timestamp", "error"])
+    for f in fields:
+        df[f] = pd.to_numeric(df[f], errors="coerce")
+    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s", errors="coerce")
+    return df
+
+def get_ltps(symbols, max_workers: int = 8) -> "pd.DataFrame":
+    """Bulk get_ltp: DataFrame of symbol, token, lp, timestamp, error."""
+    return get_quotes_many(symbols, fields=("lp",), max_workers=max_workers)
+
+# === Get Candlestick Data ===
+def get_candles(symbol: str, interval: str = "5", days: int = 1):
+    """OHLCV for `symbol` as candle_store.Candles (NumPy views, oldest first); only new bars are downloaded."""
+    try:
+        token = get_token(symbol)
+        if not token:
+            return None
+        candles = get_candle_store().get(token, interval=interval, days=days, exchange="NSE")
+        log.info("✅ Candle data for %s: %d bars", symbol, len(candles.t))
+        return candles
+    except Exception as e:
+        log.error("❌ Error getting candles for %s: %s", symbol, e)
+        return None
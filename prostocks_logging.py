@@ -0,0 +1,174 @@
+# prostocks_logging.py
+# Queue-backed, redacting log pipeline for everything under the "prostocks" logger.
+#
+# Callers only build a LogRecord and put it on a queue; formatting, secret
+# redaction and the actual write happen on a background listener thread.
+# Importing a module that calls get_logger() starts nothing: the thread starts
+# with the first record emitted, or with an explicit setup_logging().
+#
+#   PROSTOCKS_LOG_LEVEL   DEBUG / INFO (default) / WARNING / ...
+#   PROSTOCKS_LOG_JSON    1 for JSON lines instead of text
+#   PROSTOCKS_LOG_FILE    write here instead of stderr
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import threading
+
+ROOT = "prostocks"
+
+# Keys whose values never reach a log sink
+SECRET_KEYS = frozenset({
+    "pwd", "password", "password_plain", "factor2", "appkey", "api_key", "apikey",
+    "susertoken", "session_token", "jkey", "token_secret",
+})
+MASK = "***"
+
+# key=value / "key": "value" / key: value spellings inside free text
+_SECRET_RE = re.compile(
+    r"""(?P<key>["']?(?:%s)["']?\s*[:=]\s*["']?)(?P<value>[^"'&,\s}]+)""" % "|".join(sorted(SECRET_KEYS)),
+    re.IGNORECASE,
+)
+
+_listener = None
+_lock = threading.Lock()
+
+
+def redact(value):
+    """Copy of `value` with secrets masked: dict keys in SECRET_KEYS, and key=value pairs in strings."""
+    if isinstance(value, dict):
+        return {k: MASK if str(k).lower() in SECRET_KEYS else redact(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(redact(v) for v in value)
+    if isinstance(value, str):
+        return _SECRET_RE.sub(lambda m: m.group("key") + MASK, value)
+    return value
+
+
+class RedactingFilter(logging.Filter):
+    """Masks secrets in msg, args and the structured `fields` extra (runs on the listener thread)."""
+
+    def filter(self, record):
+        if isinstance(record.msg, str):
+            record.msg = redact(record.msg)
+        if record.args:
+            record.args = redact(record.args)
+        fields = getattr(record, "fields", None)
+        if fields:
+            record.fields = redact(fields)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, plus any `fields` extra."""
+
+    def format(self, record):
+        out = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            out.update(fields)
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+class _StartOnFirstRecord(logging.Handler):
+    """Stands in on the "prostocks" logger until something is logged; the first record starts the pipeline."""
+
+    def emit(self, record):
+        setup_logging()
+        for handler in logging.getLogger(ROOT).handlers:
+            if handler is not self:
+                handler.handle(record)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    # The stock prepare() formats the message on the caller's thread; leave that to the listener
+    def prepare(self, record):
+        return record
+
+
+def setup_logging(level=None, json_lines=None, path=None, stream=None, force=False):
+    """Route the "prostocks" logger through a queue to a background writer. Idempotent unless force=True."""
+    global _listener
+    with _lock:
+        if _listener is not None and not force:
+            return _listener
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+        level = level or os.getenv("PROSTOCKS_LOG_LEVEL", "INFO")
+        if json_lines is None:
+            json_lines = os.getenv("PROSTOCKS_LOG_JSON", "").lower() in ("1", "true", "yes")
+        path = path or os.getenv("PROSTOCKS_LOG_FILE")
+
+        if path:
+            sink = logging.FileHandler(path, encoding="utf-8")
+        else:
+            sink = logging.StreamHandler(stream or sys.stderr)
+        sink.setFormatter(JsonFormatter() if json_lines else TextFormatter())
+        sink.addFilter(RedactingFilter())
+
+        q = queue.SimpleQueue()
+        logger = logging.getLogger(ROOT)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(_QueueHandler(q))
+        logger.setLevel(level if isinstance(level, int) else str(level).upper())
+        logger.propagate = False
+
+        _listener = logging.handlers.QueueListener(q, sink, respect_handler_level=True)
+        _listener.start()
+        return _listener
+
+
+def flush_logging():
+    """Drain the queue and stop the writer thread (also run at exit)."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                try:
+                    handler.flush()
+                except (OSError, ValueError):
+                    pass  # the stream was closed before us (e.g. a captured stderr at interpreter exit)
+            _listener = None
+
+
+atexit.register(flush_logging)
+
+
+def get_logger(name):
+    """Logger under "prostocks"; the queue pipeline starts when the first record is emitted."""
+    if _listener is None:
+        with _lock:
+            logger = logging.getLogger(ROOT)
+            if _listener is None and not logger.handlers:
+                logger.addHandler(_StartOnFirstRecord())
+                logger.setLevel(os.getenv("PROSTOCKS_LOG_LEVEL", "INFO").upper())
+                logger.propagate = False
+    return logging.getLogger(f"{ROOT}.{name}")
@@ -0,0 +1,139 @@
+# prostocks_metrics.py
+# Per-endpoint request latency histograms and counters for the ProStocks connector.
+#
+# Recording a request is a bisect over a short tuple plus a few integer adds
+# under a lock, so it can sit on the order path.  Quantiles are estimated from
+# the buckets when read.
+
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+# Bucket upper bounds in seconds (1-2.5-5 steps from 0.5 ms to 10 s)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+OUTCOMES = ("ok", "not_ok", "error")
+
+
+def outcome_of(resp):
+    """ok / not_ok (broker answered stat Not_Ok) for a decoded response; an empty book counts as ok."""
+    if isinstance(resp, dict) and resp.get("stat") == "Not_Ok":
+        return "ok" if "no data" in str(resp.get("emsg", "")).lower() else "not_ok"
+    return "ok"
+
+
+class LatencyHistogram:
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Estimate in seconds, interpolating linearly inside the bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+
+class Metrics:
+    """Latency histogram per endpoint plus named counters (per endpoint or global)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.histograms = {}
+        self.counters = defaultdict(int)  # (name, endpoint) -> count
+        self.lock = threading.Lock()
+
+    def observe(self, endpoint, seconds, outcome="ok"):
+        with self.lock:
+            hist = self.histograms.get(endpoint)
+            if hist is None:
+                hist = self.histograms[endpoint] = LatencyHistogram(self.buckets)
+            hist.observe(seconds)
+            self.counters[(outcome, endpoint)] += 1
+
+    def inc(self, name, endpoint="", n=1):
+        with self.lock:
+            self.counters[(name, endpoint)] += n
+
+    def count(self, name, endpoint=None):
+        """Counter value for one endpoint, or summed over all endpoints when endpoint is None."""
+        with self.lock:
+            if endpoint is not None:
+                return self.counters.get((name, endpoint), 0)
+            return sum(v for (n, _), v in self.counters.items() if n == name)
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    # === Export ===
+    def snapshot(self):
+        """{endpoint: {count, ok, not_ok, error, mean_ms, p50_ms, p90_ms, p99_ms, max_ms, <other counters>}}"""
+        with self.lock:
+            out = {}
+            for endpoint, hist in sorted(self.histograms.items()):
+                row = {"count": hist.count}
+                for outcome in OUTCOMES:
+                    row[outcome] = self.counters.get((outcome, endpoint), 0)
+                for (name, ep), value in self.counters.items():
+                    if ep == endpoint and name not in OUTCOMES:
+                        row[name] = value
+                row["mean_ms"] = 1000 * hist.sum / hist.count if hist.count else 0.0
+                for q in (50, 90, 99):
+                    row[f"p{q}_ms"] = 1000 * hist.quantile(q / 100)
+                row["max_ms"] = 1000 * hist.max
+                out[endpoint] = row
+            return out
+
+    def prometheus(self, prefix="prostocks"):
+        """Prometheus text exposition format."""
+        lines = [
+            f"# HELP {prefix}_request_seconds Broker request latency by endpoint.",
+            f"# TYPE {prefix}_request_seconds histogram",
+        ]
+        with self.lock:
+            for endpoint, hist in sorted(self.histograms.items()):
+                label = f'endpoint="{endpoint}"'
+                cumulative = 0
+                for bound, n in zip(self.buckets, hist.counts):
+                    cumulative += n
+                    lines.append(f'{prefix}_request_seconds_bucket{{{label},le="{bound:g}"}} {cumulative}')
+                lines.append(f'{prefix}_request_seconds_bucket{{{label},le="+Inf"}} {hist.count}')
+                lines.append(f"{prefix}_request_seconds_sum{{{label}}} {hist.sum:.6f}")
+                lines.append(f"{prefix}_request_seconds_count{{{label}}} {hist.count}")
+
+            by_metric = defaultdict(list)
+            for (name, endpoint), value in sorted(self.counters.items()):
+                labels = [f'endpoint="{endpoint}"'] if endpoint else []
+                if name in OUTCOMES:
+                    metric = f"{prefix}_requests_total"
+                    labels.append(f'outcome="{name}"')
+                else:
+                    metric = f"{prefix}_{name}_total"
+                by_metric[metric].append((",".join(labels), value))
+        for metric, rows in by_metric.items():
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in rows:
+                lines.append(f"{metric}{{{labels}}} {value}" if labels else f"{metric} {value}")
+        return "\n".join(lines) + "\n"
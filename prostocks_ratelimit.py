@@ -0,0 +1,82 @@
+# prostocks_ratelimit.py
+
+import threading
+import time
+
+# Substrings the broker uses in emsg when it rejects for rate reasons
+THROTTLE_MARKERS = ("rate limit", "too many", "throttl", "limit exceeded", "http 429")
+
+
+def is_throttled(resp):
+    if not isinstance(resp, dict) or resp.get("stat") != "Not_Ok":
+        return False
+    emsg = str(resp.get("emsg", "")).lower()
+    return any(marker in emsg for marker in THROTTLE_MARKERS)
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    `rate` tokens are added per second up to `capacity`.  When the broker
+    reports throttling, `throttled()` empties the bucket and pauses it with
+    exponential backoff; the next success resets the backoff.
+    """
+
+    def __init__(self, rate, capacity=None, backoff=0.25, max_backoff=5.0):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.penalty = 0.0
+        self.paused_until = 0.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available and take them."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self._refill(now)
+                    if self.tokens >= tokens:
+                        self.tokens -= tokens
+                        return
+                    wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def try_acquire(self, tokens=1):
+        with self.lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return False
+            self._refill(now)
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def throttled(self):
+        with self.lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                # Concurrent rejections from the same burst count once
+                return self.paused_until - now
+            self.penalty = min(self.max_backoff, self.penalty * 2 if self.penalty else self.backoff)
+            self.tokens = 0.0
+            self.paused_until = max(self.paused_until, now + self.penalty)
+            self.updated = self.paused_until
+            return self.penalty
+
+    def ok(self):
+        if self.penalty:
+            with self.lock:
+                self.penalty = 0.0
@@ -0,0 +1,177 @@
+# prostocks_session.py
+
+import os
+import threading
+import time
+
+from prostocks_logging import get_logger
+
+# Seconds a QuickAuth token is trusted, and how long before that it is renewed
+SESSION_MAX_AGE = float(os.getenv("PROSTOCKS_SESSION_MAX_AGE", str(6 * 3600)))
+SESSION_REFRESH_AHEAD = float(os.getenv("PROSTOCKS_SESSION_REFRESH_AHEAD", "300"))
+
+log = get_logger("session")
+
+
+def is_session_expired(resp):
+    return isinstance(resp, dict) and resp.get("stat") == "Not_Ok" \
+        and "Session Expired" in str(resp.get("emsg", ""))
+
+
+class _Flight:
+    __slots__ = ("event", "result")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+
+class SessionManager:
+    """Owns the session token for one account.
+
+    `authenticate()` performs a QuickAuth and returns (ok, token_or_emsg).
+    Logins are single-flight: however many threads find the session expired
+    at once, one QuickAuth is sent and the rest wait for its token.  After the
+    first successful login (with background=True) a thread renews the token
+    `refresh_ahead` seconds before `max_age`, so requests normally never wait
+    on a login; a request that still hits "Session Expired" is replayed once
+    with the new token.
+    """
+
+    def __init__(self, authenticate, max_age=SESSION_MAX_AGE, refresh_ahead=SESSION_REFRESH_AHEAD,
+                 retry_delay=5.0, metrics=None, background=True):
+        self.authenticate = authenticate
+        self.background = background
+        self.max_age = max_age
+        self.refresh_ahead = refresh_ahead
+        self.retry_delay = retry_delay
+        self.metrics = metrics
+        self.token = None
+        self.issued_at = None
+        self.last_error = None
+        self.logins = 0
+        self.failures = 0
+        self._flight = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self.running = False
+        self.thread = None
+
+    # === Token state ===
+    def set_token(self, token):
+        """Adopt a token obtained elsewhere (e.g. a jKey pasted into the dashboard)."""
+        with self._lock:
+            self.token = token
+            self.issued_at = time.monotonic() if token else None
+        self._wake.set()
+
+    def age(self):
+        issued = self.issued_at
+        return None if issued is None else time.monotonic() - issued
+
+    def due_in(self):
+        """Seconds until the background refresh should run (<= 0 means now)."""
+        age = self.age()
+        if age is None:
+            return 0.0
+        return self.max_age - self.refresh_ahead - age
+
+    # === Single-flight login ===
+    def login(self, stale=None):
+        """Log in, or join a login already in flight; returns (ok, token_or_emsg).
+
+        With `stale` set, a token newer than `stale` is returned as is: some other
+        thread has already replaced the session this caller saw expire.
+        """
+        with self._lock:
+            if stale is not None and self.token is not None and self.token != stale:
+                return True, self.token
+            flight = self._flight
+            leader = flight is None
+            if leader:
+                flight = self._flight = _Flight()
+
+        if not leader:
+            flight.event.wait()
+            return flight.result
+
+        try:
+            result = self.authenticate()
+        except Exception as e:
+            result = (False, f"Login Exception: {e}")
+        with self._lock:
+            if result[0]:
+                self.token = result[1]
+                self.issued_at = time.monotonic()
+                self.last_error = None
+                self.logins += 1
+                start = self.background and not self.running
+            else:
+                start = False
+                self.last_error = result[1]
+                self.failures += 1
+            self._flight = None
+        flight.result = result
+        flight.event.set()
+        self._wake.set()
+        if start:
+            self.start()
+        return result
+
+    def call(self, send):
+        """send(token) -> response; on "Session Expired", re-login once (single-flight) and replay."""
+        token = self.token
+        if token is None:
+            ok, token = self.login()
+            if not ok:
+                return {"stat": "Not_Ok", "emsg": f"Login failed: {token}"}
+        resp = send(token)
+        if not is_session_expired(resp):
+            return resp
+
+        log.warning("🔁 Session expired. Re-login and replay...")
+        if self.metrics is not None:
+            self.metrics.inc("relogins")
+        ok, new_token = self.login(stale=token)
+        if not ok:
+            return {"stat": "Not_Ok", "emsg": "Session expired and auto re-login failed."}
+        return send(new_token)
+
+    # === Background refresh ===
+    def start(self):
+        with self._lock:
+            if self.running:
+                return self
+            self.running = True
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name="session-refresh", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+
+    def _run(self):
+        while self.running:
+            if self.token is None:
+                # Nothing to renew until someone logs in
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            wait = self.due_in()
+            if wait > 0:
+                self._wake.wait(wait)
+                self._wake.clear()
+                continue
+            ok, result = self.login(stale=self.token)
+            if ok:
+                log.info("🔑 Session refreshed ahead of expiry")
+                if self.metrics is not None:
+                    self.metrics.inc("session_refreshes")
+            else:
+                log.error("❌ Background session refresh failed: %s", result)
+                self._wake.wait(self.retry_delay)
+                self._wake.clear()
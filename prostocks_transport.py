@@ -0,0 +1,105 @@
+# prostocks_transport.py
+
+import json
+import os
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from prostocks_metrics import Metrics, outcome_of
+
+# (connect, read) seconds per Noren endpoint
+DEFAULT_TIMEOUT = (3.05, 10)
+DEFAULT_TIMEOUTS = {
+    "QuickAuth": (3.05, 10),
+    "PlaceOrder": (2, 5),
+    "ModifyOrder": (2, 5),
+    "CancelOrder": (2, 5),
+    "OrderBook": (3.05, 10),
+    "TradeBook": (3.05, 10),
+}
+
+# Read-only endpoints that are safe to send twice
+IDEMPOTENT_ENDPOINTS = {
+    "OrderBook", "TradeBook", "SingleOrdHistory", "PositionBook",
+    "GetQuotes", "SearchScrip", "TPSeries", "UserDetails", "Limits",
+}
+
+RETRY_STATUS = {502, 503, 504}
+
+
+class Transport:
+    """One keep-alive connection pool for every ProStocksAPI call.
+
+    Bodies are always sent as "jData=<json>&jKey=<token>".  Only endpoints in
+    IDEMPOTENT_ENDPOINTS are retried; order entry is never resent.  Every call
+    is timed into `metrics` (latency per endpoint, ok / not_ok / error counts).
+    """
+
+    def __init__(self, base_url, pool_size=10, timeouts=None, retries=2, backoff=0.2, verify=True,
+                 metrics=None):
+        self.base_url = base_url.rstrip("/")
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.verify = verify
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.retries = retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Content-Type": "application/x-www-form-urlencoded"})
+        # Resolve proxy/CA environment once instead of re-scanning os.environ on every request
+        self.session.proxies.update(requests.utils.get_environ_proxies(self.base_url))
+        if self.verify is True:
+            self.verify = os.environ.get("REQUESTS_CA_BUNDLE") or os.environ.get("CURL_CA_BUNDLE") or True
+        self.session.trust_env = False
+
+    def timeout_for(self, endpoint):
+        return self.timeouts.get(endpoint, DEFAULT_TIMEOUT)
+
+    @staticmethod
+    def encode(jdata, jkey=None):
+        payload = f"jData={json.dumps(jdata, separators=(',', ':'))}"
+        if jkey is not None:
+            payload += f"&jKey={jkey}"
+        return payload
+
+    def post(self, endpoint, jdata, jkey=None):
+        """POST to an endpoint and return the decoded JSON, or a Not_Ok dict on failure."""
+        start = time.perf_counter()
+        resp, failed = self._send(endpoint, self.encode(jdata, jkey))
+        self.metrics.observe(endpoint, time.perf_counter() - start, "error" if failed else outcome_of(resp))
+        return resp
+
+    def _send(self, endpoint, payload):
+        """Returns (response, failed) where failed means no usable answer from the broker."""
+        url = f"{self.base_url}/{endpoint}"
+        attempts = 1 + (self.retries if endpoint in IDEMPOTENT_ENDPOINTS else 0)
+
+        for attempt in range(attempts):
+            if attempt:
+                self.metrics.inc("retries", endpoint)
+                time.sleep(self.backoff * (2 ** (attempt - 1)))
+            try:
+                response = self.session.post(url, data=payload, timeout=self.timeout_for(endpoint),
+                                             verify=self.verify)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = {"stat": "Not_Ok", "emsg": f"{endpoint} Exception: {e}"}
+                continue
+            except requests.exceptions.RequestException as e:
+                return {"stat": "Not_Ok", "emsg": f"{endpoint} Exception: {e}"}, True
+
+            if response.status_code in RETRY_STATUS:
+                error = {"stat": "Not_Ok", "emsg": f"HTTP {response.status_code}: {response.text}"}
+                continue
+            try:
+                return response.json(), False
+            except ValueError:
+                return {"stat": "Not_Ok", "emsg": f"HTTP {response.status_code}: {response.text}"}, True
+
+        return error, True
+
+    def close(self):
+        self.session.close()
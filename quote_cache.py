@@ -0,0 +1,99 @@
+# quote_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class QuoteCache:
+    """TTL + LRU cache in front of a fetch function, with single-flight coalescing.
+
+    Concurrent misses for the same key share one call to `fetch(key)`; callers
+    that arrive while it is in flight wait for its result instead of issuing
+    their own.  Failed fetches are raised to every waiter and never cached.
+    """
+
+    def __init__(self, fetch, ttl=1.0, maxsize=1024):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            flight = self.inflight.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = self.inflight[key] = _Flight()
+                self.misses += 1
+                leader = True
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = self.fetch(key)
+        except Exception as e:
+            flight.error = e
+        with self.lock:
+            del self.inflight[key]
+            if flight.error is None:
+                self.entries[key] = (time.monotonic() + self.ttl, flight.value)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+        flight.event.set()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key=None):
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "size": len(self.entries),
+            }
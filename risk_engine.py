@@ -0,0 +1,428 @@
+# risk_engine.py
+# In-process pre-trade risk checks in front of place_order.
+#
+# RiskEngine keeps exposure counters per symbol (filled position, working buy /
+# sell quantity, average price, mark price) and running gross / net totals
+# across the book; fills and P&L live in a PositionBook it shares with the
+# dashboard.  Acks, order updates and ticks adjust one symbol's counters and
+# apply the difference to the totals, so a check is a few dict lookups and
+# comparisons - O(1), no I/O, no book fetch.
+#
+# Exposure is worst case: a symbol counts as max(|pos + working buys|,
+# |pos - working sells|) shares at its mark (LTP, else average price, else the
+# last order price).  Orders that don't increase that worst case (exits) pass
+# the exposure and loss limits, and a MKT exit needs no LTP, so the book can
+# always be flattened.  The daily loss limit reads running realized +
+# unrealized totals, kept the same way as the exposure totals.
+#
+#   gate = RiskGate(api, RiskEngine({"max_order_value": 200000}))
+#   gate.place_order(...)   # {"stat": "Not_Ok", "emsg": "RMS: ..."} when a limit is hit
+
+import threading
+
+from position_book import PositionBook
+from prostocks_logging import get_logger
+
+log = get_logger("risk")
+
+INF = float("inf")
+
+# None disables a limit; price_band_pct is the allowed distance of a LMT price from LTP
+DEFAULT_LIMITS = {
+    "max_order_qty": 5000,
+    "max_order_value": 500000,
+    "max_symbol_qty": 10000,
+    "max_symbol_value": 1000000,
+    "max_gross": 2500000,
+    "max_net": 1500000,
+    "max_open_orders": 200,
+    "price_band_pct": 5.0,
+    "max_daily_loss": 25000,
+}
+# Limits that symbol_limits can override per trading symbol
+SYMBOL_LIMITS = ("max_order_qty", "max_order_value", "max_symbol_qty", "max_symbol_value", "price_band_pct")
+DONE_STATUSES = frozenset({"COMPLETE", "CANCELED", "REJECTED"})
+
+
+def _limits(values):
+    return {k: INF if v is None else float(v) for k, v in values.items()}
+
+
+class Exposure:
+    """Counters for one symbol plus its cached contribution to the book totals."""
+
+    __slots__ = ("tsym", "pos", "avg", "buys", "sells", "ltp", "last_prc", "gross", "net", "upnl", "limits")
+
+    def __init__(self, tsym, limits):
+        self.tsym = tsym
+        self.pos = 0  # filled, signed
+        self.avg = 0.0
+        self.buys = self.sells = 0  # working (unfilled) quantity
+        self.ltp = None
+        self.last_prc = None
+        self.gross = self.net = self.upnl = 0.0
+        self.limits = limits
+
+    @property
+    def mark(self):
+        if self.ltp is not None:
+            return self.ltp
+        return self.avg if self.pos else self.last_prc or 0.0
+
+    def worst(self, buys, sells):
+        return max(abs(self.pos + buys), abs(self.pos - sells))
+
+
+class Working:
+    """An order holding working quantity: reserved at admit, keyed by norenordno once acked."""
+
+    __slots__ = ("ordno", "tsym", "side", "qty", "filled", "value")
+
+    def __init__(self, tsym, side, qty):
+        self.ordno, self.tsym, self.side, self.qty = None, tsym, side, qty
+        self.filled, self.value = 0, 0.0
+
+
+class RiskEngine:
+    """
+    Pre-trade limits over incrementally maintained exposure.
+
+    Feed it prices (on_price / attach_feed) and order updates (on_order, "om"
+    pushes or order_book rows via sync); fills are folded into `positions`.  admit() checks and reserves in one
+    step under the lock, so concurrent orders can't both squeeze under a limit.
+    """
+
+    def __init__(self, limits=None, symbol_limits=None, positions=None):
+        self.limits = _limits(dict(DEFAULT_LIMITS, **(limits or {})))
+        self.symbol_limits = {k: _limits(dict({n: self.limits[n] for n in SYMBOL_LIMITS}, **v))
+                              for k, v in (symbol_limits or {}).items()}
+        self.symbols = {}
+        self.working = {}  # norenordno -> Working
+        self.done = set()  # finished order numbers, so a re-synced book doesn't adopt them again
+        self.open_orders = 0
+        self.positions = positions if positions is not None else PositionBook()
+        self.gross = self.net = 0.0
+        self.unrealized = 0.0  # sum of Exposure.upnl, for the daily loss limit
+        self.rejects = {}
+        self.day = None
+        self.lock = threading.Lock()
+
+    def _symbol(self, tsym):
+        s = self.symbols.get(tsym)
+        if s is None:
+            s = self.symbols[tsym] = Exposure(tsym, self.symbol_limits.get(tsym, self.limits))
+        return s
+
+    def _refresh(self, s):
+        mark = s.mark
+        gross = s.worst(s.buys, s.sells) * mark
+        net = (s.pos + s.buys - s.sells) * mark
+        upnl = s.pos * (mark - s.avg) if s.pos else 0.0
+        self.gross += gross - s.gross
+        self.net += net - s.net
+        self.unrealized += upnl - s.upnl
+        s.gross, s.net, s.upnl = gross, net, upnl
+
+    # === Pre-trade ===
+    def check(self, tsym, side, qty, price=None, price_type="LMT", new_order=True):
+        """None when the order passes every limit, else the reason. Nothing is reserved."""
+        with self.lock:
+            return self._check(self._symbol(tsym), side, qty, price, price_type, new_order)
+
+    def admit(self, tsym, side, qty, price=None, price_type="LMT"):
+        """Check and reserve the order's working quantity; returns (ticket, None) or (None, reason)."""
+        with self.lock:
+            s = self._symbol(tsym)
+            reason = self._check(s, side, qty, price, price_type, True)
+            if reason is not None:
+                return None, reason
+            ticket = Working(tsym, side, qty)
+            self._add_working(s, side, qty)
+            self.open_orders += 1
+            if price is not None and price_type not in ("MKT", "SL-MKT"):
+                s.last_prc = price
+            self._refresh(s)
+            return ticket, None
+
+    def _check(self, s, side, qty, price, price_type, new_order):
+        lim, own = self.limits, s.limits
+        buys, sells = (s.buys + qty, s.sells) if side > 0 else (s.buys, s.sells + qty)
+        worst = s.worst(buys, sells)
+        reducing = worst <= s.worst(s.buys, s.sells)
+        ref = s.ltp
+        if price_type == "MKT" or price is None:
+            if ref is None and not reducing:
+                return self._reject("no_price", f"no LTP for {s.tsym} to value a {price_type} order")
+            price = ref
+        elif ref is not None and abs(price - ref) > ref * own["price_band_pct"] / 100:
+            return self._reject("price_band_pct", f"price {price} more than {own['price_band_pct']:g}% from "
+                                                  f"LTP {ref}")
+        if qty > own["max_order_qty"]:
+            return self._reject("max_order_qty", f"qty {qty} > {own['max_order_qty']:g}")
+        if price is not None and qty * price > own["max_order_value"]:
+            return self._reject("max_order_value", f"order value {qty * price:.0f} > {own['max_order_value']:g}")
+        if new_order and self.open_orders >= lim["max_open_orders"]:
+            return self._reject("max_open_orders", f"{self.open_orders} open orders")
+        if reducing:
+            return None  # doesn't add exposure: exits always pass
+        if worst > own["max_symbol_qty"]:
+            return self._reject("max_symbol_qty", f"{s.tsym} position up to {worst} > {own['max_symbol_qty']:g}")
+        mark = s.ltp if s.ltp is not None else price
+        gross = worst * mark
+        if gross > own["max_symbol_value"]:
+            return self._reject("max_symbol_value", f"{s.tsym} exposure {gross:.0f} > {own['max_symbol_value']:g}")
+        if self.gross - s.gross + gross > lim["max_gross"]:
+            return self._reject("max_gross", f"gross exposure {self.gross - s.gross + gross:.0f} > "
+                                             f"{lim['max_gross']:g}")
+        net = self.net - s.net + (s.pos + buys - sells) * mark
+        if abs(net) > lim["max_net"]:
+            return self._reject("max_net", f"net exposure {net:.0f} beyond {lim['max_net']:g}")
+        pnl = self.positions.realized_total + self.unrealized
+        if pnl <= -lim["max_daily_loss"]:
+            return self._reject("max_daily_loss", f"day P&L {pnl:.0f} hit the loss limit; only reducing orders "
+                                                  f"allowed")
+        return None
+
+    def _reject(self, rule, reason):
+        self.rejects[rule] = self.rejects.get(rule, 0) + 1
+        log.warning("🛑 Order blocked by %s: %s", rule, reason, extra={"fields": {"rule": rule}})
+        return reason
+
+    def _add_working(self, s, side, qty):
+        if side > 0:
+            s.buys += qty
+        else:
+            s.sells += qty
+
+    def ack(self, ticket, resp):
+        """place_order's response for an admitted order: track it under its order number or release it."""
+        ordno = resp.get("norenordno") if isinstance(resp, dict) and resp.get("stat") == "Ok" else None
+        with self.lock:
+            # An order update may have beaten the response and adopted the order already
+            if ordno is None or ordno in self.working or ordno in self.done:
+                self._release(ticket)
+                return
+            ticket.ordno = ordno
+            self.working[ordno] = ticket
+
+    def release(self, ticket):
+        """Drop an admitted order that was never sent."""
+        with self.lock:
+            self._release(ticket)
+
+    def _release(self, w):
+        s = self._symbol(w.tsym)
+        self._add_working(s, w.side, -(w.qty - w.filled))
+        self.open_orders -= 1
+        self._refresh(s)
+
+    # === Updates ===
+    def on_price(self, tsym, lp):
+        if lp is None or lp != lp:
+            return
+        with self.lock:
+            s = self._symbol(tsym)
+            s.ltp = float(lp)
+            self._refresh(s)
+        self.positions.on_price(tsym, s.ltp)
+
+    def on_order(self, order):
+        """One order row or "om" push: acks, quantity changes, fills and terminal statuses."""
+        ordno = order.get("norenordno")
+        if not ordno:
+            return
+        status = str(order.get("status", "")).upper()
+        with self.lock:
+            w = self.working.get(ordno)
+            if w is None:
+                if ordno in self.done or not order.get("tsym") or order.get("trantype") not in ("B", "S"):
+                    return
+                # Placed elsewhere (or before we started): adopt it
+                w = Working(order["tsym"], 1 if order["trantype"] == "B" else -1, int(order.get("qty") or 0))
+                w.ordno = ordno
+                self.working[ordno] = w
+                self.open_orders += 1
+                self._add_working(self._symbol(w.tsym), w.side, w.qty)
+            s = self._symbol(w.tsym)
+            if order.get("qty") and status not in DONE_STATUSES:
+                qty = int(order["qty"])
+                if qty != w.qty:
+                    self._add_working(s, w.side, qty - w.qty)
+                    w.qty = qty
+            filled = int(order.get("fillshares") or 0)
+            if filled > w.filled:
+                value = float(order.get("avgprc") or order.get("flprc") or s.mark) * filled
+                qty = filled - w.filled
+                self._add_working(s, w.side, -qty)
+                s.pos, s.avg = self.positions.fill(s.tsym, w.side * qty, (value - w.value) / qty)
+                w.filled, w.value = filled, value
+            if status in DONE_STATUSES:
+                self._add_working(s, w.side, -(w.qty - w.filled))
+                w.qty = w.filled
+                del self.working[ordno]
+                self.done.add(ordno)
+                self.open_orders -= 1
+            self._refresh(s)
+
+    def sync(self, order_book):
+        """Fold an order_book() response in (when there is no order-update stream)."""
+        if isinstance(order_book, dict):
+            order_book = order_book.get("orders") or []
+        for order in order_book if isinstance(order_book, list) else ():
+            if isinstance(order, dict):
+                self.on_order(order)
+
+    def attach_feed(self, feed, tokens, exchange="NSE"):
+        """Marks from a MarketFeed's ticks and fills from its order pushes; tokens maps symbol -> token."""
+        by_key = {f"{exchange}|{token}": tsym for tsym, token in tokens.items()}
+
+        def on_tick(key, row):
+            tsym = by_key.get(key)
+            if tsym is not None and row is not None:
+                self.on_price(tsym, row.get("lp"))
+
+        feed.on_tick(on_tick)
+        feed.subscribe_orders(self.on_order)
+        return on_tick
+
+    def new_day(self, day):
+        """Session rollover: realized P&L restarts for the daily loss limit."""
+        with self.lock:
+            self.day = day
+            self.positions.new_day()
+
+    def snapshot(self):
+        with self.lock:
+            self.positions.mtm()
+            return {
+                "gross": self.gross, "net": self.net, "realized": self.positions.realized_total,
+                "unrealized": self.positions.unrealized_total,
+                "open_orders": self.open_orders, "rejects": dict(self.rejects),
+                "symbols": {t: {"pos": s.pos, "avg": s.avg, "buys": s.buys, "sells": s.sells, "ltp": s.ltp,
+                                "gross": s.gross} for t, s in self.symbols.items() if s.pos or s.buys or s.sells},
+            }
+
+
+def _order_price(price_type, price, trigger_price):
+    price_type = str(price_type).upper()
+    if price_type == "MKT":
+        return None
+    return float(trigger_price if price_type == "SL-MKT" else price)
+
+
+class RiskGate:
+    """
+    ProStocksAPI wrapper that admits every new order, and every modification
+    that adds quantity or re-prices, through a RiskEngine before it goes out;
+    blocked ones get a Noren-style Not_Ok response without touching the
+    network.  Cancels and everything else pass through to `api` (attribute
+    writes too, e.g. a manually pasted session_token).
+    """
+
+    def __init__(self, api, risk=None):
+        object.__setattr__(self, "api", api)
+        object.__setattr__(self, "risk", risk if risk is not None else RiskEngine())
+
+    def __getattr__(self, name):
+        return getattr(self.api, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.api, name, value)
+
+    def _admit(self, spec):
+        try:
+            qty = int(spec["quantity"])
+            prc = _order_price(spec["price_type"], spec.get("price"), spec.get("trigger_price"))
+        except (KeyError, TypeError, ValueError):
+            return None, None  # malformed: let the API reject it as it always has
+        side = 1 if spec.get("buy_or_sell") == "B" else -1
+        return self.risk.admit(spec["tradingsymbol"], side, qty, prc, str(spec["price_type"]).upper())
+
+    def place_order(self, buy_or_sell, product_type, exchange, tradingsymbol, quantity, discloseqty, price_type,
+                    price=None, trigger_price=None, retention='DAY', remarks=''):
+        spec = dict(buy_or_sell=buy_or_sell, product_type=product_type, exchange=exchange,
+                    tradingsymbol=tradingsymbol, quantity=quantity, discloseqty=discloseqty, price_type=price_type,
+                    price=price, trigger_price=trigger_price, retention=retention, remarks=remarks)
+        ticket, reason = self._admit(spec)
+        if reason is not None:
+            return {"stat": "Not_Ok", "emsg": f"RMS: {reason}"}
+        try:
+            resp = self.api.place_order(**spec)
+        except Exception:
+            if ticket is not None:
+                self.risk.release(ticket)
+            raise
+        if ticket is not None:
+            self.risk.ack(ticket, resp)
+        return resp
+
+    def place_orders(self, orders, max_workers=8, max_throttle_retries=3):
+        """Batch form: blocked orders are answered locally, the rest go out in one api.place_orders call."""
+        orders = list(orders)
+        results = [None] * len(orders)
+        tickets, send = [], []
+        for i, spec in enumerate(orders):
+            ticket, reason = self._admit(spec)
+            if reason is not None:
+                results[i] = {"stat": "Not_Ok", "emsg": f"RMS: {reason}"}
+            else:
+                tickets.append((i, ticket))
+                send.append(spec)
+        try:
+            responses = self.api.place_orders(send, max_workers=max_workers,
+                                              max_throttle_retries=max_throttle_retries) if send else []
+        except Exception:
+            for _, ticket in tickets:
+                if ticket is not None:
+                    self.risk.release(ticket)
+            raise
+        for (i, ticket), resp in zip(tickets, responses):
+            if ticket is not None:
+                self.risk.ack(ticket, resp)
+            results[i] = resp
+        return results
+
+    def _check_modify(self, spec):
+        """RMS reason for a modification, or None; extra quantity and a new price are checked like a new order."""
+        w = self.risk.working.get(str(spec.get("norenordno")))
+        if w is None:
+            return None
+        try:
+            extra = int(spec["qty"]) - w.qty
+            price = _order_price(spec["prctyp"], spec.get("prc", "0"), None)
+        except (KeyError, TypeError, ValueError):
+            return None  # malformed: let the API reject it as it always has
+        reason = self.risk.check(spec.get("tsym") or w.tsym, w.side, max(extra, 0), price,
+                                 str(spec["prctyp"]).upper(), new_order=False)
+        return reason if extra > 0 or price is not None else None
+
+    def _modified(self, spec, resp):
+        if isinstance(resp, dict) and resp.get("stat") == "Ok" and str(spec.get("norenordno")) in self.risk.working:
+            self.risk.on_order({"norenordno": str(spec["norenordno"]), "qty": spec["qty"]})
+
+    def modify_order(self, norenordno, exch, tsym, qty, prctyp, prc="0"):
+        spec = dict(norenordno=norenordno, exch=exch, tsym=tsym, qty=qty, prctyp=prctyp, prc=prc)
+        reason = self._check_modify(spec)
+        if reason is not None:
+            return {"stat": "Not_Ok", "emsg": f"RMS: {reason}"}
+        resp = self.api.modify_order(**spec)
+        self._modified(spec, resp)
+        return resp
+
+    def modify_orders(self, modifications, max_workers=8, max_throttle_retries=3):
+        """Batch form of modify_order: blocked ones are answered locally, the rest go out in one call."""
+        modifications = list(modifications)
+        results = [None] * len(modifications)
+        send = []
+        for i, spec in enumerate(modifications):
+            reason = self._check_modify(spec)
+            if reason is not None:
+                results[i] = {"stat": "Not_Ok", "emsg": f"RMS: {reason}"}
+            else:
+                send.append(i)
+        responses = self.api.modify_orders([modifications[i] for i in send], max_workers=max_workers,
+                                           max_throttle_retries=max_throttle_retries) if send else []
+        for i, resp in zip(send, responses):
+            self._modified(modifications[i], resp)
+            results[i] = resp
+        return results
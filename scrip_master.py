@@ -0,0 +1,239 @@
+# scrip_master.py
+# Daily on-disk index of the exchange instrument master (NSE/NFO/BSE).
+#
+# Each exchange is downloaded once per day, parsed once, and written as plain
+# .npy arrays that later processes open with mmap instead of re-parsing:
+#
+#   <cache>/<YYYY-MM-DD>/<EXCH>/tsym.npy    sorted trading symbols (fixed-width bytes)
+#                               token.npy   instrument tokens, same order
+#                               lot.npy     lot sizes, same order
+#                               slots.npy   open-addressing hash table -> row in tsym.npy
+#
+# Exact lookups (token / lot_size) are one hash probe and prefix search is a
+# binary search; search()'s substring fallback is still a scan over every
+# symbol, so keep it to interactive use (a few ms on NSE's master).
+
+import csv
+import io
+import json
+import os
+import shutil
+import threading
+import time
+import zipfile
+from datetime import date
+
+import numpy as np
+
+from prostocks_logging import get_logger
+
+log = get_logger("scrips")
+
+CACHE_DIR = os.getenv("PROSTOCKS_SCRIP_CACHE",
+                      os.path.join(os.path.expanduser("~"), ".cache", "prostocks", "scrips"))
+MASTER_URL = os.getenv("PROSTOCKS_SCRIP_MASTER_URL", "https://starapi.prostocks.com/{exch}_symbols.txt.zip")
+EXCHANGES = ("NSE", "NFO", "BSE")
+RETRY_AFTER = 600  # seconds before retrying a failed master download
+
+_FNV_OFFSET = 0xcbf29ce484222325
+_FNV_PRIME = 0x100000001b3
+_MASK64 = 0xffffffffffffffff
+
+
+def _fnv1a(key: bytes) -> int:
+    h = _FNV_OFFSET
+    for b in key:
+        h = ((h ^ b) * _FNV_PRIME) & _MASK64
+    return h
+
+
+# === Download + parse the broker's symbol file ===
+def download_master(exch: str) -> str:
+    import requests  # only needed once a day, when the index is rebuilt
+
+    url = MASTER_URL.format(exch=exch)
+    response = requests.get(url, timeout=30)
+    response.raise_for_status()
+    if url.endswith(".zip"):
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+            names = zf.namelist()
+            if not names:
+                raise zipfile.BadZipFile(f"{url} is an empty archive")
+            return zf.read(names[0]).decode("utf-8", errors="replace")
+    return response.text
+
+
+def parse_master(text: str):
+    """Rows of (tsym, token, lotsize) from an "Exchange,Token,LotSize,Symbol,TradingSymbol,..." file."""
+    rows = []
+    for rec in csv.DictReader(io.StringIO(text)):
+        tsym = (rec.get("TradingSymbol") or "").strip().upper()
+        token = (rec.get("Token") or "").strip()
+        if not tsym or not token.isdigit():
+            continue
+        lot = (rec.get("LotSize") or "1").strip()
+        rows.append((tsym, int(token), int(lot) if lot.isdigit() else 1))
+    return rows
+
+
+# === Build the on-disk index ===
+def build_index(rows, out_dir: str):
+    rows = sorted(set(rows))
+    os.makedirs(out_dir, exist_ok=True)
+    width = max((len(r[0]) for r in rows), default=1)
+    tsym = np.array([r[0].encode() for r in rows], dtype=f"S{width}")
+    token = np.array([r[1] for r in rows], dtype=np.int64)
+    lot = np.array([r[2] for r in rows], dtype=np.int32)
+
+    # Power-of-two table at <= 50% load, linear probing, -1 = empty
+    size = 1 << max(4, (2 * len(rows) - 1).bit_length())
+    mask = size - 1
+    slots = np.full(size, -1, dtype=np.int32)
+    for i, key in enumerate(tsym):
+        h = _fnv1a(key) & mask
+        while slots[h] != -1:
+            h = (h + 1) & mask
+        slots[h] = i
+
+    # Write to temp names then rename, so a reader never sees half an index
+    for name, arr in (("tsym", tsym), ("token", token), ("lot", lot), ("slots", slots)):
+        np.save(os.path.join(out_dir, f"{name}.tmp.npy"), arr)
+        os.replace(os.path.join(out_dir, f"{name}.tmp.npy"), os.path.join(out_dir, f"{name}.npy"))
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump({"count": len(rows), "built": date.today().isoformat()}, f)
+
+
+class ScripIndex:
+    """Memory-mapped view of one exchange's index."""
+
+    def __init__(self, directory: str, exch: str):
+        self.exch = exch
+        self.directory = directory
+        self.tsym = np.load(os.path.join(directory, "tsym.npy"), mmap_mode="r")
+        self.tokens = np.load(os.path.join(directory, "token.npy"), mmap_mode="r")
+        self.lots = np.load(os.path.join(directory, "lot.npy"), mmap_mode="r")
+        self.slots = np.load(os.path.join(directory, "slots.npy"), mmap_mode="r")
+        self.mask = len(self.slots) - 1
+
+    def __len__(self):
+        return len(self.tsym)
+
+    def _row(self, tsym: str):
+        key = tsym.strip().upper().encode()
+        h = _fnv1a(key) & self.mask
+        while True:
+            i = int(self.slots[h])
+            if i == -1:
+                return None
+            if self.tsym[i] == key:
+                return i
+            h = (h + 1) & self.mask
+
+    def token(self, tsym: str):
+        """Exact tsym -> token (as the str the REST API expects), or None."""
+        i = self._row(tsym)
+        return None if i is None else str(int(self.tokens[i]))
+
+    def lot_size(self, tsym: str):
+        i = self._row(tsym)
+        return None if i is None else int(self.lots[i])
+
+    def search(self, text: str, limit: int = 20):
+        """Prefix matches first (binary search), then substring matches (a linear scan)."""
+        q = text.strip().upper().encode()
+        if not q:
+            return []
+        lo = int(np.searchsorted(self.tsym, q, side="left"))
+        hi = int(np.searchsorted(self.tsym, q + b"\xff", side="left"))
+        out = [s.decode() for s in self.tsym[lo:min(hi, lo + limit)]]
+        if len(out) < limit:
+            hits = np.flatnonzero(np.char.find(self.tsym, q) > 0)
+            out.extend(self.tsym[i].decode() for i in hits[:limit - len(out)])
+        return out
+
+
+# === Per-process, once-per-day loading ===
+_indexes = {}
+_failed = {}
+_lock = threading.Lock()  # guards the dicts above; never held across a download
+_build_locks = {}  # exch -> Lock: one download / build per exchange at a time
+
+
+def index_dir(exch: str, day=None) -> str:
+    return os.path.join(CACHE_DIR, (day or date.today()).isoformat(), exch)
+
+
+def _prune(exch: str, keep_day):
+    if not os.path.isdir(CACHE_DIR):
+        return
+    for name in os.listdir(CACHE_DIR):
+        if name != keep_day.isoformat():
+            shutil.rmtree(os.path.join(CACHE_DIR, name, exch), ignore_errors=True)
+
+
+def load_index(exch: str = "NSE", day=None, download: bool = True):
+    """Today's ScripIndex for `exch`, building it from the master file if needed.
+
+    When today's cannot be built, the last index loaded in this process is returned
+    (None if there is none).
+    """
+    exch = exch.upper()
+    day = day or date.today()
+    cached = _indexes.get(exch)
+    if cached is not None and cached[0] == day:
+        return cached[1]
+    with _lock:
+        build_lock = _build_locks.setdefault(exch, threading.Lock())
+    # Single flight per exchange, outside the module lock: other exchanges and cached lookups never wait on
+    # a download, and while one thread rebuilds for a new day the others keep answering from the old index
+    if not build_lock.acquire(blocking=cached is None):
+        return cached[1]
+    try:
+        cached = _indexes.get(exch)
+        if cached is not None and cached[0] == day:
+            return cached[1]
+        stale = cached[1] if cached is not None else None
+        directory = index_dir(exch, day)
+        if not os.path.exists(os.path.join(directory, "meta.json")):
+            if not download or time.monotonic() - _failed.get(exch, -RETRY_AFTER) < RETRY_AFTER:
+                return stale
+            try:
+                build_index(parse_master(download_master(exch)), directory)
+                _prune(exch, day)
+                log.info("✅ Scrip master for %s indexed in %s", exch, directory)
+            except (zipfile.BadZipFile, OSError) as e:  # requests' RequestException is an OSError
+                log.error("❌ Could not build scrip master for %s: %s", exch, e)
+                with _lock:
+                    _failed[exch] = time.monotonic()
+                if stale is not None:
+                    log.warning("⚠️ Serving the %s scrip master from %s until a rebuild succeeds", exch, cached[0])
+                return stale
+        index = ScripIndex(directory, exch)
+        with _lock:
+            _indexes[exch] = (day, index)
+        return index
+    finally:
+        build_lock.release()
+
+
+def get_token(symbol: str, exch: str = "NSE"):
+    """tsym -> token from the local index; bare cash symbols also try the -EQ series."""
+    index = load_index(exch)
+    if index is None:
+        return None
+    token = index.token(symbol)
+    if token is None and exch.upper() in ("NSE", "BSE") and "-" not in symbol:
+        token = index.token(f"{symbol}-EQ")
+    return token
+
+
+def search(text: str, exch: str = "NSE", limit: int = 20):
+    index = load_index(exch)
+    return index.search(text, limit) if index is not None else []
+
+
+if __name__ == "__main__":
+    # Pre-build today's indexes, e.g. from a cron job before the open
+    for exch in EXCHANGES:
+        index = load_index(exch)
+        print(f"{exch}: {len(index) if index is not None else 'unavailable'} instruments")
@@ -0,0 +1,134 @@
+# strategy_rules.py
+# Entry / exit / sizing rules over TradingEngine's `stock_data` vocabulary, as
+# plain functions so the scanner, the engine runtime and the backtester all
+# evaluate the same thing.  Scalar forms take one symbol's `indicators` dict;
+# the *_vec forms take IndicatorEngine.signals() arrays for a whole universe.
+#
+#   Buy   atr_trail Buy, tkp_trm Buy, macd_hist > 0, close above the PAC band,
+#         volatility >= min_vol_required
+#   Sell  atr_trail Sell, tkp_trm Sell, macd_hist < 0, close below the PAC band,
+#         volatility >= min_vol_required
+#   Size  qcfg tier by price (Q1 cheapest ... Q6 dearest), capped by balance
+#   Stop  the opposite PAC band; target at REWARD_RISK x the stop distance
+#   Exit  stop or target touched, atr_trail flips against the position,
+#         or auto_exit_time reached
+
+import numpy as np
+
+# Upper price bound of each quantity tier; above the last bound is Q6
+QTY_TIER_BOUNDS = (100.0, 250.0, 500.0, 1000.0, 2500.0)
+QTY_TIERS = ("Q1", "Q2", "Q3", "Q4", "Q5", "Q6")
+DEFAULT_QCFG = {"Q1": 100, "Q2": 80, "Q3": 60, "Q4": 40, "Q5": 30, "Q6": 20}
+REWARD_RISK = 2.0
+
+BUY, FLAT, SELL = 1, 0, -1
+SIDE_NAMES = {BUY: "Buy", SELL: "Sell"}
+
+
+# === Time windows (datetime.time values from dashboard_logic.load_settings) ===
+def can_enter(now, settings):
+    start = settings.get("trading_start")
+    cutoff = settings.get("cutoff_time") or settings.get("trading_end")
+    return (start is None or now >= start) and (cutoff is None or now < cutoff)
+
+
+def must_exit(now, settings):
+    auto_exit = settings.get("auto_exit_time")
+    return auto_exit is not None and now >= auto_exit
+
+
+# === One symbol ===
+def entry_side(indicators, price):
+    """BUY / SELL / FLAT for one symbol's indicators dict."""
+    ind = indicators
+    if ind.get("volatility", 0.0) < ind.get("min_vol_required", 0.0):
+        return FLAT
+    if ind.get("atr_trail") == "Buy" and ind.get("tkp_trm") == "Buy" and ind.get("macd_hist", 0) > 0 \
+            and ind.get("above_pac"):
+        return BUY
+    if ind.get("atr_trail") == "Sell" and ind.get("tkp_trm") == "Sell" and ind.get("macd_hist", 0) < 0 \
+            and price < ind.get("pac_band_lower", -np.inf):
+        return SELL
+    return FLAT
+
+
+def quantity(price, qcfg=None, balance=None):
+    qcfg = qcfg or DEFAULT_QCFG
+    tier = QTY_TIERS[int(np.searchsorted(QTY_TIER_BOUNDS, price, side="right"))]
+    qty = int(qcfg.get(tier, 0))
+    if balance is not None and price > 0:
+        qty = min(qty, int(balance // price))
+    return max(qty, 0)
+
+
+def stop_and_target(side, price, indicators):
+    if side == BUY:
+        sl = indicators.get("pac_band_lower", price)
+        sl = sl if sl < price else price * 0.99
+        return sl, price + REWARD_RISK * (price - sl)
+    sl = indicators.get("pac_band_upper", price)
+    sl = sl if sl > price else price * 1.01
+    return sl, price - REWARD_RISK * (sl - price)
+
+
+def evaluate(symbol, price, indicators, qcfg=None, balance=None, time=None, **_):
+    """Entry decision for one `stock_data` dict (extra keys ignored); None when there is nothing to do."""
+    side = entry_side(indicators, price)
+    if side == FLAT:
+        return None
+    qty = quantity(price, qcfg, balance)
+    if qty <= 0:
+        return None
+    sl, tgt = stop_and_target(side, price, indicators)
+    return {"symbol": symbol, "side": SIDE_NAMES[side], "price": price, "qty": qty,
+            "sl": round(sl, 2), "tgt": round(tgt, 2), "time": time}
+
+
+def exit_reason(position, price, indicators, high=None, low=None):
+    """Why an open position should close now, or None. position has side ("Buy"/"Sell"), sl, tgt."""
+    high = price if high is None else high
+    low = price if low is None else low
+    if position["side"] == "Buy":
+        if low <= position["sl"]:
+            return "stop"
+        if high >= position["tgt"]:
+            return "target"
+        if indicators.get("atr_trail") == "Sell":
+            return "trail"
+    else:
+        if high >= position["sl"]:
+            return "stop"
+        if low <= position["tgt"]:
+            return "target"
+        if indicators.get("atr_trail") == "Buy":
+            return "trail"
+    return None
+
+
+# === Whole universe (arrays from IndicatorEngine.signals()) ===
+def entry_side_vec(signals, close, min_vol_required):
+    """int8 array of BUY / SELL / FLAT, one per symbol; NaN inputs come out FLAT."""
+    vol_ok = signals["volatility"] >= min_vol_required
+    buy = (signals["atr_trail"] == "Buy") & (signals["tkp_trm"] == "Buy") & (signals["macd_hist"] > 0) \
+        & signals["above_pac"] & vol_ok
+    sell = (signals["atr_trail"] == "Sell") & (signals["tkp_trm"] == "Sell") & (signals["macd_hist"] < 0) \
+        & (close < signals["pac_band_lower"]) & vol_ok
+    return np.where(buy, BUY, np.where(sell, SELL, FLAT)).astype(np.int8)
+
+
+def quantity_vec(price, qcfg=None, balance=None):
+    qcfg = qcfg or DEFAULT_QCFG
+    table = np.array([qcfg.get(t, 0) for t in QTY_TIERS], dtype=np.int64)
+    qty = table[np.searchsorted(QTY_TIER_BOUNDS, price, side="right")]
+    if balance is not None:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            afford = np.where(price > 0, np.floor(balance / price), 0).astype(np.int64)
+        qty = np.minimum(qty, afford)
+    return np.maximum(qty, 0)
+
+
+def stop_and_target_vec(side, price, pac_lower, pac_upper):
+    sl = np.where(side == BUY, np.where(pac_lower < price, pac_lower, price * 0.99),
+                  np.where(pac_upper > price, pac_upper, price * 1.01))
+    tgt = price + REWARD_RISK * (price - sl)
+    return sl, tgt
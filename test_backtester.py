@@ -0,0 +1,34 @@
+# test_backtester.py
+# SimBroker round-trip pairing and --sweep value parsing.
+
+import pytest
+
+from backtester import SimBroker, _parse_sweep
+
+
+def _pnl(fills, cost_bps=0.0):
+    broker = SimBroker()
+    broker.fills = [(i, sym, q, px) for i, (sym, q, px) in enumerate(fills)]
+    return broker.trade_pnl(cost_bps)
+
+
+def test_round_trips_follow_the_running_position():
+    assert _pnl([("A", 10, 100.0), ("A", -10, 110.0)]) == [100.0]
+    # Scale in, then out in two parts: one trip at the average entry
+    assert _pnl([("A", 10, 100.0), ("A", 10, 110.0), ("A", -5, 120.0), ("A", -15, 90.0)]) == [75.0 - 225.0]
+    # A reversal closes the long and opens a short at the same fill
+    assert _pnl([("A", 10, 100.0), ("A", -20, 90.0), ("A", 10, 80.0)]) == [-100.0, 100.0]
+    # Interleaved symbols don't pair with each other
+    assert _pnl([("A", 5, 10.0), ("B", -5, 20.0), ("A", -5, 12.0), ("B", 5, 18.0)]) == [10.0, 10.0]
+
+
+def test_round_trip_costs_charge_every_fill():
+    assert _pnl([("A", 10, 100.0), ("A", -10, 100.0)], cost_bps=10) == [pytest.approx(-2.0)]
+    assert _pnl([("A", 10, 100.0), ("A", -20, 100.0), ("A", 10, 100.0)], cost_bps=10) == \
+        [pytest.approx(-2.0), pytest.approx(-2.0)]
+
+
+def test_sweep_parses_negative_and_exponent_numbers():
+    sets = _parse_sweep(["tsi_offset=-1.5,2,1e-3", "qcfg=fixed"])
+    assert [s["tsi_offset"] for s in sets] == [-1.5, 2.0, 0.001]
+    assert all(s["qcfg"] == "fixed" for s in sets)
@@ -0,0 +1,98 @@
+# test_candle_store.py
+# CandleStore day files: only whole days are persisted, and a reload fetches
+# whatever the disk does not cover.
+
+import os
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import candle_store
+from candle_store import IST, CandleStore
+
+NOW = datetime(2026, 10, 14, 10, 0, tzinfo=IST).timestamp()  # a Wednesday, mid-session
+
+
+class _Api:
+    """TPSeries over 5m bars 09:15-15:30 IST on weekdays, up to NOW."""
+
+    def __init__(self):
+        self.calls = []
+
+    @staticmethod
+    def bars(start, end):
+        out = []
+        day = datetime.fromtimestamp(start, IST).replace(hour=0, minute=0, second=0)
+        while day.timestamp() <= end:
+            if day.weekday() < 5:
+                t0 = day.replace(hour=9, minute=15).timestamp()
+                for k in range(76):
+                    t = int(t0) + 300 * k
+                    if start <= t <= end and t <= NOW:
+                        out.append(t)
+            day = datetime.fromtimestamp(day.timestamp() + 86400, IST)
+        return out
+
+    def get_time_price_series(self, exchange, token, starttime, endtime=None, interval="5"):
+        self.calls.append((int(starttime), endtime))
+        ts = self.bars(int(starttime), int(endtime or NOW))
+        if not ts:
+            return {"stat": "Not_Ok", "emsg": "no data"}
+        return [{"stat": "Ok", "ssboe": str(t), "into": "1", "inth": "2", "intl": "0.5", "intc": str(t % 997),
+                 "intv": "10"} for t in reversed(ts)]
+
+
+class _FixedDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return datetime.fromtimestamp(NOW, tz)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    monkeypatch.setattr(candle_store, "time", SimpleNamespace(time=lambda: NOW))
+    monkeypatch.setattr(candle_store, "datetime", _FixedDatetime)
+
+
+def _files(tmp_path):
+    path = tmp_path / "NSE" / "2885" / "5m"
+    return sorted(os.listdir(path)) if path.is_dir() else []
+
+
+def test_partial_day_is_not_persisted(tmp_path, clock):
+    store = CandleStore(_Api(), cache_dir=str(tmp_path))
+    bars = store.get(2885, "5", days=1)
+    assert bars.t[0] == datetime(2026, 10, 13, 10, 0, tzinfo=IST).timestamp()
+    assert _files(tmp_path) == []  # Tuesday from 10:00 on only
+
+    store.get(2885, "5", days=3)  # from Sunday 10:00: Monday and Tuesday are now whole
+    assert _files(tmp_path) == ["2026-10-12.npy", "2026-10-13.npy"]
+    tuesday = np.load(tmp_path / "NSE" / "2885" / "5m" / "2026-10-13.npy")
+    assert tuesday.shape == (6, 76) and tuesday[0, 0] == datetime(2026, 10, 13, 9, 15, tzinfo=IST).timestamp()
+
+
+def test_reload_fetches_only_what_disk_lacks(tmp_path, clock):
+    expected = CandleStore(_Api(), cache_dir=str(tmp_path)).get(2885, "5", days=3)
+
+    api = _Api()
+    again = CandleStore(api, cache_dir=str(tmp_path)).get(2885, "5", days=3)
+    assert np.array_equal(np.asarray(again.t), np.asarray(expected.t))
+    # Nothing before Monday's first bar but the weekend, and today's bars after Tuesday's last
+    monday = datetime(2026, 10, 12, 9, 15, tzinfo=IST).timestamp()
+    assert all(end is not None and end < monday for start, end in api.calls[:-1])
+    assert api.calls[-1][0] == datetime(2026, 10, 13, 15, 30, tzinfo=IST).timestamp()
+
+
+def test_gap_in_day_files_is_refetched(tmp_path, clock):
+    expected = CandleStore(_Api(), cache_dir=str(tmp_path)).get(2885, "5", days=3)
+    path = tmp_path / "NSE" / "2885" / "5m"
+    os.remove(path / "2026-10-12.npy")
+    np.save(path / "2026-10-11.tmp.npy", np.zeros((6, 3)))  # a writer died mid-save
+
+    api = _Api()
+    again = CandleStore(api, cache_dir=str(tmp_path)).get(2885, "5", days=3)
+    assert np.array_equal(np.asarray(again.t), np.asarray(expected.t))
+    assert api.calls[0][1] == datetime(2026, 10, 13, 9, 15, tzinfo=IST).timestamp() - 1
+    assert "2026-10-12.npy" in _files(tmp_path)
@@ -0,0 +1,85 @@
+# test_engine_runtime.py
+# EngineRuntime bar handling against an in-memory candle store.
+
+import asyncio
+from datetime import datetime
+from datetime import time as dtime
+
+import numpy as np
+import pytest
+
+import scrip_master
+from candle_store import IST, Candles
+from engine_runtime import EngineRuntime
+
+TOKENS = {"AAA-EQ": "1", "BBB-EQ": "2", "CCC-EQ": "3"}
+SETTINGS = {"master_auto": False, "trading_start": dtime(0, 0), "trading_end": dtime(23, 59),
+            "min_vol_required": 0.1}
+# Four sessions of 75 five-minute bars
+START = datetime(2026, 10, 12, 9, 15, tzinfo=IST).timestamp()
+TIMES = np.array([START + d * 86400 + 300 * i for d in range(4) for i in range(75)])
+
+
+class Store:
+    """Serves bars up to `now`, including the one still forming; CCC-EQ starts trading 100 bars late."""
+
+    def __init__(self):
+        rng = np.random.default_rng(1)
+        self.close = {tok: 100 * np.exp(np.cumsum(rng.normal(0, 0.003, len(TIMES)))) for tok in TOKENS.values()}
+        self.now = None
+
+    def get(self, token, interval="5", days=5, exchange="NSE"):
+        n = int(np.searchsorted(TIMES, self.now, side="left")) + 1
+        first = 100 if token == "3" else 0
+        c, t = self.close[token][first:n], TIMES[first:n]
+        return Candles(t, c, c * 1.004, c * 0.996, c, np.ones(len(c)))
+
+
+@pytest.fixture(autouse=True)
+def tokens(monkeypatch):
+    monkeypatch.setattr(scrip_master, "get_token", lambda symbol, exchange="NSE": TOKENS.get(symbol))
+
+
+def runtime(store):
+    rt = EngineRuntime(None, list(TOKENS), settings=SETTINGS, candle_store=store)
+    rt._resolve_tokens()
+    return rt
+
+
+async def close_bars(rt, store, bars):
+    rt.loop = asyncio.get_running_loop()
+    for k in bars:
+        store.now = TIMES[k]
+        await rt.on_bar_close(datetime.fromtimestamp(TIMES[k], IST))
+    return rt.state.snapshot()["indicators"]
+
+
+def test_incremental_indicators_match_a_fresh_seed():
+    store = Store()
+    live = runtime(store)
+    # Bar closes with gaps, and one symbol that only gets bars partway through
+    bars = list(range(60, 240, 7))
+    incremental = asyncio.run(close_bars(live, store, bars))
+    seeded = asyncio.run(close_bars(runtime(store), store, bars[-1:]))
+    assert incremental.keys() == seeded.keys() == set(TOKENS)
+    for symbol, fields in seeded.items():
+        for name, value in fields.items():
+            assert incremental[symbol][name] == pytest.approx(value, rel=1e-9), (symbol, name)
+
+
+def test_forming_bar_is_not_fed():
+    store = Store()
+    rt = runtime(store)
+    asyncio.run(close_bars(rt, store, [80]))
+    # The bar starting at the close time is still forming: the last one used is the bar before it
+    assert rt.ind_t["AAA-EQ"] == TIMES[79]
+    assert rt.state.snapshot()["prices"]["AAA-EQ"] == store.close["1"][79]
+
+
+def test_day_refs_follow_the_session():
+    store = Store()
+    rt = runtime(store)
+    asyncio.run(close_bars(rt, store, [80]))
+    day, y_close, day_open = rt.day_refs["AAA-EQ"]
+    assert day.isoformat() == "2026-10-13"
+    assert y_close == store.close["1"][74] and day_open == store.close["1"][75]
@@ -0,0 +1,96 @@
+# test_indicator_engine.py
+# Incremental indicator state against a batch recompute of the same filters.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicator_engine import DEFAULT_PARAMS, OUTPUTS, IndicatorEngine
+
+N_BARS = 300
+
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, (3, N_BARS)), axis=1))
+    spread = np.abs(rng.normal(0, 0.003, (3, N_BARS)))
+    return close * (1 + spread), close * (1 - spread), close
+
+
+def _ema(x, alpha):
+    return pd.Series(x).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def _batch(high, low, close, p=DEFAULT_PARAMS):
+    """The engine's indicators for one symbol, recomputed over the whole series with pandas."""
+    a = lambda n: 2.0 / (n + 1.0)
+    pc = np.concatenate(([close[0]], close[:-1]))
+    macd = _ema(close, a(p["macd_fast"])) - _ema(close, a(p["macd_slow"]))
+    tr = np.maximum(high - low, np.maximum(np.abs(high - pc), np.abs(low - pc)))
+    change = close - pc
+    gain = _ema(np.maximum(change, 0.0), 1.0 / p["rsi_period"])
+    loss = _ema(np.maximum(-change, 0.0), 1.0 / p["rsi_period"])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(loss == 0, 100.0, 100.0 - 100.0 / (1.0 + gain / loss))
+    rsi[(gain == 0) & (loss == 0)] = 50.0
+    mom = _ema(_ema(change, a(p["tsi_long"])), a(p["tsi_short"]))
+    absm = _ema(_ema(np.abs(change), a(p["tsi_long"])), a(p["tsi_short"]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tsi = np.where(absm > 0, 100.0 * mom / absm, 0.0)
+    return {
+        "macd_hist": macd - _ema(macd, a(p["macd_signal"])),
+        "pac_band_upper": _ema(high, a(p["pac_period"])),
+        "pac_band_lower": _ema(low, a(p["pac_period"])),
+        "atr": _ema(tr, 1.0 / p["atr_period"]),
+        "rsi": rsi,
+        "tsi": tsi,
+        "tsi_signal": _ema(tsi, a(p["tsi_signal"])),
+    }
+
+
+def test_run_matches_batch_recompute(bars):
+    high, low, close = bars
+    out = IndicatorEngine(["A", "B", "C"]).run(high, low, close)
+    for i in range(3):
+        expected = _batch(high[i], low[i], close[i])
+        for name, series in expected.items():
+            np.testing.assert_allclose(out[name][i], series, rtol=1e-9, atol=1e-9, err_msg=name)
+
+
+def test_update_after_seed_matches_full_run(bars):
+    high, low, close = bars
+    full = IndicatorEngine(["A", "B", "C"]).run(high, low, close)
+
+    live = IndicatorEngine(["A", "B", "C"])
+    live.run(high[:, :200], low[:, :200], close[:, :200])
+    for j in range(200, N_BARS):
+        live.update(high[:, j], low[:, j], close[:, j])
+        for name in OUTPUTS:
+            np.testing.assert_allclose(live.value(name), full[name][:, j], rtol=1e-12, err_msg=name)
+
+
+def test_missing_bar_leaves_symbol_untouched(bars):
+    high, low, close = bars
+    engine = IndicatorEngine(["A", "B", "C"])
+    engine.run(high[:, :100], low[:, :100], close[:, :100])
+    before = {name: engine.value(name).copy() for name in OUTPUTS}
+
+    h, l, c = high[:, 100].copy(), low[:, 100].copy(), close[:, 100].copy()
+    h[1] = l[1] = c[1] = np.nan
+    engine.update(h, l, c)
+    for name in OUTPUTS:
+        assert engine.value(name)[1] == before[name][1], name
+        assert engine.value(name)[0] != before[name][0], name
+    assert engine.bars.tolist() == [101, 100, 101]
+
+
+def test_late_listing_matches_its_own_history(bars):
+    high, low, close = bars
+    late = close.copy()
+    late[2, :50] = np.nan
+    out = IndicatorEngine(["A", "B", "C"]).run(high, low, late)
+
+    alone = IndicatorEngine(["C"]).run(high[2:, 50:], low[2:, 50:], close[2:, 50:])
+    for name in OUTPUTS:
+        np.testing.assert_allclose(out[name][2, 50:], alone[name][0], rtol=1e-12, err_msg=name)
@@ -0,0 +1,80 @@
+# test_market_feed.py
+# MarketFeed against FakeNorenWS, and TickRing on its own.
+
+import numpy as np
+import pytest
+
+from conftest import wait_for
+from market_feed import MarketFeed, TickRing
+
+
+@pytest.fixture
+def feed(ws_server, ws_api):
+    feed = MarketFeed(ws_api, ws_url=ws_server.url, capacity=8, reconnect_delay=0.05).start()
+    assert feed.wait_connected(5)
+    yield feed
+    feed.stop()
+
+
+def test_ticks_reach_the_ring(ws_server, feed):
+    feed.subscribe(["10001", "10002"])
+    wait_for(lambda: ws_server.subscribers("NSE", "10002") == 1)
+    ws_server.push_tick("NSE", "10001", lp="101.50", v="10")
+    ws_server.push_tick("NSE", "10001", bp1="101.45")  # partial update keeps lp
+    wait_for(lambda: (feed.latest("10001") or {}).get("bp1") == 101.45)
+    row = feed.latest("10001")
+    assert row["lp"] == 101.5 and row["bp1"] == 101.45 and row["v"] == 10
+    assert feed.ltp("10002") is None
+
+
+def test_reconnect_resubscribes(ws_server, feed):
+    feed.subscribe(["10001"])
+    feed.subscribe(["10002"], depth=True)
+    wait_for(lambda: ws_server.subscribers("NSE", "10001") == 1)
+    ws_server.drop_all()
+    wait_for(lambda: feed.reconnects >= 1 and ws_server.subscribers("NSE", "10001") == 1)
+    wait_for(lambda: ws_server.subscribers("NSE", "10002") == 1)
+    assert ws_server.logins >= 2
+    ws_server.push_tick("NSE", "10001", lp="123.45")
+    wait_for(lambda: feed.ltp("10001") == 123.45)
+
+
+def test_unsubscribed_symbol_is_not_replayed(ws_server, feed):
+    feed.subscribe(["10001", "10002"])
+    wait_for(lambda: ws_server.subscribers("NSE", "10002") == 1)
+    feed.unsubscribe(["10002"])
+    wait_for(lambda: ws_server.subscribers("NSE", "10002") == 0)
+    ws_server.drop_all()
+    wait_for(lambda: feed.reconnects >= 1 and ws_server.subscribers("NSE", "10001") == 1)
+    assert ws_server.subscribers("NSE", "10002") == 0
+
+
+def test_ring_wraps_oldest_first():
+    ring = TickRing(capacity=4)
+    for i in range(10):
+        ring.write("NSE|1", float(i), {"lp": 100 + i})
+    ts, data = ring.history("NSE|1")
+    assert ts.tolist() == [6.0, 7.0, 8.0, 9.0]
+    assert data[:, ring.col["lp"]].tolist() == [106, 107, 108, 109]
+    ts, _ = ring.history("NSE|1", n=2)
+    assert ts.tolist() == [8.0, 9.0]
+    assert ring.latest("NSE|1")["lp"] == 109
+
+
+def test_ring_partial_history_before_wrap():
+    ring = TickRing(capacity=4)
+    ring.write("NSE|1", 1.0, {"lp": "5"})
+    ts, data = ring.history("NSE|1")
+    assert ts.tolist() == [1.0] and data.shape == (1, len(ring.fields))
+    assert ring.history("NSE|2")[0].size == 0
+
+
+def test_ring_allocates_per_subscribed_symbol():
+    ring = TickRing(capacity=16, max_symbols=2)
+    assert ring.data == []
+    ring.slot("NSE|1")
+    assert len(ring.data) == 1 and ring.data[0].shape == (16, len(ring.fields))
+    assert np.isnan(ring.data[0]).all()
+    ring.slot("NSE|2")
+    with pytest.raises(ValueError):
+        ring.slot("NSE|3")
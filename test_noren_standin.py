@@ -0,0 +1,104 @@
+# test_noren_standin.py
+# Sessions and fault injection in the Noren stand-in, and the load-test suite on top of it.
+
+import json
+import time
+
+import requests
+
+import bench_suite
+import noren_standin
+from noren_standin import NorenStandIn, parse_body
+
+
+def _login(standin, uid="TEST01"):
+    return standin.handle("QuickAuth", {"uid": uid, "pwd": "x"}, "")["susertoken"]
+
+
+def test_parse_body_raw_and_urlencoded():
+    raw = 'jData={"uid":"A","remarks":"a&jKey=b"}&jKey=tok'
+    assert parse_body(raw) == ({"uid": "A", "remarks": "a&jKey=b"}, "tok")
+    assert parse_body("jData=%7B%22uid%22%3A%22A%22%7D&jKey=tok") == ({"uid": "A"}, "tok")
+    assert parse_body('jData={"uid":"A"}') == ({"uid": "A"}, "")
+
+
+def test_every_endpoint_but_login_needs_a_live_session():
+    standin = NorenStandIn(symbols=5)
+    assert standin.handle("OrderBook", {}, "nope")["emsg"] == NorenStandIn.SESSION_EXPIRED
+    assert standin.handle("QuickAuth", {"uid": "TEST01"}, "")["stat"] == "Not_Ok"
+
+    token = _login(standin)
+    assert standin.handle("GetQuotes", {"token": "10001"}, token)["stat"] == "Ok"
+    standin.expire_sessions()
+    assert standin.handle("GetQuotes", {"token": "10001"}, token)["emsg"] == NorenStandIn.SESSION_EXPIRED
+    assert standin.expired_rejections == 2
+
+
+def test_session_ttl():
+    standin = NorenStandIn(symbols=5, session_ttl=60)
+    token = _login(standin)
+    assert standin.handle("OrderBook", {}, token)["emsg"] == "no data"
+    uid, issued = standin.sessions[token]
+    standin.sessions[token] = (uid, issued - 61)
+    assert standin.handle("OrderBook", {}, token)["emsg"] == NorenStandIn.SESSION_EXPIRED
+
+
+def test_order_lifecycle_and_rate_cap():
+    standin = NorenStandIn(symbols=5, order_rate_cap=2)
+    token = _login(standin)
+    spec = {"tsym": "SYM0001-EQ", "qty": "1", "prc": "100", "prctyp": "LMT"}
+    first = standin.handle("PlaceOrder", spec, token)["norenordno"]
+    assert standin.handle("ModifyOrder", {"norenordno": first, "prc": "101"}, token)["stat"] == "Ok"
+    resp = standin.handle("CancelOrder", {"norenordno": first}, token)
+    assert resp["emsg"].startswith("Too many requests")
+    assert standin.throttled == 1
+
+    standin.order_times = [t - 1.0 for t in standin.order_times]
+    assert standin.handle("CancelOrder", {"norenordno": first}, token)["stat"] == "Ok"
+    assert standin.handle("CancelOrder", {"norenordno": first}, token)["emsg"] == f"Order {first} not open"
+    assert standin.orders[first]["status"] == "CANCELED" and standin.orders[first]["prc"] == "101"
+
+
+def test_injected_errors_are_seeded():
+    def outcomes(seed):
+        standin = NorenStandIn(symbols=5, error_rate=0.3, seed=seed)
+        return [standin.handle("QuickAuth", {"uid": "A", "pwd": "x"}, "")["stat"] for _ in range(50)], standin
+
+    first, standin = outcomes(3)
+    again, _ = outcomes(3)
+    assert first == again
+    assert standin.injected_errors == first.count("Not_Ok") > 0
+
+
+def test_http_502_over_the_wire():
+    server, standin, base_url = noren_standin.serve(http_error_rate=1.0)
+    try:
+        body = "jData=" + json.dumps({"uid": "TEST01", "pwd": "x"})
+        resp = requests.post(f"{base_url}/QuickAuth", data=body, timeout=5)
+        assert resp.status_code == 502 and resp.json() == {"error": "Bad Gateway"}
+        assert standin.injected_errors == 1 and standin.requests == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_latency_is_added_per_request():
+    standin = NorenStandIn(symbols=5, latency=0.02)
+    start = time.perf_counter()
+    _login(standin)
+    assert time.perf_counter() - start >= 0.02
+
+
+def test_suite_runs_and_flags_regressions(rest_server, capsys):
+    _, base_url = rest_server
+    results = bench_suite.run_suite(base_url, ops=20, basket=5)
+    rows = {r["name"]: r for r in results}
+    assert list(rows) == ["login", "place_order", "modify_order", "cancel_order", "order_book", "trade_book",
+                          "place_orders x5"]
+    assert all(r["ok"] == r["n"] for r in results)
+    assert rows["modify_order"]["n"] == 20
+
+    baseline = [dict(r, ops_per_s=r["ops_per_s"] * 2) for r in results]
+    assert bench_suite.report(results, baseline, tolerance=0.2) == list(rows)
+    assert bench_suite.report(results, results, tolerance=0.2) == []
+    assert "vs baseline" in capsys.readouterr().out
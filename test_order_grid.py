@@ -0,0 +1,101 @@
+# test_order_grid.py
+# Order grid filtering and paging, plus the grid and order panel in a headless AppTest run.
+
+from streamlit.testing.v1 import AppTest
+
+from bench_dashboard_render import fake_book
+from order_grid import GRID_COLUMNS, order_frame, order_ids
+
+
+def test_store_indexes_match_a_scan():
+    snap, store = fake_book(500)
+    for statuses, symbol in [((), None), (("OPEN",), None), (("OPEN", "REJECTED"), "SYM007-EQ"),
+                             ((), "SYM012-EQ"), (("COMPLETE",), "All")]:
+        assert order_ids(snap.orders, store, statuses, symbol) == order_ids(snap.orders, None, statuses, symbol)
+
+
+def test_filters_and_newest_first():
+    snap, store = fake_book(500)
+    ids = order_ids(snap.orders, store, ("OPEN",), "SYM007-EQ")
+    assert ids and all(snap.orders[i]["status"] == "OPEN" and snap.orders[i]["tsym"] == "SYM007-EQ" for i in ids)
+    assert ids == sorted(ids, key=int, reverse=True)
+    # Longer order numbers are newer even when they sort lower as text
+    orders = {"9": {}, "10": {}, "100": {}}
+    assert order_ids(orders) == ["100", "10", "9"]
+
+
+def test_ids_missing_from_the_snapshot_are_dropped():
+    snap, store = fake_book(10)
+    orders = dict(snap.orders)
+    gone = orders.popitem()[0]
+    assert gone not in order_ids(orders, store)
+
+
+def test_frame_has_only_the_page():
+    snap, _ = fake_book(500)
+    ids = order_ids(snap.orders)[:50]
+    df = order_frame(snap.orders, ids, added={ids[0]}, changed={ids[1]})
+    assert list(df.columns) == [""] + list(GRID_COLUMNS)
+    assert len(df) == 50 and df["norenordno"].tolist() == ids
+    assert df[""].tolist()[:3] == ["🆕", "✏️", ""]
+
+
+def grid_app(n):
+    from bench_dashboard_render import fake_book
+    from order_grid import order_grid
+
+    import streamlit as st
+
+    snap, store = fake_book(n)
+    order_grid(snap, store, st.session_state.get("api"))
+
+
+class Api:
+    userid = "TEST01"
+
+    def __init__(self):
+        self.calls = []
+
+    def cancel_order(self, **kwargs):
+        self.calls.append(kwargs)
+        return {"stat": "Ok", "result": kwargs["norenordno"]}
+
+
+def test_pages_and_clamp():
+    at = AppTest.from_function(grid_app, args=(500,), default_timeout=30)
+    at.run()
+    assert not at.exception
+    assert at.caption[0].value == "Showing 50 of 500 matching · 500 total"
+    assert len(at.dataframe[0].value) == 50
+
+    at.selectbox(key="orders_size").set_value(200).run()
+    at.number_input(key="orders_page").set_value(3).run()
+    assert at.caption[0].value == "Showing 100 of 500 matching · 500 total"
+
+    # A filter with fewer pages pulls the page number back into range
+    at.multiselect(key="orders_status").set_value(["REJECTED"]).run()
+    rejected = sum(o["status"] == "REJECTED" for o in fake_book(500)[0].orders.values())
+    assert at.number_input(key="orders_page").value == 1
+    assert at.caption[0].value == f"Showing {rejected} of {rejected} matching · 500 total"
+
+
+def test_panel_cancels_the_selected_order():
+    snap, store = fake_book(500)
+    ordno = next(i for i in order_ids(snap.orders, store, ("OPEN",)))
+    closed = next(i for i in order_ids(snap.orders, store, ("COMPLETE",)))
+    api = Api()
+    at = AppTest.from_function(grid_app, args=(500,), default_timeout=30)
+    at.session_state["api"] = api
+    at.session_state["orders_selected"] = closed
+    at.run()
+    assert not at.exception
+    assert not [b for b in at.button if b.key == "orders_cancel"]
+
+    at.session_state["orders_selected"] = ordno
+    at.run()
+    at.button(key="orders_cancel").click().run()
+    assert api.calls == [{"norenordno": ordno, "uid": "TEST01"}]
+    assert at.success[0].value.endswith(f"Order Cancelled: {ordno}")
+
+    at.button(key="orders_close").click().run()
+    assert "orders_selected" not in at.session_state
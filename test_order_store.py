@@ -0,0 +1,58 @@
+# test_order_store.py
+# OrderStore against full order_book() snapshots, and OrderBookService's
+# listener-before-publish ordering.
+
+from order_store import OrderStore
+from orderbook_service import OrderBookService
+
+
+def _order(no, status="OPEN", tsym="SBIN-EQ", tag=""):
+    return {"norenordno": no, "status": status, "tsym": tsym, "remarks": tag, "qty": "1"}
+
+
+def test_full_snapshot_drops_missing_orders():
+    store = OrderStore()
+    store.apply_order_book([_order("1", tag="s1"), _order("2"), _order("3", tsym="TCS-EQ")])
+    store.apply_trade_book([{"norenordno": "2", "flid": "9", "tsym": "SBIN-EQ"}])
+
+    assert store.apply_order_book([_order("1", tag="s1"), _order("3", tsym="TCS-EQ")]) == 0
+    assert len(store) == 3  # a partial list never removes anything
+
+    assert store.apply_order_book([_order("1", "COMPLETE", tag="s1")], full=True) == 3
+    assert set(store.orders) == {"1"}
+    assert store.open_ids() == set()
+    assert store.symbols() == ["SBIN-EQ"]
+    assert store.counts_by_status() == {"COMPLETE": 1}
+    assert store.ids(tag="s1") == {"1"}
+    assert len(store.fills("2")) == 1  # fills outlive the order row
+
+    assert store.apply_order_book({"stat": "Ok", "orders": []}, full=True) == 1
+    assert len(store) == 0 and not store.by_status and not store.by_symbol_status
+
+
+class _Api:
+    def __init__(self):
+        self.orders = [_order("1"), _order("2")]
+
+    def order_book(self):
+        return {"stat": "Ok", "orders": list(self.orders)}
+
+
+def test_listeners_run_before_snapshot_is_published():
+    api, store = _Api(), OrderStore()
+    service = OrderBookService(api)
+    seen = []
+
+    def listener(snap, orders):
+        store.apply_order_book(orders, full=True)
+        seen.append(service.snapshot().version)
+
+    service.on_refresh(listener)
+    first = service.refresh()
+    assert seen == [0] and first.version == 1
+    assert service.snapshot() is first and set(store.orders) == set(first.orders)
+
+    api.orders = [_order("2", "CANCELED")]
+    second = service.refresh()
+    assert seen == [0, 1] and second.removed == {"1"}
+    assert set(store.orders) == set(second.orders) == {"2"}
@@ -0,0 +1,71 @@
+# test_paper_exchange.py
+# PaperExchange books: lazy deletion under cancels and re-prices, time
+# priority, compaction and self-trade prevention.
+
+
+def _sell(px, prc, qty=10, uid="MM"):
+    return px.place_order("S", "I", "NSE", "SBIN-EQ", qty, 0, "LMT", price=prc, uid=uid)["norenordno"]
+
+
+def _buy(px, prc, qty=10, uid=None, price_type="LMT"):
+    return px.place_order("B", "I", "NSE", "SBIN-EQ", qty, 0, price_type, price=prc, uid=uid)["norenordno"]
+
+
+def _fills(px):
+    return [(t["norenordno"], int(t["flqty"]), float(t["flprc"])) for t in px.trades]
+
+
+def test_cancelled_order_is_skipped_at_its_price_level(paper):
+    first, second = _sell(paper, 101.0), _sell(paper, 101.0)
+    assert paper.cancel_order(first)["stat"] == "Ok"
+    buy = _buy(paper, 101.0, qty=15)
+    assert _fills(paper) == [(second, 10, 101.0), (buy, 10, 101.0)]
+    assert paper.orders[first].status == "CANCELED" and paper.orders[first].filled == 0
+    assert paper.orders[buy].status == "OPEN" and paper.orders[buy].remaining == 5
+
+
+def test_reprice_requeues_and_size_cut_keeps_priority(paper):
+    moved, cut, later = _sell(paper, 101.0), _sell(paper, 101.0), _sell(paper, 101.0)
+    paper.modify_order(moved, "NSE", "SBIN-EQ", 10, "LMT", prc="102.00")
+    paper.modify_order(cut, "NSE", "SBIN-EQ", 5, "LMT", prc="101.00")
+    _buy(paper, 101.0, qty=15)
+    assert [f[0] for f in _fills(paper) if paper.orders[f[0]].side < 0] == [cut, later]
+    assert paper.orders[moved].filled == 0 and paper.orders[moved].status == "OPEN"
+    _buy(paper, 102.0, qty=10)
+    assert paper.orders[moved].status == "COMPLETE"
+
+
+def test_stale_entries_are_compacted(paper):
+    ids = [_sell(paper, round(110.0 + i * 0.05, 2)) for i in range(2100)]
+    for ordno in ids[:-10]:
+        paper.cancel_order(ordno)
+    book = paper.books["SBIN-EQ"]
+    assert book.stale < 1100 and len(book.asks) < 1100
+    _buy(paper, 300.0, qty=100)
+    assert [f[0] for f in _fills(paper)[::2]] == ids[-10:]
+
+
+def test_no_self_trade(paper):
+    resting = _sell(paper, 101.0, uid=paper.userid)
+    buy = _buy(paper, 101.0)
+    order = paper.orders[buy]
+    assert order.status == "CANCELED" and "Self-trade" in order.rejreason and resting in order.rejreason
+    assert paper.orders[resting].status == "OPEN" and paper.trades == []
+    # A MKT order meets the same wall; another account trades normally
+    assert paper.orders[_buy(paper, None, price_type="MKT")].status == "CANCELED"
+    other = _buy(paper, 101.0, uid="OTHER")
+    assert _fills(paper) == [(resting, 10, 101.0), (other, 10, 101.0)]
+
+
+def test_market_is_still_taken_ahead_of_a_worse_own_order(paper):
+    _sell(paper, 105.0, uid=paper.userid)
+    paper.on_tick("SBIN-EQ", lp=100.0, bp=99.95, sp=100.05)
+    buy = _buy(paper, None, price_type="MKT")
+    assert paper.orders[buy].status == "COMPLETE" and _fills(paper) == [(buy, 10, 100.05)]
+
+
+def test_modify_into_own_order_cancels_the_modified_one(paper):
+    resting = _sell(paper, 101.0, uid=paper.userid)
+    bid = _buy(paper, 100.0)
+    assert paper.modify_order(bid, "NSE", "SBIN-EQ", 10, "LMT", prc="101.00")["stat"] == "Ok"
+    assert paper.orders[bid].status == "CANCELED" and paper.orders[resting].status == "OPEN"
@@ -0,0 +1,32 @@
+# test_position_book.py
+# PositionBook.mark with LTP vectors shorter or longer than the book.
+
+import numpy as np
+import pytest
+
+from position_book import PositionBook
+
+
+def _book():
+    book = PositionBook(capacity=4)
+    for s, q, p in (("A", 10, 100.0), ("B", -5, 50.0), ("C", 2, 10.0)):
+        book.fill(s, q, p)
+        book.on_price(s, p)
+    return book
+
+
+def test_short_vector_keeps_the_remaining_marks():
+    book = _book()
+    book.mark([110.0])
+    book.mtm()
+    assert book.unrealized_total == pytest.approx(100.0)
+    book.mark(np.array([np.nan, 40.0]))
+    book.mtm()
+    assert book.unrealized_total == pytest.approx(150.0)
+
+
+def test_long_vector_is_cut_to_the_book():
+    book = _book()
+    book.mark([100.0, 50.0, 15.0, 999.0, 999.0])
+    book.mtm()
+    assert book.unrealized_total == pytest.approx(10.0)
@@ -0,0 +1,95 @@
+# test_prostocks_accounts.py
+# Many accounts on one transport: concurrent login, fan-out, shared limits and pooled renewal.
+
+import time
+
+import pytest
+
+from conftest import wait_for
+from prostocks_accounts import AccountPool
+
+USERS = ["ACC01", "ACC02", "ACC03", "ACC04"]
+INTENT = {"buy_or_sell": "B", "product_type": "I", "exchange": "NSE", "tradingsymbol": "SYM0001-EQ",
+          "quantity": 1, "discloseqty": 0, "price_type": "LMT", "price": 100.0}
+
+
+@pytest.fixture
+def pool(rest_server):
+    _, base_url = rest_server
+    pool = AccountPool(base_url, order_rate=1000)
+    for uid in USERS:
+        pool.add(uid, "pwd", "ABCDE1234F", uid, "key", "MAC123456")
+    yield pool
+    pool.close()
+
+
+def test_login_all_shares_one_transport(rest_server, pool):
+    standin, _ = rest_server
+    results = pool.login_all()
+    assert list(results) == USERS
+    assert all(ok for ok, _ in results.values())
+    assert len({token for _, token in results.values()}) == len(USERS)
+    assert all(api.transport is pool.transport and api.metrics is pool.metrics for api in pool)
+    assert pool.metrics.count("ok", "QuickAuth") == len(USERS)
+    # One refresh thread for the pool, none per account
+    assert pool.running and all(api.session_manager.thread is None for api in pool)
+    assert standin.connections <= len(USERS)
+
+
+def test_failed_login_is_reported_per_account(pool):
+    pool.add("", "pwd", "ABCDE1234F", "", "key", "MAC123456")
+    results = pool.login_all()
+    assert results[""][0] is False
+    assert all(results[u][0] for u in USERS)
+
+
+def test_broadcast_with_quantity_overrides(rest_server, pool):
+    standin, _ = rest_server
+    pool.login_all()
+    resps = pool.broadcast(INTENT, userids=USERS[:3], quantities={"ACC02": 5})
+    assert list(resps) == USERS[:3]
+    assert all(r["stat"] == "Ok" for r in resps.values())
+    by_user = {o["uid"]: o["qty"] for o in standin.orders.values()}
+    assert by_user == {"ACC01": "1", "ACC02": "5", "ACC03": "1"}
+
+    books = pool.order_books(["ACC02", "ACC04"])
+    assert books["ACC02"]["stat"] == "Ok" and books["ACC04"]["stat"] == "Ok"
+
+
+def test_global_order_rate_spans_accounts(rest_server):
+    _, base_url = rest_server
+    pool = AccountPool(base_url, order_rate=1000, global_order_rate=20)
+    try:
+        for uid in USERS:
+            pool.add(uid, "pwd", "ABCDE1234F", uid, "key", "MAC123456")
+        pool.login_all()
+        start = time.perf_counter()
+        pool.broadcast(INTENT)
+        pool.broadcast(INTENT)
+        # Eight orders through one 20/s bucket of capacity 1: at least seven intervals
+        assert time.perf_counter() - start >= 7 / 20 * 0.9
+        assert all(api.shared_limiter is pool.global_limiter for api in pool)
+    finally:
+        pool.close()
+
+
+def test_pool_thread_renews_due_sessions(rest_server):
+    _, base_url = rest_server
+    pool = AccountPool(base_url, order_rate=1000, session_max_age=0.4)
+    try:
+        for uid in USERS[:2]:
+            pool.add(uid, "pwd", "ABCDE1234F", uid, "key", "MAC123456")
+        first = {u: token for u, (_, token) in pool.login_all().items()}
+        wait_for(lambda: pool.metrics.count("session_refreshes") >= 2, timeout=3)
+        assert all(pool.get(u).session_token != first[u] for u in first)
+    finally:
+        pool.close()
+    assert not pool.thread.is_alive()
+
+
+def test_remove(pool):
+    api = pool.remove("ACC03")
+    assert api.userid == "ACC03" and len(pool) == 3
+    assert pool.remove("ACC03") is None
+    with pytest.raises(KeyError):
+        pool.get("ACC03")
@@ -0,0 +1,73 @@
+# test_prostocks_async.py
+# AsyncProStocksAPI batch order entry against the REST stand-in.
+
+import asyncio
+
+from conftest import CREDS
+from prostocks_async import AsyncProStocksAPI
+
+
+def spec(i, **overrides):
+    order = {"buy_or_sell": "B", "product_type": "I", "exchange": "NSE", "tradingsymbol": "SBIN-EQ",
+             "quantity": 1, "discloseqty": 0, "price_type": "LMT", "price": 780.0 + i * 0.05,
+             "remarks": f"test_{i}"}
+    order.update(overrides)
+    return order
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_bad_spec_does_not_lose_the_rest(rest_server):
+    _, base_url = rest_server
+
+    async def go():
+        async with AsyncProStocksAPI(*CREDS, base_url, order_rate=None) as api:
+            await api.login()
+            orders = [spec(0), spec(1, price=None), spec(2), {"quantity": 1}]
+            return await api.place_orders(orders)
+
+    results = run(go())
+    assert [r["stat"] for r in results] == ["Ok", "Not_Ok", "Ok", "Not_Ok"]
+    assert results[0]["norenordno"] != results[2]["norenordno"]
+    assert "Price is required" in results[1]["emsg"]
+
+
+def test_max_in_flight_caps_concurrency(rest_server):
+    _, base_url = rest_server
+    live, peak = [0], [0]
+
+    async def go():
+        async with AsyncProStocksAPI(*CREDS, base_url, order_rate=None, max_in_flight=3) as api:
+            await api.login()
+            send = api.place_order
+
+            async def counted(**order):
+                live[0] += 1
+                peak[0] = max(peak[0], live[0])
+                try:
+                    await asyncio.sleep(0.01)
+                    return await send(**order)
+                finally:
+                    live[0] -= 1
+
+            api.place_order = counted
+            return await api.place_orders([spec(i) for i in range(12)])
+
+    results = run(go())
+    assert all(r["stat"] == "Ok" for r in results)
+    assert peak[0] == 3
+
+
+def test_throttled_orders_are_resent(rest_server):
+    standin, base_url = rest_server
+    standin.order_rate_cap = 2
+
+    async def go():
+        async with AsyncProStocksAPI(*CREDS, base_url, order_rate=50, max_in_flight=4) as api:
+            await api.login()
+            return await api.place_orders([spec(i) for i in range(4)], max_throttle_retries=5)
+
+    results = run(go())
+    assert all(r["stat"] == "Ok" for r in results), results
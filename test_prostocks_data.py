@@ -0,0 +1,69 @@
+# test_prostocks_data.py
+# prostocks_data against a PaperExchange session: get_ltp through the quote
+# cache, and the bulk quote / LTP frames (order, failures, feed ticks first).
+
+import pytest
+
+import prostocks_data
+from paper_exchange import PaperExchange
+
+SYMBOLS = {"SBIN-EQ": 801.5, "INFY-EQ": 1502.25, "TCS-EQ": 3999.0}
+
+
+@pytest.fixture
+def data(monkeypatch):
+    px = PaperExchange()
+    for tsym, lp in SYMBOLS.items():
+        px.on_tick(tsym, lp=lp)
+    calls = []
+    get_quotes = px.get_quotes
+
+    def counting(exchange, token):
+        calls.append(token)
+        return get_quotes(exchange, token)
+
+    px.get_quotes = counting
+    # Paper books are keyed by trading symbol, so the "token" is the symbol itself
+    monkeypatch.setattr(prostocks_data.scrip_master, "get_token", lambda s, e="NSE": s if s in SYMBOLS else None)
+    monkeypatch.setattr(prostocks_data, "market_feed", None)
+    prostocks_data.set_api(px)
+    prostocks_data.quote_cache.invalidate()
+    yield px, calls
+    prostocks_data.quote_cache.invalidate()
+    prostocks_data.set_api(None)
+
+
+def test_get_ltp_is_served_from_the_cache(data):
+    px, calls = data
+    assert prostocks_data.get_ltp("SBIN-EQ") == 801.5
+    px.on_tick("SBIN-EQ", lp=802.0)
+    assert prostocks_data.get_ltp("SBIN-EQ") == 801.5  # within the TTL
+    assert calls == ["SBIN-EQ"]
+    prostocks_data.quote_cache.invalidate(("NSE", "SBIN-EQ"))
+    assert prostocks_data.get_ltp("SBIN-EQ") == 802.0
+    assert prostocks_data.get_ltp("NOPE-EQ") is None
+
+
+def test_bulk_quotes_keep_order_and_report_failures(data):
+    px, calls = data
+    px.books["TCS-EQ"].lp = None  # quoted once, no price now: GetQuotes fails for it
+    df = prostocks_data.get_quotes_many(["INFY-EQ", "NOPE-EQ", "SBIN-EQ", "TCS-EQ", "INFY-EQ"])
+    assert df["symbol"].tolist() == ["INFY-EQ", "NOPE-EQ", "SBIN-EQ", "TCS-EQ"]  # duplicates folded
+    assert df["lp"].tolist()[::2] == [1502.25, 801.5]
+    assert df["error"].tolist()[1] == "unknown symbol" and "GetQuotes failed" in df["error"].tolist()[3]
+    assert df["lp"].isna().tolist() == [False, True, False, True]
+    assert sorted(calls) == ["INFY-EQ", "SBIN-EQ", "TCS-EQ"]
+
+
+def test_get_ltps_prefers_fresh_feed_ticks(data, monkeypatch):
+    px, calls = data
+
+    class _Feed:
+        def ltp(self, token, exchange, max_age=None):
+            return 805.0 if token == "SBIN-EQ" else None
+
+    monkeypatch.setattr(prostocks_data, "market_feed", _Feed())
+    df = prostocks_data.get_ltps(["SBIN-EQ", "INFY-EQ"])
+    assert df.set_index("symbol")["lp"].to_dict() == {"SBIN-EQ": 805.0, "INFY-EQ": 1502.25}
+    assert calls == ["INFY-EQ"]
+    assert prostocks_data.get_ltps([]).empty
@@ -0,0 +1,96 @@
+# test_prostocks_metrics.py
+# Latency histograms, counters and their exports, plus what the connector records into them.
+
+import pytest
+
+from conftest import CREDS
+from prostocks_connector import ProStocksAPI
+from prostocks_metrics import LatencyHistogram, Metrics, outcome_of
+
+
+def test_outcome_of():
+    assert outcome_of({"stat": "Ok"}) == "ok"
+    assert outcome_of([{"norenordno": "1"}]) == "ok"
+    assert outcome_of({"stat": "Not_Ok", "emsg": "no data"}) == "ok"
+    assert outcome_of({"stat": "Not_Ok", "emsg": "Session Expired"}) == "not_ok"
+
+
+def test_histogram_buckets_and_quantiles():
+    hist = LatencyHistogram(bounds=(0.01, 0.02, 0.05))
+    for s in [0.005] * 50 + [0.015] * 40 + [0.04] * 9 + [0.2]:
+        hist.observe(s)
+    assert hist.counts == [50, 40, 9, 1]
+    assert hist.count == 100 and hist.max == 0.2
+    assert hist.sum == pytest.approx(0.25 + 0.6 + 0.36 + 0.2)
+    # Linear inside the bucket: rank 25 of 50 in [0, 10 ms]
+    assert hist.quantile(0.25) == pytest.approx(0.005)
+    assert hist.quantile(0.5) == pytest.approx(0.01)
+    assert hist.quantile(0.7) == pytest.approx(0.015)
+    # The +Inf bucket interpolates up to the largest sample
+    assert hist.quantile(1.0) == pytest.approx(0.2)
+    assert LatencyHistogram().quantile(0.99) == 0.0
+
+
+def test_quantile_never_exceeds_max():
+    hist = LatencyHistogram(bounds=(1.0,))
+    hist.observe(0.1)
+    assert hist.quantile(0.99) == pytest.approx(0.1)
+
+
+def test_counters_snapshot_and_reset():
+    m = Metrics(buckets=(0.01, 0.1))
+    m.observe("PlaceOrder", 0.005)
+    m.observe("PlaceOrder", 0.05, "not_ok")
+    m.observe("OrderBook", 0.02, "error")
+    m.inc("retries", "OrderBook", 2)
+    m.inc("throttled")
+    assert m.count("retries", "OrderBook") == 2
+    assert m.count("throttled") == 1
+    assert m.count("ok") == 1 and m.count("error", "PlaceOrder") == 0
+
+    snap = m.snapshot()
+    assert list(snap) == ["OrderBook", "PlaceOrder"]
+    assert snap["PlaceOrder"]["count"] == 2
+    assert (snap["PlaceOrder"]["ok"], snap["PlaceOrder"]["not_ok"], snap["PlaceOrder"]["error"]) == (1, 1, 0)
+    assert snap["PlaceOrder"]["mean_ms"] == pytest.approx(27.5)
+    assert snap["PlaceOrder"]["max_ms"] == pytest.approx(50.0)
+    assert snap["OrderBook"]["retries"] == 2 and "throttled" not in snap["OrderBook"]
+
+    m.reset()
+    assert m.snapshot() == {} and m.count("retries") == 0
+
+
+def test_prometheus_text():
+    m = Metrics(buckets=(0.01, 0.1))
+    m.observe("PlaceOrder", 0.005)
+    m.observe("PlaceOrder", 0.05)
+    m.observe("PlaceOrder", 0.5, "error")
+    m.inc("throttled")
+    lines = m.prometheus().splitlines()
+    assert "# TYPE prostocks_request_seconds histogram" in lines
+    assert 'prostocks_request_seconds_bucket{endpoint="PlaceOrder",le="0.01"} 1' in lines
+    assert 'prostocks_request_seconds_bucket{endpoint="PlaceOrder",le="0.1"} 2' in lines
+    assert 'prostocks_request_seconds_bucket{endpoint="PlaceOrder",le="+Inf"} 3' in lines
+    assert 'prostocks_request_seconds_count{endpoint="PlaceOrder"} 3' in lines
+    assert 'prostocks_request_seconds_sum{endpoint="PlaceOrder"} 0.555000' in lines
+    assert 'prostocks_requests_total{endpoint="PlaceOrder",outcome="error"} 1' in lines
+    assert 'prostocks_requests_total{endpoint="PlaceOrder",outcome="ok"} 2' in lines
+    assert "# TYPE prostocks_throttled_total counter" in lines
+    assert "prostocks_throttled_total 1" in lines
+
+
+def test_connector_records_each_request(rest_server):
+    standin, base_url = rest_server
+    api = ProStocksAPI(*CREDS, base_url, order_rate=1000, auto_refresh=False)
+    try:
+        api.login()
+        api.order_book()
+        standin.error_rate = 1.0
+        api.order_book()
+        snap = api.metrics.snapshot()
+        assert snap["QuickAuth"]["ok"] == 1
+        assert (snap["OrderBook"]["count"], snap["OrderBook"]["ok"], snap["OrderBook"]["not_ok"]) == (2, 1, 1)
+        assert snap["OrderBook"]["max_ms"] > 0
+    finally:
+        api.close()
+        api.transport.close()
@@ -0,0 +1,82 @@
+# test_prostocks_ratelimit.py
+# TokenBucket pacing and throttle backoff on a fake clock, and the
+# connector's batch order entry against a rate-capped stand-in.
+
+import pytest
+
+import noren_standin
+import prostocks_ratelimit
+from conftest import CREDS
+from prostocks_connector import ProStocksAPI
+from prostocks_ratelimit import TokenBucket, is_throttled
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        # A real sleep always lets some time pass; a float-rounding wait of 1e-16 must too
+        self.slept.append(seconds)
+        self.now += max(seconds, 1e-6)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(prostocks_ratelimit, "time", clock)
+    return clock
+
+
+def test_acquire_paces_at_the_rate(clock):
+    bucket = TokenBucket(10, capacity=2)
+    stamps = []
+    for _ in range(6):
+        bucket.acquire()
+        stamps.append(round(clock.now - 1000.0, 3))
+    assert stamps == [0.0, 0.0, 0.1, 0.2, 0.3, 0.4]  # the burst of 2, then one every 1/rate
+    clock.now += 10
+    assert bucket.try_acquire() and bucket.try_acquire() and not bucket.try_acquire()
+
+
+def test_throttle_pauses_with_exponential_backoff(clock):
+    bucket = TokenBucket(10, capacity=1, backoff=0.25, max_backoff=1.0)
+    assert bucket.throttled() == 0.25
+    assert bucket.throttled() == pytest.approx(0.25)  # same burst: counted once
+    assert not bucket.try_acquire()
+    bucket.acquire()
+    assert clock.now - 1000.0 == pytest.approx(0.35, abs=1e-5)  # pause, then an empty bucket refills one token
+    assert [bucket.throttled() for _ in range(4) if not clock.sleep(2)] == [0.5, 1.0, 1.0, 1.0]
+    bucket.ok()
+    clock.sleep(2)
+    assert bucket.throttled() == 0.25
+
+
+def test_is_throttled_markers():
+    assert is_throttled({"stat": "Not_Ok", "emsg": "Too many requests : order rate limit exceeded"})
+    assert not is_throttled({"stat": "Not_Ok", "emsg": "Insufficient margin"})
+    assert not is_throttled({"stat": "Ok"})
+
+
+def test_place_orders_resends_throttled_orders_in_input_order():
+    server, standin, base_url = noren_standin.serve(order_rate_cap=3)
+    api = ProStocksAPI(*CREDS, base_url, order_rate=1000, auto_refresh=False)
+    try:
+        assert api.login()[0]
+        specs = [{"buy_or_sell": "B", "product_type": "I", "exchange": "NSE", "tradingsymbol": "SBIN-EQ",
+                  "quantity": 1, "discloseqty": 0, "price_type": "LMT", "price": 780 + i, "remarks": f"o{i}"}
+                 for i in range(5)] + [{"quantity": 1}]
+        results = api.place_orders(specs, max_workers=6, max_throttle_retries=6)
+        assert [r["stat"] for r in results] == ["Ok"] * 5 + ["Not_Ok"]
+        assert "Invalid order spec" in results[-1]["emsg"]
+        assert [standin.orders[r["norenordno"]]["remarks"] for r in results[:5]] == [s["remarks"] for s in specs[:5]]
+        assert standin.throttled >= 2 and api.metrics.count("throttled") >= 2
+    finally:
+        api.close()
+        api.transport.close()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,140 @@
+# test_prostocks_session.py
+# Single-flight login, replay on "Session Expired" and background renewal.
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import CREDS, wait_for
+from prostocks_connector import ProStocksAPI
+from prostocks_metrics import Metrics
+from prostocks_session import SessionManager, is_session_expired
+
+EXPIRED = {"stat": "Not_Ok", "emsg": "Session Expired :  Invalid Session Key"}
+
+
+class Auth:
+    """QuickAuth double: token-1, token-2, ... ; `gate` holds every call until set."""
+
+    def __init__(self, ok=True):
+        self.ok = ok
+        self.calls = 0
+        self.gate = threading.Event()
+        self.gate.set()
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        self.gate.wait(5)
+        with self.lock:
+            self.calls += 1
+            return (True, f"token-{self.calls}") if self.ok else (False, "Invalid password")
+
+
+def test_is_session_expired():
+    assert is_session_expired(EXPIRED)
+    assert not is_session_expired({"stat": "Not_Ok", "emsg": "Invalid Input"})
+    assert not is_session_expired([{"stat": "Ok"}])
+
+
+def test_concurrent_logins_share_one_quickauth():
+    auth = Auth()
+    auth.gate.clear()
+    sm = SessionManager(auth, background=False)
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(sm.login) for _ in range(8)]
+        wait_for(lambda: sm._flight is not None)
+        auth.gate.set()
+        results = [f.result() for f in futures]
+    assert auth.calls == 1
+    assert results == [(True, "token-1")] * 8
+    assert sm.token == "token-1" and sm.logins == 1
+
+
+def test_stale_login_returns_the_newer_token():
+    auth = Auth()
+    sm = SessionManager(auth, background=False)
+    sm.login()
+    assert sm.login(stale="token-0") == (True, "token-1")
+    assert auth.calls == 1
+    assert sm.login(stale="token-1") == (True, "token-2")
+
+
+def test_expired_calls_relogin_once_and_replay():
+    auth = Auth()
+    metrics = Metrics()
+    sm = SessionManager(auth, metrics=metrics, background=False)
+    sm.set_token("token-0")
+    sent = []
+    barrier = threading.Barrier(8)
+
+    def send(token):
+        sent.append(token)
+        if token == "token-0":
+            barrier.wait(5)  # every caller sees the old token expire before anyone re-logs in
+            return EXPIRED
+        return {"stat": "Ok", "token": token}
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: sm.call(send), range(8)))
+    assert auth.calls == 1
+    assert results == [{"stat": "Ok", "token": "token-1"}] * 8
+    assert sent.count("token-0") == 8 and sent.count("token-1") == 8
+    assert metrics.count("relogins") == 8
+
+
+def test_replay_happens_once():
+    sm = SessionManager(Auth(), background=False)
+    sm.set_token("token-0")
+    sent = []
+    assert sm.call(lambda token: sent.append(token) or EXPIRED) == EXPIRED
+    assert sent == ["token-0", "token-1"]
+
+
+def test_failed_login():
+    auth = Auth(ok=False)
+    sm = SessionManager(auth, background=False)
+    resp = sm.call(lambda token: {"stat": "Ok"})
+    assert resp == {"stat": "Not_Ok", "emsg": "Login failed: Invalid password"}
+    assert sm.failures == 1 and sm.last_error == "Invalid password" and sm.token is None
+
+    sm.set_token("token-0")
+    assert sm.call(lambda token: EXPIRED)["emsg"] == "Session expired and auto re-login failed."
+
+
+def test_login_exception_is_a_failed_login():
+    def boom():
+        raise ConnectionError("down")
+
+    sm = SessionManager(boom, background=False)
+    assert sm.login() == (False, "Login Exception: down")
+
+
+def test_background_refresh_ahead_of_expiry():
+    auth = Auth()
+    metrics = Metrics()
+    sm = SessionManager(auth, max_age=0.3, refresh_ahead=0.2, metrics=metrics)
+    try:
+        sm.login()
+        assert sm.running
+        wait_for(lambda: auth.calls >= 3, timeout=3)
+        assert metrics.count("session_refreshes") >= 2
+        assert sm.due_in() > -0.1
+    finally:
+        sm.stop()
+    assert not sm.thread.is_alive()
+
+
+def test_connector_replays_after_broker_expiry(rest_server):
+    standin, base_url = rest_server
+    api = ProStocksAPI(*CREDS, base_url, order_rate=1000, auto_refresh=False)
+    try:
+        assert api.login()[0]
+        old = api.session_token
+        standin.expire_sessions()
+        with ThreadPoolExecutor(6) as pool:
+            books = list(pool.map(lambda _: api.order_book(), range(6)))
+        assert all(b["emsg"] == "no data" for b in books)
+        assert api.session_manager.logins == 2
+        assert api.session_token != old
+    finally:
+        api.close()
+        api.transport.close()
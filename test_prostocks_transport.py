@@ -0,0 +1,47 @@
+# test_prostocks_transport.py
+# One pooled Transport under every ProStocksAPI call: keep-alive reuse, the
+# jData/jKey body, and retries only for read-only endpoints.
+
+import noren_standin
+from conftest import CREDS
+from prostocks_connector import ProStocksAPI
+from prostocks_transport import Transport
+
+
+def test_encode_matches_noren_body():
+    assert Transport.encode({"uid": "A", "qty": "1"}) == 'jData={"uid":"A","qty":"1"}'
+    assert Transport.encode({"uid": "A"}, "tok") == 'jData={"uid":"A"}&jKey=tok'
+
+
+def test_every_call_shares_one_connection(rest_server):
+    standin, base_url = rest_server
+    api = ProStocksAPI(*CREDS, base_url, order_rate=1000, auto_refresh=False)
+    try:
+        assert api.login()[0]
+        for i in range(5):
+            assert api.place_order("B", "I", "NSE", "SBIN-EQ", 1, 0, "LMT", price=780 + i)["stat"] == "Ok"
+        assert api.order_book()["stat"] == "Ok"
+        assert api.get_quotes("NSE", "10001")["stat"] == "Ok"
+        assert standin.requests == 8 and standin.connections == 1
+        assert api.metrics.count("ok", "PlaceOrder") == 5
+    finally:
+        api.close()
+        api.transport.close()
+
+
+def test_only_idempotent_endpoints_are_retried():
+    server, standin, base_url = noren_standin.serve(http_error_rate=1.0)
+    transport = Transport(base_url, retries=2, backoff=0.0)
+    try:
+        resp = transport.post("OrderBook", {"uid": "TEST01"}, "tok")
+        assert resp["stat"] == "Not_Ok" and "HTTP 502" in resp["emsg"]
+        assert standin.requests == 3 and transport.metrics.count("retries", "OrderBook") == 2
+
+        resp = transport.post("PlaceOrder", {"uid": "TEST01"}, "tok")
+        assert resp["stat"] == "Not_Ok"
+        assert standin.requests == 4 and transport.metrics.count("retries", "PlaceOrder") == 0
+        assert transport.metrics.count("error", "PlaceOrder") == 1
+    finally:
+        transport.close()
+        server.shutdown()
+        server.server_close()
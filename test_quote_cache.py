@@ -0,0 +1,99 @@
+# test_quote_cache.py
+# QuoteCache TTL expiry, LRU eviction, single-flight coalescing and errors.
+
+import threading
+
+import pytest
+
+import quote_cache
+from conftest import wait_for
+from quote_cache import QuoteCache
+
+
+class _Clock:
+    now = 500.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(quote_cache, "time", clock)
+    return clock
+
+
+def _counting():
+    calls = []
+
+    def fetch(key):
+        calls.append(key)
+        return {"key": key, "n": len(calls)}
+
+    return fetch, calls
+
+
+def test_entries_expire_after_ttl(clock):
+    fetch, calls = _counting()
+    cache = QuoteCache(fetch, ttl=1.0)
+    assert cache.get("A")["n"] == 1
+    clock.now += 0.99
+    assert cache.get("A")["n"] == 1
+    clock.now += 0.02
+    assert cache.get("A")["n"] == 2
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_is_evicted(clock):
+    fetch, calls = _counting()
+    cache = QuoteCache(fetch, ttl=60, maxsize=2)
+    cache.get("A")
+    cache.get("B")
+    cache.get("A")  # B is now the oldest
+    cache.get("C")
+    assert list(cache.entries) == ["A", "C"] and cache.stats()["evictions"] == 1
+    cache.get("B")
+    assert calls == ["A", "B", "C", "B"]
+    cache.put("D", {"n": 0})
+    assert list(cache.entries) == ["B", "D"]
+    cache.invalidate("B")
+    assert list(cache.entries) == ["D"]
+
+
+def test_concurrent_misses_share_one_fetch():
+    release, started = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch(key):
+        calls.append(key)
+        started.set()
+        assert release.wait(5)
+        return {"lp": "101.5"}
+
+    cache = QuoteCache(fetch, ttl=1.0)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("SBIN"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    assert started.wait(5)
+    wait_for(lambda: cache.stats()["coalesced"] == 7)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert calls == ["SBIN"] and results == [{"lp": "101.5"}] * 8
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    fails = [True]
+
+    def fetch(key):
+        if fails[0]:
+            raise ValueError("GetQuotes failed")
+        return {"lp": "1"}
+
+    cache = QuoteCache(fetch, ttl=60)
+    with pytest.raises(ValueError):
+        cache.get("X")
+    fails[0] = False
+    assert cache.get("X") == {"lp": "1"} and cache.stats()["misses"] == 2
@@ -0,0 +1,95 @@
+# test_risk_engine.py
+# RiskEngine limits and the RiskGate wrapper over PaperExchange.
+
+import pytest
+
+from engine_runtime import EngineRuntime
+from risk_engine import RiskEngine, RiskGate
+
+LIMITS = {"max_order_qty": 100, "max_order_value": None, "max_symbol_qty": 150, "max_symbol_value": None,
+          "max_gross": None, "max_net": None, "max_open_orders": None, "price_band_pct": 5,
+          "max_daily_loss": None}
+
+
+@pytest.fixture
+def gate(paper):
+    risk = RiskEngine(LIMITS)
+    paper.subscribe_orders(risk.on_order)
+    paper.on_tick("SBIN-EQ", lp=100.0, bp=99.95, sp=100.05)
+    risk.on_price("SBIN-EQ", 100.0)
+    return RiskGate(paper, risk)
+
+
+def buy(qty, price=99.0):
+    return {"buy_or_sell": "B", "product_type": "I", "exchange": "NSE", "tradingsymbol": "SBIN-EQ",
+            "quantity": qty, "discloseqty": 0, "price_type": "LMT", "price": price}
+
+
+def modify(ordno, qty, prc=99.0):
+    return {"norenordno": ordno, "exch": "NSE", "tsym": "SBIN-EQ", "qty": qty, "prctyp": "LMT", "prc": prc}
+
+
+def test_place_order_blocked_before_the_network(gate, paper):
+    resp = gate.place_order(**buy(101))
+    assert resp["stat"] == "Not_Ok" and resp["emsg"].startswith("RMS:")
+    assert paper.orders == {}
+    assert gate.place_order(**buy(50))["stat"] == "Ok"
+
+
+def test_modify_orders_cannot_grow_past_limits(gate):
+    first = gate.place_order(**buy(80))["norenordno"]
+    second = gate.place_order(**buy(60))["norenordno"]
+    results = gate.modify_orders([modify(first, 90), modify(second, 40), modify(second, 60, prc=150.0)])
+    # 90 + 60 working reaches max_symbol_qty exactly; then a price outside the 5% band
+    assert [r["stat"] for r in results] == ["Ok", "Ok", "Not_Ok"]
+    assert gate.risk.working[first].qty == 90 and gate.risk.working[second].qty == 40
+    blocked = gate.modify_orders([modify(first, 120)])[0]
+    assert blocked["stat"] == "Not_Ok" and "RMS" in blocked["emsg"]
+    assert gate.risk.working[first].qty == 90
+
+
+def test_cancel_passes_through_and_frees_quantity(gate):
+    ordno = gate.place_order(**buy(100))["norenordno"]
+    assert gate.place_order(**buy(100))["stat"] == "Not_Ok"
+    assert gate.cancel_orders([ordno])[0]["stat"] == "Ok"
+    assert gate.place_order(**buy(100))["stat"] == "Ok"
+
+
+def test_attribute_writes_reach_the_api(gate, paper):
+    gate.session_token = "pasted"
+    assert paper.session_token == "pasted" and gate.session_token == "pasted"
+
+
+def test_runtime_reuses_an_existing_gate(gate):
+    runtime = EngineRuntime(gate, [], settings={})
+    assert runtime.api is gate and runtime.risk is gate.risk
+    with pytest.raises(ValueError):
+        EngineRuntime(gate, [], settings={}, risk=RiskEngine(LIMITS))
+
+
+def _filled(risk, tsym, side, qty, price, ordno="1"):
+    risk.on_order({"norenordno": ordno, "tsym": tsym, "trantype": side, "qty": str(qty), "fillshares": str(qty),
+                   "avgprc": str(price), "status": "COMPLETE"})
+
+
+def test_mkt_exit_needs_no_ltp():
+    risk = RiskEngine(LIMITS)
+    _filled(risk, "TCS-EQ", "B", 10, 3500.0)
+    assert risk.check("TCS-EQ", -1, 10, None, "MKT") is None
+    ticket, reason = risk.admit("TCS-EQ", -1, 10, None, "MKT")
+    assert reason is None and ticket is not None
+    # Adding to the position at market still has nothing to value it with
+    assert "no LTP" in risk.check("TCS-EQ", 1, 1, None, "MKT")
+
+
+def test_daily_loss_reads_running_totals(monkeypatch):
+    risk = RiskEngine(dict(LIMITS, max_daily_loss=500))
+    _filled(risk, "SBIN-EQ", "B", 10, 100.0, "1")
+    _filled(risk, "SBIN-EQ", "S", 5, 90.0, "2")  # -50 realized
+    risk.on_price("SBIN-EQ", 100.0)
+    monkeypatch.setattr(risk.positions, "mtm", lambda: pytest.fail("pre-trade check ran a full MTM"))
+    assert risk.check("INFY-EQ", 1, 1, 1500.0) is None
+    risk.on_price("SBIN-EQ", 10.0)  # 5 x -90 unrealized
+    assert risk.unrealized == pytest.approx(-450.0)
+    assert "loss limit" in risk.check("INFY-EQ", 1, 1, 1500.0)
+    assert risk.check("SBIN-EQ", -1, 5, None, "MKT") is None
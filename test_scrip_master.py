@@ -0,0 +1,78 @@
+# test_scrip_master.py
+# load_index downloads outside the module lock: one slow exchange must not stall
+# lookups on another, and a new-day rebuild (or a failed one) keeps serving
+# yesterday's index.
+
+import io
+import sys
+import threading
+import time
+import types
+import zipfile
+from datetime import date, timedelta
+
+import pytest
+
+import scrip_master
+
+MASTER = "Exchange,Token,LotSize,Symbol,TradingSymbol\n{exch},2885,1,RELIANCE,RELIANCE-EQ\n{exch},11536,1,TCS,TCS-EQ\n"
+
+
+def _slow_master(release, started):
+    def download(exch):
+        started.set()
+        assert release.wait(5)
+        return MASTER.format(exch=exch)
+    return download
+
+
+def test_slow_download_does_not_block_other_lookups(tmp_path, monkeypatch):
+    monkeypatch.setattr(scrip_master, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(scrip_master, "_indexes", {})
+    monkeypatch.setattr(scrip_master, "_failed", {})
+    monkeypatch.setattr(scrip_master, "_build_locks", {})
+    monkeypatch.setattr(scrip_master, "download_master", lambda exch: MASTER.format(exch=exch))
+    yesterday = date.today() - timedelta(days=1)
+    assert scrip_master.load_index("BSE").token("TCS-EQ") == "11536"
+    assert scrip_master.load_index("NSE", day=yesterday).token("RELIANCE-EQ") == "2885"
+
+    release, started = threading.Event(), threading.Event()
+    monkeypatch.setattr(scrip_master, "download_master", _slow_master(release, started))
+    builder = threading.Thread(target=scrip_master.load_index, args=("NSE",))
+    builder.start()
+    try:
+        assert started.wait(5)
+        t0 = time.perf_counter()
+        assert scrip_master.load_index("BSE").token("TCS-EQ") == "11536"
+        assert scrip_master.load_index("NSE").token("RELIANCE-EQ") == "2885"  # yesterday's, while today's builds
+        assert time.perf_counter() - t0 < 1.0
+    finally:
+        release.set()
+        builder.join(5)
+    assert scrip_master._indexes["NSE"][0] == date.today()
+
+
+def test_failed_rebuild_keeps_serving_the_old_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(scrip_master, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(scrip_master, "_indexes", {})
+    monkeypatch.setattr(scrip_master, "_failed", {})
+    monkeypatch.setattr(scrip_master, "_build_locks", {})
+    monkeypatch.setattr(scrip_master, "download_master", lambda exch: MASTER.format(exch=exch))
+    old = scrip_master.load_index("NSE", day=date.today() - timedelta(days=1))
+
+    def broken(exch):
+        raise OSError("connection reset")
+
+    monkeypatch.setattr(scrip_master, "download_master", broken)
+    assert scrip_master.load_index("NSE") is old
+    assert scrip_master.get_token("RELIANCE") == "2885"
+    assert scrip_master.load_index("BSE") is None  # nothing to fall back to
+
+
+def test_empty_archive_is_a_failed_download(monkeypatch):
+    buf = io.BytesIO()
+    zipfile.ZipFile(buf, "w").close()
+    resp = types.SimpleNamespace(content=buf.getvalue(), raise_for_status=lambda: None)
+    monkeypatch.setitem(sys.modules, "requests", types.SimpleNamespace(get=lambda url, timeout: resp))
+    with pytest.raises(zipfile.BadZipFile):
+        scrip_master.download_master("NSE")
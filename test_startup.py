@@ -0,0 +1,82 @@
+# test_startup.py
+# Importing an entry module has no side effects: no login, no network, no threads,
+# none of the heavy modules startup_budget.json forbids. Timings stay in bench_startup.py.
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import prostocks_connector
+import prostocks_data
+from bench_startup import BUDGET_FILE
+
+with open(BUDGET_FILE) as f:
+    BUDGET = json.load(f)
+
+PROBE = """
+import json, socket, sys, threading
+
+def no_network(self, *args):
+    raise AssertionError(f"network at import: {{args}}")
+
+socket.socket.connect = socket.socket.connect_ex = no_network
+import {module}
+import prostocks_logging
+print(json.dumps({{"modules": sorted(sys.modules), "threads": [t.name for t in threading.enumerate()],
+                  "listener": prostocks_logging._listener is not None}}))
+"""
+
+
+def cold_import(module):
+    env = {k: v for k, v in os.environ.items() if not k.startswith("PROSTOCKS_")}
+    proc = subprocess.run([sys.executable, "-c", PROBE.format(module=module)], capture_output=True, text=True,
+                          env=env, cwd=os.path.dirname(BUDGET_FILE), timeout=60)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", sorted(BUDGET))
+def test_import_has_no_side_effects(module):
+    state = cold_import(module)
+    loaded = set(state["modules"])
+    assert sorted(m for m in BUDGET[module].get("forbid", ()) if m in loaded) == []
+    assert state["threads"] == ["MainThread"]
+    assert not state["listener"]
+
+
+@pytest.fixture
+def fresh_data(monkeypatch):
+    monkeypatch.setattr(prostocks_data, "_api", None)
+    monkeypatch.setattr(prostocks_data, "_candle_store", None)
+    yield prostocks_data
+    prostocks_data.set_api(None)
+
+
+def test_session_resolves_lazily(fresh_data, monkeypatch):
+    logins = []
+    monkeypatch.setattr(prostocks_connector, "login_ps", lambda: logins.append(1) or "session")
+    assert logins == []
+    assert fresh_data.ps_api == "session"
+    assert fresh_data.get_api() == "session"
+    assert logins == [1]
+
+
+def test_failed_first_login_raises(fresh_data, monkeypatch):
+    monkeypatch.setattr(prostocks_connector, "login_ps", lambda: None)
+    with pytest.raises(RuntimeError, match="login failed"):
+        fresh_data.get_api()
+    assert fresh_data._api is None
+
+
+def test_injected_session_and_candle_store(fresh_data, paper):
+    fresh_data.set_api(paper)
+    store = fresh_data.candle_store
+    assert fresh_data.ps_api is paper
+    assert store.api is paper and fresh_data.get_candle_store() is store
+    fresh_data.set_api(paper)
+    assert fresh_data.candle_store is not store
+    with pytest.raises(AttributeError):
+        fresh_data.no_such_name
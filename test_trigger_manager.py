@@ -0,0 +1,64 @@
+# test_trigger_manager.py
+# Bracket legs fired from ticks: firing order, OCO siblings and pruning of
+# finished brackets.
+
+import trigger_manager
+from trigger_manager import TriggerManager
+
+
+class _Api:
+    def __init__(self):
+        self.sent = []
+
+    def place_order(self, **spec):
+        self.sent.append((spec["tradingsymbol"], spec["buy_or_sell"], spec["quantity"], spec["remarks"]))
+        return {"stat": "Ok", "norenordno": str(len(self.sent))}
+
+    def place_orders(self, specs):
+        return [self.place_order(**spec) for spec in specs]
+
+
+def test_legs_fire_in_price_order_and_cancel_their_siblings():
+    api = _Api()
+    tm = TriggerManager(api)
+    a = tm.add_bracket("SBIN-EQ", "B", 10, sl=95, tgt=105, remarks="a")
+    b = tm.add_bracket("SBIN-EQ", "B", 20, sl=97, tgt=103, remarks="b")
+    c = tm.add_bracket("SBIN-EQ", "S", 5, sl=104, tgt=90, remarks="c")
+    assert tm.on_tick("SBIN-EQ", 100.0) == []
+
+    # One tick through three up-levels: lowest first, each bracket exits once
+    assert [x.bid for x in tm.on_tick("SBIN-EQ", 106.0)] == [b.bid, c.bid, a.bid]
+    assert api.sent == [("SBIN-EQ", "S", 20, "b_target"), ("SBIN-EQ", "B", 5, "c_stop"),
+                        ("SBIN-EQ", "S", 10, "a_target")]
+    # Their stops / targets on the other side are dead
+    assert tm.on_tick("SBIN-EQ", 80.0) == []
+    assert len(api.sent) == 3 and tm.fired == 3
+
+
+def test_trailing_stop_follows_the_peak():
+    api = _Api()
+    tm = TriggerManager(api)
+    tight = tm.add_bracket("INFY-EQ", "B", 1, trail=2, ref_price=100.0)
+    loose = tm.add_bracket("INFY-EQ", "B", 1, trail=5, ref_price=100.0)
+    for price in (101.0, 104.0, 103.0):
+        assert tm.on_tick("INFY-EQ", price) == []
+    assert tm.on_tick("INFY-EQ", 102.0) == [tight]
+    assert tight.exit_price == 102.0 and tight.exit_reason == "trail"
+    assert tm.on_tick("INFY-EQ", 99.0) == [loose]
+
+
+def test_finished_brackets_are_pruned(monkeypatch):
+    monkeypatch.setattr(trigger_manager, "FINISHED_MAX", 4)
+    tm = TriggerManager(_Api())
+    kept = tm.add_bracket("SBIN-EQ", "B", 1, sl=90, tgt=110)
+    for _ in range(10):
+        tm.cancel(tm.add_bracket("SBIN-EQ", "B", 1, sl=90, tgt=110).bid)
+    hit = tm.add_bracket("TCS-EQ", "S", 1, sl=110)
+    tm.on_tick("TCS-EQ", 111.0)
+
+    assert list(tm.brackets) == [kept.bid]
+    assert tm.live() == [kept]
+    rows = tm.snapshot()
+    assert len(rows) == 5 and rows[0]["bid"] == kept.bid
+    assert rows[-1]["bid"] == hit.bid and rows[-1]["status"] == "exited"
+    assert tm.cancel(hit.bid) is False
@@ -0,0 +1,90 @@
+# test_universe_scanner.py
+# Sharded universe scans against the in-process scan and the one-symbol rules.
+
+from datetime import datetime
+from datetime import time as dtime
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+import strategy_rules
+from bench_scanner import synthetic
+from indicator_engine import IndicatorEngine
+from universe_scanner import UniverseScanner
+
+SYMBOLS = [f"SYM{i:04d}-EQ" for i in range(120)]
+PARAMS = {"min_vol_required": 0.3}
+
+
+@pytest.fixture(scope="module")
+def candles():
+    high, low, close = synthetic(len(SYMBOLS), 150)
+    close[7] = np.nan  # never traded
+    close[9, :100] = np.nan  # listed late
+    return high, low, close
+
+
+def _scan(candles, workers):
+    with UniverseScanner(SYMBOLS, workers=workers, params=PARAMS, balance=1_000_000) as scanner:
+        scanner.load(*candles)
+        return scanner.scan()
+
+
+def test_workers_find_the_same_signals(candles):
+    single = _scan(candles, 1)
+    assert len(single) > 5
+    assert {s["side"] for s in single} == {"Buy", "Sell"}
+    for workers in (2, 3):
+        assert _scan(candles, workers) == single
+
+
+def test_scan_matches_one_symbol_rules(candles):
+    high, low, close = candles
+    engine = IndicatorEngine(SYMBOLS, PARAMS)
+    engine.run(high, low, close, keep=())
+    expected = []
+    for i, symbol in enumerate(SYMBOLS):
+        price = engine.close[i]
+        if np.isnan(price):
+            continue
+        hit = strategy_rules.evaluate(symbol, float(price), engine.indicators(symbol), balance=1_000_000)
+        if hit:
+            expected.append(hit)
+    found = _scan(candles, 1)
+    assert [s["symbol"] for s in found] == [s["symbol"] for s in expected]
+    for got, want in zip(found, expected):
+        assert got["side"] == want["side"] and got["qty"] == want["qty"]
+        assert got["sl"] == pytest.approx(want["sl"], abs=0.011)
+        assert got["tgt"] == pytest.approx(want["tgt"], abs=0.011)
+    assert "SYM0007-EQ" not in {s["symbol"] for s in found}
+
+
+def test_entry_window_and_stamp(candles):
+    settings = {"trading_start": dtime(9, 20), "trading_end": dtime(15, 0)}
+    with UniverseScanner(SYMBOLS, workers=1, params=PARAMS) as scanner:
+        assert scanner.scan() == []
+        scanner.load(*candles)
+        assert scanner.scan(now=dtime(9, 15), settings=settings) == []
+        now = datetime(2026, 10, 14, 10, 5)
+        signals = scanner.scan(now=now, settings={})
+        assert signals and all(s["time"] == "10:05" for s in signals)
+
+
+def test_block_is_reused_and_released(candles):
+    high, low, close = candles
+    scanner = UniverseScanner(SYMBOLS, workers=2, params=PARAMS)
+    scanner.load(high, low, close)
+    name = scanner.shm.name
+    scanner.load(high, low, close)
+    assert scanner.shm.name == name
+    scanner.load(high[:, :100], low[:, :100], close[:, :100])
+    assert scanner.shm.name != name and scanner.hlc.shape == (3, len(SYMBOLS), 100)
+    first = scanner.scan()
+    assert first == _scan((high[:, :100], low[:, :100], close[:, :100]), 1)
+
+    last = scanner.shm.name
+    scanner.close()
+    assert scanner.pool is None and scanner.shm is None
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=last)
@@ -0,0 +1,122 @@
+# trading_engine.py
+# TradingEngine-compatible engine built on strategy_rules.
+#
+# app.py was written against intraday_trading_engine.TradingEngine, which is not
+# part of this repo.  make_engine() uses it when it is importable and falls back
+# to RulesEngine otherwise; both take (dashboard, ps_api) and expose
+# process_trade(**stock_data).
+
+import threading
+from datetime import datetime
+from functools import lru_cache
+
+import strategy_rules
+from prostocks_logging import get_logger
+
+log = get_logger("engine")
+
+
+def make_engine(dashboard, ps_api, settings=None, **kwargs):
+    try:
+        from intraday_trading_engine import TradingEngine
+    except ImportError:
+        return RulesEngine(dashboard, ps_api, settings=settings, **kwargs)
+    return TradingEngine(dashboard, ps_api)
+
+
+def _parse_time(value):
+    if value is None or not isinstance(value, str):
+        return value
+    return _parse_hhmm(value)
+
+
+@lru_cache(maxsize=1440)
+def _parse_hhmm(value):
+    return datetime.strptime(value, "%H:%M").time()
+
+
+class RulesEngine:
+    """
+    Intraday engine: entries, sizing and exits from strategy_rules.
+
+    Orders are MKT on `exchange` / `product_type`; with ps_api=None it only
+    records the positions (dry run).  The dashboard object gets the same
+    callbacks TradingEngine used: log_trade, close_position, update_visuals.
+    """
+
+    def __init__(self, dashboard, ps_api, settings=None, exchange="NSE", product_type="I"):
+        self.dashboard = dashboard
+        self.ps_api = ps_api
+        self.settings = dict(settings or {})
+        self.exchange = exchange
+        self.product_type = product_type
+        self.positions = {}  # symbol -> {side, qty, entry_price, sl, tgt, time, norenordno}
+        self.lock = threading.RLock()
+
+    def _allowed(self, side):
+        s = self.settings
+        if not s.get("master_auto", True):
+            return False
+        return s.get("auto_buy", True) if side == "Buy" else s.get("auto_sell", True)
+
+    def _send(self, symbol, side, qty, remarks):
+        if self.ps_api is None:
+            return {"stat": "Ok", "norenordno": None}
+        return self.ps_api.place_order(
+            buy_or_sell="B" if side == "Buy" else "S", product_type=self.product_type,
+            exchange=self.exchange, tradingsymbol=symbol, quantity=qty, discloseqty=0,
+            price_type="MKT", remarks=remarks,
+        )
+
+    def process_trade(self, symbol, price, indicators, qcfg=None, time=None, balance=None, high=None, low=None,
+                      **_):
+        """One evaluation for one symbol (the stock_data dict app.py builds); returns the action taken."""
+        now = _parse_time(time)
+        with self.lock:
+            position = self.positions.get(symbol)
+            if position is not None:
+                reason = "auto_exit" if now is not None and strategy_rules.must_exit(now, self.settings) \
+                    else strategy_rules.exit_reason(position, price, indicators, high, low)
+                if reason:
+                    return self._exit(symbol, position, price, reason, time)
+                return None
+
+            if now is not None and not strategy_rules.can_enter(now, self.settings):
+                return None
+            signal = strategy_rules.evaluate(symbol, price, indicators, qcfg, balance, time)
+            if signal is None or not self._allowed(signal["side"]):
+                return None
+            resp = self._send(symbol, signal["side"], signal["qty"], "engine_entry")
+            if resp.get("stat") != "Ok":
+                log.warning("❌ Entry order rejected for %s: %s", symbol, resp.get("emsg"))
+                return None
+            self.positions[symbol] = {"side": signal["side"], "qty": signal["qty"], "entry_price": price,
+                                      "sl": signal["sl"], "tgt": signal["tgt"], "time": time,
+                                      "norenordno": resp.get("norenordno")}
+            self.dashboard.log_trade(symbol, signal["side"], price, signal["qty"], signal["sl"], signal["tgt"],
+                                     time)
+            return "entry"
+
+    def _exit(self, symbol, position, price, reason, time):
+        side = "Sell" if position["side"] == "Buy" else "Buy"
+        resp = self._send(symbol, side, position["qty"], f"engine_{reason}")
+        if resp.get("stat") != "Ok":
+            log.warning("❌ Exit order rejected for %s: %s", symbol, resp.get("emsg"))
+            return None
+        del self.positions[symbol]
+        self.dashboard.close_position(symbol, dict(position, exit_price=price, reason=reason, exit_time=time))
+        return reason
+
+    def exit_position(self, symbol, price, reason, time=None):
+        """Close one position now (a client-side stop / target fired); returns the reason, or None."""
+        with self.lock:
+            position = self.positions.get(symbol)
+            if position is None:
+                return None
+            return self._exit(symbol, position, price, reason, time)
+
+    def exit_all(self, prices, time=None):
+        """Square off every open position (auto_exit_time); prices maps symbol -> last price."""
+        with self.lock:
+            for symbol, position in list(self.positions.items()):
+                self._exit(symbol, position, prices.get(symbol, position["entry_price"]), "auto_exit", time)
@@ -0,0 +1,476 @@
+# trigger_manager.py
+# Client-side bracket / OCO legs: stop-loss, target and trailing stop for each
+# open position, fired from the tick stream.
+#
+# Each symbol keeps its fixed legs in two heaps keyed by trigger price: "up"
+# legs fire when the price reaches their level (long targets, short stops),
+# "down" legs when it falls to it (long stops, short targets).  A tick that
+# crosses nothing costs two heap-top comparisons and each fired leg is one pop,
+# O(log n) whatever the number of live brackets.  When a leg fires its sibling
+# is cancelled by marking it dead; dead entries are dropped when they reach a
+# heap top, and a heap is compacted once they outnumber the live ones.
+#
+# Trailing stops move with the price, so they can't sit at a fixed level.
+# Legs that have seen the same peak share a cohort; a new high merges every
+# cohort below it into one (smaller into larger), and within a cohort the leg
+# with the tightest trail fires first.  A rising tick costs a merge of the
+# cohorts it overtakes, not an update per leg.
+
+import heapq
+import itertools
+import threading
+from collections import OrderedDict, deque
+
+from prostocks_logging import get_logger
+
+log = get_logger("triggers")
+
+DONE_STATUSES = frozenset({"COMPLETE", "CANCELED", "REJECTED"})
+COMPACT_MIN = 1024
+# Order updates kept for entries whose place_order response hasn't come back yet
+UNCLAIMED_MAX = 256
+# Exited / cancelled brackets kept for snapshot(); older ones are dropped
+FINISHED_MAX = 256
+
+
+class Leg:
+    __slots__ = ("bracket", "kind", "level", "trail", "cohort", "alive")
+
+    def __init__(self, bracket, kind, level=None, trail=None):
+        self.bracket, self.kind, self.level, self.trail = bracket, kind, level, trail
+        self.cohort = None
+        self.alive = True
+
+    def current(self):
+        """Trigger price now (a trailing stop's level moves with its peak)."""
+        if self.trail is None:
+            return self.level
+        sign = self.bracket.side
+        return sign * (self.cohort.peak - self.trail)
+
+
+class Bracket:
+    """One position's exit legs; status pending (entry not filled yet) / active / exiting / exited /
+    exit_failed / cancelled."""
+
+    __slots__ = ("bid", "tsym", "side", "qty", "sl", "tgt", "trail", "key", "remarks", "legs", "status",
+                 "entry_ordno", "entry_open", "exit_reason", "exit_price", "exit_resp")
+
+    def __init__(self, bid, tsym, side, qty, sl, tgt, trail, key, remarks):
+        self.bid, self.tsym, self.side, self.qty = bid, tsym, side, qty
+        self.sl, self.tgt, self.trail = sl, tgt, trail
+        self.key, self.remarks = key, remarks
+        self.legs = []
+        self.status = "pending"
+        self.entry_ordno, self.entry_open = None, False
+        self.exit_reason = self.exit_price = self.exit_resp = None
+
+    def row(self):
+        return {"bid": self.bid, "tsym": self.tsym, "side": "Buy" if self.side > 0 else "Sell", "qty": self.qty,
+                "status": self.status, "legs": {leg.kind: leg.current() for leg in self.legs if leg.alive},
+                "entry_ordno": self.entry_ordno, "exit_reason": self.exit_reason, "exit_price": self.exit_price}
+
+
+class Cohort:
+    __slots__ = ("peak", "legs", "stamp", "alive")
+
+    def __init__(self, peak):
+        self.peak = peak
+        self.legs = []  # (trail, seq, leg): tightest trail on top
+        self.stamp = 0
+        self.alive = True
+
+
+class TrailBook:
+    """Trailing stops for one symbol and position side, in x = side * price terms: a leg
+    fires when x <= peak - trail, where peak is the highest x since it was armed."""
+
+    def __init__(self, sign, seq):
+        self.sign = sign
+        self.seq = seq
+        self.cohorts = []  # (peak, seq, cohort) min-heap: the ones a new high overtakes come first
+        self.levels = []   # (-stop, seq, stamp, cohort) max-heap of each cohort's highest stop
+        self.by_peak = {}
+
+    def add(self, leg, price):
+        x = self.sign * price
+        cohort = self.by_peak.get(x)
+        if cohort is None:
+            cohort = self.by_peak[x] = Cohort(x)
+            heapq.heappush(self.cohorts, (x, next(self.seq), cohort))
+        heapq.heappush(cohort.legs, (leg.trail, next(self.seq), leg))
+        leg.cohort = cohort
+        self._relevel(cohort)
+
+    def _relevel(self, cohort):
+        legs = cohort.legs
+        while legs and not legs[0][2].alive:
+            heapq.heappop(legs)
+        cohort.stamp += 1
+        if legs:
+            heapq.heappush(self.levels, (legs[0][0] - cohort.peak, next(self.seq), cohort.stamp, cohort))
+        else:
+            cohort.alive = False
+            if self.by_peak.get(cohort.peak) is cohort:
+                del self.by_peak[cohort.peak]
+
+    def _merge(self, x):
+        merged = []
+        while self.cohorts and self.cohorts[0][0] < x:
+            peak, _, cohort = heapq.heappop(self.cohorts)
+            if cohort.alive and cohort.peak == peak:
+                merged.append(cohort)
+        if not merged:
+            return
+        same = self.by_peak.get(x)
+        if same is not None:
+            merged.append(same)
+        base = max(merged, key=lambda c: len(c.legs))
+        for cohort in merged:
+            del self.by_peak[cohort.peak]
+            if cohort is base:
+                continue
+            cohort.alive = False
+            for entry in cohort.legs:
+                if entry[2].alive:
+                    heapq.heappush(base.legs, entry)
+                    entry[2].cohort = base
+        if same is not base:
+            heapq.heappush(self.cohorts, (x, next(self.seq), base))
+        base.peak = x
+        self.by_peak[x] = base
+        self._relevel(base)
+
+    def on_price(self, price, fired):
+        x = self.sign * price
+        if self.cohorts and self.cohorts[0][0] < x:
+            self._merge(x)
+        levels = self.levels
+        while levels:
+            neg, _, stamp, cohort = levels[0]
+            if not cohort.alive or stamp != cohort.stamp:
+                heapq.heappop(levels)
+                continue
+            if x > -neg:
+                break
+            heapq.heappop(levels)
+            _, _, leg = heapq.heappop(cohort.legs)
+            if leg.alive:
+                leg.level = self.sign * (cohort.peak - leg.trail)
+                fired.append(leg)
+            self._relevel(cohort)
+        if len(levels) > COMPACT_MIN and len(levels) > 4 * len(self.by_peak):
+            self.levels = [e for e in levels if e[3].alive and e[2] == e[3].stamp]
+            heapq.heapify(self.levels)
+
+
+class SymbolTriggers:
+    """All legs on one symbol."""
+
+    def __init__(self, seq):
+        self.up = []    # (level, seq, leg): fire when price >= level
+        self.down = []  # (-level, seq, leg): fire when price <= level
+        self.trail = {1: TrailBook(1, seq), -1: TrailBook(-1, seq)}
+        self.dead = 0
+
+    def on_price(self, price, fired):
+        up, down = self.up, self.down
+        while up and up[0][0] <= price:
+            leg = heapq.heappop(up)[2]
+            if leg.alive:
+                fired.append(leg)
+            else:
+                self.dead -= 1
+        while down and -down[0][0] >= price:
+            leg = heapq.heappop(down)[2]
+            if leg.alive:
+                fired.append(leg)
+            else:
+                self.dead -= 1
+        for book in self.trail.values():
+            if book.levels:
+                book.on_price(price, fired)
+
+    def compact(self):
+        for name in ("up", "down"):
+            heap = [e for e in getattr(self, name) if e[2].alive]
+            heapq.heapify(heap)
+            setattr(self, name, heap)
+        self.dead = 0
+
+
+class TriggerManager:
+    """
+    Stop-loss / target / trailing-stop legs for open positions, fired on ticks.
+
+    The first leg to trigger wins: its siblings are cancelled (OCO) and the
+    exit goes out as one MKT order for the bracket's quantity - through
+    exit_fn(bracket, leg, price) when given (the engine closing its own
+    position), else api.place_order / place_orders for every exit a tick fires.
+    """
+
+    def __init__(self, api=None, exchange="NSE", product_type="I", exit_fn=None, on_exit=None):
+        self.api = api
+        self.exchange = exchange
+        self.product_type = product_type
+        self.exit_fn = exit_fn
+        self.on_exit = on_exit  # on_exit(bracket, response) after each exit is sent
+        self.books = {}
+        self.brackets = {}  # live brackets (and failed exits); finished ones move to `finished`
+        self.finished = deque(maxlen=FINISHED_MAX)
+        self.by_key = {}
+        self.pending = {}  # entry norenordno -> Bracket waiting for its fill
+        self.unclaimed = OrderedDict()
+        self.ltp = {}
+        self.seq = itertools.count()
+        self.next_bid = 0
+        self.fired = 0
+        self.lock = threading.RLock()
+
+    # === Brackets ===
+    def add_bracket(self, tsym, side, qty, sl=None, tgt=None, trail=None, ref_price=None, key=None, remarks=""):
+        """Arm legs for an open position; side is "Buy"/"Sell"/"B"/"S" or 1/-1. trail is a distance in price terms,
+        measured from ref_price (default: last tick) and following the best price since."""
+        with self.lock:
+            bracket = self._new(tsym, side, qty, sl, tgt, trail, key, remarks)
+            exits = self._arm(bracket, ref_price)
+        self._send(exits)
+        return bracket
+
+    def _new(self, tsym, side, qty, sl, tgt, trail, key, remarks):
+        self.next_bid += 1
+        if side not in (1, -1):
+            side = 1 if str(side)[:1].upper() == "B" else -1
+        bracket = Bracket(self.next_bid, tsym, side, int(qty), sl, tgt, trail, key, remarks)
+        self.brackets[bracket.bid] = bracket
+        if key is not None:
+            self.by_key[key] = bracket
+        return bracket
+
+    def _arm(self, bracket, ref_price=None):
+        """Push the bracket's legs; returns exits for levels the price is already through."""
+        book = self.books.get(bracket.tsym)
+        if book is None:
+            book = self.books[bracket.tsym] = SymbolTriggers(self.seq)
+        side = bracket.side
+        if bracket.sl is not None:
+            self._push(book, Leg(bracket, "stop", float(bracket.sl)), up=side < 0)
+        if bracket.tgt is not None:
+            self._push(book, Leg(bracket, "target", float(bracket.tgt)), up=side > 0)
+        if bracket.trail is not None:
+            ref = ref_price if ref_price is not None else self.ltp.get(bracket.tsym)
+            if ref is None:
+                raise ValueError(f"Trailing stop on {bracket.tsym} needs ref_price or a tick first")
+            leg = Leg(bracket, "trail", trail=float(bracket.trail))
+            bracket.legs.append(leg)
+            book.trail[side].add(leg, float(ref))
+        bracket.status = "active"
+        # Armed after the market already moved through a level: fire on the current price
+        fired = []
+        if bracket.tsym in self.ltp:
+            book.on_price(self.ltp[bracket.tsym], fired)
+        return self._take(book, fired, self.ltp.get(bracket.tsym))
+
+    def _push(self, book, leg, up):
+        bracket = leg.bracket
+        bracket.legs.append(leg)
+        if up:
+            heapq.heappush(book.up, (leg.level, next(self.seq), leg))
+        else:
+            heapq.heappush(book.down, (-leg.level, next(self.seq), leg))
+
+    def _kill(self, bracket):
+        book = self.books[bracket.tsym]
+        for leg in bracket.legs:
+            if leg.alive:
+                leg.alive = False
+                if leg.trail is None:
+                    book.dead += 1
+        if book.dead > COMPACT_MIN and book.dead > len(book.up) + len(book.down) - book.dead:
+            book.compact()
+
+    def cancel(self, bid):
+        """Disarm a bracket (the position was closed some other way); True if it was live."""
+        with self.lock:
+            bracket = self.brackets.get(bid)
+            if bracket is None or bracket.status not in ("pending", "active"):
+                return False
+            self._kill(bracket)
+            bracket.status = "cancelled"
+            self.pending.pop(bracket.entry_ordno, None)
+            if self.by_key.get(bracket.key) is bracket:
+                del self.by_key[bracket.key]
+            self._retire(bracket)
+            return True
+
+    def _retire(self, bracket):
+        """A bracket whose legs are all done leaves `brackets`; snapshot() still shows the latest ones."""
+        if self.brackets.pop(bracket.bid, None) is bracket:
+            self.finished.append(bracket)
+
+    def cancel_key(self, key):
+        bracket = self.by_key.get(key)
+        return bracket is not None and self.cancel(bracket.bid)
+
+    def modify(self, bid, sl=None, tgt=None, trail=None, ref_price=None):
+        """Move legs of a live bracket; None leaves a leg as it is."""
+        with self.lock:
+            bracket = self.brackets.get(bid)
+            if bracket is None or bracket.status != "active":
+                return False
+            self._kill(bracket)
+            bracket.legs = []
+            if sl is not None:
+                bracket.sl = sl
+            if tgt is not None:
+                bracket.tgt = tgt
+            if trail is not None:
+                bracket.trail = trail
+            exits = self._arm(bracket, ref_price)
+        self._send(exits)
+        return True
+
+    def place_bracket_order(self, symbol, qty, price, sl, target, side, trail=None, price_type="LMT",
+                            exchange=None, product_type=None, remarks="bracket"):
+        """Entry order through api plus exit legs armed as it fills; fills arrive via on_order /
+        attach_feed / sync. Returns (response, bracket)."""
+        side_code = "B" if str(side)[:1].upper() == "B" else "S"
+        resp = self.api.place_order(buy_or_sell=side_code, product_type=product_type or self.product_type,
+                                    exchange=exchange or self.exchange, tradingsymbol=symbol, quantity=qty,
+                                    discloseqty=0, price_type=price_type, price=price, remarks=remarks)
+        if not isinstance(resp, dict) or resp.get("stat") != "Ok":
+            return resp, None
+        with self.lock:
+            bracket = self._new(symbol, side_code, 0, sl, target, trail, None, remarks)
+            bracket.entry_ordno, bracket.entry_open = resp.get("norenordno"), True
+            self.pending[bracket.entry_ordno] = bracket
+            early = self.unclaimed.pop(bracket.entry_ordno, None)
+        if early is not None:
+            self.on_order(early)
+        return resp, bracket
+
+    # === Updates ===
+    def on_order(self, order):
+        """Order row or "om" push: fills of pending entries arm (and size) their brackets."""
+        ordno = order.get("norenordno")
+        exits = []
+        with self.lock:
+            bracket = self.pending.get(ordno)
+            if bracket is None:
+                # Possibly the fill of an entry still inside place_bracket_order
+                if ordno and order.get("fillshares"):
+                    self.unclaimed[ordno] = dict(self.unclaimed.get(ordno, {}), **order)
+                    if len(self.unclaimed) > UNCLAIMED_MAX:
+                        self.unclaimed.popitem(last=False)
+                return
+            filled = int(order.get("fillshares") or 0)
+            status = str(order.get("status", "")).upper()
+            if filled > bracket.qty:
+                bracket.qty = filled
+                if bracket.status == "pending":
+                    ref = order.get("avgprc") or order.get("flprc")
+                    exits = self._arm(bracket, float(ref) if ref else None)
+            if status in DONE_STATUSES:
+                del self.pending[ordno]
+                bracket.entry_open = False
+                if bracket.status == "pending":
+                    bracket.status = "cancelled"
+                    self._retire(bracket)
+        self._send(exits)
+
+    def sync(self, order_book):
+        if isinstance(order_book, dict):
+            order_book = order_book.get("orders") or []
+        for order in order_book if isinstance(order_book, list) else ():
+            if isinstance(order, dict) and order.get("norenordno") in self.pending:
+                self.on_order(order)
+
+    def on_tick(self, tsym, price):
+        """New price for tsym; sends the exits it triggers and returns the fired brackets."""
+        if price is None or price != price:
+            return []
+        with self.lock:
+            self.ltp[tsym] = price
+            book = self.books.get(tsym)
+            if book is None:
+                return []
+            fired = []
+            book.on_price(price, fired)
+            if not fired:
+                return []
+            exits = self._take(book, fired, price)
+        return self._send(exits)
+
+    def _take(self, book, fired, price):
+        """First leg per bracket wins; mark its siblings dead (OCO)."""
+        exits = []
+        for leg in fired:
+            bracket = leg.bracket
+            if not leg.alive or bracket.status != "active":
+                if leg.trail is None:
+                    book.dead -= 1  # popped in the same tick after a sibling killed it
+                continue
+            leg.alive = False
+            self._kill(bracket)
+            bracket.status = "exiting"
+            bracket.exit_reason, bracket.exit_price = leg.kind, price
+            if self.by_key.get(bracket.key) is bracket:
+                del self.by_key[bracket.key]
+            exits.append((bracket, leg, price))
+        self.fired += len(exits)
+        return exits
+
+    def _send(self, exits):
+        if not exits:
+            return []
+        if self.exit_fn is not None:
+            responses = [self.exit_fn(bracket, leg, price) for bracket, leg, price in exits]
+        else:
+            for bracket, _, _ in exits:
+                if bracket.entry_open and bracket.entry_ordno:
+                    self.api.cancel_order(bracket.entry_ordno)
+            specs = [dict(buy_or_sell="S" if b.side > 0 else "B", product_type=self.product_type,
+                          exchange=self.exchange, tradingsymbol=b.tsym, quantity=b.qty, discloseqty=0,
+                          price_type="MKT", remarks=f"{b.remarks}_{leg.kind}".lstrip("_")) for b, leg, _ in exits]
+            if len(specs) == 1:
+                responses = [self.api.place_order(**specs[0])]
+            else:
+                responses = self.api.place_orders(specs)
+        for (bracket, leg, price), resp in zip(exits, responses):
+            ok = resp is not None and (not isinstance(resp, dict) or resp.get("stat") == "Ok")
+            with self.lock:
+                bracket.status = "exited" if ok else "exit_failed"
+                bracket.exit_resp = resp
+                if ok:
+                    self._retire(bracket)  # a failed exit stays listed until someone deals with it
+            if ok:
+                log.info("🎯 %s %s hit @ %s, exited %s", bracket.tsym, leg.kind, price, bracket.qty)
+            else:
+                log.error("❌ %s %s hit @ %s but the exit failed: %s", bracket.tsym, leg.kind, price, resp)
+            if self.on_exit is not None:
+                self.on_exit(bracket, resp)
+        return [bracket for bracket, _, _ in exits]
+
+    def attach_feed(self, feed, tokens, exchange="NSE"):
+        """Ticks and entry fills from a MarketFeed; tokens maps trading symbol -> token."""
+        by_key = {f"{exchange}|{token}": tsym for tsym, token in tokens.items()}
+
+        def on_tick(key, row):
+            tsym = by_key.get(key)
+            if tsym is not None and row is not None:
+                self.on_tick(tsym, row.get("lp"))
+
+        feed.on_tick(on_tick)
+        feed.subscribe_orders(self.on_order)
+        return on_tick
+
+    # === Reads ===
+    def live(self, tsym=None):
+        with self.lock:
+            return [b for b in self.brackets.values() if b.status in ("pending", "active")
+                    and (tsym is None or b.tsym == tsym)]
+
+    def snapshot(self):
+        """Live and failed brackets, then the last FINISHED_MAX exited / cancelled ones."""
+        with self.lock:
+            return [b.row() for b in self.brackets.values()] + [b.row() for b in self.finished]
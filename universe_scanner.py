@@ -0,0 +1,133 @@
+# universe_scanner.py
+# Entry rules (strategy_rules) evaluated over a whole universe every bar, sharded
+# across a process pool.
+#
+# Candles live in one shared-memory block shaped (3, symbols, bars) for high,
+# low and close.  Workers map that block instead of receiving pickled copies:
+# a task is just (block name, shape, row range) and the reply is the few
+# symbols that actually have a signal.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import strategy_rules
+from indicator_engine import DEFAULT_PARAMS, IndicatorEngine
+
+# Worker-side cache of attached blocks: name -> SharedMemory
+_attached = {}
+
+
+def _attach(name):
+    shm = _attached.get(name)
+    if shm is None:
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13: pool workers share the parent's resource tracker, so the
+            # extra registration is a no-op and the parent stays the one that unlinks
+            shm = shared_memory.SharedMemory(name=name)
+        for old in _attached.values():
+            old.close()
+        _attached.clear()
+        _attached[name] = shm
+    return shm
+
+
+def scan_rows(hlc, lo, hi, params, qcfg, balance):
+    """Rows lo:hi of a (3, symbols, bars) array -> [(row, side, price, qty, sl, tgt), ...]."""
+    high, low, close = hlc[0, lo:hi], hlc[1, lo:hi], hlc[2, lo:hi]
+    engine = IndicatorEngine(range(hi - lo), params)
+    engine.run(high, low, close, keep=())
+    signals = engine.signals()
+    price = engine.close
+    side = strategy_rules.entry_side_vec(signals, price, engine.params["min_vol_required"])
+    qty = strategy_rules.quantity_vec(np.nan_to_num(price), qcfg, balance)
+    hit = np.flatnonzero((side != strategy_rules.FLAT) & (qty > 0))
+    if not len(hit):
+        return []
+    sl, tgt = strategy_rules.stop_and_target_vec(side[hit], price[hit], engine.pac_lower[hit],
+                                                 engine.pac_upper[hit])
+    return [(lo + int(i), int(side[i]), float(price[i]), int(qty[i]), float(s), float(t))
+            for i, s, t in zip(hit, sl, tgt)]
+
+
+def _scan_shard(name, shape, lo, hi, params, qcfg, balance):
+    shm = _attach(name)
+    hlc = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    return scan_rows(hlc, lo, hi, params, qcfg, balance)
+
+
+class UniverseScanner:
+    """
+    Scan every symbol's latest bar for entries.
+
+    workers=1 runs in-process; otherwise shards go to a persistent process pool.
+    Write candles with load() (or straight into `hlc`) and call scan().
+    """
+
+    def __init__(self, symbols, workers=None, params=None, qcfg=None, balance=None, shards_per_worker=2):
+        self.symbols = list(symbols)
+        self.workers = workers or os.cpu_count() or 1
+        self.params = dict(DEFAULT_PARAMS, **(params or {}))
+        self.qcfg = qcfg or strategy_rules.DEFAULT_QCFG
+        self.balance = balance
+        self.shards_per_worker = shards_per_worker
+        self.shm = None
+        self.hlc = None
+        self.pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+
+    def _allocate(self, bars):
+        shape = (3, len(self.symbols), bars)
+        if self.hlc is not None and self.hlc.shape == shape:
+            return
+        self._release()
+        self.shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+        self.hlc = np.ndarray(shape, dtype=np.float64, buffer=self.shm.buf)
+
+    def load(self, high, low, close):
+        """Copy (symbols x bars) arrays into the shared block; NaN marks missing bars."""
+        close = np.asarray(close, dtype=np.float64)
+        self._allocate(close.shape[1])
+        self.hlc[0], self.hlc[1], self.hlc[2] = high, low, close
+
+    def scan(self, now=None, settings=None):
+        """Actionable signals on the last loaded bar, as strategy_rules.evaluate dicts."""
+        if self.hlc is None:
+            return []
+        if now is not None and settings is not None and not strategy_rules.can_enter(now, settings):
+            return []
+        n = len(self.symbols)
+        if self.pool is None:
+            rows = scan_rows(self.hlc, 0, n, self.params, self.qcfg, self.balance)
+        else:
+            bounds = np.linspace(0, n, min(n, self.workers * self.shards_per_worker) + 1).astype(int)
+            futures = [self.pool.submit(_scan_shard, self.shm.name, self.hlc.shape, int(lo), int(hi),
+                                        self.params, self.qcfg, self.balance)
+                       for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+            rows = [row for f in futures for row in f.result()]
+        stamp = now.strftime("%H:%M") if now is not None else None
+        return [{"symbol": self.symbols[i], "side": strategy_rules.SIDE_NAMES[side], "price": price,
+                 "qty": qty, "sl": round(sl, 2), "tgt": round(tgt, 2), "time": stamp}
+                for i, side, price, qty, sl, tgt in rows]
+
+    def _release(self):
+        if self.shm is not None:
+            self.hlc = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        self._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()